@@ -4,11 +4,12 @@ Streamlit 기반 웹 UI
 """
 
 import streamlit as st
+import html
 import sys
 import os
 from pathlib import Path
 from datetime import datetime
-import base64
+import numpy as np
 
 # Streamlit Secrets를 환경 변수로 설정 (config.py 로드 전에 실행)
 # Streamlit Cloud: secrets에서 읽기
@@ -18,7 +19,9 @@ try:
         # Streamlit Cloud 환경
         os.environ['CLAUDE_API_KEY'] = st.secrets["CLAUDE_API_KEY"]
         os.environ['CLAUDE_MODEL'] = st.secrets.get("CLAUDE_MODEL", "claude-sonnet-4-5-20250929")
-        os.environ['MAX_TOKENS'] = str(st.secrets.get("MAX_TOKENS", "2000"))
+        os.environ['MAX_TOKENS'] = str(st.secrets.get("MAX_TOKENS", "1200"))
+        os.environ['CLAUDE_FAST_MODEL'] = st.secrets.get("CLAUDE_FAST_MODEL", "claude-haiku-4-5-20251001")
+        os.environ['MODEL_ROUTING'] = str(st.secrets.get("MODEL_ROUTING", "true"))
         os.environ['TEMPERATURE'] = str(st.secrets.get("TEMPERATURE", "0.7"))
 except Exception:
     # 로컬 환경에서는 secrets.toml이 없을 수 있음
@@ -28,10 +31,15 @@ except Exception:
 # src 디렉토리를 경로에 추가
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from config import validate_config
+from config import OUTPUT_DIR, TTS_SAVE_OUTPUT, validate_config
 from matcher import AnswerMatcher
-from generator import AnswerGenerator
+from answer_cache import load_answer_cache
+from audio_cache import load_audio_cache
+from generator import AsyncAnswerGenerator
+from pipeline import AsyncCounselingPipeline, EventLoopThread
+from routing import ModelRouter
 from tts import TextToSpeech
+from tts_jobs import TTSJobQueue
 from main import remove_emojis
 
 
@@ -84,31 +92,91 @@ st.markdown("""
 
 @st.cache_resource
 def init_system():
-    """시스템 초기화 (캐싱)"""
+    """
+    시스템 초기화 (캐싱)
+
+    모든 세션이 하나의 이벤트 루프 스레드와 비동기 클라이언트(HTTP 연결 풀)를 공유하며,
+    동시에 진행되는 API 요청 수는 LLM_MAX_CONCURRENCY로 제한됩니다.
+    """
     try:
         validate_config()
         matcher = AnswerMatcher()
-        generator = AnswerGenerator()
-        tts = TextToSpeech()
-        return matcher, generator, tts, None
+        generator = AsyncAnswerGenerator(cache=load_answer_cache(matcher),
+                                         router=ModelRouter(fast_threshold=matcher.fast_threshold))
+        tts = TextToSpeech(cache=load_audio_cache())
+        return AsyncCounselingPipeline(matcher, generator, tts), EventLoopThread(), TTSJobQueue(tts), None
     except Exception as e:
         return None, None, None, str(e)
 
 
-def get_audio_player(audio_path: Path):
-    """오디오 플레이어 HTML 생성"""
-    try:
-        with open(audio_path, "rb") as f:
-            audio_bytes = f.read()
-        audio_b64 = base64.b64encode(audio_bytes).decode()
-        audio_html = f"""
-        <audio controls style="width: 100%;">
-            <source src="data:audio/mp3;base64,{audio_b64}" type="audio/mp3">
-        </audio>
-        """
-        return audio_html
-    except Exception as e:
-        return f"<p>오디오 로드 실패: {e}</p>"
+def answer_box_html(answer_text: str, cursor: str = "") -> str:
+    """답변 상자 HTML (이모지를 지우고 HTML 특수문자는 이스케이프)"""
+    return f'<div class="answer-box">{html.escape(remove_emojis(answer_text))}{cursor}</div>'
+
+
+def stream_answer(pipeline, event_loop, question: str, matches, speech=None) -> str:
+    """LLM 답변을 생성되는 대로 답변 상자에 표시하고 전체 답변 반환 (speech가 있으면 문장이 끝나는 대로 음성 변환 시작)"""
+    answer_box = st.empty()
+    answer_text = ""
+    for delta in event_loop.iterate(pipeline.stream(question, matches)):
+        answer_text += delta
+        if speech is not None:
+            speech.feed(delta)
+        answer_box.markdown(answer_box_html(answer_text, "▌"), unsafe_allow_html=True)
+    answer_text = answer_text.strip()
+    answer_box.markdown(answer_box_html(answer_text), unsafe_allow_html=True)
+    return answer_text
+
+
+def open_speech(pipeline, enable_tts: bool):
+    """답변 생성과 동시에 음성 변환을 시작할 SpeechStream (TTS를 쓰지 않으면 None)"""
+    if not enable_tts or pipeline.tts is None:
+        return None
+    return pipeline.tts.open_stream()
+
+
+def submit_audio(tts_jobs, pending_audio: list, answer_text: str, speech=None):
+    """
+    음성 변환을 백그라운드 작업으로 제출하고, 결과를 표시할 자리를 답변 아래에 만들어 둠
+
+    답변 텍스트는 바로 끝나고, 음성은 화면의 나머지를 다 그린 뒤 show_audio_jobs에서 채웁니다.
+    speech가 있으면 답변 생성과 함께 이미 시작한 변환의 남은 조각만 기다립니다.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    file_name = f"answer_{timestamp}.{tts_jobs.tts.engine.format}"
+    output_path = OUTPUT_DIR / file_name if TTS_SAVE_OUTPUT else None
+    job_id = tts_jobs.submit(answer_text, output_path, speech=speech)
+    st.markdown("---")
+    st.subheader("🎙️ 음성 답변")
+    pending_audio.append((job_id, file_name, st.empty()))
+
+
+def show_audio_jobs(tts_jobs, pending_audio):
+    """제출한 음성 변환 작업이 끝나는 대로 플레이어와 다운로드 버튼 표시"""
+    engine = tts_jobs.tts.engine
+    for job_id, file_name, placeholder in pending_audio:
+        with placeholder.container():
+            try:
+                with st.spinner("음성을 생성하고 있습니다..."):
+                    audio_bytes = tts_jobs.wait(job_id).audio
+            except Exception as e:
+                st.error(f"음성 생성에 실패했습니다: {e}")
+                continue
+
+            # 오디오 플레이어 (헤더 없는 PCM은 샘플 배열로 전달)
+            if engine.format == "pcm":
+                st.audio(np.frombuffer(audio_bytes, dtype=np.int16), sample_rate=engine.sample_rate)
+            else:
+                st.audio(audio_bytes, format=engine.mime_type)
+
+            # 다운로드 버튼
+            st.download_button(
+                label="📥 음성 파일 다운로드",
+                data=audio_bytes,
+                file_name=file_name,
+                mime=engine.mime_type,
+                key=f"download_{job_id}"
+            )
 
 
 def main():
@@ -116,7 +184,8 @@ def main():
     st.markdown('<div class="main-header">💬 AI 고민상담 자동 답변 시스템</div>', unsafe_allow_html=True)
 
     # 시스템 초기화
-    matcher, generator, tts, error = init_system()
+    pipeline, event_loop, tts_jobs, error = init_system()
+    pending_audio = []  # 이번 실행에서 제출한 음성 변환 작업 (작업 ID, 파일명, 표시할 자리)
 
     if error:
         st.error(f"시스템 초기화 오류: {error}")
@@ -127,17 +196,24 @@ def main():
     with st.sidebar:
         st.header("📌 시스템 정보")
         st.success("✓ 시스템 준비 완료")
+        matcher = pipeline.matcher
 
         st.markdown("---")
         st.subheader("🗂️ 지원 카테고리")
-        categories = ["연애", "진로", "가족", "대인관계", "학업", "자존감", "스트레스", "직장", "불안"]
+        categories = matcher.categories
         for cat in categories:
-            st.markdown(f'<span class="category-badge">{cat}</span>', unsafe_allow_html=True)
+            st.markdown(f'<span class="category-badge">{html.escape(cat)}</span>', unsafe_allow_html=True)
 
         st.markdown("---")
         st.subheader("⚙️ 설정")
         enable_tts = st.checkbox("음성 답변 생성", value=True)
         show_references = st.checkbox("참고 답변 표시", value=True)
+        # 템플릿 답변은 검색기 기준 유사도가 설정된 경우에만 (TEMPLATE_ANSWER_THRESHOLD, 기본: 끔)
+        use_template = bool(pipeline.template_threshold) and st.checkbox(
+            "준비된 답변 바로 보기", value=True,
+            help="준비된 답변과 거의 같은 고민이면 AI 생성 없이 바로 보여주고, 필요할 때 자세한 답변을 요청"
+        )
+        selected_category = st.selectbox("검색 카테고리", ["자동"] + categories)
 
         st.markdown("---")
         st.info("""
@@ -186,29 +262,54 @@ def main():
         if 'answer_count' not in st.session_state:
             st.session_state.answer_count = 0
         st.metric("생성된 답변", f"{st.session_state.answer_count}개")
+        st.metric("프롬프트 캐시 비율", f"{pipeline.generator.usage.cache_hit_rate:.0%}",
+                  help="누적 입력 토큰 중 프롬프트 캐시에서 읽은 비율")
+        if pipeline.generator.cache is not None:
+            st.metric("답변 캐시 적중률", f"{pipeline.generator.cache.stats.hit_rate:.0%}",
+                      help=pipeline.generator.cache.stats.summary())
+        if pipeline.generator.resilience.stats.fallbacks:
+            st.metric("폴백 답변", f"{pipeline.generator.resilience.stats.fallbacks}회",
+                      help=pipeline.generator.resilience.stats.summary())
+        router_stats = pipeline.generator.router.stats
+        if router_stats.latencies:
+            st.metric("빠른 모델 답변", f"{router_stats.count('fast')}회", help=router_stats.summary())
+        if pipeline.tts is not None and pipeline.tts.cache is not None:
+            st.metric("음성 캐시 적중률", f"{pipeline.tts.cache.stats.hit_rate:.0%}",
+                      help=pipeline.tts.cache.stats.summary())
+        if tts_jobs.stats.submitted:
+            st.metric("음성 작업 대기열", f"{tts_jobs.stats.queue_depth}개", help=tts_jobs.stats.summary())
+        if pipeline.template_answers:
+            st.metric("바로 보여준 답변", f"{pipeline.template_answers}회", help="AI 생성 없이 준비된 답변으로 바로 답한 횟수")
+        if pipeline.flights is not None:
+            st.metric("병합된 요청", f"{pipeline.flights.stats.shared}회",
+                      help="진행 중인 같은 요청의 결과를 함께 받은 횟수")
 
     # 답변 생성
     if generate_button and question.strip():
         with st.spinner("답변을 생성하고 있습니다..."):
             try:
+                st.session_state.pop('detail_request', None)
+
                 # 1. 유사 답변 검색
                 st.info("🔍 유사한 답변을 검색 중...")
-                matches = matcher.find_best_matches(question, top_k=3)
-
-                # 2. 답변 생성
-                st.info("🤖 AI 답변 생성 중...")
-                if matches:
-                    answer_text = generator.generate_answer(question, matches)
-                else:
-                    answer_text = generator.generate_simple_answer(question)
+                category = None if selected_category == "자동" else selected_category
+                matches = event_loop.run(pipeline.retrieve(question, top_k=3, category=category))
 
-                # 이모지 제거
-                clean_answer = remove_emojis(answer_text)
-
-                # 3. 답변 표시
+                # 2. 답변 생성 (준비된 답변과 거의 같은 고민이면 템플릿 답변을 바로, 아니면 생성되는 대로 표시)
+                quick_answer = pipeline.quick_answer(question, matches) if use_template else None
+                if quick_answer is None:
+                    st.info("🤖 AI 답변 생성 중...")
                 st.markdown("---")
                 st.subheader("✨ 생성된 답변")
-                st.markdown(f'<div class="answer-box">{answer_text}</div>', unsafe_allow_html=True)
+                speech = None
+                if quick_answer is not None:
+                    answer_text = quick_answer
+                    st.markdown(answer_box_html(answer_text), unsafe_allow_html=True)
+                    st.caption("⚡ 비슷한 고민에 준비된 답변을 바로 보여드렸어요. 아래 버튼으로 AI의 자세한 답변을 받을 수 있습니다.")
+                    st.session_state.detail_request = (question, matches)
+                else:
+                    speech = open_speech(pipeline, enable_tts)
+                    answer_text = stream_answer(pipeline, event_loop, question, matches, speech)
 
                 # 참고 답변 표시
                 if show_references and matches:
@@ -218,26 +319,9 @@ def main():
                         with st.expander(f"{i}. [{answer['category']}] {answer['title']} (유사도: {score:.0%})"):
                             st.write(answer['content'])
 
-                # 4. TTS 생성
+                # 4. TTS 생성 (백그라운드 작업)
                 if enable_tts:
-                    st.markdown("---")
-                    st.subheader("🎙️ 음성 답변")
-                    with st.spinner("음성을 생성하고 있습니다..."):
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        audio_path = tts.generate_answer_audio(answer_text, f"answer_{timestamp}")
-
-                        # 오디오 플레이어
-                        audio_html = get_audio_player(audio_path)
-                        st.markdown(audio_html, unsafe_allow_html=True)
-
-                        # 다운로드 버튼
-                        with open(audio_path, "rb") as f:
-                            st.download_button(
-                                label="📥 음성 파일 다운로드",
-                                data=f,
-                                file_name=f"answer_{timestamp}.mp3",
-                                mime="audio/mp3"
-                            )
+                    submit_audio(tts_jobs, pending_audio, answer_text, speech)
 
                 # 통계 업데이트
                 st.session_state.answer_count += 1
@@ -251,10 +335,31 @@ def main():
     elif generate_button and not question.strip():
         st.warning("고민 내용을 입력해주세요.")
 
+    # 템플릿 답변 뒤 자세한 답변 요청 (버튼을 눌렀을 때만 AI 답변 생성)
+    detail_request = st.session_state.get('detail_request')
+    if detail_request is not None and st.button("🤖 AI에게 더 자세한 답변 받기", use_container_width=True):
+        detail_question, detail_matches = st.session_state.pop('detail_request')
+        st.markdown("---")
+        st.subheader("✨ AI 상세 답변")
+        st.caption(f"고민: {detail_question}")
+        try:
+            with st.spinner("AI 답변을 생성하고 있습니다..."):
+                speech = open_speech(pipeline, enable_tts)
+                answer_text = stream_answer(pipeline, event_loop, detail_question, detail_matches, speech)
+            if enable_tts:
+                submit_audio(tts_jobs, pending_audio, answer_text, speech)
+            st.session_state.answer_count += 1
+        except Exception as e:
+            st.error(f"오류가 발생했습니다: {e}")
+            st.exception(e)
+
     # 푸터
     st.markdown("---")
     st.caption("AI 고민상담 자동 답변 시스템 MVP v0.1.0 | Powered by Claude API & Streamlit")
 
+    # 음성 답변 (화면을 다 그린 뒤 백그라운드 작업 결과를 기다려 답변 아래 자리에 표시)
+    show_audio_jobs(tts_jobs, pending_audio)
+
 
 if __name__ == "__main__":
     main()
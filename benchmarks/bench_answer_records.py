@@ -0,0 +1,73 @@
+"""
+답변 레코드 메모리 벤치마크
+답변을 dict로 들고 있을 때, __slots__ 레코드(AnswerRecord)로 들고 있을 때,
+저장소 열(id/category/title) + 지연 로드(StoredAnswers)로 들고 있을 때의 답변당 메모리 비교
+
+실행:
+    python benchmarks/bench_answer_records.py [답변 수]
+"""
+
+import gc
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from common import make_answers
+from corpus import AnswerRecord, AnswerStore, StoredAnswers, write_answers
+
+
+def traced(fn):
+    """fn 실행 후 남아 있는 할당 바이트 수와 결과 반환"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        jsonl_path = tmp / "answers.jsonl"
+        write_answers(jsonl_path, make_answers(n))
+        lines = jsonl_path.read_text(encoding='utf-8').splitlines()
+
+        dict_bytes, dicts = traced(lambda: [json.loads(line) for line in lines])
+        record_bytes, records = traced(
+            lambda: [AnswerRecord.from_dict(json.loads(line)) for line in lines]
+        )
+        del dicts, records
+
+        store = AnswerStore.build(tmp / "store", "answers", "0" * 64, (json.loads(l) for l in lines))
+        store.close()
+        del lines
+
+        def open_stored():
+            # 저장소를 여는 비용(열 데이터 + 오프셋)과 검색 결과로 꺼낸 레코드 10개
+            stored = StoredAnswers(AnswerStore.open(tmp / "store", "answers", "0" * 64))
+            return stored, [stored[i] for i in range(10)]
+
+        stored_bytes, (stored, top) = traced(open_stored)
+        assert top[0]['title']
+        stored.store.close()
+
+    print(f"\n답변 {n}개 상주 메모리 (tracemalloc)")
+    for name, size in [
+        ("dict", dict_bytes),
+        ("AnswerRecord (__slots__)", record_bytes),
+        ("StoredAnswers (열 + 지연 로드)", stored_bytes),
+    ]:
+        print(f"  {name:<32} {size / 1e6:8.1f}MB  답변당 {size / n:8.1f}B  (dict 대비 {size / dict_bytes:5.1%})")
+
+
+if __name__ == "__main__":
+    main()
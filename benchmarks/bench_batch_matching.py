@@ -0,0 +1,46 @@
+"""
+배치 검색 벤치마크
+find_best_matches 반복 호출과 find_best_matches_many의 초당 처리 질문 수 비교
+
+실행:
+    python benchmarks/bench_batch_matching.py [답변 수] [질문 수]
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from common import write_corpus, make_questions, measure
+from matcher import AnswerMatcher
+
+
+def main():
+    n_answers = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_questions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_corpus(Path(tmp) / "answers.json", n_answers)
+        matcher = AnswerMatcher(path, index_cache_dir=None)
+        questions = make_questions(n_questions)
+
+        # 반복 호출은 느리므로 한 번만 측정하고 그 결과를 비교에 재사용
+        loop_results = []
+        loop_time = measure(lambda: loop_results.extend(
+            matcher.find_best_matches(q) for q in questions
+        ), repeat=1)
+        batch_time = measure(lambda: matcher.find_best_matches_many(questions), repeat=3)
+
+        batch_results = matcher.find_best_matches_many(questions)
+        same = all(
+            [(a['id'], round(s, 9)) for a, s in x] == [(a['id'], round(s, 9)) for a, s in y]
+            for x, y in zip(loop_results, batch_results)
+        )
+
+    print(f"\n답변 {n_answers}개, 질문 {n_questions}개")
+    print(f"  반복 호출:  {n_questions / loop_time:10.1f} 질문/초")
+    print(f"  배치 호출:  {n_questions / batch_time:10.1f} 질문/초 (x{loop_time / batch_time:.1f})")
+    print(f"  결과 일치:  {same}")
+
+
+if __name__ == "__main__":
+    main()
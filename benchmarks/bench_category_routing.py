@@ -0,0 +1,84 @@
+"""
+카테고리 라우팅 벤치마크
+1) 샘플 답변으로 학습한 카테고리 분류기의 라우팅 비율과 정확도 (LABELED_QUESTIONS 기준)
+2) 합성 코퍼스에서 전체 검색 / 카테고리 지정 검색 / 자동 라우팅 검색의 질문당 지연 시간
+
+실행:
+    python benchmarks/bench_category_routing.py [답변 수]
+    (기본: 100000)
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from common import LABELED_QUESTIONS, make_questions, write_corpus
+from matcher import AnswerMatcher
+
+
+def bench_accuracy():
+    """정답 답변의 카테고리로 라우팅되는 비율"""
+    matcher = AnswerMatcher(index_cache_dir=None, category_routing=True)
+    categories = {a['id']: a['category'] for a in matcher.answers}
+    classifier = matcher._index.classifier
+
+    routed = correct = 0
+    for question, expected in LABELED_QUESTIONS:
+        selected = classifier.route(question)
+        if selected is None:
+            continue
+        routed += 1
+        correct += categories[expected] in selected
+    total = len(LABELED_QUESTIONS)
+    print(f"라우팅: {routed}/{total}개 질문 ({routed / total:.0%}), "
+          f"라우팅한 질문 중 정답 카테고리 포함 {correct}/{routed} ({correct / max(routed, 1):.0%})")
+
+
+def latencies(fn, questions) -> np.ndarray:
+    """질문별 실행 시간(ms) 측정"""
+    times = []
+    for q in questions:
+        start = time.perf_counter()
+        fn(q)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def bench_latency(n: int):
+    """전체 / 카테고리 지정 / 자동 라우팅 검색의 지연 시간"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_corpus(Path(tmp) / "answers.json", n)
+        matcher = AnswerMatcher(path, index_cache_dir=None, category_routing=True)
+
+    questions = make_questions(100)
+    category = matcher.categories[0]
+    # 부분 인덱스는 처음 사용할 때 만들어지므로 미리 생성
+    build_start = time.perf_counter()
+    partition = matcher._index.partition([category])
+    build_time = time.perf_counter() - build_start
+
+    # 라우팅을 켠 매처이므로 전체 검색은 전체 인덱스 검색기를 직접 호출
+    everything = matcher._retriever(matcher._index)
+    cases = [
+        ("전체 검색", lambda q: everything.search(q, 3)),
+        (f"카테고리({category})", lambda q: matcher.find_best_matches(q, category=category)),
+        ("자동 라우팅", matcher.find_best_matches),
+    ]
+    print(f"\n답변 {n}개, 카테고리 {len(matcher.categories)}개 "
+          f"('{category}' 답변 {len(partition.answers)}개, 부분 인덱스 생성 {build_time * 1000:.0f}ms)")
+    for name, fn in cases:
+        latencies(fn, questions)  # 예열 (라우팅한 카테고리 조합의 부분 인덱스 생성)
+        times = latencies(fn, questions)
+        print(f"  {name:<14} p50 {np.percentile(times, 50):7.2f}ms  p99 {np.percentile(times, 99):7.2f}ms")
+
+
+def main():
+    bench_accuracy()
+    bench_latency(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+코퍼스 로딩 메모리 벤치마크
+메모리 모드(JSON 전체 로드)와 스트리밍 모드(JSONL + 디스크 답변 저장소)의 최대 RSS 비교
+각 모드는 별도 프로세스에서 실행하여 측정합니다 (Linux/macOS 전용, resource 모듈 사용).
+
+실행:
+    python benchmarks/bench_corpus_memory.py [답변 수]
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from common import make_answers
+from corpus import write_answers
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+CHILD_SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, {src!r})
+from matcher import AnswerMatcher
+
+start = time.perf_counter()
+matcher = {factory}
+elapsed = time.perf_counter() - start
+matcher.find_best_matches("매일 걱정이 많고 불안해요")
+
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024  # macOS는 바이트, Linux는 KB 단위
+print(json.dumps({{"rss_mb": rss * scale / 1e6, "seconds": elapsed}}))
+"""
+
+
+def run_child(factory: str) -> dict:
+    """별도 프로세스에서 매처를 만들고 최대 RSS와 생성 시간 측정"""
+    script = CHILD_SCRIPT.format(src=str(SRC_DIR), factory=factory)
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        answers = make_answers(n)
+        json_path = tmp / "answers.json"
+        jsonl_path = tmp / "answers.jsonl"
+        write_answers(json_path, answers)
+        write_answers(jsonl_path, answers)
+        del answers
+
+        size_mb = json_path.stat().st_size / 1e6
+        cases = [
+            ("메모리 (JSON)", f"AnswerMatcher({str(json_path)!r}, index_cache_dir=None)"),
+            ("스트리밍 (JSONL)", f"AnswerMatcher({str(jsonl_path)!r}, index_cache_dir=None, "
+                               f"streaming=True, store_dir={str(tmp / 'store')!r})"),
+            ("스트리밍 + 인덱스 캐시 (첫 실행)",
+             f"AnswerMatcher({str(jsonl_path)!r}, index_cache_dir={str(tmp / 'index')!r}, "
+             f"streaming=True, store_dir={str(tmp / 'store2')!r})"),
+            ("스트리밍 + 인덱스 캐시 (재시작)",
+             f"AnswerMatcher({str(jsonl_path)!r}, index_cache_dir={str(tmp / 'index')!r}, "
+             f"streaming=True, store_dir={str(tmp / 'store2')!r})"),
+        ]
+
+        print(f"\n답변 {n}개 (파일 {size_mb:.1f}MB)")
+        for name, factory in cases:
+            result = run_child(factory)
+            print(f"  {name:<28} 최대 RSS {result['rss_mb']:8.1f}MB, 생성 {result['seconds']:6.2f}초")
+
+
+if __name__ == "__main__":
+    main()
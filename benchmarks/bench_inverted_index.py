@@ -0,0 +1,65 @@
+"""
+역색인 검색 벤치마크
+전체 채점(brute)과 역색인(inverted) 검색의 지연 시간과 결과 일치 여부 비교
+
+실행:
+    python benchmarks/bench_inverted_index.py [답변 수 ...]
+    (기본: 10000 50000 200000)
+"""
+
+import copy
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from common import write_corpus, make_questions
+from matcher import AnswerMatcher
+
+# 답변마다 덧붙일 희귀 단어 수 (0이면 샘플 문장만 재조합하여 모든 답변이 n-gram을 공유)
+RARE_WORDS = int(os.getenv("BENCH_RARE_WORDS", "3"))
+
+
+def latencies(matcher: AnswerMatcher, questions) -> np.ndarray:
+    """질문별 실행 시간(ms) 측정"""
+    times = []
+    for q in questions:
+        start = time.perf_counter()
+        matcher.find_best_matches(q)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [10000, 50000, 200000]
+    questions = make_questions(200)
+
+    print(f"{'답변 수':>8} | {'brute p50':>10} {'brute p99':>10} | {'inv p50':>10} {'inv p99':>10} | 일치")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_corpus(Path(tmp) / "answers.json", n, rare_words=RARE_WORDS)
+            brute = AnswerMatcher(path, index_cache_dir=None, retrieval_mode="brute")
+
+        # 같은 학습 결과를 공유하도록 역색인 매처는 brute 매처의 상태를 복사해서 만듦
+        inverted = copy.copy(brute)
+        inverted.retrieval_mode = "inverted"
+        inverted._index = inverted._make_index(brute.answers, brute.vectorizer, brute.answer_vectors)
+
+        same = all(
+            [(a['id'], round(s, 9)) for a, s in brute.find_best_matches(q)] ==
+            [(a['id'], round(s, 9)) for a, s in inverted.find_best_matches(q)]
+            for q in questions
+        )
+        b = latencies(brute, questions)
+        i = latencies(inverted, questions)
+        print(
+            f"{n:>8} | {np.percentile(b, 50):>8.2f}ms {np.percentile(b, 99):>8.2f}ms | "
+            f"{np.percentile(i, 50):>8.2f}ms {np.percentile(i, 99):>8.2f}ms | {same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
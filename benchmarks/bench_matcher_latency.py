@@ -0,0 +1,66 @@
+"""
+단일 질문 검색 지연 시간 벤치마크
+기존 방식(cosine_similarity + 전체 argsort)과 현재 find_best_matches 비교
+
+실행:
+    python benchmarks/bench_matcher_latency.py [답변 수 ...]
+    (기본: 1000 10000 100000)
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from common import write_corpus, make_questions
+from config import SIMILARITY_THRESHOLD, TOP_K_MATCHES
+from matcher import AnswerMatcher
+
+
+def legacy_find_best_matches(matcher: AnswerMatcher, question: str, top_k: int = TOP_K_MATCHES):
+    """개선 전 검색 방식 (비교 기준)"""
+    question_vector = matcher.vectorizer.transform([question])
+    similarities = cosine_similarity(question_vector, matcher.answer_vectors)[0]
+    top_indices = similarities.argsort()[-top_k:][::-1]
+    return [
+        (matcher.answers[idx], float(similarities[idx]))
+        for idx in top_indices if similarities[idx] >= SIMILARITY_THRESHOLD
+    ]
+
+
+def latencies(fn, questions) -> np.ndarray:
+    """질문별 실행 시간(ms) 측정"""
+    times = []
+    for q in questions:
+        start = time.perf_counter()
+        fn(q)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(f"{'답변 수':>8} | {'기존 p50':>10} {'기존 p99':>10} | {'현재 p50':>10} {'현재 p99':>10} | {'배속':>6}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_corpus(Path(tmp) / "answers.json", n)
+            matcher = AnswerMatcher(path, index_cache_dir=None)
+
+        # 기존 방식은 대용량에서 느리므로 질문 수를 줄임
+        questions = make_questions(20 if n >= 50000 else 100)
+        legacy = latencies(lambda q: legacy_find_best_matches(matcher, q), questions)
+        current = latencies(matcher.find_best_matches, questions)
+
+        print(
+            f"{n:>8} | {np.percentile(legacy, 50):>8.2f}ms {np.percentile(legacy, 99):>8.2f}ms | "
+            f"{np.percentile(current, 50):>8.2f}ms {np.percentile(current, 99):>8.2f}ms | "
+            f"x{np.median(legacy) / np.median(current):>5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+모델 라우팅 벤치마크
+샘플 답변 검색 결과로 유사도 기준별 빠른 모델 / 큰 모델 비율과 예상 출력 토큰 상한 비교
+(답변 제목 그대로의 질문, 표현을 바꾼 질문(LABELED_QUESTIONS), 일반 질문(BENCH_QUESTIONS)을 함께 사용)
+
+실행:
+    python benchmarks/bench_model_routing.py
+"""
+
+from collections import Counter
+
+from common import BENCH_QUESTIONS, LABELED_QUESTIONS, load_sample_answers
+from matcher import AnswerMatcher
+from routing import ModelRouter
+
+THRESHOLDS = [0.3, 0.35, 0.4, 0.45]
+
+
+def main():
+    matcher = AnswerMatcher(index_cache_dir=None)
+    questions = ([a['title'] for a in load_sample_answers()] + [q for q, _ in LABELED_QUESTIONS]
+                 + BENCH_QUESTIONS + ["요즘 너무 힘들어서 죽고 싶어요"])
+    matches = matcher.find_best_matches_many(questions)
+
+    print(f"질문 {len(questions)}개")
+    for threshold in THRESHOLDS:
+        router = ModelRouter(fast_threshold=threshold, enabled=True)
+        decisions = [router.route(q, m) for q, m in zip(questions, matches)]
+        routes = Counter(d.route.name for d in decisions)
+        tokens = sum(d.route.max_tokens for d in decisions) / len(decisions)
+        reasons = Counter(d.reason.split(" ")[0] if d.route.name == "large" else "fast" for d in decisions)
+        print(f"  기준 {threshold:.0%}: fast {routes['fast'] / len(decisions):5.1%} | large {routes['large'] / len(decisions):5.1%} "
+              f"| 평균 max_tokens {tokens:6.0f} | 큰 모델 이유 {dict((k, v) for k, v in reasons.items() if k != 'fast')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+참고 답변 패킹 벤치마크
+합성 코퍼스의 긴 답변으로 토큰 예산별 프롬프트 크기(시스템 프롬프트 + 참고 답변의 추정 토큰 p50 / p95), 패킹 시간,
+질문과 겹치는 내용이 얼마나 남는지(질문 2-gram 중 참고 답변에 남은 비율) 비교
+
+실행:
+    python benchmarks/bench_reference_packing.py [질문 수]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from common import make_answers, make_questions
+from generator import SYSTEM_PROMPT, format_references
+from packing import char_bigrams, estimate_tokens, pack_references
+
+TOP_K = 3
+BUDGETS = [0, 800, 600, 400]  # 0: 패킹하지 않음 (중복 제거만)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    # 검색 결과처럼 질문마다 긴 답변 TOP_K개 (답변 3개를 이어 붙여 실제 긴 상담 답변 길이로 맞춤)
+    answers = make_answers(n * TOP_K * 3)
+    for i, answer in enumerate(answers[:n * TOP_K]):
+        answer['content'] = " ".join(a['content'] for a in answers[i * 3:i * 3 + 3])
+    questions = make_questions(n)
+    matches = [[(answers[i * TOP_K + k], 0.6 - 0.1 * k) for k in range(TOP_K)] for i in range(n)]
+
+    print(f"질문 {n}개, 질문당 참고 답변 {TOP_K}개")
+    for budget in BUDGETS:
+        tokens, kept, elapsed = [], [], 0.0
+        for question, refs in zip(questions, matches):
+            start = time.perf_counter()
+            packed = pack_references(question, refs, budget=budget)
+            elapsed += time.perf_counter() - start
+            tokens.append(estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(format_references(packed)))
+
+            question_grams = char_bigrams(question)
+            text_grams = char_bigrams(" ".join(" ".join(p.sentences) for p in packed))
+            kept.append(len(question_grams & text_grams) / max(len(question_grams), 1))
+
+        p50, p95 = np.percentile(tokens, [50, 95])
+        label = "제한 없음" if budget <= 0 else f"예산 {budget}"
+        print(f"  {label:<10} 프롬프트 p50 {p50:6.0f}  p95 {p95:6.0f} 토큰 | 패킹 {elapsed / n * 1000:6.3f}ms/질문 "
+              f"| 질문 2-gram 유지 {np.mean(kept):5.1%}")
+
+
+if __name__ == "__main__":
+    main()
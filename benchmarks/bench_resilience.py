@@ -0,0 +1,98 @@
+"""
+API 장애 상황 벤치마크
+장애를 주입하는 스텁 서버(tests/llm_stub.py)로 재시도 / 서킷 브레이커의 성공률과 꼬리 지연(p50 / p95 / p99) 측정
+
+실행:
+    python benchmarks/bench_resilience.py [요청 수]
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import common  # noqa: F401 (src 경로 추가)
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "tests"))
+
+from generator import AsyncAnswerGenerator
+from llm_stub import STUB_ANSWER, StubLLMServer
+from resilience import CircuitBreaker, ResilientCaller, RetryPolicy
+
+CONCURRENCY = 16
+
+
+async def run_requests(stub: StubLLMServer, caller: ResilientCaller, n: int, fallback: bool):
+    """
+    워커 CONCURRENCY개가 차례로 요청 n개를 보내고 (요청별 지연 배열, 결과별 개수) 반환
+
+    요청을 한꺼번에 띄우지 않고 워커마다 하나씩 보내므로 지연에 대기열 시간이 섞이지 않습니다.
+    """
+    generator = AsyncAnswerGenerator(api_key="bench-key", base_url=stub.base_url, max_concurrency=CONCURRENCY,
+                                     resilience=caller, fallback=fallback)
+    outcomes = {"ok": 0, "fallback": 0, "error": 0}
+    latencies = []
+    remaining = iter(range(n))
+
+    async def worker():
+        for i in remaining:
+            start = time.perf_counter()
+            try:
+                answer = await generator.generate_simple_answer(f"고민 {i}")
+                outcomes["ok" if answer == STUB_ANSWER else "fallback"] += 1
+            except Exception:
+                outcomes["error"] += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    await generator.aclose()
+    return np.array(latencies), outcomes
+
+
+def report(name: str, stub: StubLLMServer, latencies: np.ndarray, outcomes: dict, n: int):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"  {name:<24} 성공 {outcomes['ok'] / n:6.1%} | 폴백 {outcomes['fallback'] / n:6.1%} "
+          f"| 오류 {outcomes['error'] / n:6.1%} | p50 {p50:7.0f}ms  p95 {p95:7.0f}ms  p99 {p99:7.0f}ms "
+          f"| API 요청 {len(stub.requests)}회")
+
+
+def bench_transient_faults(n: int):
+    """일부 요청만 429 / 529로 실패할 때 재시도 유무 비교"""
+    print(f"\n일시 오류 (요청 {n}개, 동시 {CONCURRENCY}, 응답 50ms)")
+    for rate in (0.1, 0.3):
+        print(f" 오류 비율 {rate:.0%}")
+        for name, policy in [
+            ("재시도 없음", RetryPolicy(max_attempts=1)),
+            ("재시도 (지터 백오프)", RetryPolicy(max_attempts=4, base_delay=0.05, max_delay=0.5)),
+        ]:
+            with StubLLMServer(delay=0.05) as stub:
+                stub.fault_rate = rate
+                stub.fault = {"status": 529}
+                caller = ResilientCaller(policy, CircuitBreaker(failure_threshold=10 ** 9))
+                latencies, outcomes = asyncio.run(run_requests(stub, caller, n, fallback=False))
+                report(name, stub, latencies, outcomes, n)
+
+
+def bench_outage(n: int):
+    """모든 요청이 느리게 실패하는 장애 중 서킷 브레이커 유무 비교"""
+    print(f"\n전체 장애 (요청 {n}개, 실패 응답까지 200ms)")
+    policy = RetryPolicy(max_attempts=4, base_delay=0.05, max_delay=0.5)
+    for name, threshold in [("재시도만", 10 ** 9), ("재시도 + 서킷 브레이커", 5)]:
+        with StubLLMServer() as stub:
+            stub.fault_rate = 1.0
+            stub.fault = {"status": 529, "delay": 0.2}
+            caller = ResilientCaller(policy, CircuitBreaker(failure_threshold=threshold, recovery_timeout=30))
+            latencies, outcomes = asyncio.run(run_requests(stub, caller, n, fallback=True))
+            report(name, stub, latencies, outcomes, n)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    bench_transient_faults(n)
+    bench_outage(n)
+
+
+if __name__ == "__main__":
+    main()
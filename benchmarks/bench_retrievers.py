@@ -0,0 +1,100 @@
+"""
+검색기 비교 벤치마크
+sample_answers.json에서 TF-IDF / 임베딩 / 하이브리드 검색기의 재현율(recall@k)과 질문당 지연 시간 비교
+임베딩·하이브리드 검색기는 sentence-transformers(또는 EMBEDDING_ONNX_PATH의 ONNX 모델)가 있을 때만 측정합니다.
+임의 임베딩으로 벡터 인덱스(전체 내적 float32/float16, HNSW)의 대규모 지연 시간과 재현율도 측정합니다.
+
+실행:
+    python benchmarks/bench_retrievers.py [벡터 인덱스 답변 수]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from common import LABELED_QUESTIONS
+from embeddings import l2_normalize
+from matcher import AnswerMatcher
+from vector_index import BruteForceVectorIndex, HnswVectorIndex
+
+RECALL_KS = (1, 3, 5)
+
+
+def evaluate(matcher: AnswerMatcher, threshold):
+    """정답 답변이 상위 k개에 드는 비율과 질문당 지연 시간 계산"""
+    retriever = matcher._retriever(matcher._index)
+    hits = {k: 0 for k in RECALL_KS}
+    latencies = []
+    for question, expected in LABELED_QUESTIONS:
+        start = time.perf_counter()
+        indices, _ = retriever.search(question, max(RECALL_KS), threshold)
+        latencies.append(time.perf_counter() - start)
+        ids = [matcher.answers[i]['id'] for i in indices]
+        for k in RECALL_KS:
+            hits[k] += expected in ids[:k]
+    recall = {k: hits[k] / len(LABELED_QUESTIONS) for k in RECALL_KS}
+    return recall, np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+
+def bench_vector_indexes(n: int, dimension: int = 384, n_queries: int = 200, top_k: int = 3):
+    """임의 임베딩(n x 차원)에서 벡터 인덱스별 질문당 지연 시간과 전체 내적 대비 재현율"""
+    rng = np.random.default_rng(0)
+    # 실제 문장 임베딩처럼 내재 차원이 낮도록 저차원 잠재 벡터를 투영하여 생성
+    projection = rng.standard_normal((32, dimension)).astype(np.float32)
+    embeddings = l2_normalize(rng.standard_normal((n, 32)).astype(np.float32) @ projection)
+    latent = rng.standard_normal((n_queries, 32)).astype(np.float32)
+    queries = l2_normalize(latent @ projection)
+
+    exact = BruteForceVectorIndex(embeddings).search(queries, top_k, -1.0)
+    indexes = [
+        ("brute float32", lambda: BruteForceVectorIndex(embeddings)),
+        ("brute float16", lambda: BruteForceVectorIndex(embeddings.astype(np.float16))),
+    ]
+    try:
+        import hnswlib  # noqa: F401
+        indexes.append(("hnsw", lambda: HnswVectorIndex(embeddings)))
+    except ImportError:
+        print("[SKIP] hnsw: hnswlib가 설치되어 있지 않습니다")
+
+    print(f"\n벡터 인덱스: 답변 {n}개 x {dimension}차원, 질문 {n_queries}개, top-{top_k}")
+    for name, build in indexes:
+        start = time.perf_counter()
+        index = build()
+        build_time = time.perf_counter() - start
+        latencies, hits = [], 0
+        for query, (expected, _) in zip(queries, exact):
+            start = time.perf_counter()
+            indices, _ = index.search(query[None, :], top_k, -1.0)[0]
+            latencies.append(time.perf_counter() - start)
+            hits += len(set(indices.tolist()) & set(expected.tolist()))
+        print(f"  {name:<14} 생성 {build_time:6.2f}초 | p50 {np.percentile(latencies, 50) * 1000:7.3f}ms "
+              f"p99 {np.percentile(latencies, 99) * 1000:7.3f}ms | recall@{top_k} {hits / (top_k * n_queries):.1%}")
+
+
+def main():
+    matchers = [("tfidf", AnswerMatcher(index_cache_dir=None))]
+    for name in ("dense", "hybrid"):
+        try:
+            matchers.append((name, AnswerMatcher(index_cache_dir=None, retriever=name)))
+        except ImportError as e:
+            print(f"[SKIP] {name} 검색기: {e}")
+
+    print(f"\n질문 {len(LABELED_QUESTIONS)}개 (정답 답변 id 기준)")
+    print(f"  {'검색기':<8} {'임계값':>6} | " + " ".join(f"recall@{k:<2}" for k in RECALL_KS) + " |   p50      p99")
+    for name, matcher in matchers:
+        retriever = matcher._retriever(matcher._index)
+        # 설정된 임계값(실제 답변 생성에 쓰이는 결과)과 임계값 없이 순위만 본 결과
+        for threshold in (retriever.threshold, 0.0):
+            recall, p50, p99 = evaluate(matcher, threshold)
+            print(f"  {name:<8} {threshold:>6.2f} | " +
+                  " ".join(f"{recall[k]:>9.0%}" for k in RECALL_KS) +
+                  f" | {p50:6.2f}ms {p99:6.2f}ms")
+        _, timings = matcher.find_best_matches_with_timings(LABELED_QUESTIONS[0][0])
+        print(f"  {'':<8} 단계별: {timings.summary()}")
+
+    bench_vector_indexes(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+음성 합성 엔진 벤치마크
+샘플 답변을 엔진별로 음성 변환하여 모델 로딩 시간, 첫 조각 지연, 실시간 배율(RTF = 합성 시간 / 음성 길이) 비교
+(설치되지 않았거나 네트워크가 없어 쓸 수 없는 엔진은 건너뜀, gTTS는 MP3 / 로컬 엔진은 WAV로 측정)
+
+실행:
+    python benchmarks/bench_tts_engines.py [엔진 ...]   # 기본: gtts melo espeak
+"""
+
+import statistics
+import sys
+import time
+
+from common import load_sample_answers
+from tts import TextToSpeech
+from tts_engines import ENGINES, load_speech_engine, read_wav
+
+# MPEG 버전별 비트레이트 표 (Layer III, kbps)와 샘플링 레이트
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+
+def mp3_duration(data: bytes) -> float:
+    """MP3 프레임 헤더를 따라가며 재생 시간(초) 계산 (ID3 태그는 건너뜀)"""
+    duration, pos = 0.0, 0
+    while pos + 4 <= len(data):
+        if data[pos:pos + 3] == b"ID3" and pos + 10 <= len(data):
+            size = (data[pos + 6] & 0x7F) << 21 | (data[pos + 7] & 0x7F) << 14 | (data[pos + 8] & 0x7F) << 7 | (data[pos + 9] & 0x7F)
+            pos += 10 + size
+            continue
+        header = int.from_bytes(data[pos:pos + 4], "big")
+        if header >> 21 != 0x7FF:
+            pos += 1
+            continue
+        version = {3: 1, 2: 2, 0: 2.5}.get((header >> 19) & 3)
+        bitrate_index, rate_index = (header >> 12) & 0xF, (header >> 10) & 3
+        if version is None or bitrate_index in (0, 15) or rate_index == 3:
+            pos += 1
+            continue
+        bitrate = MP3_BITRATES[1 if version == 1 else 2][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        samples = 1152 if version == 1 else 576
+        pos += samples // 8 * bitrate // sample_rate + ((header >> 9) & 1)
+        duration += samples / sample_rate
+    return duration
+
+
+def audio_duration(audio: bytes, audio_format: str) -> float:
+    """음성 길이(초)"""
+    if audio_format == "mp3":
+        return mp3_duration(audio)
+    params, frames = read_wav(audio)
+    return params.nframes / params.framerate if params.nframes else len(frames) / params.sampwidth / params.framerate
+
+
+def bench_engine(name: str, texts):
+    audio_format = "mp3" if name == "gtts" else "wav"
+    start = time.perf_counter()
+    try:
+        engine = load_speech_engine(name, audio_format)
+    except (ImportError, ValueError) as e:
+        print(f"[WARN] {name}: 건너뜀 ({e})")
+        return
+    load_time = time.perf_counter() - start
+    tts = TextToSpeech(engine=engine)
+
+    first_times, rtfs, total_audio, total_time = [], [], 0.0, 0.0
+    try:
+        for text in texts:
+            start = time.perf_counter()
+            parts = iter(tts.iter_audio(text))
+            first = next(parts)
+            first_times.append(time.perf_counter() - start)
+            audio = engine.join([first] + list(parts))
+            elapsed = time.perf_counter() - start
+            duration = audio_duration(audio, audio_format)
+            rtfs.append(elapsed / duration)
+            total_audio += duration
+            total_time += elapsed
+    except Exception as e:
+        print(f"[WARN] {name}: 변환 실패 ({e})")
+        return
+    finally:
+        tts.close()
+
+    print(f"  {engine.name:12s} 로딩 {load_time:6.2f}s | 첫 조각 p50 {statistics.median(first_times) * 1000:6.0f}ms "
+          f"| RTF p50 {statistics.median(rtfs):5.2f} / 전체 {total_time / total_audio:5.2f} "
+          f"| 음성 {total_audio:6.1f}s ({len(texts)}개 답변)")
+
+
+def main():
+    names = sys.argv[1:] or list(ENGINES)
+    texts = [answer['content'] for answer in load_sample_answers()]
+    print(f"답변 {len(texts)}개, 평균 {sum(map(len, texts)) / len(texts):.0f}자 (RTF < 1이면 실시간보다 빠름)")
+    for name in names:
+        bench_engine(name, texts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+벤치마크 공통 유틸리티
+샘플 답변을 재조합하여 대용량 합성 코퍼스를 만들고 시간을 측정하는 기능
+"""
+
+import sys
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import SAMPLE_ANSWERS_PATH
+
+# 벤치마크용 질문 (실제 사용자 질문과 비슷한 형태)
+BENCH_QUESTIONS = [
+    "남자친구와 헤어져서 너무 힘들어요",
+    "진로를 어떻게 정해야 할지 모르겠어요",
+    "매일 걱정이 많고 불안해요",
+    "친구를 사귀고 싶은데 방법을 모르겠어요",
+    "부모님과 자꾸 싸우게 돼요",
+    "회사 상사 때문에 스트레스를 받아요",
+    "시험 성적이 떨어져서 공부할 의욕이 없어요",
+    "제 자신이 너무 초라하게 느껴져요",
+]
+
+# 검색 품질 평가용 질문과 정답 답변 id (샘플 답변과 표현이 다른 바꿔 말하기 위주)
+LABELED_QUESTIONS = [
+    ("연인과 이별하고 나서 아무것도 손에 안 잡혀요", "A001"),
+    ("여자친구가 떠난 뒤로 계속 생각나요", "A001"),
+    ("졸업을 앞두고 무슨 일을 해야 할지 모르겠어요", "A002"),
+    ("하고 싶은 일이 없어서 앞날이 캄캄해요", "A002"),
+    ("엄마 아빠랑 말만 하면 언성이 높아져요", "A003"),
+    ("부모님이 제 결정을 이해해주지 않아요", "A003"),
+    ("새 학기인데 말 걸 사람이 하나도 없어요", "A004"),
+    ("혼자인 게 외롭고 사람들과 가까워지기 어려워요", "A004"),
+    ("책상에 앉아도 공부가 손에 안 잡혀요", "A005"),
+    ("시험 준비를 해야 하는데 의욕이 안 생겨요", "A005"),
+    ("다른 사람과 비교하면 제가 한없이 작아 보여요", "A006"),
+    ("저는 잘하는 게 하나도 없는 것 같아요", "A006"),
+    ("요즘 너무 지치고 머리가 터질 것 같아요", "A007"),
+    ("쉬어도 쉰 것 같지 않고 늘 긴장돼요", "A007"),
+    ("좋아하는 사람에게 마음을 전하고 싶어요", "A008"),
+    ("거절당할까 봐 좋아한다는 말을 못 하겠어요", "A008"),
+    ("팀장님이 저만 미워하는 것 같아요", "A009"),
+    ("회사 동료들과 사이가 불편해요", "A009"),
+    ("이유 없이 가슴이 두근거리고 불안해요", "A010"),
+    ("나쁜 일이 생길 것 같아 잠을 못 자요", "A010"),
+]
+
+
+def load_sample_answers() -> List[Dict]:
+    """샘플 답변 데이터 로드"""
+    with open(SAMPLE_ANSWERS_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)['answers']
+
+
+def _random_word(rng: random.Random) -> str:
+    """임의의 한글 2-3음절 단어"""
+    return ''.join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 3)))
+
+
+def make_answers(n: int, seed: int = 42, rare_words: int = 0) -> List[Dict]:
+    """
+    샘플 답변의 문장과 키워드를 섞어 n개의 합성 답변 생성
+
+    Args:
+        n: 생성할 답변 수
+        seed: 난수 시드
+        rare_words: 답변마다 덧붙일 임의 단어 수 (실제 코퍼스처럼 희귀 n-gram을 늘림)
+
+    Returns:
+        sample_answers.json과 같은 형식의 답변 리스트
+    """
+    rng = random.Random(seed)
+    samples = load_sample_answers()
+    sentences = [
+        s for a in samples for s in re.split(r'(?<=[.?!])\s+', a['content']) if s
+    ]
+
+    vocabulary = [_random_word(rng) for _ in range(20000)] if rare_words else []
+
+    answers = []
+    for i in range(n):
+        base = samples[i % len(samples)]
+        body = rng.sample(sentences, k=min(6, len(sentences)))
+        body += rng.sample(vocabulary, k=rare_words) if rare_words else []
+        answers.append({
+            "id": f"S{i:06d}",
+            "category": base['category'],
+            "keywords": rng.sample(base['keywords'], k=max(1, len(base['keywords']) - 1)),
+            "title": f"{base['title']} #{i}",
+            "content": ' '.join(body),
+            "key_points": base.get('key_points', []),
+        })
+    return answers
+
+
+def write_corpus(path: Path, n: int, seed: int = 42, rare_words: int = 0) -> Path:
+    """합성 답변 n개를 JSON 파일로 저장"""
+    path = Path(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"answers": make_answers(n, seed, rare_words)}, f, ensure_ascii=False)
+    return path
+
+
+def make_questions(n: int, seed: int = 7) -> List[str]:
+    """벤치마크 질문 n개 생성 (기본 질문에 짧은 변형을 덧붙임)"""
+    rng = random.Random(seed)
+    suffixes = ["", " 조언 부탁드려요", " 어떻게 해야 할까요?", " 너무 답답해요"]
+    return [rng.choice(BENCH_QUESTIONS) + rng.choice(suffixes) for _ in range(n)]
+
+
+def measure(fn: Callable, repeat: int = 5) -> float:
+    """함수를 여러 번 실행하여 가장 빠른 실행 시간(초) 반환"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
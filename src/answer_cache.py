@@ -0,0 +1,357 @@
+"""
+답변 캐시 모듈
+비슷한 고민이 반복될 때 Claude API를 다시 호출하지 않도록 생성된 답변을 질문 기준으로 저장/재사용하는 기능
+(정규화한 질문 문자열 일치 + 선택적으로 질문 벡터 유사도, TTL / LRU 크기 제한, 메모리 또는 SQLite 저장소)
+"""
+
+import io
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from config import (
+    ANSWER_CACHE, ANSWER_CACHE_PATH, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_SIMILARITY, ANSWER_CACHE_EXCLUDED_CATEGORIES
+)
+
+# 질문 -> (벡터 공간 이름, 벡터). 벡터는 L2 정규화된 1차원 배열 또는 1 x d 희소 행렬
+QuestionEmbedder = Callable[[str], Tuple[str, object]]
+
+
+def normalize_question(question: str) -> str:
+    """캐시 키용 질문 정규화 (유니코드 NFKC, 소문자, 문장부호 제거, 공백 정리)"""
+    text = unicodedata.normalize('NFKC', question).lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+@dataclass
+class CacheEntry:
+    """캐시된 답변 하나"""
+    key: str  # 정규화한 질문
+    answer: str
+    category: Optional[str] = None
+    created: float = 0.0
+    space: Optional[str] = None  # 벡터 공간 이름 (같은 공간의 벡터끼리만 비교)
+    vector: object = None
+
+
+@dataclass
+class CacheStats:
+    """답변 캐시 적중/실패 카운터"""
+    hits: int = 0  # 질문 문자열 일치
+    similar_hits: int = 0  # 벡터 유사도로 찾은 적중
+    misses: int = 0
+    bypassed: int = 0  # 캐시를 쓰지 않는 카테고리라 건너뛴 요청
+    expirations: int = 0
+    evictions: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, name: str, count: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    @property
+    def hit_rate(self) -> float:
+        """캐시를 조회한 요청 중 적중 비율"""
+        lookups = self.hits + self.similar_hits + self.misses
+        return (self.hits + self.similar_hits) / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return (f"적중 {self.hits} + 유사 적중 {self.similar_hits} / 실패 {self.misses} "
+                f"(적중률 {self.hit_rate:.0%}) | 건너뜀 {self.bypassed} | 만료 {self.expirations} | 제거 {self.evictions}")
+
+
+class MemoryCacheBackend:
+    """프로세스 내 LRU 저장소 (OrderedDict, 스레드 안전)"""
+
+    def __init__(self, max_entries: int):
+        """
+        초기화
+
+        Args:
+            max_entries: 최대 답변 수 (넘으면 가장 오래 쓰지 않은 답변부터 제거)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """답변 조회 (최근 사용으로 표시)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, entry: CacheEntry) -> int:
+        """
+        답변 저장
+
+        Returns:
+            크기 제한으로 제거된 답변 수
+        """
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def vectors(self, space: str) -> List[CacheEntry]:
+        """벡터 공간이 같은 답변들 (유사도 검색용)"""
+        with self._lock:
+            return [e for e in self._entries.values() if e.space == space and e.vector is not None]
+
+
+def _dump_vector(vector) -> Optional[bytes]:
+    """벡터를 SQLite BLOB으로 직렬화 (희소 행렬은 npz, 밀집 배열은 npy, pickle 미사용)"""
+    if vector is None:
+        return None
+    buffer = io.BytesIO()
+    if sparse.issparse(vector):
+        sparse.save_npz(buffer, sparse.csr_matrix(vector))
+    else:
+        np.save(buffer, np.asarray(vector), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _load_vector(blob: Optional[bytes]):
+    if blob is None:
+        return None
+    buffer = io.BytesIO(blob)
+    if blob[:2] == b'PK':  # npz(zip) 파일
+        return sparse.load_npz(buffer)
+    return np.load(buffer, allow_pickle=False)
+
+
+class SqliteCacheBackend:
+    """
+    SQLite 파일 저장소 (여러 워커 프로세스가 같은 파일을 공유)
+
+    마지막 사용 시각(accessed)으로 LRU를 구현하며, 스레드마다 별도 연결을 사용합니다.
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        """
+        초기화
+
+        Args:
+            path: SQLite 파일 경로
+            max_entries: 최대 답변 수
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    answer TEXT NOT NULL,
+                    category TEXT,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    space TEXT,
+                    vector BLOB
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT key, answer, category, created, space, vector FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE answers SET accessed = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(*row[:5], vector=_load_vector(row[5]))
+
+    def put(self, entry: CacheEntry) -> int:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.key, entry.answer, entry.category, entry.created, time.time(),
+                 entry.space, _dump_vector(entry.vector))
+            )
+            cursor = conn.execute(
+                "DELETE FROM answers WHERE key IN "
+                "(SELECT key FROM answers ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            return cursor.rowcount
+
+    def delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+
+    def vectors(self, space: str) -> List[CacheEntry]:
+        rows = self._connect().execute(
+            "SELECT key, answer, category, created, space, vector FROM answers "
+            "WHERE space = ? AND vector IS NOT NULL", (space,)
+        ).fetchall()
+        return [CacheEntry(*row[:5], vector=_load_vector(row[5])) for row in rows]
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class AnswerCache:
+    """
+    생성된 답변 캐시
+
+    1) 정규화한 질문 문자열이 같으면 적중
+    2) similarity_threshold와 embed가 주어지면, 같은 벡터 공간에 저장된 질문 중
+       코사인 유사도가 임계값 이상인 가장 가까운 질문의 답변을 사용 (저장된 답변 수에 비례하는 전체 비교)
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttl: float = ANSWER_CACHE_TTL,
+        similarity_threshold: Optional[float] = None,
+        embed: Optional[QuestionEmbedder] = None,
+        excluded_categories: Iterable[str] = ()
+    ):
+        """
+        초기화
+
+        Args:
+            backend: MemoryCacheBackend 또는 SqliteCacheBackend (None이면 메모리)
+            ttl: 답변 유효 시간(초)
+            similarity_threshold: 유사 질문 적중 임계값 (None이면 문자열 일치만 사용)
+            embed: 질문 -> (벡터 공간 이름, 벡터) 함수 (예: AnswerMatcher.question_vector)
+            excluded_categories: 캐시를 쓰지 않을 카테고리
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend(ANSWER_CACHE_MAX_ENTRIES)
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed if similarity_threshold is not None else None
+        self.excluded_categories = frozenset(excluded_categories)
+        self.stats = CacheStats()
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created > self.ttl
+
+    def get(self, question: str, category: Optional[str] = None) -> Optional[str]:
+        """
+        캐시된 답변 조회
+
+        Args:
+            question: 사용자 질문
+            category: 질문의 카테고리 (캐시 제외 카테고리면 조회하지 않음)
+
+        Returns:
+            캐시된 답변, 없으면 None
+        """
+        if category in self.excluded_categories:
+            self.stats.add('bypassed')
+            return None
+
+        now = time.time()
+        key = normalize_question(question)
+        entry = self.backend.get(key)
+        if entry is not None:
+            if not self._expired(entry, now):
+                self.stats.add('hits')
+                return entry.answer
+            self.backend.delete(key)
+            self.stats.add('expirations')
+
+        if self.embed is not None:
+            entry = self._most_similar(question, now)
+            if entry is not None:
+                self.backend.get(entry.key)  # 최근 사용으로 표시
+                self.stats.add('similar_hits')
+                return entry.answer
+
+        self.stats.add('misses')
+        return None
+
+    def _most_similar(self, question: str, now: float) -> Optional[CacheEntry]:
+        """임계값 이상으로 가장 비슷한 (만료되지 않은) 질문의 답변"""
+        space, vector = self.embed(question)
+        entries = [e for e in self.backend.vectors(space) if not self._expired(e, now)]
+        if not entries:
+            return None
+        if sparse.issparse(vector):
+            scores = (sparse.vstack([e.vector for e in entries]) @ vector.T).toarray().ravel()
+        else:
+            scores = np.vstack([e.vector for e in entries]) @ np.asarray(vector)
+        best = int(np.argmax(scores))
+        return entries[best] if scores[best] >= self.similarity_threshold else None
+
+    def put(self, question: str, answer: str, category: Optional[str] = None):
+        """
+        생성된 답변 저장
+
+        Args:
+            question: 사용자 질문
+            answer: 생성된 답변
+            category: 질문의 카테고리 (캐시 제외 카테고리면 저장하지 않음)
+        """
+        if category in self.excluded_categories:
+            return
+        space, vector = self.embed(question) if self.embed is not None else (None, None)
+        entry = CacheEntry(normalize_question(question), answer, category, time.time(), space, vector)
+        evicted = self.backend.put(entry)
+        if evicted:
+            self.stats.add('evictions', evicted)
+
+
+def load_answer_cache(matcher=None) -> Optional[AnswerCache]:
+    """
+    config 설정에 맞는 답변 캐시 생성 (ANSWER_CACHE=none이면 None)
+
+    Args:
+        matcher: 유사 질문 적중에 쓸 질문 벡터를 제공하는 AnswerMatcher (ANSWER_CACHE_SIMILARITY를 쓸 때)
+    """
+    if ANSWER_CACHE == "none":
+        return None
+    if ANSWER_CACHE == "memory":
+        backend = MemoryCacheBackend(ANSWER_CACHE_MAX_ENTRIES)
+    elif ANSWER_CACHE == "sqlite":
+        backend = SqliteCacheBackend(ANSWER_CACHE_PATH, ANSWER_CACHE_MAX_ENTRIES)
+    else:
+        raise ValueError(f"지원하지 않는 답변 캐시 저장소입니다: {ANSWER_CACHE}")
+    embed = matcher.question_vector if matcher is not None and ANSWER_CACHE_SIMILARITY is not None else None
+    return AnswerCache(
+        backend,
+        ttl=ANSWER_CACHE_TTL,
+        similarity_threshold=ANSWER_CACHE_SIMILARITY if embed is not None else None,
+        embed=embed,
+        excluded_categories=ANSWER_CACHE_EXCLUDED_CATEGORIES
+    )
@@ -0,0 +1,170 @@
+"""
+음성 파일 캐시 모듈
+같은 텍스트(+ 언어, 속도, 합성 엔진)의 음성 변환을 다시 하지 않도록 음성 파일을 내용 해시 이름으로 한 번만 저장하고,
+전체 크기가 예산을 넘으면 가장 오래 쓰지 않은 파일부터 지우는 디스크 LRU 캐시
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_FORMAT
+
+AUDIO_SUFFIX = ".mp3"
+
+
+def audio_key(text: str, language: str, slow: bool, voice: str = "gtts:mp3") -> str:
+    """음성 파일 캐시 키 (텍스트, 언어, 속도, 합성 엔진:형식의 SHA-256)"""
+    digest = hashlib.sha256()
+    for part in (text, language, "slow" if slow else "normal", voice):
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class AudioCacheStats:
+    """음성 파일 캐시 적중/실패 카운터"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, name: str, count: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return f"적중 {self.hits} / 실패 {self.misses} (적중률 {self.hit_rate:.0%}) | 제거 {self.evictions}"
+
+
+class AudioCache:
+    """
+    내용 주소 방식의 음성 파일 디스크 캐시
+
+    파일 이름이 곧 키(audio_key)라서 같은 텍스트의 음성은 한 번만 저장됩니다.
+    사용 순서는 메모리의 OrderedDict로 관리하고 적중할 때 파일 수정 시각도 갱신하므로,
+    다시 시작하면 수정 시각 순서로 LRU 순서를 복원합니다.
+    다른 프로세스가 지운 파일은 조회할 때 실패로 처리합니다.
+    """
+
+    def __init__(self, cache_dir: Path = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 suffix: str = AUDIO_SUFFIX):
+        """
+        초기화
+
+        Args:
+            cache_dir: 음성 파일을 저장할 디렉토리
+            max_bytes: 전체 파일 크기 예산 (넘으면 가장 오래 쓰지 않은 파일부터 삭제)
+            suffix: 음성 파일 확장자 (이 확장자의 파일만 관리)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.suffix = suffix
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = AudioCacheStats()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # 키 -> 파일 크기 (오래 쓰지 않은 순)
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def _load(self):
+        """디렉토리의 기존 파일로 색인 복원 (수정 시각 순, 남은 임시 파일은 삭제)"""
+        files = []
+        for path in self.cache_dir.iterdir():
+            if path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+            elif path.suffix == self.suffix:
+                stat = path.stat()
+                files.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(files):
+            self._sizes[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        캐시된 음성 파일 경로 (없으면 None, 최근 사용으로 표시)
+
+        Args:
+            key: audio_key
+        """
+        path = self.path(key)
+        with self._lock:
+            if key in self._sizes:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    self.total_bytes -= self._sizes.pop(key)
+                else:
+                    self._sizes.move_to_end(key)
+                    self.stats.add('hits')
+                    return path
+        self.stats.add('misses')
+        return None
+
+    def store(self, key: str, write: Callable[[Path], object]) -> Path:
+        """
+        음성 파일을 만들어 캐시에 저장
+
+        임시 파일에 쓴 뒤 이름을 바꾸므로, 쓰다가 실패하거나 중단되어도 캐시에 깨진 파일이 남지 않습니다.
+
+        Args:
+            key: audio_key
+            write: 받은 경로에 음성 파일을 쓰는 함수
+
+        Returns:
+            캐시된 음성 파일 경로
+        """
+        path = self.path(key)
+        tmp_path = self.cache_dir / f"{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            write(tmp_path)
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        with self._lock:
+            self.total_bytes += size - self._sizes.pop(key, 0)
+            self._sizes[key] = size
+            self._evict()
+        return path
+
+    def _evict(self):
+        """전체 크기가 예산 안에 들 때까지 가장 오래 쓰지 않은 파일 삭제 (방금 저장한 파일은 남김)"""
+        while self.total_bytes > self.max_bytes and len(self._sizes) > 1:
+            key, size = self._sizes.popitem(last=False)
+            self.path(key).unlink(missing_ok=True)
+            self.total_bytes -= size
+            self.stats.add('evictions')
+
+    def clear(self):
+        """캐시된 음성 파일 전체 삭제"""
+        with self._lock:
+            for key in self._sizes:
+                self.path(key).unlink(missing_ok=True)
+            self._sizes.clear()
+            self.total_bytes = 0
+
+
+def load_audio_cache(audio_format: str = TTS_FORMAT) -> Optional[AudioCache]:
+    """config 설정에 맞는 음성 파일 캐시 생성 (TTS_CACHE_MAX_MB=0이면 None)"""
+    if TTS_CACHE_MAX_BYTES <= 0:
+        return None
+    return AudioCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, suffix=f".{audio_format}")
@@ -0,0 +1,399 @@
+"""
+배치 답변 모듈
+질문 파일(CSV / JSONL)을 읽어 한꺼번에 답변을 생성하고 JSONL로 저장 (중단된 지점부터 재개)
+
+실행:
+    python src/batch.py questions.csv -o output/answers.jsonl [--column 열] [--mode async|batches] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import (
+    BATCH_API_MAX_REQUESTS, BATCH_CHUNK_SIZE, BATCH_MODE, BATCH_POLL_INTERVAL, BATCH_PRICE_RATIO,
+    LLM_MAX_CONCURRENCY, OUTPUT_DIR
+)
+from generator import AsyncAnswerGenerator, UsageStats, build_prompt, cache_category, message_params
+from routing import ModelRouter
+
+BATCH_MODES = ("async", "batches")
+
+
+@dataclass
+class BatchQuestion:
+    """배치로 답변할 질문"""
+    id: str
+    question: str
+
+
+def read_questions(path: Path, column: Optional[str] = None) -> List[BatchQuestion]:
+    """
+    질문 파일 읽기
+
+    CSV는 column 열(지정하지 않으면 question 또는 질문 열)을 질문으로 읽고 id 열이 있으면 사용합니다.
+    JSONL은 줄마다 {"id": ..., "question": ...} 객체 또는 질문 문자열입니다.
+    id가 없으면 행 번호(q1, q2, ...)를 사용하며, 빈 질문은 건너뜁니다.
+    결과 파일의 id로 이어서 답변하므로 id가 겹치면 오류입니다.
+
+    Args:
+        path: .csv 또는 .jsonl 파일 경로
+        column: CSV의 질문 열 이름 (헤더에 question / 질문 열이 없으면 필수)
+
+    Returns:
+        BatchQuestion 리스트 (파일 순서)
+    """
+    path = Path(path)
+    rows: List[Tuple[Optional[str], str]] = []
+    if path.suffix.lower() == ".csv":
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            fields = reader.fieldnames or []
+            if column is None:
+                column = next((c for c in ("question", "질문") if c in fields), None)
+                if column is None:
+                    raise ValueError(f"질문 열(question / 질문)을 찾을 수 없습니다: {fields} (--column으로 지정하세요)")
+            elif column not in fields:
+                raise ValueError(f"질문 열 '{column}'이 없습니다: {fields}")
+            for row in reader:
+                rows.append((row.get('id'), row.get(column) or ""))
+    elif path.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if isinstance(item, str):
+                    rows.append((None, item))
+                else:
+                    rows.append((item.get('id'), item.get('question', "")))
+    else:
+        raise ValueError(f"지원하지 않는 질문 파일 형식입니다: {path.suffix} (.csv 또는 .jsonl)")
+
+    questions = []
+    for number, (question_id, question) in enumerate(rows, 1):
+        if question.strip():
+            questions.append(BatchQuestion(str(question_id) if question_id else f"q{number}", question.strip()))
+    duplicates = sorted(question_id for question_id, count in Counter(q.id for q in questions).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"질문 id가 중복됩니다 (이어서 답변할 수 없음): {duplicates[:10]}")
+    return questions
+
+
+class ResultWriter:
+    """
+    답변 결과 JSONL 파일 (체크포인트 겸용)
+
+    답변 하나가 끝날 때마다 한 줄씩 덧붙이고 flush하므로, 파일에 있는 id가 곧 완료된 질문입니다.
+    중단되면서 마지막 줄이 잘렸으면 열 때 그 줄을 지웁니다.
+    """
+
+    def __init__(self, path: Path):
+        """
+        초기화 (기존 결과의 id 로드)
+
+        Args:
+            path: 결과 JSONL 파일 경로
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.completed: Set[str] = set()
+        if self.path.exists():
+            self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # 쓰는 중에 중단되어 잘린 마지막 줄 제거
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+        for line in data[:end].decode('utf-8').splitlines():
+            if line.strip():
+                self.completed.add(json.loads(line)['id'])
+
+    def write(self, record: Dict):
+        """결과 한 줄 저장"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.completed.add(record['id'])
+
+    def close(self):
+        self._file.close()
+
+
+@dataclass
+class BatchReport:
+    """배치 실행 결과 (처리량 / 비용)"""
+    mode: str
+    total: int = 0  # 입력 질문 수
+    skipped: int = 0  # 이전 실행에서 이미 답변한 질문 수
+    answered: int = 0  # 이번 실행에서 답변한 질문 수
+    cached: int = 0  # 그중 답변 캐시에서 가져온 수
+    failed: int = 0  # 실패한 질문 수 (결과 파일에 쓰지 않으므로 다시 실행하면 재시도)
+    elapsed: float = 0.0
+    usage: UsageStats = field(default_factory=UsageStats)
+
+    @property
+    def throughput(self) -> float:
+        """초당 답변 수"""
+        return self.answered / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def cost(self) -> float:
+        """이번 실행의 예상 비용 (USD)"""
+        return self.usage.cost(BATCH_PRICE_RATIO if self.mode == "batches" else 1.0)
+
+    def summary(self) -> str:
+        per_thousand = self.cost / self.answered * 1000 if self.answered else 0.0
+        return (f"질문 {self.total}개 (완료되어 건너뜀 {self.skipped}) | 답변 {self.answered} (캐시 {self.cached}) "
+                f"| 실패 {self.failed} | {self.elapsed:.1f}초, {self.throughput:.1f} 답변/초 "
+                f"| 예상 비용 ${self.cost:.4f} (1000개당 ${per_thousand:.2f})")
+
+
+def _usage_since(usage: UsageStats, before: Dict[str, int]) -> UsageStats:
+    """누적 사용량에서 before 시점 이후의 사용량만 추림"""
+    return UsageStats(**{name: getattr(usage, name) - count for name, count in before.items()})
+
+
+def _usage_counts(usage: UsageStats) -> Dict[str, int]:
+    return {name: getattr(usage, name) for name in
+            ("requests", "input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens", "cache_hits")}
+
+
+def _references(matches: List[Tuple[Dict, float]]) -> List[Dict]:
+    """결과 파일에 남길 참고 답변 요약"""
+    return [{"id": answer['id'], "category": answer.get('category'), "score": round(score, 4)}
+            for answer, score in matches]
+
+
+class BatchRunner:
+    """
+    질문 여러 개를 검색 -> 답변 생성 -> JSONL 저장 순서로 처리
+
+    검색은 chunk_size개씩 matcher.find_best_matches_many로 묶어서 실행합니다.
+    생성은 두 가지 방식을 지원합니다.
+      - async: AsyncAnswerGenerator로 동시 요청 (동시 요청 수는 생성기의 세마포어가 제한)
+      - batches: Message Batches API에 제출하고 처리가 끝나면 결과를 회수 (비용 50%, 결과까지 최대 24시간)
+        제출한 배치 id는 상태 파일(<결과 파일>.batches.json)에 기록하므로, 중단 후 다시 실행하면 재제출하지 않고 회수만 합니다.
+    """
+
+    def __init__(
+        self,
+        matcher,
+        generator: AsyncAnswerGenerator,
+        output_path: Path,
+        mode: str = BATCH_MODE,
+        chunk_size: int = BATCH_CHUNK_SIZE,
+        poll_interval: float = BATCH_POLL_INTERVAL
+    ):
+        """
+        초기화
+
+        Args:
+            matcher: AnswerMatcher
+            generator: AsyncAnswerGenerator (batches 모드는 클라이언트와 답변 캐시만 사용,
+                       fallback=False로 만들어야 API 장애 시 폴백 답변을 저장하지 않고 실패로 남겨 재시도)
+            output_path: 결과 JSONL 파일 경로
+            mode: "async" 또는 "batches"
+            chunk_size: 한 번에 검색할 질문 수
+            poll_interval: Message Batches 처리 상태 확인 간격(초)
+        """
+        if mode not in BATCH_MODES:
+            raise ValueError(f"지원하지 않는 배치 방식입니다: {mode} ({', '.join(BATCH_MODES)})")
+        self.matcher = matcher
+        self.generator = generator
+        self.output_path = Path(output_path)
+        self.state_path = self.output_path.with_name(self.output_path.name + ".batches.json")
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+
+    async def run(self, questions: List[BatchQuestion]) -> BatchReport:
+        """
+        답변이 없는 질문만 처리 (결과 파일에 이미 있는 id는 건너뜀)
+
+        Args:
+            questions: read_questions 결과
+
+        Returns:
+            BatchReport
+        """
+        report = BatchReport(self.mode, total=len(questions))
+        writer = ResultWriter(self.output_path)
+        cache = self.generator.cache
+        cache_hits = cache.stats.hits + cache.stats.similar_hits if cache is not None else 0
+        usage_before = _usage_counts(self.generator.usage)
+        start = time.perf_counter()
+        report.skipped = sum(q.id in writer.completed for q in questions)
+        try:
+            if self.mode == "batches":
+                # 이전 실행에서 제출한 배치를 먼저 회수해야 그 질문을 다시 제출하지 않음
+                await self._collect_batches(writer, report)
+            pending = [q for q in questions if q.id not in writer.completed]
+            if self.mode == "batches":
+                await self._run_batches(pending, writer, report)
+            else:
+                await self._run_async(pending, writer, report)
+        finally:
+            report.elapsed = time.perf_counter() - start
+            writer.close()
+        # 생성기의 사용량은 누적값이므로 이번 실행분만 보고
+        report.usage = _usage_since(self.generator.usage, usage_before)
+        if cache is not None:
+            report.cached = cache.stats.hits + cache.stats.similar_hits - cache_hits
+        return report
+
+    async def _retrieve(self, chunk: List[BatchQuestion]) -> List[List[Tuple[Dict, float]]]:
+        return await asyncio.to_thread(self.matcher.find_best_matches_many, [q.question for q in chunk])
+
+    async def _run_async(self, pending: List[BatchQuestion], writer: ResultWriter, report: BatchReport):
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            matches = await self._retrieve(chunk)
+            await asyncio.gather(*(self._answer(q, m, writer, report) for q, m in zip(chunk, matches)))
+            print(f"[OK] {start + len(chunk)}/{len(pending)}개 처리")
+
+    async def _answer(
+        self, item: BatchQuestion, matches: List[Tuple[Dict, float]], writer: ResultWriter, report: BatchReport
+    ):
+        try:
+            if matches:
+                answer = await self.generator.generate_answer(item.question, matches)
+            else:
+                answer = await self.generator.generate_simple_answer(item.question)
+        except Exception as e:
+            report.failed += 1
+            print(f"[ERROR] {item.id} 답변 생성 실패: {e}")
+            return
+        writer.write({"id": item.id, "question": item.question, "answer": answer,
+                      "references": _references(matches)})
+        report.answered += 1
+
+    # Message Batches 방식
+
+    def _load_state(self) -> List[Dict]:
+        if not self.state_path.exists():
+            return []
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['batches']
+
+    def _save_state(self, batches: List[Dict]):
+        """제출한 배치 목록 저장 (임시 파일에 쓴 뒤 교체)"""
+        if not batches:
+            self.state_path.unlink(missing_ok=True)
+            return
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"batches": batches}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    async def _run_batches(self, pending: List[BatchQuestion], writer: ResultWriter, report: BatchReport):
+        cache = self.generator.cache
+        requests: List[Dict] = []
+        entries: Dict[str, Dict] = {}
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            for item, matches in zip(chunk, await self._retrieve(chunk)):
+                category = cache_category(matches)
+                cached = await asyncio.to_thread(cache.get, item.question, category) if cache is not None else None
+                if cached is not None:
+                    writer.write({"id": item.id, "question": item.question, "answer": cached,
+                                  "references": _references(matches)})
+                    report.answered += 1
+                    continue
+                custom_id = f"q{len(requests)}"
+                route = self.generator.router.route(item.question, matches).route
+                requests.append({"custom_id": custom_id,
+                                 "params": message_params(*build_prompt(item.question, matches), route)})
+                entries[custom_id] = {"id": item.id, "question": item.question, "references": _references(matches),
+                                      "category": category}
+
+        batches = self._load_state()
+        for start in range(0, len(requests), BATCH_API_MAX_REQUESTS):
+            group = requests[start:start + BATCH_API_MAX_REQUESTS]
+            batch = await self.generator.client.messages.batches.create(requests=group)
+            batches.append({"id": batch.id, "requests": {r['custom_id']: entries[r['custom_id']] for r in group}})
+            self._save_state(batches)
+            print(f"[OK] 배치 제출: {batch.id} (요청 {len(group)}개)")
+        await self._collect_batches(writer, report)
+
+    async def _collect_batches(self, writer: ResultWriter, report: BatchReport):
+        """상태 파일의 배치가 끝날 때까지 기다렸다가 결과 저장 (회수한 배치는 상태 파일에서 제거)"""
+        batches = self._load_state()
+        client = self.generator.client
+        cache = self.generator.cache
+        while batches:
+            state = batches[0]
+            batch = await client.messages.batches.retrieve(state['id'])
+            while batch.processing_status != "ended":
+                await asyncio.sleep(self.poll_interval)
+                batch = await client.messages.batches.retrieve(state['id'])
+
+            async for item in await client.messages.batches.results(state['id']):
+                entry = state['requests'].get(item.custom_id)
+                if entry is None or entry['id'] in writer.completed:
+                    continue
+                if item.result.type != "succeeded":
+                    report.failed += 1
+                    print(f"[ERROR] {entry['id']} 답변 생성 실패: {item.result.type}")
+                    continue
+                message = item.result.message
+                self.generator.usage.record(message.usage)
+                answer = message.content[0].text.strip()
+                writer.write({"id": entry['id'], "question": entry['question'], "answer": answer,
+                              "references": entry['references']})
+                report.answered += 1
+                if cache is not None:
+                    await asyncio.to_thread(cache.put, entry['question'], answer, entry['category'])
+
+            batches.pop(0)
+            self._save_state(batches)
+            print(f"[OK] 배치 결과 회수: {state['id']}")
+
+
+def main():
+    """배치 답변 실행"""
+    parser = argparse.ArgumentParser(description="질문 파일의 답변을 한꺼번에 생성 (중단된 지점부터 재개)")
+    parser.add_argument("input", type=Path, help="질문 파일 (.csv 또는 .jsonl)")
+    parser.add_argument("-o", "--output", type=Path, help="결과 JSONL 파일 (기본: output/<입력 파일명>.answers.jsonl)")
+    parser.add_argument("--column", help="CSV의 질문 열 이름 (기본: question 또는 질문 열)")
+    parser.add_argument("--mode", choices=BATCH_MODES, default=BATCH_MODE, help="생성 방식")
+    parser.add_argument("--concurrency", type=int, default=LLM_MAX_CONCURRENCY, help="async 방식의 동시 요청 수")
+    args = parser.parse_args()
+
+    from answer_cache import load_answer_cache
+    from matcher import AnswerMatcher
+
+    questions = read_questions(args.input, args.column)
+    output_path = args.output or OUTPUT_DIR / f"{args.input.stem}.answers.jsonl"
+    matcher = AnswerMatcher()
+    generator = AsyncAnswerGenerator(
+        max_concurrency=args.concurrency, cache=load_answer_cache(matcher), fallback=False,
+        router=ModelRouter(fast_threshold=matcher.fast_threshold)
+    )
+    runner = BatchRunner(matcher, generator, output_path, mode=args.mode)
+
+    async def run():
+        try:
+            return await runner.run(questions)
+        finally:
+            await generator.aclose()
+
+    report = asyncio.run(run())
+    print(f"[OK] {report.summary()}")
+    print(f"[OK] 토큰: {report.usage.summary()}")
+    print(f"[OK] 결과 저장: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
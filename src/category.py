@@ -0,0 +1,91 @@
+"""
+카테고리 분류 모듈
+답변의 카테고리 / 키워드 / 제목으로 학습하여 질문이 어느 카테고리에 속하는지 예측하는 경량 분류기
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import CATEGORY_ROUTING_CONFIDENCE, CATEGORY_ROUTING_MAX
+
+
+class CategoryClassifier:
+    """
+    카테고리 분류기 (카테고리별 중심 벡터와의 코사인 유사도)
+
+    카테고리마다 카테고리 이름, 소속 답변의 키워드와 제목을 하나의 문서로 모아 문자 n-gram TF-IDF로 벡터화합니다.
+    질문과 각 카테고리 문서의 유사도를 합이 1이 되도록 나눈 값을 확률처럼 사용합니다.
+    """
+
+    def __init__(self, answers: Iterable[Mapping]):
+        """
+        초기화 (학습)
+
+        Args:
+            answers: 'category', 'keywords', 'title' 필드를 가진 답변들
+        """
+        documents: Dict[str, List[str]] = {}
+        for answer in answers:
+            category = answer.get('category')
+            if not category:
+                continue
+            parts = documents.setdefault(category, [category])
+            parts.extend(answer.get('keywords', []))
+            parts.append(answer.get('title', ''))
+
+        self.categories = list(documents)
+        self.vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3), sublinear_tf=True)
+        if self.categories:
+            matrix = self.vectorizer.fit_transform(' '.join(parts) for parts in documents.values())
+            self.centroids = matrix.T.tocsr()
+        else:
+            self.centroids = None
+
+    def predict(self, question: str) -> List[Tuple[str, float]]:
+        """
+        질문의 카테고리별 확률
+
+        Args:
+            question: 사용자 질문
+
+        Returns:
+            (카테고리, 확률) 리스트, 확률 내림차순 (어느 카테고리와도 겹치지 않으면 빈 리스트)
+        """
+        if self.centroids is None:
+            return []
+        similarities = (self.vectorizer.transform([question]) @ self.centroids).toarray()[0]
+        total = similarities.sum()
+        if total <= 0:
+            return []
+        order = np.argsort(-similarities, kind='stable')
+        return [(self.categories[i], float(similarities[i] / total)) for i in order if similarities[i] > 0]
+
+    def route(
+        self,
+        question: str,
+        confidence: float = CATEGORY_ROUTING_CONFIDENCE,
+        max_categories: int = CATEGORY_ROUTING_MAX
+    ) -> Optional[List[str]]:
+        """
+        질문을 먼저 검색할 카테고리 선택
+
+        확률이 높은 카테고리부터 누적 확률이 confidence 이상이 될 때까지 최대 max_categories개를 고릅니다.
+
+        Args:
+            question: 사용자 질문
+            confidence: 라우팅에 필요한 최소 누적 확률
+            max_categories: 최대 카테고리 수
+
+        Returns:
+            카테고리 리스트, 확신이 부족하면 None (전체 검색)
+        """
+        cumulative = 0.0
+        selected = []
+        for category, probability in self.predict(question)[:max_categories]:
+            selected.append(category)
+            cumulative += probability
+            if cumulative >= confidence:
+                return selected
+        return None
@@ -16,13 +16,49 @@ load_dotenv(PROJECT_ROOT / ".env")
 # API 설정 - 환경 변수에서 읽기 (app.py에서 이미 secrets를 환경 변수로 설정함)
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
 CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-5-20250929")
-MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2000"))
+MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1200"))  # 큰 모델(CLAUDE_MODEL)의 최대 출력 토큰 (300-500자 답변 + 여유)
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
+CLAUDE_BASE_URL = os.getenv("CLAUDE_BASE_URL") or None  # API 주소 (프록시/테스트 서버용, 기본: Anthropic API)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # 비동기 생성기의 동시 API 요청 수 상한
+# 시스템 프롬프트 프롬프트 캐시 사용 여부 (기본 시스템 프롬프트는 최소 캐시 길이보다 짧아 끔, 프롬프트를 늘렸을 때 켬)
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "false").lower() == "true"
+# 모델별 최소 캐시 접두부 길이 (토큰, 이보다 짧은 접두부는 cache_control을 붙여도 캐시되지 않음, 모델 이름에 포함된 첫 항목 사용)
+PROMPT_CACHE_MIN_TOKENS = [("opus-4-5", 4096), ("haiku-4-5", 4096), ("haiku", 2048), ("", 1024)]
+
+# API 호출 재시도 / 서킷 브레이커 설정 (일시 오류: 429, 5xx, 529 과부하, 시간 초과, 연결 오류)
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))  # 첫 시도 포함 최대 시도 수
+LLM_BACKOFF_BASE = 0.5  # 지수 백오프 기준 대기 시간(초)
+LLM_BACKOFF_MAX = 8.0  # 지수 백오프 최대 대기 시간(초)
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "60"))  # 시도 하나의 제한 시간(초)
+LLM_TOTAL_TIMEOUT = float(os.getenv("LLM_TOTAL_TIMEOUT", "90"))  # 재시도를 포함한 전체 제한 시간(초)
+CIRCUIT_FAILURE_THRESHOLD = 5  # 서킷 브레이커를 열 연속 실패 수
+CIRCUIT_RECOVERY_TIMEOUT = 30.0  # 서킷이 열린 뒤 시험 호출까지 기다릴 시간(초)
+LLM_FALLBACK = os.getenv("LLM_FALLBACK", "true").lower() == "true"  # API 장애 시 참고 답변 / 안내문으로 대신 답변할지 여부
+
+# 모델 라우팅 (유사한 답변이 확실하고 민감하지 않은 고민은 작고 빠른 모델로, 나머지는 CLAUDE_MODEL로)
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "true").lower() == "true"  # false면 항상 CLAUDE_MODEL 사용
+CLAUDE_FAST_MODEL = os.getenv("CLAUDE_FAST_MODEL", "claude-haiku-4-5-20251001")
+FAST_MAX_TOKENS = int(os.getenv("FAST_MAX_TOKENS", "800"))  # 빠른 모델의 최대 출력 토큰
+ROUTING_FAST_THRESHOLD = float(os.getenv("ROUTING_FAST_THRESHOLD", "0.35"))  # 빠른 모델을 쓸 최소 참고 답변 유사도 (RETRIEVER=tfidf, TF-IDF 코사인)
+DENSE_ROUTING_FAST_THRESHOLD = float(os.getenv("DENSE_ROUTING_FAST_THRESHOLD", "0.6"))  # 같은 기준 (RETRIEVER=dense, 임베딩 코사인, hybrid는 빠른 모델을 쓰지 않음)
+ROUTING_SENSITIVE_CATEGORIES = [  # 유사도와 관계없이 큰 모델을 쓸 카테고리 (쉼표로 구분)
+    c.strip() for c in os.getenv("ROUTING_SENSITIVE_CATEGORIES", "불안,자존감").split(",") if c.strip()
+]
+
+# 비용 추정 (CLAUDE_MODEL의 100만 토큰당 USD 가격)
+LLM_INPUT_PRICE = float(os.getenv("LLM_INPUT_PRICE", "3.0"))
+LLM_OUTPUT_PRICE = float(os.getenv("LLM_OUTPUT_PRICE", "15.0"))
+CACHE_READ_PRICE_RATIO = 0.1  # 캐시 읽기 토큰 가격 (입력 가격 대비)
+CACHE_WRITE_PRICE_RATIO = 1.25  # 캐시 쓰기 토큰 가격 (입력 가격 대비)
 
 # 파일 경로
 DATA_DIR = PROJECT_ROOT / "data"
 OUTPUT_DIR = PROJECT_ROOT / "output"
 SAMPLE_ANSWERS_PATH = DATA_DIR / "sample_answers.json"
+CACHE_DIR = PROJECT_ROOT / ".cache"
+INDEX_CACHE_DIR = CACHE_DIR / "index"
+CORPUS_STORE_DIR = CACHE_DIR / "corpus"
+EMBEDDING_CACHE_DIR = CACHE_DIR / "embeddings"
 
 # 출력 디렉토리 생성
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -30,10 +66,68 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 # 답변 생성 설정
 SIMILARITY_THRESHOLD = 0.3  # 유사도 임계값 (0.0 ~ 1.0)
 TOP_K_MATCHES = 3  # 상위 몇 개의 유사 답변을 참고할지
+REFERENCE_TOKEN_BUDGET = int(os.getenv("REFERENCE_TOKEN_BUDGET", "600"))  # 프롬프트에 넣을 참고 답변 전체의 토큰 예산 (0: 제한 없음)
+REFERENCE_DUPLICATE_THRESHOLD = 0.8  # 참고 답변 / 문장을 중복으로 볼 글자 2-gram Jaccard 유사도
+# 이 유사도 이상이면 LLM 없이 템플릿 답변 (0: 끔, 기본). TF-IDF 코사인은 답변 제목과 같은 질문도 0.4대라 켤 때는 데이터로 확인 후 설정
+TEMPLATE_ANSWER_THRESHOLD = float(os.getenv("TEMPLATE_ANSWER_THRESHOLD", "0"))  # RETRIEVER=tfidf
+DENSE_TEMPLATE_ANSWER_THRESHOLD = float(os.getenv("DENSE_TEMPLATE_ANSWER_THRESHOLD", "0"))  # RETRIEVER=dense (hybrid는 템플릿 답변을 쓰지 않음)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "brute")  # "brute" (전체 채점) 또는 "inverted" (역색인 + 후보 가지치기)
+INDEX_CACHE_ENABLED = os.getenv("INDEX_CACHE_ENABLED", "true").lower() == "true"  # 학습된 인덱스 디스크 캐시 사용 여부
+STREAMING_CORPUS = os.getenv("STREAMING_CORPUS", "false").lower() == "true"  # 답변 본문을 디스크에 두고 필요한 답변만 읽을지 여부
+INDEX_COMPACTION_RATIO = 0.1  # 재학습 없이 추가/삭제된 답변이 전체의 이 비율을 넘으면 백그라운드 재학습
+
+# 의미 기반(임베딩) 검색 설정
+RETRIEVER = os.getenv("RETRIEVER", "tfidf")  # "tfidf" (문자 n-gram) 또는 "dense" (문장 임베딩)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+EMBEDDING_ONNX_PATH = os.getenv("EMBEDDING_ONNX_PATH")  # 설정하면 sentence-transformers 대신 로컬 ONNX 모델 사용
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float32")  # 답변 임베딩 저장 형식 ("float32" 또는 디스크/메모리를 절반으로 줄이는 "float16")
+DENSE_INDEX = os.getenv("DENSE_INDEX", "brute")  # "brute" (전체 내적) 또는 "hnsw" (근사 최근접 이웃, hnswlib 필요)
+DENSE_SIMILARITY_THRESHOLD = float(os.getenv("DENSE_SIMILARITY_THRESHOLD", "0.4"))  # 임베딩 코사인 유사도 임계값
+
+# 하이브리드 검색 설정 (RETRIEVER=hybrid: TF-IDF + 임베딩 후보를 RRF로 합친 뒤 선택적으로 재순위화)
+HYBRID_CANDIDATES = 50  # 검색기마다 가져올 후보 수
+RRF_K = 60  # reciprocal-rank fusion 상수 (클수록 하위 순위 후보의 비중이 커짐)
+RERANKER = os.getenv("RERANKER", "none")  # "none" 또는 "cross-encoder"
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+CANDIDATE_BUDGET_MS = float(os.getenv("CANDIDATE_BUDGET_MS", "200"))  # 후보 생성 단계 시간 예산 (넘으면 늦은 검색기 결과 제외)
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "500"))  # 재순위화 단계 시간 예산 (넘으면 남은 후보는 RRF 순서 유지)
+
+# 카테고리 라우팅 설정 (질문을 분류기로 1~2개 카테고리에 먼저 보내고, 확신이 부족하거나 결과가 없으면 전체 검색)
+CATEGORY_ROUTING = os.getenv("CATEGORY_ROUTING", "false").lower() == "true"
+CATEGORY_ROUTING_CONFIDENCE = float(os.getenv("CATEGORY_ROUTING_CONFIDENCE", "0.5"))  # 라우팅에 필요한 최소 누적 확률
+CATEGORY_ROUTING_MAX = 2  # 라우팅할 최대 카테고리 수
+
+# 답변 캐시 설정 (비슷한 고민에는 생성된 답변을 재사용)
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "memory")  # "memory" (프로세스 내), "sqlite" (워커 간 공유 파일) 또는 "none"
+ANSWER_CACHE_PATH = CACHE_DIR / "answers.sqlite3"
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))  # 답변 유효 시간(초)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))  # 최대 답변 수 (LRU 제거)
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0")) or None  # 유사 질문 적중 임계값 (0: 문자열 일치만)
+ANSWER_CACHE_EXCLUDED_CATEGORIES = [  # 캐시를 쓰지 않을 카테고리 (쉼표로 구분)
+    c.strip() for c in os.getenv("ANSWER_CACHE_EXCLUDED_CATEGORIES", "").split(",") if c.strip()
+]
+
+# 배치 답변 설정 (batch.py: 질문 파일을 한꺼번에 답변)
+BATCH_MODE = os.getenv("BATCH_MODE", "async")  # "async" (동시 API 요청) 또는 "batches" (Message Batches API, 50% 할인, 최대 24시간)
+BATCH_CHUNK_SIZE = 256  # 한 번에 검색(find_best_matches_many)하고 생성할 질문 수
+BATCH_API_MAX_REQUESTS = 10000  # Message Batches 배치 하나에 담을 최대 요청 수
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "30"))  # Message Batches 처리 상태 확인 간격(초)
+BATCH_PRICE_RATIO = 0.5  # Message Batches 토큰 가격 (일반 요청 대비)
 
 # TTS 설정
 TTS_LANGUAGE = "ko"  # 한국어
 TTS_SLOW = False  # 속도 (False = 정상 속도)
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")  # "gtts" (Google, 온라인), "melo" (MeloTTS 한국어 신경망, CPU 오프라인) 또는 "espeak" (espeak-ng 포먼트, 오프라인)
+TTS_FORMAT = os.getenv("TTS_FORMAT", "mp3")  # 음성 형식 ("mp3", "ogg", "wav", "pcm" (16비트 모노), gTTS는 mp3만, 로컬 엔진의 mp3/ogg는 soundfile 필요)
+TTS_ESPEAK_VOICE = os.getenv("TTS_ESPEAK_VOICE", "")  # espeak-ng 음성 (비우면 TTS_LANGUAGE)
+TTS_MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "4"))  # 동시에 변환할 문장 조각 수
+TTS_SAVE_OUTPUT = os.getenv("TTS_SAVE_OUTPUT", "false").lower() == "true"  # 웹 UI 음성을 output/에도 저장할지 여부 (백그라운드)
+TTS_JOB_WORKERS = int(os.getenv("TTS_JOB_WORKERS", "2"))  # 동시에 실행할 백그라운드 음성 변환 작업 수
+TTS_JOB_PROCESSES = os.getenv("TTS_JOB_PROCESSES", "false").lower() == "true"  # 합성을 프로세스 풀에서 실행할지 여부 (GIL을 잡는 로컬 엔진용)
+TTS_JOB_HISTORY = 200  # 결과를 남겨 둘 끝난 음성 변환 작업 수
+TTS_CHUNK_CHARS = 150  # 음성 변환 조각 하나의 최대 글자 수 (문장 경계 기준, 첫 문장은 따로 변환)
+TTS_CACHE_DIR = CACHE_DIR / "tts"  # 음성 파일 캐시 (텍스트 해시 이름의 음성 파일)
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024)  # 음성 파일 캐시 크기 예산 (0: 캐시 끔)
 
 
 def validate_config():
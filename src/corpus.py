@@ -0,0 +1,552 @@
+"""
+코퍼스 스트리밍 모듈
+대용량 답변 파일(JSONL / JSON 배열)을 메모리에 모두 올리지 않고 읽고,
+답변 본문은 오프셋 색인이 있는 디스크 파일에 두었다가 필요한 답변만 꺼내 쓰는 기능
+답변은 __slots__ 기반 AnswerRecord로 다루며 dict처럼 접근할 수 있음
+"""
+
+import json
+import mmap
+import os
+import sys
+from collections.abc import Mapping, Sequence
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+# 스트리밍 파싱 시 한 번에 읽을 크기
+READ_CHUNK_SIZE = 1 << 20
+# 답변 저장소 파일 형식 버전 (바뀌면 이전 형식의 저장 파일은 다시 만듦)
+STORE_FORMAT = 2
+# JSON 배열 원소(또는 건너뛸 값) 하나의 최대 크기 (글자 수, 넘으면 손상된 파일로 보고 중단)
+MAX_VALUE_SIZE = 16 << 20
+
+
+def iter_answers(path: Path, key: str = "answers") -> Iterator[Dict]:
+    """
+    답변 파일을 한 건씩 읽는 제너레이터
+
+    Args:
+        path: 답변 파일 경로 (.jsonl: 한 줄에 답변 하나, .json: {"answers": [...]} 또는 최상위 배열)
+        key: JSON 객체 안에서 답변 배열이 들어 있는 키
+
+    Yields:
+        답변 딕셔너리
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix == ".jsonl":
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise json.JSONDecodeError(f"{path}:{line_no} {e.msg}", e.doc, e.pos)
+        else:
+            yield from _iter_json_array(f, key)
+
+
+class _JsonReader:
+    """
+    파일을 READ_CHUNK_SIZE씩 읽어 가며 JSON 토큰 / 값을 하나씩 꺼내는 리더
+
+    버퍼에는 아직 처리하지 않은 부분만 남기며, 값 하나가 MAX_VALUE_SIZE를 넘도록 끝나지 않으면
+    (닫히지 않은 문자열 등 손상된 파일) 나머지를 더 읽지 않고 바로 오류를 냅니다.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0  # 버퍼 시작의 파일 내 위치 (글자 단위, 오류 메시지용)
+        self.eof = False
+
+    def error(self, message: str, pos: Optional[int] = None) -> json.JSONDecodeError:
+        pos = self.pos if pos is None else pos
+        return json.JSONDecodeError(f"{message} (위치 {self.offset + pos})", self.buffer, pos)
+
+    def fill(self) -> bool:
+        """버퍼에 더 읽어 붙이기 (파일 끝이면 False)"""
+        if self.eof:
+            return False
+        chunk = self.f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """공백을 건너뛴 다음 글자 (파일 끝이면 빈 문자열)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, token: str):
+        """다음 글자가 token인지 확인하고 넘기기"""
+        if self.peek() != token:
+            raise self.error(f"'{token}'가 필요합니다")
+        self.pos += 1
+
+    def value(self):
+        """다음 JSON 값 하나 파싱 (값이 버퍼 끝에서 잘렸으면 더 읽어서 재시도)"""
+        self.peek()
+        while True:
+            try:
+                item, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+                return item
+            except json.JSONDecodeError as e:
+                # 버퍼 끝에서 잘린 값만 더 읽음 (\uXXXX 이스케이프가 잘린 경우 포함), 그 밖의 문법 오류는 바로 중단
+                truncated = e.pos >= len(self.buffer) - 6 or e.msg.startswith("Unterminated string")
+                if not truncated:
+                    raise self.error(e.msg, e.pos) from None
+                if len(self.buffer) - self.pos > MAX_VALUE_SIZE:
+                    raise self.error(f"값 하나가 {MAX_VALUE_SIZE}자를 넘습니다 (손상된 파일?)") from None
+                if not self.fill():
+                    raise self.error(e.msg, e.pos) from None
+
+
+def _iter_json_array(f, key: str) -> Iterator[Dict]:
+    """최상위 배열 또는 {key: [...]} 객체의 배열 원소를 하나씩 파싱"""
+    reader = _JsonReader(f)
+
+    # 배열 시작 위치 찾기: 최상위 배열이거나 객체의 key 값 (앞에 있는 다른 키의 값은 건너뜀)
+    if reader.peek() == "{":
+        reader.pos += 1
+        while True:
+            if reader.peek() != '"':
+                raise reader.error(f"'{key}' 키를 찾을 수 없습니다")
+            name = reader.value()
+            reader.expect(":")
+            if name == key:
+                break
+            reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+            elif reader.peek() == "}":
+                raise reader.error(f"'{key}' 키를 찾을 수 없습니다")
+            else:
+                raise reader.error("',' 또는 '}'가 필요합니다")
+
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        token = reader.peek()
+        if token == "]":
+            return
+        if token != ",":
+            raise reader.error("',' 또는 ']'가 필요합니다" if token else "배열이 닫히지 않았습니다")
+        reader.pos += 1
+
+
+_MISSING = object()
+
+
+class AnswerRecord(Mapping):
+    """
+    답변 레코드 (__slots__ 기반)
+
+    기존 dict처럼 answer['title'], answer.get('keywords', []) 형태로 접근할 수 있습니다.
+    검색에 필요한 id, category, title은 바로 갖고 있고, 나머지 필드(content 등)는
+    loader가 있으면 처음 접근할 때 읽어옵니다.
+    """
+
+    __slots__ = ('id', 'category', 'title', 'keywords', 'content', 'key_points', '_extra', '_loader')
+
+    FIELDS = ('id', 'category', 'title', 'keywords', 'content', 'key_points')
+    LAZY_FIELDS = ('keywords', 'content', 'key_points')
+
+    def __init__(self, answer_id, category, title, loader: Optional[Callable[[], Dict]] = None):
+        """
+        초기화 (dict에서 만들 때는 from_dict 사용)
+
+        Args:
+            answer_id: 답변 id
+            category: 카테고리
+            title: 제목
+            loader: 나머지 필드가 담긴 원본 답변을 읽어오는 함수 (None이면 이미 채워진 것으로 간주)
+        """
+        self.id = answer_id
+        self.category = category
+        self.title = title
+        self._extra = None
+        self._loader = loader
+
+    @classmethod
+    def from_dict(cls, answer: Mapping) -> "AnswerRecord":
+        """dict 답변을 레코드로 변환 (카테고리 문자열은 intern하여 공유)"""
+        if isinstance(answer, AnswerRecord):
+            return answer
+        category = answer.get('category', _MISSING)
+        record = cls(
+            answer.get('id', _MISSING),
+            sys.intern(category) if isinstance(category, str) else category,
+            answer.get('title', _MISSING)
+        )
+        record._fill(answer)
+        return record
+
+    def _fill(self, answer: Mapping):
+        for field in self.LAZY_FIELDS:
+            setattr(self, field, answer.get(field, _MISSING))
+        extra = {k: v for k, v in answer.items() if k not in self.FIELDS}
+        self._extra = extra or None
+
+    def _ensure_loaded(self):
+        loader = self._loader
+        if loader is not None:
+            self._fill(loader())
+            self._loader = None
+
+    def __getattr__(self, name):
+        # 아직 읽지 않은 지연 필드에 속성으로 접근한 경우 (슬롯이 비어 있을 때만 호출됨)
+        if name in AnswerRecord.LAZY_FIELDS and object.__getattribute__(self, '_loader') is not None:
+            self._ensure_loaded()
+            value = object.__getattribute__(self, name)
+            return None if value is _MISSING else value
+        raise AttributeError(name)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            if key in self.LAZY_FIELDS:
+                self._ensure_loaded()
+            value = object.__getattribute__(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        self._ensure_loaded()
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        self._ensure_loaded()
+        for field in self.FIELDS:
+            if object.__getattribute__(self, field) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict:
+        """일반 dict로 변환 (지연 필드도 모두 읽음)"""
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f"AnswerRecord(id={self.id!r}, category={self.category!r}, title={self.title!r})"
+
+
+def as_dict(answer: Mapping) -> Dict:
+    """JSON 직렬화용 dict로 변환"""
+    return answer.to_dict() if isinstance(answer, AnswerRecord) else dict(answer)
+
+
+def answer_text(answer: Mapping) -> str:
+    """답변의 키워드, 제목, 내용을 결합한 검색용 텍스트"""
+    return ' '.join([
+        ' '.join(answer.get('keywords', [])),
+        answer.get('title', ''),
+        answer.get('content', '')
+    ])
+
+
+class AnswerColumns:
+    """
+    검색 결과 표시에 필요한 id / category / title의 열 단위 저장소
+
+    id와 title은 각각 하나의 UTF-8 버퍼에 이어 붙이고 오프셋으로 잘라 쓰며 (id는 int / str 타입을 유지하도록 JSON으로 저장),
+    category는 중복이 많으므로 코드 배열 + 카테고리 이름 목록으로 저장합니다.
+    """
+
+    def __init__(self, ids: np.ndarray, id_offsets: np.ndarray, titles: np.ndarray,
+                 title_offsets: np.ndarray, category_codes: np.ndarray, category_names: List[str]):
+        self.ids = ids
+        self.id_offsets = id_offsets
+        self.titles = titles
+        self.title_offsets = title_offsets
+        self.category_codes = category_codes
+        self.category_names = [sys.intern(name) for name in category_names]
+
+    @staticmethod
+    def _text(buffer: np.ndarray, offsets: np.ndarray, row: int) -> str:
+        return buffer[offsets[row]:offsets[row + 1]].tobytes().decode('utf-8')
+
+    def answer_id(self, row: int):
+        return json.loads(self._text(self.ids, self.id_offsets, row))
+
+    def title(self, row: int) -> str:
+        return self._text(self.titles, self.title_offsets, row)
+
+    def category(self, row: int) -> str:
+        return self.category_names[self.category_codes[row]]
+
+    def save(self, f):
+        """npz 형식으로 저장"""
+        np.savez(
+            f, ids=self.ids, id_offsets=self.id_offsets,
+            titles=self.titles, title_offsets=self.title_offsets,
+            category_codes=self.category_codes,
+            category_names=np.array(self.category_names, dtype=str)
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "AnswerColumns":
+        """npz 파일에서 불러오기"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['ids'], data['id_offsets'], data['titles'], data['title_offsets'],
+                data['category_codes'], data['category_names'].tolist()
+            )
+
+
+class _ColumnsBuilder:
+    """AnswerColumns를 한 건씩 채워 만드는 도우미"""
+
+    def __init__(self):
+        self.ids = bytearray()
+        self.id_offsets = [0]
+        self.titles = bytearray()
+        self.title_offsets = [0]
+        self.category_codes = []
+        self.category_index: Dict[str, int] = {}
+
+    def add(self, answer: Mapping):
+        self.ids += json.dumps(answer.get('id'), ensure_ascii=False).encode('utf-8')
+        self.id_offsets.append(len(self.ids))
+        self.titles += str(answer.get('title', '')).encode('utf-8')
+        self.title_offsets.append(len(self.titles))
+        category = str(answer.get('category', ''))
+        self.category_codes.append(self.category_index.setdefault(category, len(self.category_index)))
+
+    def build(self) -> AnswerColumns:
+        return AnswerColumns(
+            np.frombuffer(bytes(self.ids), dtype=np.uint8),
+            np.asarray(self.id_offsets, dtype=np.int64),
+            np.frombuffer(bytes(self.titles), dtype=np.uint8),
+            np.asarray(self.title_offsets, dtype=np.int64),
+            np.asarray(self.category_codes, dtype=np.uint16),
+            list(self.category_index)
+        )
+
+
+class AnswerStore:
+    """
+    답변 저장 파일 (한 줄에 답변 하나인 JSONL + 바이트 오프셋 배열 + id/category/title 열)
+
+    파일은 읽기 전용 mmap으로 열어 여러 스레드가 잠금 없이 읽을 수 있습니다.
+    """
+
+    def __init__(self, data_path: Path, offsets: np.ndarray, columns: AnswerColumns):
+        """
+        초기화 (build / open 사용 권장)
+
+        Args:
+            data_path: 답변 JSONL 파일 경로
+            offsets: 답변별 시작 바이트 오프셋
+            columns: 답변별 id / category / title
+        """
+        self.data_path = Path(data_path)
+        self.offsets = offsets
+        self.columns = columns
+        self._file = open(self.data_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    @staticmethod
+    def _prefix(name: str, key: str) -> str:
+        return f"{name}.v{STORE_FORMAT}.{key[:16]}"
+
+    @classmethod
+    def _paths(cls, directory: Path, name: str, key: str):
+        prefix = cls._prefix(name, key)
+        return (
+            directory / f"{prefix}.answers.jsonl",
+            directory / f"{prefix}.columns.npz",
+            directory / f"{prefix}.offsets.npy"
+        )
+
+    @classmethod
+    def open(cls, directory: Path, name: str, key: str) -> Optional["AnswerStore"]:
+        """
+        같은 키로 만들어 둔 저장 파일 열기
+
+        Returns:
+            저장소, 없으면 None
+        """
+        paths = cls._paths(Path(directory), name, key)
+        if not all(path.exists() for path in paths):
+            return None
+        data_path, columns_path, offsets_path = paths
+        try:
+            offsets = np.load(offsets_path, mmap_mode='r')
+            columns = AnswerColumns.load(columns_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(data_path, offsets, columns)
+
+    @classmethod
+    def build(cls, directory: Path, name: str, key: str, answers: Iterable[Mapping]) -> "AnswerStore":
+        """
+        답변을 한 건씩 저장 파일에 기록 (임시 파일에 쓴 뒤 교체)
+
+        Args:
+            directory: 저장 디렉토리
+            name: 코퍼스 이름
+            key: 코퍼스 내용 키
+            answers: 답변 이터러블
+
+        Returns:
+            저장소
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = cls._paths(directory, name, key)
+        tmp_paths = [path.with_name(path.name + ".tmp") for path in paths]
+        tmp_data, tmp_columns, tmp_offsets = tmp_paths
+
+        offsets = []
+        columns = _ColumnsBuilder()
+        position = 0
+        with open(tmp_data, 'wb') as f:
+            for answer in answers:
+                line = json.dumps(as_dict(answer), ensure_ascii=False).encode('utf-8') + b"\n"
+                offsets.append(position)
+                columns.add(answer)
+                f.write(line)
+                position += len(line)
+
+        with open(tmp_columns, 'wb') as f:
+            columns.build().save(f)
+        with open(tmp_offsets, 'wb') as f:
+            np.save(f, np.asarray(offsets, dtype=np.int64))
+
+        # 오프셋 파일을 마지막에 교체 (오프셋 파일이 커밋 역할)
+        for tmp_path, path in zip(tmp_paths, paths):
+            os.replace(tmp_path, path)
+
+        for path in directory.glob(f"{name}.*"):
+            if not path.name.startswith(f"{cls._prefix(name, key)}.") and not path.name.endswith(".tmp"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+        return cls.open(directory, name, key)
+
+    def read(self, row: int) -> Dict:
+        """답변 하나를 원본 dict로 읽기"""
+        offset = int(self.offsets[row])
+        end = self._map.find(b"\n", offset)
+        return json.loads(self._map[offset:end])
+
+    def record(self, row: int) -> AnswerRecord:
+        """id / category / title만 채운 레코드 반환 (나머지는 접근할 때 파일에서 읽음)"""
+        columns = self.columns
+        return AnswerRecord(
+            columns.answer_id(row), columns.category(row), columns.title(row),
+            loader=partial(self.read, row)
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def close(self):
+        """파일 닫기"""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+class StoredAnswers(Sequence):
+    """
+    저장 파일에 있는 답변 목록의 불변 뷰
+
+    인덱싱하면 id / category / title만 채운 AnswerRecord를 돌려주고,
+    content 등 나머지 필드는 실제로 읽을 때 디스크(페이지 캐시)에서 가져옵니다.
+    실행 중 추가된 답변은 저장 파일을 건드리지 않고 메모리 목록(overlay)에 둡니다.
+    overlay는 뷰마다 자기가 가리키는 답변만 가지므로, 삭제된 답변은 그 답변을 가리키던 이전 뷰가 사라지면 함께 해제됩니다.
+    """
+
+    def __init__(self, store: AnswerStore, rows: Optional[np.ndarray] = None,
+                 overlay: Optional[List[AnswerRecord]] = None):
+        """
+        초기화
+
+        Args:
+            store: 답변 저장소
+            rows: 답변 위치 배열 (0 이상: 저장 파일 행 번호, 음수: overlay 인덱스 -(i+1))
+            overlay: 실행 중 추가된 답변 목록
+        """
+        self.store = store
+        self.rows = np.arange(len(store), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+        self.overlay = overlay if overlay is not None else []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _load(self, row: int) -> AnswerRecord:
+        if row >= 0:
+            return self.store.record(int(row))
+        return self.overlay[-row - 1]
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return StoredAnswers(self.store, self.rows[index], self.overlay)
+        return self._load(self.rows[index])
+
+    def __iter__(self) -> Iterator[AnswerRecord]:
+        for row in self.rows:
+            yield self._load(row)
+
+    def _view(self, rows: np.ndarray, added: Sequence[Mapping] = ()) -> "StoredAnswers":
+        """rows(+ 덧붙일 답변)만 가리키는 새 뷰 (overlay는 새 뷰가 쓰는 답변만 새 목록으로 옮김)"""
+        rows = np.array(rows, dtype=np.int64)
+        in_overlay = rows < 0
+        kept = -rows[in_overlay] - 1
+        overlay = [self.overlay[i] for i in kept] + [AnswerRecord.from_dict(a) for a in added]
+        rows[in_overlay] = -(np.arange(len(kept), dtype=np.int64) + 1)
+        new_rows = -(np.arange(len(kept), len(overlay), dtype=np.int64) + 1)
+        return StoredAnswers(self.store, np.concatenate([rows, new_rows]), overlay)
+
+    def extend(self, answers: List[Mapping]) -> "StoredAnswers":
+        """답변을 덧붙인 새 뷰 반환 (저장 파일은 그대로)"""
+        return self._view(self.rows, answers)
+
+    def select(self, indices: Sequence[int]) -> "StoredAnswers":
+        """지정한 인덱스의 답변만 남긴 새 뷰 반환"""
+        return self._view(self.rows[np.asarray(indices, dtype=np.intp)])
+
+
+def write_answers(path: Path, answers: Iterable[Mapping]):
+    """
+    답변을 한 건씩 파일로 저장 (임시 파일에 쓴 뒤 교체)
+
+    Args:
+        path: 저장 경로 (.jsonl이면 한 줄에 하나, 아니면 {"answers": [...]} JSON)
+        answers: 답변 이터러블
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if path.suffix == ".jsonl":
+            for answer in answers:
+                f.write(json.dumps(as_dict(answer), ensure_ascii=False) + "\n")
+        else:
+            f.write('{\n  "answers": [')
+            for i, answer in enumerate(answers):
+                f.write(("," if i else "") + "\n    " + json.dumps(as_dict(answer), ensure_ascii=False))
+            f.write('\n  ]\n}\n')
+    os.replace(tmp_path, path)
@@ -0,0 +1,233 @@
+"""
+문장 임베딩 모듈
+CPU에서 동작하는 로컬 문장 임베딩 모델(sentence-transformers 또는 ONNX)로 텍스트를 벡터화하고,
+답변 임베딩을 디스크에 저장해 메모리 매핑으로 불러오는 기능
+"""
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from config import EMBEDDING_MODEL, EMBEDDING_ONNX_PATH
+
+# 임베딩 계산 시 한 번에 모델에 넣을 텍스트 수
+EMBEDDING_BATCH_SIZE = 64
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (내적이 곧 코사인 유사도가 되도록)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class Encoder(ABC):
+    """
+    문장 임베딩 모델 인터페이스
+
+    name은 임베딩 캐시 키에 들어가므로 모델이 바뀌면 값도 달라져야 합니다.
+    """
+
+    name: str
+    dimension: int
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        텍스트를 임베딩으로 변환
+
+        Args:
+            texts: 텍스트 리스트
+
+        Returns:
+            (텍스트 수 x 차원) float32 배열, 행마다 L2 정규화
+        """
+
+
+class SentenceTransformerEncoder(Encoder):
+    """sentence-transformers 모델 (CPU)"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        """
+        초기화
+
+        Args:
+            model_name: Hugging Face 모델 이름 또는 로컬 모델 디렉토리
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "임베딩 검색에는 sentence-transformers가 필요합니다: pip install sentence-transformers"
+            ) from e
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"sentence-transformers:{model_name}"
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            list(texts), batch_size=EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OnnxEncoder(Encoder):
+    """
+    로컬 ONNX 문장 임베딩 모델 (onnxruntime CPU)
+
+    모델 출력(토큰별 hidden state)을 attention mask로 평균 풀링한 뒤 L2 정규화합니다.
+    """
+
+    def __init__(self, model_path: Path, tokenizer_path: Optional[Path] = None, max_length: int = 256):
+        """
+        초기화
+
+        Args:
+            model_path: .onnx 모델 파일 경로
+            tokenizer_path: tokenizers 형식의 tokenizer.json 경로 (기본: 모델과 같은 디렉토리)
+            max_length: 최대 토큰 수
+        """
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "ONNX 임베딩 모델에는 onnxruntime과 tokenizers가 필요합니다: pip install onnxruntime tokenizers"
+            ) from e
+
+        self.model_path = Path(model_path)
+        tokenizer_path = Path(tokenizer_path or self.model_path.parent / "tokenizer.json")
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.session = onnxruntime.InferenceSession(
+            str(self.model_path), providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        stat = self.model_path.stat()
+        self.name = f"onnx:{self.model_path.name}:{stat.st_size}:{int(stat.st_mtime)}"
+        self.dimension = int(self.encode(["차원 확인"]).shape[1])
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, getattr(self, 'dimension', 0)), dtype=np.float32)
+
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.input_names:
+            feeds['token_type_ids'] = np.zeros_like(input_ids)
+
+        output = self.session.run(None, feeds)[0]
+        if output.ndim == 3:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return l2_normalize(output)
+
+
+def load_encoder() -> Encoder:
+    """config 설정에 맞는 임베딩 모델 생성 (EMBEDDING_ONNX_PATH가 있으면 ONNX 모델 사용)"""
+    if EMBEDDING_ONNX_PATH:
+        return OnnxEncoder(Path(EMBEDDING_ONNX_PATH))
+    return SentenceTransformerEncoder(EMBEDDING_MODEL)
+
+
+def encode_in_batches(encoder: Encoder, texts: Iterable[str],
+                      batch_size: int = EMBEDDING_BATCH_SIZE) -> Iterator[np.ndarray]:
+    """텍스트를 batch_size개씩 모아 임베딩 (전체 텍스트를 한 번에 메모리에 올리지 않음)"""
+    batch: List[str] = []
+    for text in texts:
+        batch.append(text)
+        if len(batch) == batch_size:
+            yield encoder.encode(batch)
+            batch = []
+    if batch:
+        yield encoder.encode(batch)
+
+
+def embedding_key(corpus_key: str, encoder: Encoder, dtype: str) -> str:
+    """코퍼스 키, 모델, 저장 형식으로 임베딩 파일 키 생성"""
+    return hashlib.sha256(f"{corpus_key}|{encoder.name}|{dtype}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """답변 임베딩 디스크 저장소 (.npy, 메모리 매핑으로 읽음)"""
+
+    def __init__(self, cache_dir: Path, name: str):
+        """
+        초기화
+
+        Args:
+            cache_dir: 임베딩 파일을 저장할 디렉토리
+            name: 코퍼스 이름 (보통 답변 파일명)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.name = name
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{self.name}.{key[:16]}.npy"
+
+    def load(self, key: str) -> Optional[np.ndarray]:
+        """
+        키가 일치하는 임베딩이 있으면 읽기 전용 메모리 매핑으로 반환
+
+        Returns:
+            (답변 수 x 차원) 배열, 없거나 손상된 경우 None
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"[WARN] 임베딩 파일을 읽을 수 없어 다시 계산합니다: {e}")
+            return None
+
+    def build(self, key: str, batches: Iterable[np.ndarray], count: int,
+              dimension: int, dtype: str) -> np.ndarray:
+        """
+        임베딩을 배치 단위로 파일에 기록 (임시 파일에 쓴 뒤 교체)
+
+        Args:
+            key: embedding_key로 만든 키
+            batches: 답변 순서대로의 임베딩 배치
+            count: 답변 수
+            dimension: 임베딩 차원
+            dtype: 저장 형식 ("float16" 또는 "float32")
+
+        Returns:
+            저장된 파일의 읽기 전용 메모리 매핑
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(count, dimension))
+        position = 0
+        for batch in batches:
+            matrix[position:position + len(batch)] = batch
+            position += len(batch)
+        if position != count:
+            raise ValueError(f"임베딩 수가 답변 수와 다릅니다: {position} != {count}")
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, path)
+
+        for old in self.cache_dir.glob(f"{self.name}.*.npy"):
+            if old != path:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+        return np.load(path, mmap_mode='r')
@@ -3,21 +3,298 @@
 Claude API를 활용하여 질문에 대한 맞춤형 답변 생성
 """
 
-from typing import List, Dict, Tuple
-from anthropic import Anthropic
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from anthropic import Anthropic, AsyncAnthropic, DefaultAsyncHttpxClient
+
+from answer_cache import AnswerCache
+from config import (
+    CACHE_READ_PRICE_RATIO, CACHE_WRITE_PRICE_RATIO, CLAUDE_API_KEY, CLAUDE_BASE_URL, CLAUDE_MODEL,
+    LLM_FALLBACK, LLM_INPUT_PRICE, LLM_MAX_CONCURRENCY, LLM_OUTPUT_PRICE, MAX_TOKENS, PROMPT_CACHE_MIN_TOKENS,
+    PROMPT_CACHING, TEMPERATURE
+)
+from packing import PackedReference, estimate_tokens, pack_references
+from resilience import CircuitOpenError, ResilientCaller, is_retryable
+from routing import ModelRouter, Route, RouteDecision
+
+
+# 답변 생성 시스템 프롬프트 (모든 요청에 같은 내용이므로, 모델의 최소 캐시 길이 이상이면 프롬프트 캐시 대상)
+SYSTEM_PROMPT = """당신은 공감 능력이 뛰어난 전문 고민 상담사입니다.
+사용자의 고민에 진심으로 공감하고, 따뜻하면서도 실질적인 조언을 제공합니다.
+
+답변 작성 원칙:
+1. 공감과 이해: 먼저 상대방의 감정을 공감하고 이해한다는 것을 표현
+2. 긍정적 관점: 문제를 다룰 때도 희망적이고 건설적인 관점 유지
+3. 구체적 조언: 추상적인 조언보다 실천 가능한 구체적 방법 제시
+4. 격려와 지지: 마무리는 항상 따뜻한 격려와 응원의 메시지로
+
+답변 구조:
+- 공감 표현 (2-3문장)
+- 상황 이해 및 분석 (2-3문장)
+- 구체적 조언 및 방법 (4-5문장)
+- 격려 및 마무리 (2-3문장)
+
+주의사항:
+- 의료적/법률적 조언은 하지 않고 전문가 상담 권유
+- 위기 상황(자살, 폭력 등)은 즉시 전문 기관 연락 권유
+- 판단하거나 비난하지 않는 중립적 태도 유지
+- 이모지나 특수문자는 사용하지 말고 순수한 한글 텍스트만 사용"""
+
+# 참고 답변 없이 생성할 때의 시스템 프롬프트 (폴백용)
+SIMPLE_SYSTEM_PROMPT = """당신은 공감 능력이 뛰어난 전문 고민 상담사입니다.
+사용자의 고민에 진심으로 공감하고, 따뜻하면서도 실질적인 조언을 제공합니다."""
+
+CACHE_CONTROL = {"type": "ephemeral"}
 
-from config import CLAUDE_API_KEY, CLAUDE_MODEL, MAX_TOKENS, TEMPERATURE
+# API 장애로 답변을 생성할 수 없을 때의 답변 (폴백)
+FALLBACK_NOTICE = "지금은 맞춤 답변을 준비하기 어려워, 비슷한 고민에 대한 상담 답변을 먼저 전해 드려요."
+FALLBACK_ANSWER = """고민을 털어놓아 주셔서 고마워요. 지금은 답변을 준비하는 데 문제가 생겨 자세한 답변을 드리기 어려워요.
+잠시 후 다시 질문해 주시면 정성껏 답변해 드릴게요.
+
+혼자 감당하기 힘들 만큼 마음이 괴롭다면 자살예방상담전화(109)나 정신건강위기상담전화(1577-0199)에서 언제든 이야기를 나눌 수 있어요."""
+
+
+def text_block(text: str) -> Dict:
+    """Messages API 텍스트 블록"""
+    return {"type": "text", "text": text}
+
+
+_short_prefix_models = set()  # 최소 캐시 길이 경고를 이미 출력한 모델
+
+
+def min_cacheable_tokens(model: str) -> int:
+    """모델의 최소 캐시 접두부 길이 (토큰)"""
+    return next(tokens for name, tokens in PROMPT_CACHE_MIN_TOKENS if name in model)
+
+
+def cache_system_prompt(system: List[Dict], model: str) -> List[Dict]:
+    """
+    시스템 블록(요청마다 같은 접두부) 끝에 프롬프트 캐시 지점 표시
+
+    접두부가 모델의 최소 캐시 길이보다 짧으면 표시해도 캐시되지 않으므로 그대로 두고, 모델마다 한 번 경고합니다.
+    참고 답변 블록은 질문마다 조합이 달라 캐시 쓰기 비용(1.25배)만 늘어나므로 캐시 지점을 두지 않습니다.
+    """
+    if not PROMPT_CACHING or not system:
+        return system
+    tokens = sum(estimate_tokens(block['text']) for block in system)
+    min_tokens = min_cacheable_tokens(model)
+    if tokens < min_tokens:
+        if model not in _short_prefix_models:
+            _short_prefix_models.add(model)
+            print(f"[WARN] 시스템 프롬프트(약 {tokens}토큰)가 {model}의 최소 캐시 길이({min_tokens}토큰)보다 짧아 캐시하지 않습니다.")
+        return system
+    return system[:-1] + [dict(system[-1], cache_control=CACHE_CONTROL)]
+
+
+def format_references(references: List[PackedReference]) -> str:
+    """패킹한 참고 답변을 프롬프트용으로 포맷팅 (질문마다 달라지는 유사도는 질문 블록에 따로 넣음)"""
+    if not references:
+        return "참고할 유사한 답변이 없습니다."
+
+    return "\n\n".join(f"\n{reference.text(i)}" for i, reference in enumerate(references, 1))
+
+
+def build_answer_prompt(
+    question: str,
+    reference_answers: List[Tuple[Dict, float]]
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    참고 답변을 활용한 답변 생성 프롬프트
+
+    참고 답변은 REFERENCE_TOKEN_BUDGET 안으로 패킹합니다 (packing.pack_references).
+    캐시 지점은 message_params()가 시스템 프롬프트 끝에만 둡니다 (cache_system_prompt).
+
+    Returns:
+        (시스템 블록 리스트, 사용자 메시지 블록 리스트)
+    """
+    # 참고 답변 정리
+    references = pack_references(question, reference_answers)
+    reference_text = format_references(references)
+    scores = ", ".join(f"참고 {i} {reference.score:.0%}" for i, reference in enumerate(references, 1))
+
+    # 사용자 프롬프트
+    question_prompt = f"""다음은 사용자의 고민입니다:
+
+"{question}"
+
+위 고민에 대해 따뜻하고 공감적인 답변을 작성해주세요.
+참고 답변별 유사도: {scores}
+
+위 참고 답변들의 핵심 내용을 활용하되, 사용자의 구체적인 상황에 맞게 새롭게 작성해주세요.
+답변은 자연스러운 한국어로, 300-500자 정도로 작성해주세요."""
+
+    system = [text_block(SYSTEM_PROMPT)]
+    user = [
+        text_block(f"참고할 수 있는 유사한 고민에 대한 답변들:\n{reference_text}"),
+        text_block(question_prompt),
+    ]
+    return system, user
+
+
+def build_simple_prompt(question: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    참고 답변 없이 질문만으로 답변을 생성하는 프롬프트 (폴백용)
+
+    Returns:
+        (시스템 블록 리스트, 사용자 메시지 블록 리스트)
+    """
+    user_prompt = f"""다음 고민에 대해 따뜻하고 공감적인 답변을 300-500자로 작성해주세요:
+
+"{question}" """
+
+    return [text_block(SIMPLE_SYSTEM_PROMPT)], [text_block(user_prompt)]
+
+
+def build_prompt(
+    question: str,
+    reference_answers: Optional[List[Tuple[Dict, float]]]
+) -> Tuple[List[Dict], List[Dict]]:
+    """참고 답변이 있으면 답변 생성 프롬프트, 없으면 폴백 프롬프트"""
+    if reference_answers:
+        return build_answer_prompt(question, reference_answers)
+    return build_simple_prompt(question)
+
+
+def message_params(system: List[Dict], user: List[Dict], route: Optional[Route] = None) -> Dict:
+    """Messages API 요청 인자 (일반 / 스트리밍 요청 공통, route가 없으면 CLAUDE_MODEL / MAX_TOKENS)"""
+    model = route.model if route else CLAUDE_MODEL
+    return {
+        "model": model,
+        "max_tokens": route.max_tokens if route else MAX_TOKENS,
+        "temperature": TEMPERATURE,
+        "system": cache_system_prompt(system, model),
+        "messages": [
+            {"role": "user", "content": user}
+        ],
+    }
+
+
+@dataclass
+class UsageStats:
+    """
+    토큰 사용량 누적 카운터 (프롬프트 캐시 적중률 확인용)
+
+    input_tokens는 캐시와 무관하게 처리된 입력 토큰이고,
+    cache_read_tokens / cache_write_tokens는 캐시에서 읽은 / 캐시에 새로 쓴 입력 토큰입니다.
+    """
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cache_hits: int = 0  # 캐시에서 읽은 토큰이 있는 요청 수
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, usage) -> Dict[str, int]:
+        """
+        요청 하나의 사용량(Messages API usage) 누적
+
+        Returns:
+            이 요청의 토큰 수 딕셔너리
+        """
+        request = {
+            'input_tokens': usage.input_tokens or 0,
+            'output_tokens': usage.output_tokens or 0,
+            'cache_read_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0,
+            'cache_write_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0,
+        }
+        with self._lock:
+            self.requests += 1
+            self.input_tokens += request['input_tokens']
+            self.output_tokens += request['output_tokens']
+            self.cache_read_tokens += request['cache_read_tokens']
+            self.cache_write_tokens += request['cache_write_tokens']
+            self.cache_hits += request['cache_read_tokens'] > 0
+        return request
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """전체 입력 토큰 중 캐시에서 읽은 비율"""
+        total = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        return self.cache_read_tokens / total if total else 0.0
+
+    def cost(self, price_ratio: float = 1.0) -> float:
+        """
+        누적 토큰 사용량의 예상 비용 (USD)
+
+        Args:
+            price_ratio: 가격 배율 (Message Batches는 BATCH_PRICE_RATIO)
+        """
+        input_units = (self.input_tokens + self.cache_read_tokens * CACHE_READ_PRICE_RATIO
+                       + self.cache_write_tokens * CACHE_WRITE_PRICE_RATIO)
+        return (input_units * LLM_INPUT_PRICE + self.output_tokens * LLM_OUTPUT_PRICE) / 1_000_000 * price_ratio
+
+    def summary(self) -> str:
+        return (f"요청 {self.requests}회 (캐시 적중 {self.cache_hits}회) | 입력 {self.input_tokens} "
+                f"+ 캐시 읽기 {self.cache_read_tokens} + 캐시 쓰기 {self.cache_write_tokens} "
+                f"(캐시 비율 {self.cache_hit_rate:.0%}) | 출력 {self.output_tokens}")
+
+
+def cache_category(reference_answers: Optional[List[Tuple[Dict, float]]]) -> Optional[str]:
+    """답변 캐시 제외 판단에 쓸 질문 카테고리 (가장 유사한 참고 답변의 카테고리)"""
+    if not reference_answers:
+        return None
+    return reference_answers[0][0].get('category')
+
+
+def fallback_answer(reference_answers: Optional[List[Tuple[Dict, float]]]) -> str:
+    """API를 쓸 수 없을 때의 답변 (가장 유사한 참고 답변, 없으면 안내문)"""
+    if reference_answers:
+        return f"{FALLBACK_NOTICE}\n\n{reference_answers[0][0]['content']}"
+    return FALLBACK_ANSWER
+
+
+def can_fall_back(error: Exception) -> bool:
+    """폴백 답변으로 대신할 오류인지 여부 (서킷 차단, 재시도 후에도 남은 일시 오류)"""
+    return isinstance(error, CircuitOpenError) or is_retryable(error)
 
 
 class AnswerGenerator:
-    """Claude API 기반 답변 생성 클래스"""
+    """
+    Claude API 기반 답변 생성 클래스
+
+    API 호출은 ResilientCaller로 일시 오류를 재시도하고, 장애가 이어져 서킷이 열리거나 재시도해도 실패하면
+    fallback이 켜져 있을 때 폴백 답변(fallback_answer)을 반환합니다. 폴백 답변은 답변 캐시에 저장하지 않습니다.
+    요청마다 ModelRouter가 고른 모델 / 최대 출력 토큰을 쓰고, 경로와 지연 시간을 router.stats에 기록합니다.
+    """
 
-    def __init__(self):
-        """초기화"""
-        if not CLAUDE_API_KEY:
+    def __init__(
+        self,
+        api_key: Optional[str] = CLAUDE_API_KEY,
+        base_url: Optional[str] = CLAUDE_BASE_URL,
+        cache: Optional[AnswerCache] = None,
+        resilience: Optional[ResilientCaller] = None,
+        fallback: bool = LLM_FALLBACK,
+        router: Optional[ModelRouter] = None
+    ):
+        """
+        초기화
+
+        Args:
+            api_key: Claude API 키
+            base_url: API 주소 (None이면 Anthropic API)
+            cache: 답변 캐시 (None이면 항상 새로 생성)
+            resilience: 재시도 / 서킷 브레이커 (None이면 설정값)
+            fallback: API 장애 시 폴백 답변 반환 여부 (False면 오류 발생)
+            router: 모델 라우터 (None이면 설정값)
+        """
+        if not api_key:
             raise ValueError("CLAUDE_API_KEY가 설정되지 않았습니다.")
 
-        self.client = Anthropic(api_key=CLAUDE_API_KEY)
+        # 재시도는 ResilientCaller가 담당하므로 SDK 자체 재시도는 끔
+        self.client = Anthropic(api_key=api_key, base_url=base_url, max_retries=0)
+        self.cache = cache
+        self.resilience = resilience or ResilientCaller()
+        self.fallback = fallback
+        self.router = router or ModelRouter()
+        self.usage = UsageStats()
+        self.last_usage: Optional[Dict[str, int]] = None  # 마지막 요청의 토큰 수
         print("[OK] Claude API 클라이언트 초기화 완료")
 
     def generate_answer(
@@ -35,78 +312,181 @@ class AnswerGenerator:
         Returns:
             생성된 답변 텍스트
         """
-        # 시스템 프롬프트
-        system_prompt = """당신은 공감 능력이 뛰어난 전문 고민 상담사입니다.
-사용자의 고민에 진심으로 공감하고, 따뜻하면서도 실질적인 조언을 제공합니다.
-
-답변 작성 원칙:
-1. 공감과 이해: 먼저 상대방의 감정을 공감하고 이해한다는 것을 표현
-2. 긍정적 관점: 문제를 다룰 때도 희망적이고 건설적인 관점 유지
-3. 구체적 조언: 추상적인 조언보다 실천 가능한 구체적 방법 제시
-4. 격려와 지지: 마무리는 항상 따뜻한 격려와 응원의 메시지로
+        return self._generate(question, reference_answers, build_answer_prompt(question, reference_answers))
 
-답변 구조:
-- 공감 표현 (2-3문장)
-- 상황 이해 및 분석 (2-3문장)
-- 구체적 조언 및 방법 (4-5문장)
-- 격려 및 마무리 (2-3문장)
+    def generate_simple_answer(self, question: str) -> str:
+        """
+        참고 답변 없이 질문만으로 답변 생성 (폴백용)
 
-주의사항:
-- 의료적/법률적 조언은 하지 않고 전문가 상담 권유
-- 위기 상황(자살, 폭력 등)은 즉시 전문 기관 연락 권유
-- 판단하거나 비난하지 않는 중립적 태도 유지
-- 이모지나 특수문자는 사용하지 말고 순수한 한글 텍스트만 사용"""
+        Args:
+            question: 사용자 질문
 
-        # 참고 답변 정리
-        reference_text = self._format_references(reference_answers)
+        Returns:
+            생성된 답변
+        """
+        return self._generate(question, None, build_simple_prompt(question))
 
-        # 사용자 프롬프트
-        user_prompt = f"""다음은 사용자의 고민입니다:
+    def stream_answer(
+        self,
+        question: str,
+        reference_answers: Optional[List[Tuple[Dict, float]]] = None
+    ) -> Iterator[str]:
+        """
+        답변을 생성되는 대로 조각(text delta) 단위로 반환 (스트리밍 Messages API)
 
-"{question}"
+        Args:
+            question: 사용자 질문
+            reference_answers: (답변, 유사도) 튜플 리스트 (없으면 폴백 프롬프트)
 
-위 고민에 대해 따뜻하고 공감적인 답변을 작성해주세요.
+        Yields:
+            답변 텍스트 조각 (모두 이어 붙이면 전체 답변, 캐시 적중 / 폴백이면 답변 전체 한 조각)
+        """
+        category = cache_category(reference_answers)
+        cached = self.cache.get(question, category) if self.cache is not None else None
+        if cached is not None:
+            yield cached
+            return
+
+        decision = self.router.route(question, reference_answers)
+        params = message_params(*build_prompt(question, reference_answers), decision.route)
+        started = False
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # 스트림 연결(응답 헤더 수신)까지만 재시도, 조각을 보내기 시작한 뒤의 오류는 그대로 전달
+                stream = self.resilience.call(
+                    lambda timeout: stack.enter_context(self.client.messages.stream(**params, timeout=timeout))
+                )
+                for text in stream.text_stream:
+                    started = True
+                    yield text
+                message = stream.get_final_message()
+                self.last_usage = self.usage.record(message.usage)
+                self.router.record(decision, time.perf_counter() - start)
 
-참고할 수 있는 유사한 고민에 대한 답변들:
-{reference_text}
+        except Exception as e:
+            if not started and self._use_fallback(e):
+                yield fallback_answer(reference_answers)
+                return
+            print(f"[ERROR] Claude API 호출 오류: {e}")
+            raise
 
-위 참고 답변들의 핵심 내용을 활용하되, 사용자의 구체적인 상황에 맞게 새롭게 작성해주세요.
-답변은 자연스러운 한국어로, 300-500자 정도로 작성해주세요."""
+        if self.cache is not None:
+            self.cache.put(question, message.content[0].text.strip(), category)
 
+    def _generate(
+        self,
+        question: str,
+        reference_answers: Optional[List[Tuple[Dict, float]]],
+        prompt: Tuple[List[Dict], List[Dict]]
+    ) -> str:
+        """캐시된 답변이 있으면 사용하고, 없으면 생성하여 캐시에 저장 (API 장애 시 폴백 답변)"""
+        category = cache_category(reference_answers)
+        if self.cache is not None:
+            cached = self.cache.get(question, category)
+            if cached is not None:
+                return cached
         try:
-            # Claude API 호출
-            response = self.client.messages.create(
-                model=CLAUDE_MODEL,
-                max_tokens=MAX_TOKENS,
-                temperature=TEMPERATURE,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
-
-            answer = response.content[0].text
-            return answer.strip()
+            answer = self._create(*prompt, self.router.route(question, reference_answers))
+        except Exception as e:
+            if self._use_fallback(e):
+                return fallback_answer(reference_answers)
+            raise
+        if self.cache is not None:
+            self.cache.put(question, answer, category)
+        return answer
+
+    def _create(self, system: List[Dict], user: List[Dict], decision: RouteDecision) -> str:
+        """라우팅한 모델로 Claude API 호출 (일시 오류는 재시도)"""
+        params = message_params(system, user, decision.route)
+        start = time.perf_counter()
+        try:
+            response = self.resilience.call(lambda timeout: self.client.messages.create(**params, timeout=timeout))
+            self.last_usage = self.usage.record(response.usage)
+            self.router.record(decision, time.perf_counter() - start)
+            return response.content[0].text.strip()
 
         except Exception as e:
             print(f"[ERROR] Claude API 호출 오류: {e}")
             raise
 
-    def _format_references(self, reference_answers: List[Tuple[Dict, float]]) -> str:
-        """참고 답변을 프롬프트용으로 포맷팅"""
-        if not reference_answers:
-            return "참고할 유사한 답변이 없습니다."
+    def _use_fallback(self, error: Exception) -> bool:
+        """폴백 답변으로 대신할지 판단하고 기록"""
+        if not (self.fallback and can_fall_back(error)):
+            return False
+        self.resilience.stats.fallbacks += 1
+        print(f"[WARN] Claude API를 사용할 수 없어 폴백 답변을 반환합니다: {error}")
+        return True
 
-        formatted = []
-        for i, (answer, score) in enumerate(reference_answers, 1):
-            formatted.append(
-                f"\n[참고 {i}] {answer['title']} (카테고리: {answer['category']}, 유사도: {score:.0%})\n"
-                f"{answer['content']}\n"
-            )
 
-        return "\n".join(formatted)
+class AsyncAnswerGenerator:
+    """
+    AsyncAnthropic 기반 비동기 답변 생성 클래스
 
-    def generate_simple_answer(self, question: str) -> str:
+    하나의 클라이언트(HTTP 연결 풀)를 모든 요청이 공유하며, 세마포어로 동시에 진행 중인 API 요청 수를 제한합니다.
+    재시도 / 서킷 브레이커 / 폴백 답변 / 모델 라우팅은 AnswerGenerator와 같습니다 (재시도 대기 중에도 요청 슬롯을 차지).
+    클라이언트와 세마포어는 처음 사용한 이벤트 루프에 묶이므로 한 이벤트 루프에서만 사용해야 합니다
+    (동기 코드에서는 pipeline.EventLoopThread로 실행).
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = CLAUDE_API_KEY,
+        base_url: Optional[str] = CLAUDE_BASE_URL,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        cache: Optional[AnswerCache] = None,
+        resilience: Optional[ResilientCaller] = None,
+        fallback: bool = LLM_FALLBACK,
+        router: Optional[ModelRouter] = None
+    ):
+        """
+        초기화
+
+        Args:
+            api_key: Claude API 키
+            base_url: API 주소 (None이면 Anthropic API)
+            max_concurrency: 동시에 진행할 최대 API 요청 수 (연결 풀 크기도 같게 설정)
+            cache: 답변 캐시 (None이면 항상 새로 생성, 조회/저장은 스레드 풀에서 실행)
+            resilience: 재시도 / 서킷 브레이커 (None이면 설정값)
+            fallback: API 장애 시 폴백 답변 반환 여부 (False면 오류 발생)
+            router: 모델 라우터 (None이면 설정값)
+        """
+        if not api_key:
+            raise ValueError("CLAUDE_API_KEY가 설정되지 않았습니다.")
+
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        self.client = AsyncAnthropic(
+            api_key=api_key, base_url=base_url, max_retries=0, http_client=DefaultAsyncHttpxClient(limits=limits)
+        )
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.resilience = resilience or ResilientCaller()
+        self.fallback = fallback
+        self.router = router or ModelRouter()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0  # 현재 진행 중인 요청 수
+        self.peak_in_flight = 0  # 동시에 진행된 최대 요청 수
+        self.usage = UsageStats()
+        print("[OK] Claude API 비동기 클라이언트 초기화 완료")
+
+    async def generate_answer(
+        self,
+        question: str,
+        reference_answers: List[Tuple[Dict, float]]
+    ) -> str:
+        """
+        질문과 참고 답변을 바탕으로 맞춤형 답변 생성
+
+        Args:
+            question: 사용자 질문
+            reference_answers: (답변, 유사도) 튜플 리스트
+
+        Returns:
+            생성된 답변 텍스트
+        """
+        return await self._generate(question, reference_answers, build_answer_prompt(question, reference_answers))
+
+    async def generate_simple_answer(self, question: str) -> str:
         """
         참고 답변 없이 질문만으로 답변 생성 (폴백용)
 
@@ -116,29 +496,117 @@ class AnswerGenerator:
         Returns:
             생성된 답변
         """
-        system_prompt = """당신은 공감 능력이 뛰어난 전문 고민 상담사입니다.
-사용자의 고민에 진심으로 공감하고, 따뜻하면서도 실질적인 조언을 제공합니다."""
+        return await self._generate(question, None, build_simple_prompt(question))
 
-        user_prompt = f"""다음 고민에 대해 따뜻하고 공감적인 답변을 300-500자로 작성해주세요:
+    async def stream_answer(
+        self,
+        question: str,
+        reference_answers: Optional[List[Tuple[Dict, float]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        답변을 생성되는 대로 조각(text delta) 단위로 반환 (스트리밍 Messages API)
 
-"{question}" """
+        스트림이 끝날 때까지 동시 요청 슬롯 하나를 차지합니다.
 
+        Args:
+            question: 사용자 질문
+            reference_answers: (답변, 유사도) 튜플 리스트 (없으면 폴백 프롬프트)
+
+        Yields:
+            답변 텍스트 조각 (캐시 적중 / 폴백이면 답변 전체 한 조각)
+        """
+        category = cache_category(reference_answers)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, question, category)
+            if cached is not None:
+                yield cached
+                return
+
+        decision = self.router.route(question, reference_answers)
+        params = message_params(*build_prompt(question, reference_answers), decision.route)
+        started = False
         try:
-            response = self.client.messages.create(
-                model=CLAUDE_MODEL,
-                max_tokens=MAX_TOKENS,
-                temperature=TEMPERATURE,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
+            async with self._request_slot(), AsyncExitStack() as stack:
+                start = time.perf_counter()
+                stream = await self.resilience.acall(
+                    lambda timeout: stack.enter_async_context(self.client.messages.stream(**params, timeout=timeout))
+                )
+                async for text in stream.text_stream:
+                    started = True
+                    yield text
+                message = await stream.get_final_message()
+                self.usage.record(message.usage)
+                self.router.record(decision, time.perf_counter() - start)
+        except Exception as e:
+            if not started and self._use_fallback(e):
+                yield fallback_answer(reference_answers)
+                return
+            raise
 
-            return response.content[0].text.strip()
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, question, message.content[0].text.strip(), category)
 
+    async def _generate(
+        self,
+        question: str,
+        reference_answers: Optional[List[Tuple[Dict, float]]],
+        prompt: Tuple[List[Dict], List[Dict]]
+    ) -> str:
+        """캐시된 답변이 있으면 사용하고, 없으면 생성하여 캐시에 저장 (API 장애 시 폴백 답변)"""
+        category = cache_category(reference_answers)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, question, category)
+            if cached is not None:
+                return cached
+        try:
+            answer = await self._create(*prompt, self.router.route(question, reference_answers))
         except Exception as e:
-            print(f"[ERROR] Claude API 호출 오류: {e}")
+            if self._use_fallback(e):
+                return fallback_answer(reference_answers)
             raise
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, question, answer, category)
+        return answer
+
+    async def _create(self, system: List[Dict], user: List[Dict], decision: RouteDecision) -> str:
+        """동시 요청 수 제한 안에서 라우팅한 모델로 Claude API 호출 (일시 오류는 재시도)"""
+        params = message_params(system, user, decision.route)
+        async with self._request_slot():
+            start = time.perf_counter()
+            response = await self.resilience.acall(
+                lambda timeout: self.client.messages.create(**params, timeout=timeout)
+            )
+            self.usage.record(response.usage)
+            self.router.record(decision, time.perf_counter() - start)
+            return response.content[0].text.strip()
+
+    def _use_fallback(self, error: Exception) -> bool:
+        """폴백 답변으로 대신할지 판단하고 기록"""
+        if not (self.fallback and can_fall_back(error)):
+            return False
+        self.resilience.stats.fallbacks += 1
+        print(f"[WARN] Claude API를 사용할 수 없어 폴백 답변을 반환합니다: {error}")
+        return True
+
+    @asynccontextmanager
+    async def _request_slot(self):
+        """세마포어로 동시 요청 수를 제한하고 진행 중인 요청 수를 기록"""
+        async with self._semaphore:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                yield
+
+            except Exception as e:
+                print(f"[ERROR] Claude API 호출 오류: {e}")
+                raise
+
+            finally:
+                self.in_flight -= 1
+
+    async def aclose(self):
+        """HTTP 연결 풀 정리"""
+        await self.client.close()
 
 
 def test_generator():
@@ -0,0 +1,148 @@
+"""
+인덱스 저장소 모듈
+학습된 TF-IDF 인덱스(어휘, idf, 답변 행렬)를 디스크에 저장하고 다시 불러오는 기능
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# 인덱스 포맷 버전 (저장 구조가 바뀌면 올려서 기존 캐시를 무효화)
+INDEX_FORMAT_VERSION = 1
+
+
+def corpus_fingerprint(raw: bytes, params: dict) -> str:
+    """
+    코퍼스 내용과 벡터라이저 설정으로 인덱스 키 생성
+
+    Args:
+        raw: 답변 데이터 파일의 원본 바이트
+        params: 인덱스 결과에 영향을 주는 설정값
+
+    Returns:
+        sha256 16진수 문자열
+    """
+    digest = hashlib.sha256()
+    digest.update(raw)
+    return _finish_fingerprint(digest, params)
+
+
+def file_fingerprint(path: Path, params: dict, chunk_size: int = 1 << 20) -> str:
+    """
+    corpus_fingerprint와 같은 키를 파일 전체를 메모리에 올리지 않고 계산
+
+    Args:
+        path: 답변 데이터 파일 경로
+        params: 인덱스 결과에 영향을 주는 설정값
+        chunk_size: 한 번에 읽을 크기
+
+    Returns:
+        sha256 16진수 문자열
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return _finish_fingerprint(digest, params)
+
+
+def _finish_fingerprint(digest, params: dict) -> str:
+    digest.update(json.dumps(
+        {"version": INDEX_FORMAT_VERSION, **params},
+        sort_keys=True, ensure_ascii=False, default=str
+    ).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TfidfIndexStore:
+    """TF-IDF 인덱스 디스크 저장소"""
+
+    def __init__(self, cache_dir: Path, name: str):
+        """
+        초기화
+
+        Args:
+            cache_dir: 인덱스 파일을 저장할 디렉토리
+            name: 코퍼스 이름 (보통 답변 파일명)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.name = name
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        prefix = f"{self.name}.{key[:16]}"
+        return (
+            self.cache_dir / f"{prefix}.vocab.npz",
+            self.cache_dir / f"{prefix}.matrix.npz"
+        )
+
+    def load(self, key: str, vectorizer: TfidfVectorizer) -> Optional[sparse.csr_matrix]:
+        """
+        키가 일치하는 인덱스가 있으면 벡터라이저에 복원하고 답변 행렬 반환
+
+        Args:
+            key: corpus_fingerprint로 만든 인덱스 키
+            vectorizer: 학습 상태를 복원할 (미학습) 벡터라이저
+
+        Returns:
+            답변 행렬, 인덱스가 없거나 손상된 경우 None
+        """
+        vocab_path, matrix_path = self._paths(key)
+        if not vocab_path.exists() or not matrix_path.exists():
+            return None
+
+        try:
+            with np.load(vocab_path, allow_pickle=False) as meta:
+                if str(meta['key']) != key:
+                    return None
+                terms = meta['terms']
+                idf = meta['idf']
+            matrix = sparse.load_npz(matrix_path).tocsr()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] 인덱스 파일을 읽을 수 없어 다시 생성합니다: {e}")
+            return None
+
+        vectorizer.vocabulary_ = {term: i for i, term in enumerate(terms.tolist())}
+        vectorizer.idf_ = idf
+        return matrix
+
+    def save(self, key: str, vectorizer: TfidfVectorizer, matrix: sparse.spmatrix):
+        """
+        학습된 벡터라이저와 답변 행렬 저장 (임시 파일에 쓴 뒤 교체)
+
+        Args:
+            key: corpus_fingerprint로 만든 인덱스 키
+            vectorizer: 학습된 벡터라이저
+            matrix: 답변 행렬
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        vocab_path, matrix_path = self._paths(key)
+
+        terms = vectorizer.get_feature_names_out().astype(str)
+        tmp_vocab = vocab_path.with_name(vocab_path.name + ".tmp")
+        tmp_matrix = matrix_path.with_name(matrix_path.name + ".tmp")
+
+        with open(tmp_vocab, 'wb') as f:
+            np.savez(f, key=np.array(key), terms=terms, idf=vectorizer.idf_)
+        with open(tmp_matrix, 'wb') as f:
+            sparse.save_npz(f, sparse.csr_matrix(matrix), compressed=False)
+
+        # 행렬을 먼저 교체하고 어휘 파일을 마지막에 교체 (어휘 파일이 커밋 역할)
+        os.replace(tmp_matrix, matrix_path)
+        os.replace(tmp_vocab, vocab_path)
+
+        self._prune(keep=key)
+
+    def _prune(self, keep: str):
+        """같은 코퍼스의 이전 버전 인덱스 삭제"""
+        for path in self.cache_dir.glob(f"{self.name}.*.npz"):
+            if not path.name.startswith(f"{self.name}.{keep[:16]}."):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
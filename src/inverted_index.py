@@ -0,0 +1,147 @@
+"""
+역색인 검색 모듈
+n-gram별 포스팅 리스트와 MaxScore 방식의 조기 종료로 질문과 n-gram을 공유하는 답변만 채점
+"""
+
+from typing import Tuple
+
+import numpy as np
+from scipy import sparse
+
+from config import SIMILARITY_THRESHOLD
+from ranking import select_top_k
+
+# 부동소수점 합산 순서 차이로 경계값 답변이 잘못 제외되지 않도록 두는 여유값
+_EPSILON = 1e-9
+
+
+class InvertedIndex:
+    """n-gram 역색인 (MaxScore 상위 k개 검색)"""
+
+    def __init__(self, answer_vectors: sparse.csr_matrix, term_vectors: sparse.csr_matrix = None):
+        """
+        초기화
+
+        Args:
+            answer_vectors: 답변 x n-gram TF-IDF 행렬 (CSR)
+            term_vectors: n-gram x 답변 행렬 (CSR, 각 행이 하나의 포스팅 리스트), 없으면 전치하여 생성
+        """
+        self.documents = sparse.csr_matrix(answer_vectors)
+        self.postings = sparse.csr_matrix(
+            term_vectors if term_vectors is not None else self.documents.T
+        )
+        self.postings.sort_indices()
+
+        # n-gram별 최대 가중치(점수 상한 계산용)와 그 가중치를 가진 답변
+        indptr = self.postings.indptr
+        lengths = np.diff(indptr)
+        self.max_weights = np.zeros(self.postings.shape[0], dtype=np.float64)
+        self.max_documents = np.zeros(self.postings.shape[0], dtype=np.intp)
+        nonempty = lengths > 0
+        if nonempty.any():
+            self.max_weights[nonempty] = np.maximum.reduceat(
+                self.postings.data, indptr[:-1][nonempty]
+            )
+            owner = np.repeat(np.arange(lengths.size), lengths)
+            is_max = self.postings.data == self.max_weights[owner]
+            # 최대 가중치를 가진 답변이 여럿이면 그중 아무것이나 남음
+            self.max_documents[owner[is_max]] = self.postings.indices[is_max]
+
+    def _posting(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.postings.indptr[term], self.postings.indptr[term + 1]
+        return self.postings.indices[start:end], self.postings.data[start:end]
+
+    def search(
+        self,
+        query: sparse.csr_matrix,
+        top_k: int,
+        threshold: float = SIMILARITY_THRESHOLD
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질문 벡터와 유사도가 임계값 이상인 상위 k개 답변 검색
+
+        먼저 질문 n-gram별 최대 가중치 답변 몇 개를 정확히 채점해 k번째 점수를 하한(theta)으로 잡습니다.
+        n-gram을 점수 상한(질문 가중치 x 최대 가중치) 순으로 정렬한 뒤,
+        상한 합이 theta에 못 미치는 n-gram(비필수)만 가진 답변은 후보에서 제외합니다.
+        필수 n-gram의 포스팅 리스트로 후보를 만든 다음 비필수 n-gram을 상한이 큰 순서로
+        더해가며, 남은 상한을 더해도 현재 k번째 점수에 못 미치는 후보를 버립니다.
+
+        Args:
+            query: 벡터화된 질문 (1 x n-gram, L2 정규화)
+            top_k: 반환할 개수
+            threshold: 최소 유사도
+
+        Returns:
+            (답변 인덱스, 유사도) 배열 튜플, 유사도 내림차순(동점이면 인덱스 오름차순)
+        """
+        empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64))
+        query = sparse.csr_matrix(query)
+        if top_k <= 0 or query.nnz == 0:
+            return empty
+
+        if threshold <= 0:
+            # 점수 0인 답변도 결과에 포함될 수 있으므로 전체 채점
+            scores = (query @ self.postings).toarray()[0]
+            return _top_k(np.arange(scores.size), scores, top_k, threshold)
+
+        terms = query.indices
+        weights = query.data
+        upper = weights * self.max_weights[terms]
+
+        # 시드 답변을 정확히 채점하여 초기 하한 설정
+        theta = threshold
+        seeds = np.unique(self.max_documents[terms[upper > 0]])
+        if seeds.size >= top_k:
+            seed_scores = (self.documents[seeds] @ query.T).toarray().ravel()
+            theta = max(theta, np.partition(seed_scores, -top_k)[-top_k])
+
+        # 상한 오름차순 정렬 후, 상한 누적합이 theta 미만인 앞부분이 비필수 n-gram
+        order = np.argsort(upper, kind='stable')
+        terms, weights, upper = terms[order], weights[order], upper[order]
+        prefix = np.cumsum(upper)
+        n_optional = int(np.searchsorted(prefix, theta - _EPSILON, side='left'))
+        if n_optional == len(terms):
+            return empty
+
+        # 필수 n-gram 포스팅 리스트로 후보 생성 및 부분 점수 누적
+        essential = sparse.csr_matrix(
+            (weights[n_optional:], terms[n_optional:], [0, len(terms) - n_optional]),
+            shape=query.shape
+        )
+        partial = essential @ self.postings
+        candidates, scores = partial.indices, partial.data
+
+        # 비필수 n-gram을 상한이 큰 순서로 더하면서 가망 없는 후보 제거
+        for j in range(n_optional - 1, -1, -1):
+            if scores.size >= top_k:
+                theta = max(theta, np.partition(scores, -top_k)[-top_k])
+            keep = scores + prefix[j] >= theta - _EPSILON
+            if not keep.all():
+                candidates, scores = candidates[keep], scores[keep]
+                if candidates.size == 0:
+                    return empty
+
+            if candidates.size * (j + 1) > self.postings.shape[1]:
+                # 후보가 많이 남았으면 남은 n-gram(0..j)을 한 번의 희소 곱으로 채점하는 편이 빠름
+                rest = sparse.csr_matrix(
+                    (weights[:j + 1], terms[:j + 1], [0, j + 1]), shape=query.shape
+                )
+                scores = scores + (rest @ self.postings).toarray()[0][candidates]
+                break
+
+            idx, data = self._posting(terms[j])
+            if idx.size == 0:
+                continue
+            pos = np.searchsorted(idx, candidates)
+            pos[pos == idx.size] = 0
+            hit = idx[pos] == candidates
+            scores[hit] += weights[j] * data[pos[hit]]
+
+        order = np.argsort(candidates)
+        return _top_k(candidates[order], scores[order], top_k, threshold)
+
+
+def _top_k(candidates: np.ndarray, scores: np.ndarray, top_k: int, threshold: float):
+    """후보 중 임계값 이상 상위 k개 선택 (후보는 인덱스 오름차순이어야 함)"""
+    top = select_top_k(scores, top_k, threshold)
+    return candidates[top], scores[top]
@@ -6,7 +6,7 @@ import sys
 import re
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # colorama로 콘솔 색상 지원
 try:
@@ -22,8 +22,13 @@ except ImportError:
 
 from config import validate_config, OUTPUT_DIR
 from matcher import AnswerMatcher
+from answer_cache import load_answer_cache
+from audio_cache import load_audio_cache
 from generator import AnswerGenerator
+from routing import ModelRouter
+from template_answer import template_answer
 from tts import TextToSpeech
+from tts_jobs import TTSJobQueue
 
 
 def remove_emojis(text: str) -> str:
@@ -63,8 +68,12 @@ class CounselingSystem:
             # 각 모듈 초기화
             print(f"{Fore.YELLOW}시스템 초기화 중...\n")
             self.matcher = AnswerMatcher()
-            self.generator = AnswerGenerator()
-            self.tts = TextToSpeech()
+            self.generator = AnswerGenerator(cache=load_answer_cache(self.matcher),
+                                             router=ModelRouter(fast_threshold=self.matcher.fast_threshold))
+            self.tts = TextToSpeech(cache=load_audio_cache())
+            self.tts_jobs = TTSJobQueue(self.tts)
+            self.audio_jobs: List[str] = []  # 결과를 아직 알리지 않은 음성 변환 작업 ID
+            self.last_template = False  # 마지막 답변이 템플릿 답변이었는지 여부
 
             print(f"\n{Fore.GREEN}[OK] 시스템 초기화 완료!\n")
 
@@ -72,13 +81,14 @@ class CounselingSystem:
             print(f"{Fore.RED}[ERROR] 초기화 오류: {e}")
             sys.exit(1)
 
-    def process_question(self, question: str, enable_tts: bool = True) -> Optional[str]:
+    def process_question(self, question: str, enable_tts: bool = True, allow_template: bool = True) -> Optional[str]:
         """
         질문을 처리하여 답변 생성
 
         Args:
             question: 사용자 질문
             enable_tts: TTS 활성화 여부
+            allow_template: 준비된 답변과 거의 같은 질문이면 AI 생성 없이 템플릿 답변 사용
 
         Returns:
             생성된 답변 텍스트
@@ -99,22 +109,38 @@ class CounselingSystem:
             else:
                 print(f"{Fore.YELLOW}! 유사한 답변을 찾지 못했습니다. 일반 답변을 생성합니다.")
 
-            # 2. Claude API로 답변 생성
-            print(f"\n{Fore.YELLOW}[2/4] AI 답변 생성 중...")
-            if matches:
-                answer_text = self.generator.generate_answer(question, matches)
+            # 2. 준비된 답변과 거의 같으면 템플릿 답변, 아니면 Claude API로 답변 생성 (3. 생성되는 대로 출력, 이모지 제거)
+            answer_text = template_answer(
+                question, matches, self.matcher.template_threshold, self.generator.router
+            ) if allow_template else None
+            self.last_template = answer_text is not None
+            if self.last_template:
+                print(f"\n{Fore.YELLOW}[2/4] 준비된 답변과 거의 같은 고민입니다. 템플릿 답변을 사용합니다.")
             else:
-                answer_text = self.generator.generate_simple_answer(question)
-
-            print(f"{Fore.GREEN}[OK] 답변 생성 완료")
-
-            # 3. 답변 출력 (이모지 제거)
-            clean_answer = remove_emojis(answer_text)
+                print(f"\n{Fore.YELLOW}[2/4] AI 답변 생성 중...")
             print(f"\n{Fore.CYAN}{'='*60}")
             print(f"{Fore.CYAN}생성된 답변")
             print(f"{Fore.CYAN}{'='*60}\n")
-            print(f"{Fore.WHITE}{clean_answer}\n")
-            print(f"{Fore.CYAN}{'='*60}\n")
+            print(Fore.WHITE, end='')
+            speech = None
+            if self.last_template:
+                print(remove_emojis(answer_text), end='')
+            else:
+                # 음성 변환은 문장이 끝나는 대로 답변 생성과 동시에 시작
+                speech = self.tts.open_stream() if enable_tts else None
+                parts = []
+                for delta in self.generator.stream_answer(question, matches):
+                    parts.append(delta)
+                    if speech is not None:
+                        speech.feed(delta)
+                    print(remove_emojis(delta), end='', flush=True)
+                answer_text = "".join(parts).strip()
+            print(f"\n\n{Fore.CYAN}{'='*60}\n")
+
+            if self.last_template:
+                print(f"{Fore.GREEN}[OK] 템플릿 답변 완료 (API 호출 없음)")
+            else:
+                print(f"{Fore.GREEN}[OK] 답변 생성 완료 (토큰: {self.generator.usage.summary()})")
 
             # 4. 답변 저장
             print(f"{Fore.YELLOW}[3/4] 답변 저장 중...")
@@ -128,11 +154,12 @@ class CounselingSystem:
 
             print(f"{Fore.GREEN}[OK] 텍스트 파일 저장: {text_path}")
 
-            # 5. TTS 변환 (선택적)
+            # 5. TTS 변환 (선택적, 백그라운드 작업으로 넘기고 답변은 바로 반환)
             if enable_tts:
-                print(f"\n{Fore.YELLOW}[4/4] 음성 변환 중...")
-                audio_path = self.tts.generate_answer_audio(answer_text, f"answer_{timestamp}")
-                print(f"{Fore.GREEN}[OK] 음성 파일 저장: {audio_path}")
+                audio_path = OUTPUT_DIR / f"answer_{timestamp}.{self.tts.engine.format}"
+                job_id = self.tts_jobs.submit(answer_text, audio_path, speech=speech)
+                self.audio_jobs.append(job_id)
+                print(f"\n{Fore.YELLOW}[4/4] 음성 변환을 백그라운드에서 진행합니다 (작업 {job_id})")
             else:
                 print(f"\n{Fore.YELLOW}[4/4] 음성 변환 건너뛰기 (TTS 비활성화)")
 
@@ -149,6 +176,51 @@ class CounselingSystem:
             traceback.print_exc()
             return None
 
+    def report_audio_jobs(self, wait: bool = False):
+        """
+        끝난 음성 변환 작업 결과 출력
+
+        Args:
+            wait: True면 남은 작업이 모두 끝날 때까지 기다림
+        """
+        for job_id in list(self.audio_jobs):
+            job = self.tts_jobs.get(job_id)
+            if not (job.done or wait):
+                continue
+            self.audio_jobs.remove(job_id)
+            try:
+                job = self.tts_jobs.wait(job_id)
+                print(f"{Fore.GREEN}[OK] 음성 파일 저장: {job.path} ({job.latency:.1f}초)")
+            except Exception as e:
+                print(f"{Fore.RED}[ERROR] 음성 변환 실패 (작업 {job_id}): {e}")
+
+    def close(self):
+        """남은 음성 변환 작업을 기다린 뒤 정리"""
+        if self.audio_jobs:
+            print(f"{Fore.YELLOW}남은 음성 변환 작업 {len(self.audio_jobs)}개를 기다립니다...")
+        self.report_audio_jobs(wait=True)
+        self.tts_jobs.close()
+        self.tts.close()
+        if self.tts_jobs.stats.submitted:
+            print(f"{Fore.CYAN}음성 변환 작업: {self.tts_jobs.stats.summary()}")
+
+    def offer_detailed_answer(self, question: str, enable_tts: bool = True):
+        """
+        마지막 답변이 템플릿 답변이었으면 AI의 자세한 답변을 원하는지 묻고 생성
+
+        Args:
+            question: 사용자 질문
+            enable_tts: TTS 활성화 여부
+        """
+        if not self.last_template:
+            return
+        if not sys.stdin.isatty():
+            print(f"{Fore.YELLOW}AI의 자세한 답변을 받으려면 --no-template 옵션을 붙여 다시 실행하세요.")
+            return
+        print(f"\n{Fore.MAGENTA}AI에게 더 자세한 답변을 받을까요? (y/n, 기본: n)")
+        if input(f"{Fore.WHITE}> ").strip().lower() == 'y':
+            self.process_question(question, enable_tts, allow_template=False)
+
     def interactive_mode(self):
         """대화형 모드"""
         print(f"{Fore.CYAN}대화형 모드를 시작합니다.")
@@ -156,6 +228,9 @@ class CounselingSystem:
 
         while True:
             try:
+                # 그 사이 끝난 음성 변환 작업 알림
+                self.report_audio_jobs()
+
                 # 질문 입력
                 print(f"{Fore.MAGENTA}고민을 입력해주세요:")
                 question = input(f"{Fore.WHITE}> ").strip()
@@ -175,8 +250,9 @@ class CounselingSystem:
                 tts_input = input(f"{Fore.WHITE}> ").strip().lower()
                 enable_tts = tts_input != 'n'
 
-                # 질문 처리
+                # 질문 처리 (템플릿 답변이었으면 AI의 자세한 답변을 원하는지 확인)
                 self.process_question(question, enable_tts)
+                self.offer_detailed_answer(question, enable_tts)
 
                 # 계속 여부 확인
                 print(f"\n{Fore.MAGENTA}다른 고민이 있으신가요? (계속하려면 Enter)")
@@ -194,14 +270,19 @@ def main():
     # 시스템 초기화
     system = CounselingSystem()
 
-    # 명령행 인자 확인
-    if len(sys.argv) > 1:
-        # 질문이 인자로 제공된 경우
-        question = ' '.join(sys.argv[1:])
-        system.process_question(question)
+    # 명령행 인자 확인 (--no-template: 템플릿 답변 없이 바로 AI 답변)
+    args = sys.argv[1:]
+    allow_template = '--no-template' not in args
+    args = [arg for arg in args if arg != '--no-template']
+    if args:
+        # 질문이 인자로 제공된 경우 (템플릿 답변이었으면 자세한 답변을 원하는지 확인)
+        question = ' '.join(args)
+        system.process_question(question, allow_template=allow_template)
+        system.offer_detailed_answer(question)
     else:
         # 대화형 모드
         system.interactive_mode()
+    system.close()
 
 
 if __name__ == "__main__":
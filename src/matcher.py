@@ -3,41 +3,277 @@
 질문과 가장 유사한 답변을 데이터베이스에서 찾는 기능
 """
 
+import hashlib
 import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Sequence, Iterable, Union
+
+import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
-from config import SAMPLE_ANSWERS_PATH, SIMILARITY_THRESHOLD, TOP_K_MATCHES
+from config import (
+    SAMPLE_ANSWERS_PATH, TOP_K_MATCHES,
+    INDEX_CACHE_DIR, INDEX_CACHE_ENABLED, RETRIEVAL_MODE, INDEX_COMPACTION_RATIO,
+    STREAMING_CORPUS, CORPUS_STORE_DIR,
+    RETRIEVER, DENSE_INDEX, EMBEDDING_DTYPE, EMBEDDING_CACHE_DIR, CATEGORY_ROUTING,
+    ROUTING_FAST_THRESHOLD, DENSE_ROUTING_FAST_THRESHOLD, TEMPLATE_ANSWER_THRESHOLD, DENSE_TEMPLATE_ANSWER_THRESHOLD
+)
+from category import CategoryClassifier
+from corpus import AnswerRecord, AnswerStore, StoredAnswers, answer_text, iter_answers, write_answers
+from embeddings import Encoder, EmbeddingStore, embedding_key, encode_in_batches, load_encoder
+from index_store import TfidfIndexStore, corpus_fingerprint, file_fingerprint
+from inverted_index import InvertedIndex
+from rerank import Reranker, load_reranker
+from retrievers import DenseRetriever, HybridRetriever, Retriever, SearchTimings, TfidfRetriever
+from vector_index import make_vector_index
+
+# 벡터라이저 설정 (변경 시 인덱스 캐시 키도 함께 바뀜)
+VECTORIZER_PARAMS = {
+    'analyzer': 'char',  # 한국어는 문자 단위가 효과적
+    'ngram_range': (2, 3)  # 2-3글자 조합
+}
+
+# 검색기별 점수 척도에서의 빠른 모델 / 템플릿 답변 최소 유사도
+# (hybrid 점수는 RRF 순위 / 재순위화 점수라 1위가 늘 1.0 근처이므로 유사도 임계값과 비교하지 않음: None = 끔)
+FAST_THRESHOLDS = {"tfidf": ROUTING_FAST_THRESHOLD, "dense": DENSE_ROUTING_FAST_THRESHOLD, "hybrid": None}
+TEMPLATE_THRESHOLDS = {"tfidf": TEMPLATE_ANSWER_THRESHOLD, "dense": DENSE_TEMPLATE_ANSWER_THRESHOLD, "hybrid": None}
+
+
+def _extend_answers(answers: Sequence[Dict], new_answers: List[Dict]) -> Sequence[Dict]:
+    """답변 목록 뒤에 새 답변을 덧붙인 새 목록"""
+    if isinstance(answers, StoredAnswers):
+        return answers.extend(new_answers)
+    return list(answers) + [AnswerRecord.from_dict(a) for a in new_answers]
+
+
+def _select_answers(answers: Sequence[Dict], indices: List[int]) -> Sequence[Dict]:
+    """지정한 인덱스의 답변만 남긴 새 목록"""
+    if isinstance(answers, StoredAnswers):
+        return answers.select(indices)
+    return [answers[i] for i in indices]
+
+
+@lru_cache(maxsize=4)
+def _vectorizer_space(vectorizer: TfidfVectorizer) -> str:
+    """학습된 어휘/idf로 정해지는 TF-IDF 벡터 공간 이름 (같은 코퍼스로 학습한 워커끼리 같음)"""
+    digest = hashlib.sha256(vectorizer.idf_.tobytes())
+    digest.update(str(len(vectorizer.vocabulary_)).encode('ascii'))
+    return f"tfidf:{digest.hexdigest()[:16]}"
+
+
+@dataclass(frozen=True)
+class CategoryPartition:
+    """카테고리 부분 인덱스 (해당 카테고리 답변만 담은 검색기)"""
+    rows: np.ndarray  # 전체 답변 목록에서의 위치 (오름차순)
+    answers: Sequence[Dict]
+    lexical: TfidfRetriever
+    dense: Optional[DenseRetriever] = None
+
+
+@dataclass(frozen=True)
+class MatcherIndex:
+    """
+    검색에 필요한 상태의 불변 스냅샷
+
+    갱신은 새 스냅샷을 만들어 참조 하나만 교체하므로, 검색 중인 요청은
+    시작할 때 잡은 스냅샷을 끝까지 일관되게 사용합니다.
+    """
+    answers: Sequence[Dict]  # list 또는 StoredAnswers (스트리밍 모드)
+    vectorizer: TfidfVectorizer
+    answer_vectors: sparse.csr_matrix
+    term_vectors: sparse.csr_matrix
+    lexical: TfidfRetriever
+    inverted_index: Optional[InvertedIndex] = None
+    dense: Optional[DenseRetriever] = None  # 임베딩 검색을 쓰는 경우에만 생성
+    classifier: Optional[CategoryClassifier] = None  # 카테고리 라우팅을 쓰는 경우에만 생성
+    version: int = 0
+    stale_updates: int = 0  # 마지막 학습 이후 추가/삭제된 답변 수 (idf에 반영되지 않은 변경)
+    # 카테고리별 답변 위치와 부분 인덱스 (처음 필요할 때 만들어 이 스냅샷에서만 재사용)
+    _partitions: Dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def category_rows(self) -> Dict[str, np.ndarray]:
+        """카테고리별 답변 위치 (카테고리는 처음 등장한 순서)"""
+        rows = self._partitions.get(None)
+        if rows is None:
+            positions: Dict[str, List[int]] = {}
+            for i, answer in enumerate(self.answers):
+                positions.setdefault(answer.get('category'), []).append(i)
+            rows = {c: np.asarray(p, dtype=np.intp) for c, p in positions.items()}
+            self._partitions[None] = rows
+        return rows
+
+    def partition(self, categories: Tuple[str, ...]) -> CategoryPartition:
+        """
+        카테고리 부분 인덱스 (여러 카테고리면 합친 하나의 파티션)
+
+        Args:
+            categories: 카테고리 튜플
+
+        Returns:
+            파티션 (없는 카테고리는 무시, 모두 없으면 답변이 없는 파티션)
+        """
+        key = tuple(sorted(set(categories)))
+        partition = self._partitions.get(key)
+        if partition is None:
+            category_rows = self.category_rows()
+            parts = [category_rows[c] for c in key if c in category_rows]
+            rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+            partition = CategoryPartition(
+                rows=rows,
+                answers=_select_answers(self.answers, rows.tolist()),
+                lexical=self.lexical.subset(rows),
+                dense=self.dense.subset(rows) if self.dense is not None else None
+            )
+            self._partitions[key] = partition
+        return partition
 
 
 class AnswerMatcher:
     """답변 매칭 클래스"""
 
-    def __init__(self, answers_path: Path = SAMPLE_ANSWERS_PATH):
+    def __init__(
+        self,
+        answers_path: Path = SAMPLE_ANSWERS_PATH,
+        index_cache_dir: Optional[Path] = INDEX_CACHE_DIR if INDEX_CACHE_ENABLED else None,
+        retrieval_mode: str = RETRIEVAL_MODE,
+        auto_compact: bool = True,
+        streaming: bool = STREAMING_CORPUS,
+        store_dir: Path = CORPUS_STORE_DIR,
+        retriever: str = RETRIEVER,
+        encoder: Optional[Encoder] = None,
+        embedding_cache_dir: Optional[Path] = EMBEDDING_CACHE_DIR if INDEX_CACHE_ENABLED else None,
+        dense_index: str = DENSE_INDEX,
+        embedding_dtype: str = EMBEDDING_DTYPE,
+        reranker: Optional[Reranker] = None,
+        category_routing: bool = CATEGORY_ROUTING
+    ):
         """
         초기화
 
         Args:
             answers_path: 답변 데이터베이스 JSON 파일 경로
+            index_cache_dir: 학습된 인덱스를 저장할 디렉토리 (None이면 매번 새로 학습)
+            retrieval_mode: "brute" (전체 답변 채점) 또는 "inverted" (역색인 후보만 채점)
+            auto_compact: 변경이 쌓이면 백그라운드에서 벡터라이저를 다시 학습할지 여부
+            streaming: 답변 파일을 한 건씩 읽어 본문은 디스크 저장소에 두고 필요한 답변만 읽을지 여부
+            store_dir: 스트리밍 모드의 답변 저장소 디렉토리
+            retriever: "tfidf" (문자 n-gram), "dense" (문장 임베딩) 또는 "hybrid" (둘을 RRF로 합친 뒤 재순위화)
+            encoder: 임베딩 모델 (None이면 config 설정으로 로드, dense 검색기에서만 사용)
+            embedding_cache_dir: 답변 임베딩을 저장할 디렉토리 (None이면 매번 새로 계산)
+            dense_index: 임베딩 벡터 인덱스 ("brute" 또는 "hnsw")
+            embedding_dtype: 답변 임베딩 저장 형식 ("float16" 또는 "float32")
+            reranker: 하이브리드 검색의 재순위화 모델 (None이면 config 설정으로 로드, RERANKER=none이면 사용 안 함)
+            category_routing: 카테고리를 지정하지 않은 질문을 분류기로 1~2개 카테고리에 먼저 보낼지 여부
         """
-        self.answers_path = answers_path
-        self.answers = []
-        self.vectorizer = TfidfVectorizer(
-            analyzer='char',  # 한국어는 문자 단위가 효과적
-            ngram_range=(2, 3)  # 2-3글자 조합
+        if retrieval_mode not in ("brute", "inverted"):
+            raise ValueError(f"지원하지 않는 검색 방식입니다: {retrieval_mode}")
+        if retriever not in ("tfidf", "dense", "hybrid"):
+            raise ValueError(f"지원하지 않는 검색기입니다: {retriever}")
+
+        self.answers_path = Path(answers_path)
+        self.retrieval_mode = retrieval_mode
+        self.auto_compact = auto_compact
+        self.streaming = streaming
+        self.store_dir = Path(store_dir)
+        self.retriever = retriever
+        self.encoder = encoder
+        self.dense_index = dense_index
+        self.embedding_dtype = embedding_dtype
+        self.reranker = reranker
+        self.category_routing = category_routing
+        # 하이브리드 검색에서 임베딩 검색기를 TF-IDF와 병렬로 돌릴 스레드 풀
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.embedding_store = (
+            EmbeddingStore(embedding_cache_dir, self.answers_path.stem)
+            if embedding_cache_dir else None
+        )
+        self.index_key = None
+        self.index_store = (
+            TfidfIndexStore(index_cache_dir, self.answers_path.stem)
+            if index_cache_dir else None
         )
-        self.load_answers()
-        self.prepare_vectorizer()
+        self._index: Optional[MatcherIndex] = None
+        self._write_lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self.prepare_vectorizer(self.load_answers())
+        if self.retriever in ("dense", "hybrid"):
+            self.prepare_embeddings()
+        if self.retriever == "hybrid":
+            if self.reranker is None:
+                self.reranker = load_reranker()
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="matcher-retrieval")
+
+    @property
+    def fast_threshold(self) -> Optional[float]:
+        """이 검색기 점수로 빠른 모델을 쓸 최소 유사도 (None: 점수가 유사도가 아니라 쓰지 않음)"""
+        return FAST_THRESHOLDS[self.retriever]
+
+    @property
+    def template_threshold(self) -> Optional[float]:
+        """이 검색기 점수로 템플릿 답변을 쓸 최소 유사도 (None / 0: 쓰지 않음)"""
+        return TEMPLATE_THRESHOLDS[self.retriever]
+
+    # 현재 스냅샷의 상태를 그대로 노출 (기존 호출 코드 호환)
+    @property
+    def answers(self) -> Sequence[Dict]:
+        return self._index.answers
+
+    @property
+    def vectorizer(self) -> TfidfVectorizer:
+        return self._index.vectorizer
+
+    @property
+    def answer_vectors(self) -> sparse.csr_matrix:
+        return self._index.answer_vectors
+
+    @property
+    def term_vectors(self) -> sparse.csr_matrix:
+        return self._index.term_vectors
+
+    @property
+    def inverted_index(self) -> Optional[InvertedIndex]:
+        return self._index.inverted_index
+
+    def load_answers(self) -> Sequence[Dict]:
+        """
+        답변 데이터베이스 로드 (.json 또는 .jsonl)
+
+        답변은 dict처럼 쓸 수 있는 AnswerRecord(__slots__)로 변환합니다.
+        스트리밍 모드에서는 파일을 한 건씩 읽어 답변 저장소에 옮겨 두고(같은 내용이면 재사용),
+        저장소를 가리키는 StoredAnswers를 반환합니다 (본문은 접근할 때 읽음).
 
-    def load_answers(self):
-        """답변 데이터베이스 로드"""
+        Returns:
+            답변 리스트
+        """
         try:
-            with open(self.answers_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.answers = data.get('answers', [])
-            print(f"[OK] {len(self.answers)}개의 답변을 로드했습니다.")
+            if self.streaming:
+                self.index_key = file_fingerprint(self.answers_path, VECTORIZER_PARAMS)
+                name = self.answers_path.stem
+                store = AnswerStore.open(self.store_dir, name, self.index_key)
+                if store is None:
+                    store = AnswerStore.build(
+                        self.store_dir, name, self.index_key, iter_answers(self.answers_path)
+                    )
+                answers = StoredAnswers(store)
+            elif self.answers_path.suffix == ".jsonl":
+                self.index_key = file_fingerprint(self.answers_path, VECTORIZER_PARAMS)
+                answers = [AnswerRecord.from_dict(a) for a in iter_answers(self.answers_path)]
+            else:
+                with open(self.answers_path, 'rb') as f:
+                    raw = f.read()
+                data = json.loads(raw.decode('utf-8'))
+                answers = [AnswerRecord.from_dict(a) for a in data.get('answers', [])]
+                self.index_key = corpus_fingerprint(raw, VECTORIZER_PARAMS)
+            print(f"[OK] {len(answers)}개의 답변을 로드했습니다.")
+            return answers
         except FileNotFoundError:
             print(f"[ERROR] 답변 파일을 찾을 수 없습니다: {self.answers_path}")
             raise
@@ -45,51 +281,433 @@ class AnswerMatcher:
             print(f"[ERROR] JSON 파싱 오류: {self.answers_path}")
             raise
 
-    def prepare_vectorizer(self):
-        """답변 데이터로 벡터라이저 학습"""
-        # 모든 답변의 키워드, 제목, 내용을 결합
-        corpus = []
-        for answer in self.answers:
-            text = ' '.join([
-                ' '.join(answer.get('keywords', [])),
-                answer.get('title', ''),
-                answer.get('content', '')
-            ])
-            corpus.append(text)
-
-        # 벡터라이저 학습
-        self.answer_vectors = self.vectorizer.fit_transform(corpus)
+    def prepare_vectorizer(self, answers: Sequence[Dict]):
+        """
+        답변 데이터로 벡터라이저 학습 (코퍼스가 바뀌지 않았으면 저장된 인덱스 사용)
+
+        Args:
+            answers: 답변 리스트
+        """
+        if self.index_store is not None:
+            vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+            matrix = self.index_store.load(self.index_key, vectorizer)
+            if matrix is not None and matrix.shape[0] == len(answers):
+                self._index = self._make_index(
+                    answers, vectorizer, matrix, classifier=self._train_classifier(answers)
+                )
+                print(f"[OK] 저장된 인덱스를 불러왔습니다 ({self.index_key[:12]})")
+                return
+
+        # 모든 답변의 키워드, 제목, 내용을 결합하여 벡터라이저 학습 (한 건씩 공급)
+        vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+        answer_vectors = vectorizer.fit_transform(answer_text(a) for a in answers)
+        self._index = self._make_index(
+            answers, vectorizer, answer_vectors, classifier=self._train_classifier(answers)
+        )
         print(f"[OK] 벡터라이저 학습 완료")
 
-    def find_best_matches(self, question: str, top_k: int = TOP_K_MATCHES) -> List[Tuple[Dict, float]]:
+        if self.index_store is not None:
+            try:
+                self.index_store.save(self.index_key, vectorizer, answer_vectors)
+            except OSError as e:
+                print(f"[WARN] 인덱스 저장 실패: {e}")
+
+    def _train_classifier(self, answers: Sequence[Dict]) -> Optional[CategoryClassifier]:
+        """카테고리 라우팅용 분류기 학습 (라우팅을 쓰지 않으면 None)"""
+        if not self.category_routing:
+            return None
+        return CategoryClassifier(answers)
+
+    def prepare_embeddings(self):
+        """
+        답변 임베딩을 계산하여 임베딩 검색기 생성 (같은 코퍼스/모델이면 저장된 임베딩을 메모리 매핑으로 사용)
+
+        임베딩은 배치 단위로 계산하여 디스크 파일에 바로 기록하므로 전체 임베딩을 한 번에 메모리에 올리지 않습니다.
+        """
+        if self.encoder is None:
+            self.encoder = load_encoder()
+
+        answers = self.answers
+        texts = (answer_text(a) for a in answers)
+        batches = encode_in_batches(self.encoder, texts)
+        shape = (len(answers), self.encoder.dimension)
+
+        if self.embedding_store is not None:
+            key = embedding_key(self.index_key, self.encoder, self.embedding_dtype)
+            embeddings = self.embedding_store.load(key)
+            if embeddings is not None and embeddings.shape == shape:
+                print(f"[OK] 저장된 답변 임베딩을 불러왔습니다 ({key[:12]})")
+            else:
+                embeddings = self.embedding_store.build(
+                    key, batches, shape[0], shape[1], self.embedding_dtype
+                )
+                print(f"[OK] 답변 임베딩 계산 완료 ({self.encoder.name})")
+        else:
+            embeddings = np.zeros(shape, dtype=self.embedding_dtype)
+            position = 0
+            for batch in batches:
+                embeddings[position:position + len(batch)] = batch
+                position += len(batch)
+            print(f"[OK] 답변 임베딩 계산 완료 ({self.encoder.name})")
+
+        dense = DenseRetriever(self.encoder, make_vector_index(embeddings, self.dense_index))
+        with self._write_lock:
+            if self._index.answers is answers:
+                self._index = replace(self._index, dense=dense)
+            else:
+                raise RuntimeError("임베딩 계산 중 답변이 변경되었습니다.")
+
+    def _make_index(
+        self,
+        answers: Sequence[Dict],
+        vectorizer: TfidfVectorizer,
+        answer_vectors: sparse.spmatrix,
+        version: int = 0,
+        stale_updates: int = 0,
+        dense: Optional[DenseRetriever] = None,
+        classifier: Optional[CategoryClassifier] = None
+    ) -> MatcherIndex:
+        """
+        검색용 스냅샷 생성
+
+        검색에는 전치 행렬(n-gram x 답변, CSR)을 사용합니다. 질문 벡터와의 곱이 질문에 등장한
+        n-gram 행만 읽게 되어 답변 행렬(CSR)과 직접 곱하는 것보다 훨씬 빠릅니다.
+        """
+        answer_vectors = sparse.csr_matrix(answer_vectors)
+        term_vectors = answer_vectors.T.tocsr()
+        inverted_index = (
+            InvertedIndex(answer_vectors, term_vectors)
+            if self.retrieval_mode == "inverted" else None
+        )
+        return MatcherIndex(
+            answers=answers,
+            vectorizer=vectorizer,
+            answer_vectors=answer_vectors,
+            term_vectors=term_vectors,
+            lexical=TfidfRetriever(vectorizer, term_vectors, inverted_index),
+            inverted_index=inverted_index,
+            dense=dense,
+            classifier=classifier,
+            version=version,
+            stale_updates=stale_updates
+        )
+
+    @property
+    def categories(self) -> List[str]:
+        """답변 데이터베이스의 카테고리 목록 (처음 등장한 순서)"""
+        return list(self._index.category_rows())
+
+    def question_vector(self, question: str) -> Tuple[str, object]:
+        """
+        질문 벡터 (답변 캐시의 유사 질문 비교용)
+
+        임베딩 검색기를 쓰면 임베딩, 아니면 TF-IDF 벡터를 반환합니다.
+        벡터 공간 이름은 모델/학습된 어휘가 같을 때만 같으므로, 재학습 전후의 벡터는 서로 비교되지 않습니다.
+
+        Returns:
+            (벡터 공간 이름, L2 정규화된 벡터 (임베딩: 1차원 배열, TF-IDF: 1 x 어휘 수 희소 행렬))
+        """
+        index = self._index
+        if index.dense is not None:
+            return f"dense:{self.encoder.name}", self.encoder.encode([question])[0]
+        return _vectorizer_space(index.vectorizer), index.vectorizer.transform([question])
+
+    def _retriever(self, source: Union[MatcherIndex, CategoryPartition]) -> Retriever:
+        """설정된 검색기 선택 (하이브리드 검색기는 스냅샷의 두 검색기로 그때그때 구성)"""
+        if self.retriever == "hybrid":
+            return HybridRetriever(
+                [source.lexical, source.dense], source.answers,
+                reranker=self.reranker, executor=self._executor
+            )
+        return source.dense if self.retriever == "dense" else source.lexical
+
+    @staticmethod
+    def _categories(category: Union[str, Sequence[str], None]) -> Optional[Tuple[str, ...]]:
+        if category is None:
+            return None
+        return (category,) if isinstance(category, str) else tuple(category)
+
+    def _route(self, index: MatcherIndex, question: str) -> Optional[Tuple[str, ...]]:
+        """분류기로 질문을 먼저 검색할 카테고리 선택 (라우팅을 쓰지 않거나 확신이 부족하면 None)"""
+        if not self.category_routing or index.classifier is None:
+            return None
+        routed = index.classifier.route(question)
+        return tuple(routed) if routed else None
+
+    def find_best_matches(
+        self,
+        question: str,
+        top_k: int = TOP_K_MATCHES,
+        category: Union[str, Sequence[str], None] = None
+    ) -> List[Tuple[Dict, float]]:
         """
         질문과 가장 유사한 답변 찾기
 
         Args:
             question: 사용자 질문
             top_k: 상위 몇 개를 반환할지
+            category: 이 카테고리(들)의 답변만 검색 (None이면 전체, 라우팅 사용 시 분류기가 선택)
 
         Returns:
             (답변, 유사도 점수) 튜플의 리스트
         """
-        # 질문 벡터화
-        question_vector = self.vectorizer.transform([question])
+        return self.find_best_matches_with_timings(question, top_k, category)[0]
+
+    def find_best_matches_with_timings(
+        self,
+        question: str,
+        top_k: int = TOP_K_MATCHES,
+        category: Union[str, Sequence[str], None] = None
+    ) -> Tuple[List[Tuple[Dict, float]], SearchTimings]:
+        """
+        find_best_matches와 같지만 검색 단계별 소요 시간도 함께 반환
+
+        카테고리를 지정하면 해당 카테고리 부분 인덱스만 검색합니다.
+        카테고리 없이 라우팅을 쓰면 분류기가 고른 카테고리를 먼저 검색하고,
+        분류기가 확신하지 못하거나 그 카테고리에 임계값 이상 답변이 없으면 전체를 검색합니다.
+
+        Args:
+            question: 사용자 질문
+            top_k: 상위 몇 개를 반환할지
+            category: 이 카테고리(들)의 답변만 검색
+
+        Returns:
+            ((답변, 유사도 점수) 튜플의 리스트, 단계별 소요 시간)
+        """
+        index = self._index
+        stages = {}
+        categories = self._categories(category)
+        routed = False
+        if categories is None:
+            start = time.perf_counter()
+            categories = self._route(index, question)
+            routed = categories is not None
+            if self.category_routing:
+                stages['routing'] = (time.perf_counter() - start) * 1000
+
+        if categories is not None:
+            partition = index.partition(categories)
+            (top_indices, scores), timings = self._retriever(partition).search_with_timings(question, top_k)
+            if top_indices.size or not routed:
+                timings.stages = {**stages, **timings.stages}
+                return [
+                    (partition.answers[idx], float(score)) for idx, score in zip(top_indices, scores)
+                ], timings
+            # 라우팅한 카테고리에 결과가 없으면 전체 검색으로 대체
+            stages['partition'] = sum(v for k, v in timings.stages.items() if k != 'total')
+
+        (top_indices, scores), timings = self._retriever(index).search_with_timings(question, top_k)
+        timings.stages = {**stages, **timings.stages}
+        return [(index.answers[idx], float(score)) for idx, score in zip(top_indices, scores)], timings
+
+    def find_best_matches_many(
+        self,
+        questions: Sequence[str],
+        top_k: int = TOP_K_MATCHES,
+        category: Union[str, Sequence[str], None] = None
+    ) -> List[List[Tuple[Dict, float]]]:
+        """
+        여러 질문을 한 번에 검색 (배치 처리용)
+
+        질문 전체를 한 번에 벡터화하고 답변 행렬과의 행렬 곱으로 유사도를 계산합니다.
+        라우팅을 쓰면 같은 카테고리로 보내진 질문끼리 묶어서 검색합니다.
+
+        Args:
+            questions: 사용자 질문 리스트
+            top_k: 질문마다 상위 몇 개를 반환할지
+            category: 모든 질문에 적용할 카테고리 필터
 
-        # 코사인 유사도 계산
-        similarities = cosine_similarity(question_vector, self.answer_vectors)[0]
+        Returns:
+            질문 순서대로 find_best_matches와 같은 형식의 결과 리스트
+        """
+        if len(questions) == 0:
+            return []
 
-        # 상위 k개 인덱스 추출
-        top_indices = similarities.argsort()[-top_k:][::-1]
+        index = self._index
+        categories = self._categories(category)
+        if categories is not None:
+            groups = {categories: list(range(len(questions)))}
+        else:
+            groups: Dict[Optional[Tuple[str, ...]], List[int]] = {}
+            for i, question in enumerate(questions):
+                groups.setdefault(self._route(index, question), []).append(i)
 
-        # 결과 구성
-        results = []
-        for idx in top_indices:
-            score = similarities[idx]
-            if score >= SIMILARITY_THRESHOLD:
-                results.append((self.answers[idx], float(score)))
+        results: List[Optional[List[Tuple[Dict, float]]]] = [None] * len(questions)
+        fallback = groups.pop(None, [])
+        for group_categories, positions in groups.items():
+            partition = index.partition(group_categories)
+            batch = self._retriever(partition).search_many([questions[i] for i in positions], top_k)
+            for i, (top_indices, scores) in zip(positions, batch):
+                if top_indices.size == 0 and category is None:
+                    fallback.append(i)  # 라우팅한 카테고리에 결과가 없으면 전체 검색
+                    continue
+                results[i] = [
+                    (partition.answers[idx], float(score)) for idx, score in zip(top_indices, scores)
+                ]
 
+        if fallback:
+            fallback.sort()
+            batch = self._retriever(index).search_many([questions[i] for i in fallback], top_k)
+            for i, (top_indices, scores) in zip(fallback, batch):
+                results[i] = [(index.answers[idx], float(score)) for idx, score in zip(top_indices, scores)]
         return results
 
+    def add_answers(self, answers: List[Dict]) -> int:
+        """
+        답변 추가 (전체 재학습 없이 현재 어휘/idf로 벡터화하여 인덱스에 덧붙임)
+
+        새 답변에만 있는 n-gram은 다음 재학습(compact) 전까지 검색에 반영되지 않습니다.
+
+        Args:
+            answers: 추가할 답변 리스트 (각 답변에 고유한 'id' 필요)
+
+        Returns:
+            추가된 답변 수
+        """
+        answers = [dict(a) for a in answers]
+        if not answers:
+            return 0
+
+        with self._write_lock:
+            current = self._index
+            existing = {a.get('id') for a in current.answers}
+            new_ids = [a.get('id') for a in answers]
+            if any(answer_id is None for answer_id in new_ids):
+                raise ValueError("추가할 답변에 'id'가 없습니다.")
+            duplicates = (existing & set(new_ids)) | {
+                answer_id for answer_id, count in Counter(new_ids).items() if count > 1
+            }
+            if duplicates:
+                raise ValueError(f"이미 존재하는 답변 id입니다: {sorted(duplicates)}")
+
+            texts = [answer_text(a) for a in answers]
+            new_vectors = current.vectorizer.transform(texts)
+            dense = current.dense
+            if dense is not None:
+                dense = dense.extend(dense.encoder.encode(texts))
+            self._index = self._make_index(
+                _extend_answers(current.answers, answers),
+                current.vectorizer,
+                sparse.vstack([current.answer_vectors, new_vectors], format='csr'),
+                version=current.version + 1,
+                stale_updates=current.stale_updates + len(answers),
+                dense=dense,
+                classifier=current.classifier
+            )
+
+        print(f"[OK] {len(answers)}개의 답변을 추가했습니다.")
+        self._maybe_compact()
+        return len(answers)
+
+    def remove_answers(self, ids: Iterable[str]) -> int:
+        """
+        답변 삭제
+
+        Args:
+            ids: 삭제할 답변 id 목록
+
+        Returns:
+            삭제된 답변 수
+        """
+        ids = set(ids)
+
+        with self._write_lock:
+            current = self._index
+            keep = [i for i, a in enumerate(current.answers) if a.get('id') not in ids]
+            removed = len(current.answers) - len(keep)
+            if removed == 0:
+                return 0
+
+            self._index = self._make_index(
+                _select_answers(current.answers, keep),
+                current.vectorizer,
+                current.answer_vectors[keep],
+                version=current.version + 1,
+                stale_updates=current.stale_updates + removed,
+                dense=current.dense.select(keep) if current.dense is not None else None,
+                classifier=current.classifier
+            )
+
+        print(f"[OK] {removed}개의 답변을 삭제했습니다.")
+        self._maybe_compact()
+        return removed
+
+    def compact(self):
+        """
+        현재 답변으로 벡터라이저를 다시 학습하여 추가/삭제로 어긋난 어휘와 idf를 바로잡음
+
+        학습은 잠금 없이 진행하므로 그동안 검색과 추가/삭제가 막히지 않습니다.
+        학습 중에 들어온 변경은 교체 직전에 새 벡터라이저로 다시 벡터화하여 반영합니다.
+        """
+        with self._compaction_lock:
+            base = self._index
+            if base.stale_updates == 0:
+                return
+
+            vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+            answer_vectors = vectorizer.fit_transform(answer_text(a) for a in base.answers)
+            rebuilt = self._make_index(base.answers, vectorizer, answer_vectors)
+            classifier = self._train_classifier(base.answers)
+
+            with self._write_lock:
+                current = self._index
+                if current.version == base.version:
+                    stale_updates = 0
+                else:
+                    rebuilt = self._make_index(
+                        current.answers,
+                        vectorizer,
+                        vectorizer.transform(answer_text(a) for a in current.answers)
+                    )
+                    stale_updates = current.stale_updates - base.stale_updates
+
+                # 임베딩은 어휘와 무관하므로 현재 스냅샷의 것을 그대로 사용
+                self._index = replace(
+                    rebuilt,
+                    version=current.version + 1,
+                    stale_updates=stale_updates,
+                    dense=current.dense,
+                    classifier=classifier
+                )
+
+        print(f"[OK] 인덱스 재학습 완료 ({len(rebuilt.answers)}개 답변)")
+
+    def compact_in_background(self) -> threading.Thread:
+        """
+        백그라운드 스레드에서 compact 실행 (이미 실행 중이면 그 스레드 반환)
+
+        Returns:
+            재학습 스레드
+        """
+        with self._write_lock:
+            thread = self._compaction_thread
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=self.compact, name="matcher-compaction", daemon=True)
+                self._compaction_thread = thread
+                thread.start()
+        return thread
+
+    def _maybe_compact(self):
+        """idf에 반영되지 않은 변경이 일정 비율을 넘으면 백그라운드 재학습 시작"""
+        index = self._index
+        limit = max(1, int(len(index.answers) * INDEX_COMPACTION_RATIO))
+        if self.auto_compact and index.stale_updates >= limit:
+            self.compact_in_background()
+
+    def save_answers(self, path: Optional[Path] = None) -> Path:
+        """
+        현재 답변 목록을 JSON 파일로 저장 (임시 파일에 쓴 뒤 교체)
+
+        Args:
+            path: 저장할 경로 (기본: 로드한 답변 파일)
+
+        Returns:
+            저장된 파일 경로
+        """
+        path = Path(path or self.answers_path)
+        write_answers(path, self.answers)
+        return path
+
     def get_match_summary(self, matches: List[Tuple[Dict, float]]) -> str:
         """
         매칭 결과 요약
@@ -0,0 +1,148 @@
+"""
+참고 답변 패킹 모듈
+프롬프트에 넣을 참고 답변을 토큰 예산 안으로 줄이기 (중복 제거, 핵심 포인트 우선, 질문과 겹치는 문장 선택)
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Tuple
+
+from config import REFERENCE_DUPLICATE_THRESHOLD, REFERENCE_TOKEN_BUDGET
+
+_SENTENCE_PATTERN = re.compile(r'(?<=[.?!。])\s+|\n+')
+_HANGUL_PATTERN = re.compile(r'[가-힣]')
+_WORD_PATTERN = re.compile(r'[\w]+')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 추정한 토큰 수
+
+    한글 음절은 1토큰, 나머지 문자는 4자당 1토큰으로 셉니다.
+    실제 토큰 수보다 조금 크게 나오도록 잡은 값이라 예산을 넘지 않는 쪽으로 어긋납니다.
+    """
+    hangul = len(_HANGUL_PATTERN.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장 단위로 나누기 (마침표/물음표/느낌표 뒤 공백, 줄바꿈 기준)"""
+    return [s.strip() for s in _SENTENCE_PATTERN.split(text) if s.strip()]
+
+
+def char_bigrams(text: str) -> FrozenSet[str]:
+    """공백과 문장부호를 뺀 글자 2-gram 집합 (겹침 / 중복 비교용)"""
+    compact = "".join(_WORD_PATTERN.findall(text.lower()))
+    return frozenset(compact[i:i + 2] for i in range(len(compact) - 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+@dataclass
+class PackedReference:
+    """프롬프트에 넣을 참고 답변 (truncated이면 sentences는 고른 문장만 원래 순서대로)"""
+    answer: Dict
+    score: float
+    sentences: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def key_points(self) -> List[str]:
+        return list(self.answer.get('key_points') or [])
+
+    def header(self, number: int) -> str:
+        return f"[참고 {number}] {self.answer['title']} (카테고리: {self.answer['category']})"
+
+    def text(self, number: int) -> str:
+        """프롬프트용 텍스트 (줄인 답변은 핵심 포인트를 먼저 적음)"""
+        lines = [self.header(number)]
+        if self.truncated and self.key_points:
+            lines.append(f"핵심: {', '.join(self.key_points)}")
+        body = " ".join(self.sentences)
+        if body:
+            lines.append(body)
+        return "\n".join(lines)
+
+
+def _dedupe(reference_answers: List[Tuple[Dict, float]], threshold: float) -> List[Tuple[Dict, float]]:
+    """본문이 앞선 참고 답변과 거의 같은 답변 제거 (유사도 순서 유지)"""
+    kept, kept_grams = [], []
+    for answer, score in reference_answers:
+        grams = char_bigrams(answer['content'])
+        if any(jaccard(grams, other) >= threshold for other in kept_grams):
+            continue
+        kept.append((answer, score))
+        kept_grams.append(grams)
+    return kept
+
+
+def pack_references(
+    question: str,
+    reference_answers: List[Tuple[Dict, float]],
+    budget: int = REFERENCE_TOKEN_BUDGET,
+    duplicate_threshold: float = REFERENCE_DUPLICATE_THRESHOLD
+) -> List[PackedReference]:
+    """
+    참고 답변을 토큰 예산 안으로 패킹
+
+    1. 본문이 거의 같은 참고 답변은 하나만 남깁니다.
+    2. 전부 넣어도 예산 안이면 본문을 그대로 씁니다 (같은 참고 답변 조합이면 같은 텍스트라 프롬프트 캐시 유지).
+    3. 넘으면 답변마다 제목과 핵심 포인트(key_points)를 먼저 넣고, 남은 예산에 문장을 채웁니다.
+       답변마다 가장 좋은 문장 하나씩을 먼저 넣고, 나머지는 (질문과 겹치는 글자 2-gram 비율 x 참고 답변 유사도) 순입니다.
+       이미 넣은 문장과 거의 같은 문장은 건너뜁니다.
+
+    Args:
+        question: 사용자 질문
+        reference_answers: (답변, 유사도) 튜플 리스트 (유사도 내림차순)
+        budget: 참고 답변 텍스트 전체의 토큰 예산 (0 이하이면 패킹하지 않고 중복 제거만)
+        duplicate_threshold: 중복으로 볼 글자 2-gram Jaccard 유사도
+
+    Returns:
+        PackedReference 리스트 (유사도 순서)
+    """
+    references = _dedupe(reference_answers, duplicate_threshold)
+    full = [PackedReference(answer, score, split_sentences(answer['content'])) for answer, score in references]
+    if budget <= 0 or sum(estimate_tokens(p.text(i)) for i, p in enumerate(full, 1)) <= budget:
+        return full
+
+    # 제목과 핵심 포인트만으로 예산을 넘으면 유사도가 낮은 참고 답변부터 제외
+    packed = [PackedReference(answer, score, truncated=True) for answer, score in references]
+    used = sum(estimate_tokens(p.text(i)) + 1 for i, p in enumerate(packed, 1))  # 참고 답변 사이 줄바꿈 포함
+    while len(packed) > 1 and used > budget:
+        removed = packed.pop()
+        used -= estimate_tokens(removed.text(len(packed) + 1)) + 1
+
+    question_grams = char_bigrams(question)
+    candidates = []
+    for rank, reference in enumerate(packed):
+        for position, sentence in enumerate(full[rank].sentences):
+            grams = char_bigrams(sentence)
+            overlap = len(grams & question_grams) / len(question_grams) if question_grams else 0.0
+            candidates.append((-(overlap * max(reference.score, 1e-3)), rank, position, sentence, grams))
+    candidates.sort(key=lambda c: c[:3])
+    # 먼저 참고 답변마다 가장 좋은 문장 하나씩, 그다음 전체 순위대로
+    firsts, seen = [], set()
+    for candidate in candidates:
+        if candidate[1] not in seen:
+            seen.add(candidate[1])
+            firsts.append(candidate)
+
+    chosen: Dict[int, List[Tuple[int, str]]] = {rank: [] for rank in range(len(packed))}
+    chosen_grams: List[FrozenSet[str]] = []
+    for _, rank, position, sentence, grams in firsts + candidates:
+        cost = estimate_tokens(sentence) + 1  # 문장 사이 공백
+        if used + cost > budget:
+            continue
+        # 같은 후보(답변마다 먼저 넣은 문장)와 다른 답변의 거의 같은 문장은 건너뜀
+        if any(jaccard(grams, other) >= duplicate_threshold for other in chosen_grams):
+            continue
+        chosen[rank].append((position, sentence))
+        chosen_grams.append(grams)
+        used += cost
+
+    for rank, reference in enumerate(packed):
+        reference.sentences = [sentence for _, sentence in sorted(chosen[rank])]
+    return packed
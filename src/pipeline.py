@@ -0,0 +1,235 @@
+"""
+비동기 답변 파이프라인 모듈
+유사 답변 검색 -> 답변 생성 -> 음성 변환을 각각 await 가능한 단계로 실행
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple,
+    Union
+)
+
+from answer_cache import normalize_question
+from config import TOP_K_MATCHES
+from singleflight import AsyncSingleFlight
+from template_answer import template_answer
+
+
+@dataclass
+class PipelineResult:
+    """파이프라인 실행 결과"""
+    question: str
+    matches: List[Tuple[Dict, float]]
+    answer: str
+    audio_path: Optional[Path] = None
+    template: bool = False  # LLM 없이 만든 템플릿 답변인지 여부
+
+
+class AsyncCounselingPipeline:
+    """
+    비동기 상담 파이프라인
+
+    검색(CPU)과 음성 변환(gTTS 네트워크 호출)은 블로킹 함수이므로 스레드 풀에서 실행하고,
+    답변 생성은 AsyncAnswerGenerator의 코루틴을 그대로 기다립니다.
+    coalesce가 켜져 있으면 같은 질문의 검색 / 같은 질문과 참고 답변의 생성 / 같은 텍스트의 음성 변환이
+    진행 중일 때 새로 실행하지 않고 진행 중인 작업의 결과를 함께 받습니다 (예시 질문 버튼 동시 클릭 등).
+    가장 유사한 답변이 template_threshold 이상이면 quick_answer()로 LLM 없이 템플릿 답변을 바로 줄 수 있습니다.
+    """
+
+    def __init__(self, matcher, generator, tts=None, coalesce: bool = True,
+                 template_threshold: Optional[float] = None):
+        """
+        초기화
+
+        Args:
+            matcher: AnswerMatcher
+            generator: AsyncAnswerGenerator
+            tts: TextToSpeech (음성 변환을 쓰지 않으면 None)
+            coalesce: 동일한 진행 중 요청 병합 여부
+            template_threshold: 템플릿 답변을 쓸 최소 유사도 (None이면 matcher 검색기의 기준, 0 이하이면 쓰지 않음)
+        """
+        self.matcher = matcher
+        self.generator = generator
+        self.tts = tts
+        self.flights = AsyncSingleFlight() if coalesce else None
+        if template_threshold is None:
+            template_threshold = getattr(matcher, 'template_threshold', None)
+        self.template_threshold = template_threshold
+        self.template_answers = 0  # 템플릿 답변으로 대신한 수
+
+    async def _coalesce(self, key: Hashable, factory: Callable[[], Awaitable]) -> Any:
+        if self.flights is None:
+            return await factory()
+        return await self.flights.do(key, factory)
+
+    @staticmethod
+    def _answer_key(question: str, matches: List[Tuple[Dict, float]]) -> Tuple:
+        """답변 생성 병합 키 (정규화한 질문 + 참고 답변 id)"""
+        return ("answer", normalize_question(question), tuple(answer['id'] for answer, _ in matches))
+
+    async def retrieve(
+        self,
+        question: str,
+        top_k: int = TOP_K_MATCHES,
+        category: Union[str, Sequence[str], None] = None
+    ) -> List[Tuple[Dict, float]]:
+        """유사 답변 검색 단계"""
+        scope = category if category is None or isinstance(category, str) else tuple(category)
+        matches = await self._coalesce(
+            ("retrieve", normalize_question(question), top_k, scope),
+            lambda: asyncio.to_thread(self.matcher.find_best_matches, question, top_k, category)
+        )
+        return list(matches)
+
+    def quick_answer(self, question: str, matches: List[Tuple[Dict, float]]) -> Optional[str]:
+        """
+        LLM 없이 바로 줄 템플릿 답변 (조건에 맞지 않으면 None)
+
+        가장 유사한 답변이 template_threshold 이상이고 민감한 질문이 아닐 때만 만듭니다 (template_answer).
+        더 자세한 답변이 필요하면 같은 matches로 generate() / stream()을 호출합니다.
+        """
+        answer = template_answer(question, matches, self.template_threshold, getattr(self.generator, 'router', None))
+        if answer is not None:
+            self.template_answers += 1
+        return answer
+
+    async def generate(self, question: str, matches: List[Tuple[Dict, float]]) -> str:
+        """답변 생성 단계 (참고 답변이 없으면 폴백 답변)"""
+        async def produce():
+            if matches:
+                return await self.generator.generate_answer(question, matches)
+            return await self.generator.generate_simple_answer(question)
+
+        return await self._coalesce(self._answer_key(question, matches), produce)
+
+    async def stream(self, question: str, matches: List[Tuple[Dict, float]]) -> AsyncIterator[str]:
+        """
+        답변 생성 단계 (스트리밍, 답변 조각 단위)
+
+        같은 답변이 이미 생성 중이면 그 답변이 끝날 때까지 기다렸다가 전체를 한 조각으로 반환합니다.
+        """
+        if self.flights is None:
+            async for text in self.generator.stream_answer(question, matches):
+                yield text
+            return
+
+        future, leader = self.flights.lead(self._answer_key(question, matches))
+        if not leader:
+            yield await asyncio.shield(future)
+            return
+
+        parts = []
+        try:
+            async for text in self.generator.stream_answer(question, matches):
+                parts.append(text)
+                yield text
+        except BaseException as e:
+            # 스트림을 중간에 닫거나 취소한 경우에도 기다리던 요청이 멈추지 않도록 예외로 완료
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("답변 스트림이 중단되었습니다."))
+            raise
+        future.set_result("".join(parts).strip())
+
+    async def synthesize(self, text: str, filename: str = "answer") -> Path:
+        """음성 변환 단계 (같은 텍스트를 변환 중이면 먼저 요청한 쪽의 파일을 함께 사용)"""
+        if self.tts is None:
+            raise ValueError("TTS 모듈이 설정되지 않았습니다.")
+        return await self._coalesce(
+            ("synthesize", text),
+            lambda: asyncio.to_thread(self.tts.generate_answer_audio, text, filename)
+        )
+
+    async def synthesize_bytes(self, text: str, output_path: Optional[Path] = None) -> bytes:
+        """메모리 음성 변환 단계 (파일을 거치지 않고 MP3 바이트 반환, 같은 텍스트를 변환 중이면 결과를 함께 사용)"""
+        if self.tts is None:
+            raise ValueError("TTS 모듈이 설정되지 않았습니다.")
+        return await self._coalesce(
+            ("synthesize_bytes", text),
+            lambda: asyncio.to_thread(self.tts.synthesize_bytes, text, output_path)
+        )
+
+    async def answer(
+        self,
+        question: str,
+        enable_tts: bool = False,
+        filename: str = "answer",
+        category: Union[str, Sequence[str], None] = None,
+        allow_template: bool = False
+    ) -> PipelineResult:
+        """
+        질문 하나를 검색 -> 생성 -> (음성 변환) 순서로 처리
+
+        Args:
+            question: 사용자 질문
+            enable_tts: 음성 변환 여부
+            filename: 음성 파일명 (확장자 제외)
+            category: 검색할 카테고리 (None이면 전체)
+            allow_template: True면 조건에 맞을 때 LLM 대신 템플릿 답변 사용
+
+        Returns:
+            PipelineResult
+        """
+        matches = await self.retrieve(question, category=category)
+        answer = self.quick_answer(question, matches) if allow_template else None
+        template = answer is not None
+        if not template:
+            answer = await self.generate(question, matches)
+        audio_path = await self.synthesize(answer, filename) if enable_tts else None
+        return PipelineResult(question, matches, answer, audio_path, template)
+
+    async def answer_many(self, questions: Sequence[str], allow_template: bool = False) -> List[PipelineResult]:
+        """
+        여러 질문을 동시에 처리 (동시 API 요청 수는 생성기의 세마포어가 제한)
+
+        Returns:
+            질문 순서대로 PipelineResult 리스트
+        """
+        return list(await asyncio.gather(*(self.answer(q, allow_template=allow_template) for q in questions)))
+
+
+class EventLoopThread:
+    """
+    전용 스레드에서 도는 이벤트 루프
+
+    Streamlit처럼 요청마다 다른 스레드에서 실행되는 동기 코드가
+    하나의 이벤트 루프(= 하나의 비동기 클라이언트와 연결 풀)를 공유하도록 코루틴을 넘겨 실행합니다.
+    """
+
+    def __init__(self):
+        """초기화 (루프 스레드 시작)"""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="event-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """코루틴을 루프에 넘기고 결과를 받을 Future 반환"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Coroutine, timeout: Optional[float] = None) -> Any:
+        """코루틴을 루프에서 실행하고 결과를 기다림"""
+        return self.submit(coroutine).result(timeout)
+
+    def iterate(self, iterator: AsyncIterator) -> Iterator:
+        """
+        비동기 이터레이터를 루프에서 한 항목씩 꺼내는 동기 이터레이터로 변환 (스트리밍 출력용)
+
+        중간에 순회를 멈춰도 비동기 제너레이터를 닫아 스트림 연결과 동시 요청 슬롯을 돌려줍니다.
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if hasattr(iterator, 'aclose'):
+                self.run(iterator.aclose())
+
+    def close(self):
+        """루프 정지 및 스레드 종료"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
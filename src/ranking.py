@@ -0,0 +1,33 @@
+"""
+랭킹 유틸리티 모듈
+유사도 점수에서 상위 결과를 고르는 공통 함수
+"""
+
+import numpy as np
+
+from config import SIMILARITY_THRESHOLD
+
+
+def select_top_k(scores: np.ndarray, top_k: int, threshold: float = SIMILARITY_THRESHOLD) -> np.ndarray:
+    """
+    임계값 이상인 점수 중 상위 k개 인덱스 선택 (전체 정렬 없이 부분 선택)
+
+    Args:
+        scores: 답변별 유사도 점수 (1차원)
+        top_k: 선택할 개수
+        threshold: 최소 유사도
+
+    Returns:
+        점수 내림차순(동점이면 인덱스 오름차순)으로 정렬된 인덱스 배열
+    """
+    candidates = np.flatnonzero(scores >= threshold)
+    if top_k <= 0 or candidates.size == 0:
+        return candidates[:0]
+
+    if candidates.size > top_k:
+        part = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+        candidates = np.sort(candidates[part])
+
+    # 남은 k개만 정렬 (lexsort는 마지막 키가 우선)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
@@ -0,0 +1,68 @@
+"""
+재순위화 모듈
+질문과 답변을 함께 입력하는 cross-encoder로 후보 답변만 다시 채점하는 기능 (CPU)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+
+import numpy as np
+
+from config import RERANKER, RERANKER_MODEL
+
+
+class Reranker(ABC):
+    """재순위화 모델 인터페이스"""
+
+    name: str
+
+    @abstractmethod
+    def score(self, question: str, texts: Sequence[str]) -> np.ndarray:
+        """
+        질문과 각 답변 텍스트의 관련도 계산
+
+        Args:
+            question: 사용자 질문
+            texts: 후보 답변 텍스트 리스트
+
+        Returns:
+            답변별 관련도 (0.0 ~ 1.0, 클수록 관련 있음)
+        """
+
+
+class CrossEncoderReranker(Reranker):
+    """sentence-transformers CrossEncoder 재순위화 모델 (CPU)"""
+
+    def __init__(self, model_name: str = RERANKER_MODEL, max_length: int = 512):
+        """
+        초기화
+
+        Args:
+            model_name: Hugging Face 모델 이름 또는 로컬 모델 디렉토리
+            max_length: 질문 + 답변 최대 토큰 수
+        """
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                "재순위화에는 sentence-transformers가 필요합니다: pip install sentence-transformers"
+            ) from e
+
+        self.model = CrossEncoder(model_name, device="cpu", max_length=max_length)
+        self.name = f"cross-encoder:{model_name}"
+
+    def score(self, question: str, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.empty(0, dtype=np.float64)
+        # 출력이 하나인 모델은 sigmoid를 거친 관련도(0~1)를 반환
+        scores = self.model.predict([(question, text) for text in texts], show_progress_bar=False)
+        return np.asarray(scores, dtype=np.float64).reshape(len(texts))
+
+
+def load_reranker() -> Optional[Reranker]:
+    """config 설정에 맞는 재순위화 모델 생성 (RERANKER=none이면 None)"""
+    if RERANKER == "none":
+        return None
+    if RERANKER == "cross-encoder":
+        return CrossEncoderReranker(RERANKER_MODEL)
+    raise ValueError(f"지원하지 않는 재순위화 모델입니다: {RERANKER}")
@@ -0,0 +1,260 @@
+"""
+API 호출 복원력 모듈
+재시도(지터를 넣은 지수 백오프, retry-after 준수), 시도별 / 전체 제한 시간, 서킷 브레이커
+"""
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import anthropic
+import httpx
+
+from config import (
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT, LLM_ATTEMPT_TIMEOUT, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX,
+    LLM_MAX_ATTEMPTS, LLM_TOTAL_TIMEOUT
+)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429}  # 이 상태 코드와 5xx(529 과부하 포함)는 재시도
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 API를 호출하지 않음"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """일시적인 오류(요청 제한, 과부하, 서버 오류, 시간 초과, 연결 오류)인지 여부"""
+    # httpx 오류는 SDK가 감싸지 않은 채로 올라오는 경우 (오류 응답 본문 / 스트림을 읽다가 시간 초과 등)
+    if isinstance(error, (anthropic.APIConnectionError, httpx.TransportError, asyncio.TimeoutError, TimeoutError)):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """응답 헤더의 retry-after-ms / retry-after(초 또는 HTTP 날짜)를 초 단위로 반환"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms') is not None:
+            return max(float(headers['retry-after-ms']) / 1000, 0.0)
+        value = headers.get('retry-after')
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            date = email.utils.parsedate_to_datetime(value)
+            return max(date.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """재시도 정책"""
+    max_attempts: int = LLM_MAX_ATTEMPTS  # 첫 시도 포함 최대 시도 수
+    base_delay: float = LLM_BACKOFF_BASE  # 백오프 기준 대기 시간(초)
+    max_delay: float = LLM_BACKOFF_MAX  # 백오프 최대 대기 시간(초)
+    attempt_timeout: float = LLM_ATTEMPT_TIMEOUT  # 시도 하나의 제한 시간(초)
+    total_timeout: float = LLM_TOTAL_TIMEOUT  # 재시도를 포함한 전체 제한 시간(초)
+
+    def backoff(self, attempt: int, server_delay: Optional[float] = None) -> float:
+        """
+        다음 시도까지 기다릴 시간
+
+        지수 백오프 상한 안에서 무작위로 고르고(full jitter, 동시에 실패한 요청들이 한꺼번에 재시도하지 않도록),
+        서버가 retry-after로 알려준 시간보다는 짧게 기다리지 않습니다.
+
+        Args:
+            attempt: 실패한 시도 번호 (0부터)
+            server_delay: retry-after 헤더 값(초)
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, server_delay) if server_delay is not None else delay
+
+
+class CircuitBreaker:
+    """
+    서킷 브레이커
+
+    일시적인 오류가 failure_threshold번 연속되면 열려서(open) recovery_timeout 동안 호출을 바로 거절하고,
+    그 뒤 시험 호출 하나만 허용합니다(half-open). 시험 호출이 성공하면 닫히고, 실패하면 다시 열립니다.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT):
+        """
+        초기화
+
+        Args:
+            failure_threshold: 서킷을 열 연속 실패 수
+            recovery_timeout: 열린 뒤 시험 호출을 허용하기까지의 시간(초)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0  # 연속 실패 수
+        self.opened_at: Optional[float] = None
+        self.trips = 0  # 서킷이 열린 횟수
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """상태 (closed / open / half_open)"""
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """호출해도 되는지 여부 (half-open에서는 시험 호출 하나만 허용)"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self.opened_at < self.recovery_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def release(self):
+        """
+        시험 호출이 서버 상태를 알 수 없이 끝났을 때 (취소, 요청 자체의 오류) 상태는 그대로 두고 다음 호출이 다시 시험하게 함
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                if not self._probing:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+@dataclass
+class ResilienceStats:
+    """재시도 / 서킷 브레이커 카운터"""
+    calls: int = 0  # 호출 수
+    attempts: int = 0  # 실제 API 요청 수 (재시도 포함)
+    retries: int = 0  # 재시도 수
+    failures: int = 0  # 재시도 후에도 실패한 호출 수
+    short_circuits: int = 0  # 서킷이 열려 있어 바로 거절한 호출 수
+    fallbacks: int = 0  # 폴백 답변으로 대신한 호출 수 (생성기가 기록)
+
+    def summary(self) -> str:
+        return (f"호출 {self.calls}회 | 요청 {self.attempts}회 (재시도 {self.retries}) | 실패 {self.failures} "
+                f"| 서킷 차단 {self.short_circuits} | 폴백 {self.fallbacks}")
+
+
+class ResilientCaller:
+    """
+    재시도 정책과 서킷 브레이커를 적용해 API 호출 함수를 실행
+
+    호출 함수는 이번 시도의 제한 시간(초)을 인자로 받아 API 요청에 넘깁니다.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None):
+        """
+        초기화
+
+        Args:
+            policy: 재시도 정책 (None이면 설정값)
+            breaker: 서킷 브레이커 (None이면 설정값, 생성기 하나에 하나씩)
+        """
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = ResilienceStats()
+
+    def _admit(self, deadline: float) -> float:
+        """서킷을 확인하고 이번 시도의 제한 시간 반환"""
+        if not self.breaker.allow():
+            self.stats.short_circuits += 1
+            raise CircuitOpenError("Claude API 장애로 서킷 브레이커가 열려 있습니다.")
+        self.stats.attempts += 1
+        return max(min(self.policy.attempt_timeout, deadline - time.monotonic()), 0.001)
+
+    def _next_delay(self, error: Exception, attempt: int, deadline: float) -> float:
+        """
+        실패한 시도를 기록하고 재시도까지 기다릴 시간 반환
+
+        재시도하지 않는 오류이거나 시도 수 / 전체 제한 시간을 넘으면 오류를 그대로 다시 발생시킵니다.
+        """
+        if not is_retryable(error):
+            # 요청 자체의 문제(400, 401 등)는 서버 장애도 정상 응답도 아니므로 서킷 상태를 바꾸지 않음
+            self.breaker.release()
+            raise error
+        self.breaker.record_failure()
+        delay = self.policy.backoff(attempt, retry_after(error))
+        if attempt + 1 >= self.policy.max_attempts or time.monotonic() + delay >= deadline:
+            self.stats.failures += 1
+            raise error
+        self.stats.retries += 1
+        print(f"[WARN] Claude API 일시 오류, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.policy.max_attempts}): {error}")
+        return delay
+
+    def call(self, request: Callable[[float], T]) -> T:
+        """
+        동기 호출
+
+        Args:
+            request: 제한 시간(초)을 받아 API를 호출하는 함수
+
+        Returns:
+            request의 반환값
+        """
+        self.stats.calls += 1
+        deadline = time.monotonic() + self.policy.total_timeout
+        attempt = 0
+        while True:
+            timeout = self._admit(deadline)
+            try:
+                result = request(timeout)
+            except Exception as e:
+                time.sleep(self._next_delay(e, attempt, deadline))
+                attempt += 1
+                continue
+            except BaseException:
+                # KeyboardInterrupt 등으로 결과 없이 끝나면 시험 호출을 풀어 서킷이 half-open에 묶이지 않게 함
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, request: Callable[[float], Awaitable[T]]) -> T:
+        """비동기 호출 (시도별 제한 시간을 asyncio.wait_for로도 강제)"""
+        self.stats.calls += 1
+        deadline = time.monotonic() + self.policy.total_timeout
+        attempt = 0
+        while True:
+            timeout = self._admit(deadline)
+            try:
+                result = await asyncio.wait_for(request(timeout), timeout)
+            except Exception as e:
+                await asyncio.sleep(self._next_delay(e, attempt, deadline))
+                attempt += 1
+                continue
+            except BaseException:
+                # 요청 취소(asyncio.CancelledError, 바깥 wait_for 시간 초과)로 끝나면 시험 호출을 풀어 줌
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return result
@@ -0,0 +1,391 @@
+"""
+검색기 모듈
+질문에서 답변 후보(답변 인덱스, 점수)를 찾는 검색기 인터페이스와 구현
+(문자 n-gram TF-IDF / 문장 임베딩 / 두 검색기를 RRF로 합치고 재순위화하는 하이브리드)
+"""
+
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import (
+    DENSE_SIMILARITY_THRESHOLD, SIMILARITY_THRESHOLD,
+    HYBRID_CANDIDATES, RRF_K, CANDIDATE_BUDGET_MS, RERANK_BUDGET_MS
+)
+from corpus import answer_text
+from embeddings import Encoder
+from inverted_index import InvertedIndex
+from ranking import select_top_k
+from rerank import Reranker
+
+# 배치 검색 시 한 번에 밀집 행렬로 펼칠 질문 수 (메모리 사용량 = 청크 크기 x 답변 수)
+RETRIEVER_CHUNK_SIZE = 256
+
+# 재순위화 시 한 번에 모델에 넣을 후보 수 (예산 확인 단위)
+RERANK_BATCH_SIZE = 8
+
+SearchResult = Tuple[np.ndarray, np.ndarray]
+
+
+def _empty() -> SearchResult:
+    return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+@dataclass
+class SearchTimings:
+    """검색 단계별 소요 시간 (ms)"""
+    stages: Dict[str, float] = field(default_factory=dict)
+    over_budget: List[str] = field(default_factory=list)  # 시간 예산을 넘겨 결과가 잘린 단계
+
+    @property
+    def total(self) -> float:
+        return self.stages.get('total', sum(self.stages.values()))
+
+    def summary(self) -> str:
+        """'tfidf 0.52ms | dense 8.10ms (예산 초과) | ...' 형식의 요약"""
+        return " | ".join(
+            f"{name} {ms:.2f}ms" + (" (예산 초과)" if name in self.over_budget else "")
+            for name, ms in self.stages.items()
+        )
+
+
+class Retriever(ABC):
+    """
+    검색기 인터페이스
+
+    검색 결과는 (답변 인덱스, 점수) 배열 튜플이며 점수 내림차순(동점이면 인덱스 오름차순)입니다.
+    검색기는 불변이며, 답변 추가/삭제는 새 검색기를 만들어 매처 스냅샷에 담습니다.
+    """
+
+    name: str
+    threshold: float  # 이 검색기 점수 척도에서의 기본 최소 유사도
+
+    def search(self, question: str, top_k: int, threshold: Optional[float] = None) -> SearchResult:
+        """
+        질문 하나 검색
+
+        Args:
+            question: 사용자 질문
+            top_k: 반환할 개수
+            threshold: 최소 유사도 (None이면 검색기 기본값)
+
+        Returns:
+            (답변 인덱스, 점수) 배열 튜플
+        """
+        return self.search_many([question], top_k, threshold)[0]
+
+    def search_with_timings(self, question: str, top_k: int,
+                            threshold: Optional[float] = None) -> Tuple[SearchResult, SearchTimings]:
+        """search와 같지만 단계별 소요 시간도 함께 반환"""
+        start = time.perf_counter()
+        result = self.search(question, top_k, threshold)
+        return result, SearchTimings({self.name: _elapsed_ms(start)})
+
+    @abstractmethod
+    def search_many(self, questions: Sequence[str], top_k: int,
+                    threshold: Optional[float] = None) -> List[SearchResult]:
+        """여러 질문 검색 (질문 순서대로 search와 같은 형식의 결과 리스트)"""
+
+
+class TfidfRetriever(Retriever):
+    """문자 n-gram TF-IDF 검색기 (희소 내적, 선택적으로 역색인)"""
+
+    name = "tfidf"
+    threshold = SIMILARITY_THRESHOLD
+
+    def __init__(self, vectorizer: TfidfVectorizer, term_vectors: sparse.csr_matrix,
+                 inverted_index: Optional[InvertedIndex] = None):
+        """
+        초기화
+
+        Args:
+            vectorizer: 학습된 벡터라이저
+            term_vectors: n-gram x 답변 TF-IDF 행렬 (CSR)
+            inverted_index: 역색인 (있으면 단일 검색에 사용)
+        """
+        self.vectorizer = vectorizer
+        self.term_vectors = term_vectors
+        self.inverted_index = inverted_index
+
+    def score(self, question_vectors: sparse.spmatrix) -> np.ndarray:
+        """
+        질문 벡터와 모든 답변의 코사인 유사도 계산
+
+        TF-IDF 벡터는 이미 L2 정규화되어 있으므로 희소 내적이 곧 코사인 유사도입니다.
+        전치 행렬(n-gram x 답변, CSR)과 곱하면 질문에 등장한 n-gram 행만 읽게 됩니다.
+
+        Returns:
+            (질문 수 x 답변 수) 유사도 배열
+        """
+        return (question_vectors @ self.term_vectors).toarray()
+
+    def search(self, question: str, top_k: int, threshold: Optional[float] = None) -> SearchResult:
+        threshold = self.threshold if threshold is None else threshold
+        question_vector = self.vectorizer.transform([question])
+        if question_vector.nnz == 0:
+            return _empty()
+
+        if self.inverted_index is not None:
+            return self.inverted_index.search(question_vector, top_k, threshold)
+
+        similarities = self.score(question_vector)[0]
+        top = select_top_k(similarities, top_k, threshold)
+        return top, similarities[top]
+
+    def search_many(self, questions: Sequence[str], top_k: int,
+                    threshold: Optional[float] = None) -> List[SearchResult]:
+        threshold = self.threshold if threshold is None else threshold
+        if len(questions) == 0:
+            return []
+
+        question_vectors = self.vectorizer.transform(questions)
+        results = []
+        for start in range(0, question_vectors.shape[0], RETRIEVER_CHUNK_SIZE):
+            for row in self.score(question_vectors[start:start + RETRIEVER_CHUNK_SIZE]):
+                top = select_top_k(row, top_k, threshold)
+                results.append((top, row[top]))
+        return results
+
+    def subset(self, indices: np.ndarray) -> "TfidfRetriever":
+        """지정한 답변만 담은 부분 검색기 (같은 어휘/idf, 결과 인덱스는 indices 기준 위치)"""
+        term_vectors = self.term_vectors[:, indices].tocsr()
+        inverted_index = (
+            InvertedIndex(self.inverted_index.documents[indices], term_vectors)
+            if self.inverted_index is not None else None
+        )
+        return TfidfRetriever(self.vectorizer, term_vectors, inverted_index)
+
+
+class DenseRetriever(Retriever):
+    """문장 임베딩 검색기 (질문 임베딩과 답변 임베딩의 코사인 유사도)"""
+
+    name = "dense"
+
+    def __init__(self, encoder: Encoder, vector_index, threshold: float = DENSE_SIMILARITY_THRESHOLD):
+        """
+        초기화
+
+        Args:
+            encoder: 문장 임베딩 모델
+            vector_index: 답변 임베딩 벡터 인덱스 (BruteForceVectorIndex / HnswVectorIndex)
+            threshold: 기본 최소 유사도 (TF-IDF와 점수 분포가 달라 별도 설정)
+        """
+        self.encoder = encoder
+        self.vector_index = vector_index
+        self.threshold = threshold
+
+    def search_many(self, questions: Sequence[str], top_k: int,
+                    threshold: Optional[float] = None) -> List[SearchResult]:
+        threshold = self.threshold if threshold is None else threshold
+        results = [_empty() for _ in questions]
+
+        # 빈 질문은 임베딩하지 않음 (TF-IDF 검색과 같이 결과 없음)
+        positions = [i for i, question in enumerate(questions) if question.strip()]
+        for start in range(0, len(positions), RETRIEVER_CHUNK_SIZE):
+            chunk = positions[start:start + RETRIEVER_CHUNK_SIZE]
+            queries = self.encoder.encode([questions[i] for i in chunk])
+            for i, result in zip(chunk, self.vector_index.search(queries, top_k, threshold)):
+                results[i] = result
+        return results
+
+    def extend(self, embeddings: np.ndarray) -> "DenseRetriever":
+        """답변 임베딩을 덧붙인 새 검색기 반환"""
+        return DenseRetriever(self.encoder, self.vector_index.extend(embeddings), self.threshold)
+
+    def select(self, indices: List[int]) -> "DenseRetriever":
+        """지정한 답변만 남긴 새 검색기 반환"""
+        return DenseRetriever(self.encoder, self.vector_index.select(indices), self.threshold)
+
+    def subset(self, indices: np.ndarray) -> "DenseRetriever":
+        """지정한 답변만 담은 부분 검색기 (결과 인덱스는 indices 기준 위치)"""
+        return DenseRetriever(self.encoder, self.vector_index.subset(indices), self.threshold)
+
+
+def reciprocal_rank_fusion(results: Sequence[SearchResult], rrf_k: int = RRF_K) -> SearchResult:
+    """
+    여러 검색기의 순위를 reciprocal-rank fusion으로 합침
+
+    답변마다 검색기별 1 / (rrf_k + 순위)를 더합니다. 점수 척도가 다른 검색기도 순위만 쓰므로 그대로 합칠 수 있습니다.
+
+    Args:
+        results: 검색기별 (답변 인덱스, 점수) 결과 (각각 점수 내림차순)
+        rrf_k: RRF 상수
+
+    Returns:
+        (답변 인덱스, RRF 점수) 배열 튜플, RRF 점수 내림차순(동점이면 인덱스 오름차순)
+    """
+    fused: Dict[int, float] = {}
+    for indices, _ in results:
+        for rank, idx in enumerate(indices.tolist(), 1):
+            fused[idx] = fused.get(idx, 0.0) + 1.0 / (rrf_k + rank)
+    if not fused:
+        return _empty()
+
+    order = sorted(fused, key=lambda idx: (-fused[idx], idx))
+    return np.asarray(order, dtype=np.intp), np.asarray([fused[idx] for idx in order], dtype=np.float64)
+
+
+class HybridRetriever(Retriever):
+    """
+    2단계 하이브리드 검색기
+
+    1단계: 검색기마다 상위 candidates개 후보를 만들고 reciprocal-rank fusion으로 합칩니다.
+           첫 번째 검색기(보통 TF-IDF)는 항상 기다리고, 나머지는 후보 생성 예산 안에 끝난 결과만 씁니다.
+    2단계: 재순위화 모델이 있으면 합친 후보만 RRF 순서대로 묶어서 다시 채점하며,
+           예산을 넘기면 남은 후보는 채점하지 않고 RRF 순서 그대로 뒤에 둡니다.
+
+    최종 점수는 재순위화 점수(0~1) 또는 정규화한 RRF 점수(모든 검색기에서 1위면 1.0)입니다.
+    """
+
+    name = "hybrid"
+    threshold = 0.0  # 후보는 검색기별 임계값을 이미 통과했으므로 최종 점수로는 거르지 않음
+
+    def __init__(
+        self,
+        retrievers: Sequence[Retriever],
+        answers: Sequence[Mapping],
+        reranker: Optional[Reranker] = None,
+        executor: Optional[Executor] = None,
+        candidates: int = HYBRID_CANDIDATES,
+        rrf_k: int = RRF_K,
+        candidate_budget_ms: float = CANDIDATE_BUDGET_MS,
+        rerank_budget_ms: float = RERANK_BUDGET_MS
+    ):
+        """
+        초기화
+
+        Args:
+            retrievers: 후보를 만들 검색기 (첫 번째는 시간 예산과 관계없이 항상 사용)
+            answers: 검색기와 같은 순서의 답변 목록 (재순위화 입력 텍스트용)
+            reranker: 재순위화 모델 (None이면 RRF 결과를 그대로 사용)
+            executor: 나머지 검색기를 병렬로 실행할 스레드 풀 (None이면 순서대로 실행하고 예산은 기록만 함)
+            candidates: 검색기마다 가져올 후보 수
+            rrf_k: RRF 상수
+            candidate_budget_ms: 후보 생성 단계 시간 예산
+            rerank_budget_ms: 재순위화 단계 시간 예산
+        """
+        self.retrievers = list(retrievers)
+        self.answers = answers
+        self.reranker = reranker
+        self.executor = executor
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.candidate_budget_ms = candidate_budget_ms
+        self.rerank_budget_ms = rerank_budget_ms
+
+    def search(self, question: str, top_k: int, threshold: Optional[float] = None) -> SearchResult:
+        return self.search_with_timings(question, top_k, threshold)[0]
+
+    def search_with_timings(self, question: str, top_k: int,
+                            threshold: Optional[float] = None) -> Tuple[SearchResult, SearchTimings]:
+        threshold = self.threshold if threshold is None else threshold
+        timings = SearchTimings()
+        start = time.perf_counter()
+
+        results = self._generate_candidates(question, timings)
+        fused = self._fuse(results, timings)
+        result = self._rerank(question, fused, top_k, threshold, timings)
+
+        timings.stages['total'] = _elapsed_ms(start)
+        return result, timings
+
+    def search_many(self, questions: Sequence[str], top_k: int,
+                    threshold: Optional[float] = None) -> List[SearchResult]:
+        threshold = self.threshold if threshold is None else threshold
+        # 후보 생성은 검색기별 배치 검색으로 한 번에 처리 (배치 처리에는 시간 예산을 적용하지 않음)
+        per_retriever = [r.search_many(questions, self.candidates) for r in self.retrievers]
+        results = []
+        for i, question in enumerate(questions):
+            timings = SearchTimings()
+            fused = self._fuse([batch[i] for batch in per_retriever], timings)
+            results.append(self._rerank(question, fused, top_k, threshold, timings, budget_ms=float('inf')))
+        return results
+
+    def _generate_candidates(self, question: str, timings: SearchTimings) -> List[SearchResult]:
+        """검색기별 후보 생성 (첫 번째 외의 검색기는 예산 안에 끝난 것만 사용)"""
+        start = time.perf_counter()
+        deadline = start + self.candidate_budget_ms / 1000
+
+        def run(retriever: Retriever):
+            begin = time.perf_counter()
+            result = retriever.search(question, self.candidates)
+            return result, _elapsed_ms(begin)
+
+        primary, *others = self.retrievers
+        futures = [(r, self.executor.submit(run, r)) for r in others] if self.executor is not None else []
+
+        result, elapsed = run(primary)
+        timings.stages[primary.name] = elapsed
+        results = [result]
+
+        if self.executor is None:
+            for retriever in others:
+                result, elapsed = run(retriever)
+                timings.stages[retriever.name] = elapsed
+                if time.perf_counter() > deadline:
+                    timings.over_budget.append(retriever.name)
+                results.append(result)
+            return results
+
+        for retriever, future in futures:
+            try:
+                result, elapsed = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            except FutureTimeoutError:
+                # 늦은 검색기는 결과를 버리고 진행 (아직 시작 전이면 취소, 실행 중이면 끝난 뒤 버려짐)
+                future.cancel()
+                timings.stages[retriever.name] = _elapsed_ms(start)
+                timings.over_budget.append(retriever.name)
+                continue
+            timings.stages[retriever.name] = elapsed
+            results.append(result)
+        return results
+
+    def _fuse(self, results: List[SearchResult], timings: SearchTimings) -> SearchResult:
+        """RRF로 후보를 합치고 점수를 0~1로 정규화"""
+        start = time.perf_counter()
+        indices, scores = reciprocal_rank_fusion(results, self.rrf_k)
+        # 모든 검색기에서 1위인 답변이 1.0이 되도록 정규화
+        scores = scores / (len(results) / (self.rrf_k + 1))
+        timings.stages['fusion'] = _elapsed_ms(start)
+        return indices, scores
+
+    def _rerank(self, question: str, fused: SearchResult, top_k: int, threshold: float,
+                timings: SearchTimings, budget_ms: Optional[float] = None) -> SearchResult:
+        """재순위화 모델로 후보를 다시 채점하여 최종 상위 k개 선택"""
+        indices, scores = fused
+        if self.reranker is None or indices.size == 0:
+            keep = scores >= threshold
+            return indices[keep][:top_k], scores[keep][:top_k]
+
+        budget_ms = self.rerank_budget_ms if budget_ms is None else budget_ms
+        start = time.perf_counter()
+        reranked = np.full(indices.size, np.nan)
+        for batch_start in range(0, indices.size, RERANK_BATCH_SIZE):
+            if batch_start and _elapsed_ms(start) >= budget_ms:
+                timings.over_budget.append('rerank')
+                break
+            batch = indices[batch_start:batch_start + RERANK_BATCH_SIZE]
+            reranked[batch_start:batch_start + batch.size] = self.reranker.score(
+                question, [answer_text(self.answers[idx]) for idx in batch]
+            )
+        timings.stages['rerank'] = _elapsed_ms(start)
+
+        # 채점한 후보는 재순위화 점수순, 채점하지 못한 후보는 RRF 순서로 그 뒤에
+        scored = ~np.isnan(reranked)
+        order = np.flatnonzero(scored)
+        order = order[np.lexsort((indices[order], -reranked[order]))]
+        rest = np.flatnonzero(~scored)
+        final_indices = np.concatenate([indices[order], indices[rest]])
+        final_scores = np.concatenate([reranked[order], scores[rest]])
+        keep = final_scores >= threshold
+        return final_indices[keep][:top_k], final_scores[keep][:top_k]
@@ -0,0 +1,156 @@
+"""
+모델 라우팅 모듈
+참고 답변 유사도와 카테고리로 작고 빠른 모델 / 큰 모델 중 하나를 고르고, 경로별 지연 시간 기록
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    CLAUDE_FAST_MODEL, CLAUDE_MODEL, FAST_MAX_TOKENS, MAX_TOKENS, MODEL_ROUTING, ROUTING_FAST_THRESHOLD,
+    ROUTING_SENSITIVE_CATEGORIES
+)
+
+# 유사도와 관계없이 큰 모델로 보낼 위기 / 민감 표현 (공백을 뺀 질문에서 찾음)
+SENSITIVE_KEYWORDS = [
+    "자살", "죽고싶", "죽을까", "자해", "극단적", "살기싫", "사라지고싶",
+    "폭력", "폭행", "학대", "성폭력", "성추행", "괴롭힘", "스토킹", "우울증", "공황",
+]
+
+
+@dataclass(frozen=True)
+class Route:
+    """라우팅 경로 (요청에 쓸 모델과 최대 출력 토큰)"""
+    name: str  # "fast" / "large"
+    model: str
+    max_tokens: int
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """라우팅 결정과 이유"""
+    route: Route
+    reason: str
+
+
+@dataclass
+class RoutingStats:
+    """경로별 요청 수와 지연 시간"""
+    latencies: Dict[str, List[float]] = field(default_factory=dict)  # 경로 이름 -> 요청별 지연 시간(초)
+    reasons: Dict[str, int] = field(default_factory=dict)  # 결정 이유 -> 횟수
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, decision: RouteDecision, seconds: float):
+        with self._lock:
+            self.latencies.setdefault(decision.route.name, []).append(seconds)
+            self.reasons[decision.reason] = self.reasons.get(decision.reason, 0) + 1
+
+    def count(self, name: str) -> int:
+        """경로 하나의 요청 수"""
+        return len(self.latencies.get(name, []))
+
+    def percentile(self, name: str, q: float) -> float:
+        """경로 하나의 지연 시간 백분위수(초, 기록이 없으면 0)"""
+        values = self.latencies.get(name)
+        return float(np.percentile(values, q)) if values else 0.0
+
+    def summary(self) -> str:
+        if not self.latencies:
+            return "라우팅 기록 없음"
+        return " | ".join(
+            f"{name} {self.count(name)}회 (p50 {self.percentile(name, 50):.2f}초, p95 {self.percentile(name, 95):.2f}초)"
+            for name in sorted(self.latencies)
+        )
+
+
+class ModelRouter:
+    """
+    질문마다 답변을 생성할 모델 선택
+
+    가장 유사한 참고 답변의 유사도가 fast_threshold 이상이고, 그 카테고리와 질문이 민감하지 않으면
+    작고 빠른 모델(fast)을 씁니다. 참고 답변이 없거나 유사도가 낮은 질문, 민감한 카테고리 / 위기 표현이 있는 질문은
+    큰 모델(large)로 보냅니다. 경로마다 최대 출력 토큰을 따로 둡니다.
+    """
+
+    def __init__(
+        self,
+        fast_model: str = CLAUDE_FAST_MODEL,
+        large_model: str = CLAUDE_MODEL,
+        fast_max_tokens: int = FAST_MAX_TOKENS,
+        large_max_tokens: int = MAX_TOKENS,
+        fast_threshold: Optional[float] = ROUTING_FAST_THRESHOLD,
+        sensitive_categories: Optional[List[str]] = None,
+        enabled: bool = MODEL_ROUTING
+    ):
+        """
+        초기화
+
+        Args:
+            fast_model: 작고 빠른 모델
+            large_model: 큰 모델
+            fast_max_tokens: 빠른 모델의 최대 출력 토큰
+            large_max_tokens: 큰 모델의 최대 출력 토큰
+            fast_threshold: 빠른 모델을 쓸 최소 참고 답변 유사도 (검색기 점수 척도 기준, None이면 빠른 모델을 쓰지 않음,
+                AnswerMatcher.fast_threshold 참고)
+            sensitive_categories: 항상 큰 모델을 쓸 카테고리 (None이면 설정값)
+            enabled: False면 항상 큰 모델
+        """
+        self.fast = Route("fast", fast_model, fast_max_tokens)
+        self.large = Route("large", large_model, large_max_tokens)
+        self.fast_threshold = fast_threshold
+        self.sensitive_categories = set(
+            ROUTING_SENSITIVE_CATEGORIES if sensitive_categories is None else sensitive_categories
+        )
+        self.enabled = enabled
+        self.stats = RoutingStats()
+
+    def route(self, question: str, reference_answers: Optional[List[Tuple[Dict, float]]]) -> RouteDecision:
+        """
+        질문과 검색 결과로 경로 결정
+
+        Args:
+            question: 사용자 질문
+            reference_answers: (답변, 유사도) 튜플 리스트 (유사도 내림차순, 없으면 폴백 프롬프트)
+
+        Returns:
+            RouteDecision
+        """
+        if not self.enabled:
+            return RouteDecision(self.large, "라우팅 꺼짐")
+        category = reference_answers[0][0].get('category') if reference_answers else None
+        reason = self.sensitive_reason(question, category)
+        if reason is not None:
+            return RouteDecision(self.large, reason)
+        if not reference_answers:
+            return RouteDecision(self.large, "참고 답변 없음")
+        if self.fast_threshold is None:
+            return RouteDecision(self.large, "유사도 기준 없음")
+        score = reference_answers[0][1]
+        if score < self.fast_threshold:
+            return RouteDecision(self.large, f"유사도 {score:.0%} < {self.fast_threshold:.0%}")
+        return RouteDecision(self.fast, f"유사도 {score:.0%}")
+
+    def sensitive_reason(self, question: str, category: Optional[str] = None) -> Optional[str]:
+        """
+        질문에 위기 / 민감 표현이 있거나 카테고리가 민감하면 그 이유, 아니면 None (라우팅을 꺼도 같은 기준)
+
+        Args:
+            question: 사용자 질문
+            category: 가장 유사한 참고 답변의 카테고리
+        """
+        compact = "".join(question.split())
+        keyword = next((k for k in SENSITIVE_KEYWORDS if k in compact), None)
+        if keyword is not None:
+            return f"민감 표현 '{keyword}'"
+        if category in self.sensitive_categories:
+            return f"민감 카테고리 '{category}'"
+        return None
+
+    def record(self, decision: RouteDecision, seconds: float):
+        """요청 하나의 경로와 지연 시간 기록"""
+        self.stats.record(decision, seconds)
+        print(f"[OK] 모델 라우팅: {decision.route.name} ({decision.reason}) -> "
+              f"{decision.route.model}, {seconds:.2f}초")
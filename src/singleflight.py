@@ -0,0 +1,82 @@
+"""
+요청 병합(single-flight) 모듈
+같은 작업이 이미 진행 중이면 새로 실행하지 않고 진행 중인 작업의 결과를 함께 기다리는 기능 (asyncio)
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+@dataclass
+class FlightStats:
+    """요청 병합 카운터"""
+    executed: int = 0  # 실제로 실행한 작업 수
+    shared: int = 0  # 진행 중인 작업에 합류한 요청 수
+
+    def summary(self) -> str:
+        return f"실행 {self.executed}회 | 병합 {self.shared}회"
+
+
+def _consume_exception(future: asyncio.Future):
+    """기다리는 요청이 없어도 '예외를 꺼내지 않음' 경고가 나지 않도록 예외를 확인 처리"""
+    if not future.cancelled():
+        future.exception()
+
+
+class AsyncSingleFlight:
+    """
+    키별 요청 병합 (한 이벤트 루프 안에서 사용)
+
+    같은 키의 작업이 진행 중이면 그 Future를 함께 기다리고, 작업이 끝나면 키를 지워 다음 요청은 새로 실행합니다.
+    예외도 기다리던 모든 요청에 전달됩니다. 먼저 요청한 쪽이 취소되어도 작업은 계속되어 나머지 요청이 결과를 받습니다.
+    """
+
+    def __init__(self):
+        """초기화"""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = FlightStats()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable]) -> Any:
+        """
+        키가 같은 작업은 한 번만 실행
+
+        Args:
+            key: 작업 키
+            factory: 실행할 코루틴을 만드는 함수 (진행 중인 작업이 없을 때만 호출)
+
+        Returns:
+            작업 결과
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.stats.shared += 1
+        else:
+            future = asyncio.ensure_future(factory())
+            self._register(key, future)
+        return await asyncio.shield(future)
+
+    def lead(self, key: Hashable) -> Tuple[asyncio.Future, bool]:
+        """
+        결과를 직접 만들어 알려야 하는 작업(스트리밍 등)용 병합
+
+        진행 중인 작업이 없으면 새 Future를 등록하여 (Future, True)를 반환하며,
+        호출한 쪽이 set_result / set_exception으로 반드시 완료해야 합니다.
+        진행 중인 작업이 있으면 (그 Future, False)를 반환합니다.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.stats.shared += 1
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        self._register(key, future)
+        return future, True
+
+    def _register(self, key: Hashable, future: asyncio.Future):
+        self.stats.executed += 1
+        self._calls[key] = future
+        future.add_done_callback(lambda f: self._calls.pop(key, None) if self._calls.get(key) is f else None)
+        future.add_done_callback(_consume_exception)
@@ -0,0 +1,88 @@
+"""
+템플릿 답변 모듈
+질문이 준비된 답변과 거의 같으면 LLM을 부르지 않고 그 답변을 간단한 템플릿으로 다듬어 바로 반환
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from config import TEMPLATE_ANSWER_THRESHOLD
+from routing import ModelRouter
+
+# 카테고리별 첫 공감 문장 ({topic}: 질문에 나온 답변 키워드, 없으면 카테고리)
+CATEGORY_OPENINGS = {
+    "연애": "{topic} 때문에 마음이 많이 복잡하셨겠어요.",
+    "진로": "{topic} 고민으로 앞날이 막막하게 느껴지셨을 것 같아요.",
+    "가족": "가까운 사이일수록 {topic} 문제는 더 마음이 아프죠.",
+    "대인관계": "{topic} 문제로 마음 쓰이는 날이 많으셨을 것 같아요.",
+    "학업": "{topic} 때문에 많이 지치셨을 것 같아요.",
+    "스트레스": "{topic} 때문에 많이 힘드셨겠어요.",
+    "직장": "{topic} 문제로 하루하루가 무겁게 느껴지셨을 것 같아요.",
+    "불안": "{topic} 때문에 마음 편할 날이 없으셨겠어요.",
+    "자존감": "{topic} 때문에 스스로가 작게 느껴지셨을 것 같아요.",
+}
+DEFAULT_OPENING = "{topic} 고민을 털어놓아 주셔서 고마워요."
+CLOSING = "더 자세한 이야기가 필요하면 상황을 조금 더 들려주세요. 함께 고민해 볼게요."
+
+# 핵심 포인트 끝의 문장 부호 (정리 문장 안에서 이어 쓰므로 제거)
+TRAILING_PUNCTUATION = re.compile(r"[\s.,!?~…。]+$")
+
+
+def _topic(question: str, answer: Dict) -> str:
+    """질문에 나온 답변 키워드 중 가장 긴 것 (없으면 카테고리)"""
+    found = [k for k in answer.get('keywords', []) if k in question]
+    return max(found, key=len) if found else answer['category']
+
+
+def render_template_answer(question: str, answer: Dict) -> str:
+    """
+    준비된 답변을 질문에 맞춘 공감 문장 + 본문 + 핵심 포인트 정리 + 마무리로 구성
+
+    Args:
+        question: 사용자 질문
+        answer: 가장 유사한 답변
+
+    Returns:
+        답변 텍스트
+    """
+    topic = _topic(question, answer)
+    opening = CATEGORY_OPENINGS.get(answer['category'], DEFAULT_OPENING).format(topic=topic)
+    parts = [opening, answer['content'].strip()]
+    # 핵심 포인트는 명사구일 수도 문장일 수도 있어 조사 없이 나열
+    key_points = [p for p in (TRAILING_PUNCTUATION.sub("", point) for point in answer.get('key_points') or []) if p]
+    if key_points:
+        parts.append(f"오늘 이야기의 핵심을 정리하면 다음과 같아요: {', '.join(key_points)}.")
+    parts.append(CLOSING)
+    return "\n\n".join(parts)
+
+
+def template_answer(
+    question: str,
+    matches: List[Tuple[Dict, float]],
+    threshold: Optional[float] = TEMPLATE_ANSWER_THRESHOLD,
+    router: Optional[ModelRouter] = None
+) -> Optional[str]:
+    """
+    LLM 없이 바로 줄 수 있는 템플릿 답변
+
+    가장 유사한 답변의 유사도가 threshold 이상이고, 질문과 카테고리가 민감하지 않을 때만 만듭니다
+    (민감 여부는 모델 라우팅과 같은 기준).
+
+    Args:
+        question: 사용자 질문
+        matches: (답변, 유사도) 튜플 리스트 (유사도 내림차순)
+        threshold: 템플릿 답변을 쓸 최소 유사도 (검색기 점수 척도 기준, None / 0 이하이면 쓰지 않음,
+            AnswerMatcher.template_threshold 참고)
+        router: 민감 여부를 판단할 모델 라우터 (None이면 설정값)
+
+    Returns:
+        답변 텍스트 (조건에 맞지 않으면 None)
+    """
+    if threshold is None or threshold <= 0 or not matches:
+        return None
+    answer, score = matches[0]
+    if score < threshold:
+        return None
+    if (router or ModelRouter()).sensitive_reason(question, answer.get('category')) is not None:
+        return None
+    return render_template_answer(question, answer)
@@ -1,29 +1,314 @@
 """
 TTS (Text-to-Speech) 모듈
-텍스트 답변을 음성으로 변환
+텍스트 답변을 음성으로 변환 (문장 단위로 나누어 동시에 변환하고 순서대로 이어 붙임, 합성 엔진은 tts_engines 참고)
 """
 
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from gtts import gTTS
+from typing import Dict, Iterator, List, Optional
 
-from config import TTS_LANGUAGE, TTS_SLOW, OUTPUT_DIR
+from audio_cache import AudioCache, audio_key
+from config import TTS_CHUNK_CHARS, TTS_LANGUAGE, TTS_MAX_WORKERS, TTS_SLOW, OUTPUT_DIR
+from tts_engines import SpeechEngine, load_speech_engine
+
+# 문장 끝 (마침표/물음표/느낌표/말줄임표 + 닫는 따옴표/괄호, 뒤에 공백이 와야 끝난 문장) 또는 줄바꿈
+_SENTENCE_END = re.compile(r'[.?!…。]+["\'”’)\]]*(?=\s)|\n')
+
+
+def _sentence_end(text: str) -> int:
+    """마지막으로 끝난 문장의 끝 위치 (끝난 문장이 없으면 0)"""
+    end = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.end()
+    return end
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장 단위로 나누기"""
+    sentences, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        sentences.append(text[start:match.end()])
+        start = match.end()
+    sentences.append(text[start:])
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def split_tts_chunks(text: str, max_chars: int = TTS_CHUNK_CHARS) -> List[str]:
+    """
+    음성 변환 단위로 나누기
+
+    첫 문장은 혼자 한 조각으로 두어 첫 음성이 가장 빨리 나오게 하고,
+    나머지는 문장 경계를 지키며 max_chars를 넘지 않도록 이어 붙입니다 (한 문장이 더 길면 그대로 한 조각).
+
+    Args:
+        text: 변환할 텍스트
+        max_chars: 조각 하나의 최대 글자 수
+
+    Returns:
+        조각 리스트 (이어 붙이면 공백을 빼고 원래 텍스트와 같음)
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    chunks = [sentences[0]]
+    current = ""
+    for sentence in sentences[1:]:
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SpeechStream:
+    """
+    스트리밍으로 생성되는 답변의 음성 변환
+
+    feed()로 답변 조각을 받는 대로 완성된 문장을 변환하기 시작하므로, 답변 생성이 끝나기 전에
+    앞부분 음성이 준비됩니다. 첫 조각은 첫 문장이 끝나자마자, 이후 조각은 max_chars의 절반 이상 모이면 제출합니다.
+    음성 파일 캐시가 있으면 조각마다 캐시를 거치므로 같은 답변을 다시 스트리밍해도 변환하지 않습니다.
+    """
+
+    def __init__(self, tts: "TextToSpeech"):
+        """
+        초기화
+
+        Args:
+            tts: 변환에 쓸 TextToSpeech (스레드 풀 공유)
+        """
+        self.tts = tts
+        self.text = ""  # 지금까지 받은 전체 텍스트
+        self._pending = ""  # 아직 제출하지 않은 텍스트
+        self._futures: List[Future] = []
+        self._next = 0  # 다음에 꺼낼 조각 번호
+        self._closed = False
+
+    def feed(self, delta: str):
+        """답변 조각 추가 (완성된 문장이 충분히 모이면 변환 시작)"""
+        self.text += delta
+        self._pending += delta
+        end = _sentence_end(self._pending)
+        complete = self._pending[:end].strip()
+        if complete and (not self._futures or len(complete) >= self.tts.chunk_chars // 2):
+            self._submit(complete)
+            self._pending = self._pending[end:]
+
+    def close(self):
+        """남은 텍스트 제출 (답변 생성이 끝났을 때)"""
+        if not self._closed:
+            self._closed = True
+            if self._pending.strip():
+                self._submit(self._pending.strip())
+            self._pending = ""
+
+    def _submit(self, text: str):
+        for chunk in split_tts_chunks(text, self.tts.chunk_chars):
+            self._futures.append(self.tts.submit_cached(chunk))
+
+    def _take(self) -> bytes:
+        data = self._futures[self._next].result()
+        self._next += 1
+        return data if self._next == 1 else self.tts.engine.continuation(data)
+
+    def ready(self) -> Iterator[bytes]:
+        """이미 변환이 끝난 조각을 순서대로 반환 (기다리지 않음)"""
+        while self._next < len(self._futures) and self._futures[self._next].done():
+            yield self._take()
+
+    def chunks(self) -> Iterator[bytes]:
+        """남은 조각을 순서대로 반환 (close 후 모든 조각이 끝날 때까지 기다림)"""
+        self.close()
+        while self._next < len(self._futures):
+            yield self._take()
+
+    def audio(self) -> bytes:
+        """전체 음성 (모든 조각을 이어 붙인 음성)"""
+        self.close()
+        engine = self.tts.engine
+        return engine.join([
+            data if i == 0 else engine.continuation(data) for i, data in enumerate(f.result() for f in self._futures)
+        ])
+
+    def save(self, filename: str = "answer") -> Path:
+        """
+        전체 음성을 파일로 저장
+
+        음성 파일 캐시가 있으면 전체 텍스트의 캐시 키로 저장하므로, 같은 답변은 generate_answer_audio에서 적중합니다.
+
+        Args:
+            filename: 파일명 (확장자 제외, 캐시가 없을 때만 사용)
+
+        Returns:
+            저장된 파일 경로
+        """
+        audio = self.audio()
+        cache = self.tts.cache
+        if cache is None:
+            output_path = OUTPUT_DIR / f"{filename}.{self.tts.engine.format}"
+            output_path.write_bytes(audio)
+            return output_path
+        key = self.tts.cache_key(self.text.strip())
+        return cache.get(key) or cache.store(key, lambda tmp_path: Path(tmp_path).write_bytes(audio))
+
+    def persist(self, output_path: Optional[Path] = None) -> Future:
+        """전체 음성을 백그라운드에서 캐시(와 output_path)에 저장 (TextToSpeech.persist 참고)"""
+        return self.tts.persist(self.audio(), self.text.strip(), output_path)
+
+    def cancel(self):
+        """시작하지 않은 변환 취소"""
+        for future in self._futures[self._next:]:
+            future.cancel()
 
 
 class TextToSpeech:
-    """TTS 변환 클래스"""
+    """
+    TTS 변환 클래스
+
+    답변을 문장 단위 조각으로 나누어 스레드 풀에서 동시에 변환하고 순서대로 이어 붙입니다.
+    음성 파일 캐시가 있으면 같은 텍스트(+ 언어, 속도, 합성 엔진)는 한 번만 변환하고 캐시된 파일을 다시 씁니다.
+    합성 엔진(gTTS / 로컬 엔진)과 출력 형식은 engine이 정하며, 로컬 엔진의 모델은 엔진을 만들 때 한 번만 불러옵니다.
+    """
 
-    def __init__(self, language: str = TTS_LANGUAGE, slow: bool = TTS_SLOW):
+    def __init__(
+        self,
+        language: str = TTS_LANGUAGE,
+        slow: bool = TTS_SLOW,
+        cache: Optional[AudioCache] = None,
+        max_workers: int = TTS_MAX_WORKERS,
+        chunk_chars: int = TTS_CHUNK_CHARS,
+        engine: Optional[SpeechEngine] = None
+    ):
         """
         초기화
 
         Args:
             language: 언어 코드 (기본: 한국어 'ko')
             slow: 느린 속도 여부
+            cache: 음성 파일 캐시 (None이면 매번 변환하여 OUTPUT_DIR에 저장)
+            max_workers: 동시에 변환할 최대 조각 수
+            chunk_chars: 조각 하나의 최대 글자 수
+            engine: 음성 합성 엔진 (None이면 config의 TTS_ENGINE / TTS_FORMAT으로 생성)
         """
+        self.engine = engine or load_speech_engine()
         self.language = language
         self.slow = slow
+        self.cache = cache
+        self.chunk_chars = chunk_chars
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._sink = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-sink")  # 음성 파일 저장용
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}  # 변환 중인 조각의 캐시 키 -> Future (submit_cached)
+        self.chunks_synthesized = 0  # 변환한 조각 수
         print("[OK] TTS 모듈 초기화 완료")
 
+    def synthesize_chunk(self, text: str) -> bytes:
+        """
+        텍스트 조각 하나를 음성 바이트로 변환 (합성 엔진)
+
+        Args:
+            text: 변환할 텍스트 조각
+
+        Returns:
+            engine.format 형식의 음성 바이트
+        """
+        return self.engine.synthesize(text, self.language, self.slow)
+
+    def submit(self, chunk: str) -> Future:
+        """조각 하나의 변환을 스레드 풀에 제출"""
+        def run() -> bytes:
+            data = self.synthesize_chunk(chunk)
+            with self._lock:
+                self.chunks_synthesized += 1
+            return data
+        return self._executor.submit(run)
+
+    def submit_cached(self, chunk: str) -> Future:
+        """
+        캐시를 거쳐 조각 하나의 변환을 제출 (스트리밍 답변용)
+
+        캐시에 있으면 변환하지 않고 캐시 파일을 읽으며, 새로 변환한 조각은 조각 키로 캐시에 저장합니다.
+        같은 조각이 이미 변환 중이면 새로 변환하지 않고 그 결과를 함께 기다립니다.
+        먼저 제출한 쪽이 시작 전에 취소하면 기다리던 쪽이 다시 제출합니다.
+        """
+        if self.cache is None:
+            return self.submit(chunk)
+        key = self.cache_key(chunk)
+        with self._lock:
+            shared = self._flights.get(key)
+            if shared is None:
+                future = self._executor.submit(self._synthesize_cached, chunk, key)
+                self._flights[key] = future
+        if shared is None:
+            future.add_done_callback(lambda f: self._end_flight(key, f))
+            return future
+
+        follower = Future()
+
+        def copy(source: Future):
+            if source.cancelled():
+                self.submit_cached(chunk).add_done_callback(copy)
+            elif follower.set_running_or_notify_cancel():
+                if source.exception() is not None:
+                    follower.set_exception(source.exception())
+                else:
+                    follower.set_result(source.result())
+        shared.add_done_callback(copy)
+        return follower
+
+    def _end_flight(self, key: str, future: Future):
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def _synthesize_cached(self, chunk: str, key: str) -> bytes:
+        """캐시에서 조각 음성을 읽거나, 없으면 변환해 캐시에 저장 (저장 실패는 경고만 출력)"""
+        path = self.cache.get(key)
+        if path is not None:
+            try:
+                return path.read_bytes()
+            except FileNotFoundError:  # 조회와 읽기 사이에 제거된 경우 다시 변환
+                pass
+        data = self.synthesize_chunk(chunk)
+        with self._lock:
+            self.chunks_synthesized += 1
+        try:
+            self.cache.store(key, lambda tmp_path: Path(tmp_path).write_bytes(data))
+        except Exception as e:
+            print(f"[WARN] 음성 조각 캐시 저장 실패: {e}")
+        return data
+
+    def iter_audio(self, text: str) -> Iterator[bytes]:
+        """
+        텍스트를 조각으로 나누어 동시에 변환하고, 음성을 순서대로 반환 (첫 조각은 준비되는 대로 바로)
+
+        Args:
+            text: 변환할 텍스트
+
+        Yields:
+            음성 바이트 조각 (첫 조각은 완전한 파일, 나머지는 engine.continuation을 거친 조각, engine.join으로 합침)
+        """
+        futures = [self.submit(chunk) for chunk in split_tts_chunks(text, self.chunk_chars)]
+        try:
+            for i, future in enumerate(futures):
+                data = future.result()
+                yield data if i == 0 else self.engine.continuation(data)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def open_stream(self) -> SpeechStream:
+        """스트리밍으로 생성되는 답변의 음성 변환 시작 (SpeechStream.feed로 답변 조각 전달)"""
+        return SpeechStream(self)
+
+    def cache_key(self, text: str) -> str:
+        """음성 파일 캐시 키 (텍스트 + 언어, 속도, 합성 엔진, 출력 형식)"""
+        return audio_key(text, self.language, self.slow, f"{self.engine.name}:{self.engine.format}")
+
     def text_to_speech(self, text: str, output_path: Path) -> Path:
         """
         텍스트를 음성 파일로 변환
@@ -36,13 +321,12 @@ class TextToSpeech:
             저장된 파일 경로
         """
         try:
-            # gTTS 객체 생성
-            tts = gTTS(text=text, lang=self.language, slow=self.slow)
+            audio = self.engine.join(list(self.iter_audio(text)))
 
             # 파일 저장
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            tts.save(str(output_path))
+            output_path.write_bytes(audio)
 
             print(f"[OK] 음성 파일 생성 완료: {output_path}")
             return output_path
@@ -51,20 +335,98 @@ class TextToSpeech:
             print(f"[ERROR] TTS 변환 오류: {e}")
             raise
 
+    def synthesize(self, text: str) -> Path:
+        """
+        캐시를 거쳐 텍스트를 음성 파일로 변환 (캐시된 음성이 있으면 변환하지 않음)
+
+        Args:
+            text: 변환할 텍스트
+
+        Returns:
+            캐시된 음성 파일 경로
+        """
+        if self.cache is None:
+            raise ValueError("음성 파일 캐시가 설정되지 않았습니다.")
+        key = self.cache_key(text)
+        path = self.cache.get(key)
+        if path is not None:
+            return path
+        return self.cache.store(key, lambda tmp_path: self.text_to_speech(text, tmp_path))
+
+    def synthesize_bytes(self, text: str, output_path: Optional[Path] = None) -> bytes:
+        """
+        텍스트를 메모리의 음성 바이트로 변환 (임시 파일 / 다시 읽기 없음)
+
+        캐시에 있으면 캐시 파일을 한 번 읽고, 없으면 조각을 동시에 변환해 BytesIO에 이어 붙인 뒤
+        캐시 저장은 백그라운드로 넘기므로 디스크 쓰기를 기다리지 않고 바로 반환합니다.
+
+        Args:
+            text: 변환할 텍스트
+            output_path: 지정하면 이 경로에도 백그라운드로 저장
+
+        Returns:
+            engine.format 형식의 음성 바이트
+        """
+        key = self.cache_key(text) if self.cache is not None else None
+        path = self.cache.get(key) if key is not None else None
+        if path is not None:
+            try:
+                audio = path.read_bytes()
+            except FileNotFoundError:  # 조회와 읽기 사이에 제거된 경우 다시 변환
+                pass
+            else:
+                if output_path is not None:
+                    self.persist(audio, output_path=output_path)
+                return audio
+
+        audio = self.engine.join(list(self.iter_audio(text)))
+        self.persist(audio, text if key is not None else None, output_path)
+        return audio
+
+    def persist(self, audio: bytes, text: Optional[str] = None, output_path: Optional[Path] = None) -> Future:
+        """
+        변환한 음성을 백그라운드에서 저장 (저장 실패는 경고만 출력)
+
+        Args:
+            audio: 음성 바이트
+            text: 지정하면 이 텍스트의 키로 음성 파일 캐시에 저장 (캐시가 없으면 무시)
+            output_path: 지정하면 이 경로에도 저장
+
+        Returns:
+            저장이 끝나면 완료되는 Future
+        """
+        def write():
+            try:
+                if text is not None and self.cache is not None:
+                    self.cache.store(self.cache_key(text), lambda tmp_path: Path(tmp_path).write_bytes(audio))
+                if output_path is not None:
+                    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                    Path(output_path).write_bytes(audio)
+            except Exception as e:
+                print(f"[WARN] 음성 파일 저장 실패: {e}")
+        return self._sink.submit(write)
+
     def generate_answer_audio(self, text: str, filename: str = "answer") -> Path:
         """
         답변 텍스트를 음성 파일로 변환 (편의 메서드)
 
         Args:
             text: 답변 텍스트
-            filename: 파일명 (확장자 제외)
+            filename: 파일명 (확장자 제외, 캐시가 있으면 쓰지 않고 캐시된 파일 경로를 반환)
 
         Returns:
             저장된 파일 경로
         """
-        output_path = OUTPUT_DIR / f"{filename}.mp3"
+        if self.cache is not None:
+            return self.synthesize(text)
+        output_path = OUTPUT_DIR / f"{filename}.{self.engine.format}"
         return self.text_to_speech(text, output_path)
 
+    def close(self):
+        """변환 스레드 풀 정리 (백그라운드 저장은 끝날 때까지 기다림)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._sink.shutdown(wait=True)
+
 
 def test_tts():
     """TTS 테스트 함수"""
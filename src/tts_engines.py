@@ -0,0 +1,298 @@
+"""
+음성 합성 엔진 모듈
+TextToSpeech가 쓰는 합성 엔진 (gTTS 온라인 / MeloTTS 한국어 신경망 CPU / espeak-ng 포먼트 오프라인)과
+출력 형식 (MP3 / OGG / WAV / raw PCM) 변환, 조각 이어 붙이기 기능
+"""
+
+import io
+import shutil
+import subprocess
+import threading
+import wave
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+
+from config import TTS_ENGINE, TTS_ESPEAK_VOICE, TTS_FORMAT, TTS_LANGUAGE
+
+# 출력 형식 -> MIME 타입
+AUDIO_FORMATS = {
+    "mp3": "audio/mpeg",
+    "ogg": "audio/ogg",
+    "wav": "audio/wav",
+    "pcm": "audio/L16",  # 16비트 little-endian 모노 (헤더 없음)
+}
+
+
+def check_format(audio_format: str) -> str:
+    """지원하는 출력 형식인지 확인"""
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"지원하지 않는 음성 형식입니다: {audio_format} (가능: {', '.join(AUDIO_FORMATS)})")
+    return audio_format
+
+
+def strip_id3(data: bytes) -> bytes:
+    """MP3 앞의 ID3v2 태그 제거 (조각을 이어 붙일 때 두 번째 조각부터 적용)"""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return data[10 + size + footer:]
+    return data
+
+
+def read_wav(data: bytes):
+    """WAV 바이트 -> (파라미터, PCM 프레임)"""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        return wav.getparams(), wav.readframes(wav.getnframes())
+
+
+def continuation(data: bytes, audio_format: str) -> bytes:
+    """
+    두 번째 조각부터 앞 조각 뒤에 이어 붙일 바이트
+
+    MP3는 ID3 태그를, WAV는 헤더를 떼고 프레임만 남깁니다.
+    OGG는 조각마다 독립된 스트림을 그대로 이어 붙입니다 (chained Ogg).
+    """
+    if audio_format == "mp3":
+        return strip_id3(data)
+    if audio_format == "wav":
+        return read_wav(data)[1]
+    return data
+
+
+def join_audio(parts: Sequence[bytes], audio_format: str) -> bytes:
+    """
+    첫 조각 + continuation()을 거친 나머지 조각을 하나의 음성으로 합치기 (WAV는 헤더의 길이를 다시 씀)
+
+    Args:
+        parts: 첫 조각은 그대로, 나머지는 continuation()을 거친 조각
+        audio_format: 출력 형식
+
+    Returns:
+        전체 음성 바이트
+    """
+    if audio_format != "wav" or len(parts) < 2:
+        return b"".join(parts)
+    params, frames = read_wav(parts[0])
+    return encode_wav(frames + b"".join(parts[1:]), params.framerate, params.nchannels, params.sampwidth)
+
+
+def encode_wav(pcm: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """PCM 프레임을 WAV로 감싸기"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def encode_pcm(pcm: bytes, sample_rate: int, audio_format: str) -> bytes:
+    """
+    16비트 모노 PCM을 출력 형식으로 변환
+
+    Args:
+        pcm: 16비트 little-endian 모노 PCM
+        sample_rate: 샘플링 레이트
+        audio_format: 출력 형식
+
+    Returns:
+        변환된 음성 바이트
+    """
+    if audio_format == "pcm":
+        return pcm
+    if audio_format == "wav":
+        return encode_wav(pcm, sample_rate)
+    try:
+        import soundfile
+    except ImportError as e:
+        raise ImportError(
+            f"{audio_format.upper()} 변환에는 soundfile이 필요합니다: pip install soundfile (또는 TTS_FORMAT=wav)"
+        ) from e
+
+    buffer = io.BytesIO()
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    if audio_format == "ogg":
+        soundfile.write(buffer, samples, sample_rate, format="OGG", subtype="VORBIS")
+    else:
+        soundfile.write(buffer, samples, sample_rate, format="MP3", subtype="MPEG_LAYER_III")
+    return buffer.getvalue()
+
+
+class SpeechEngine(ABC):
+    """
+    음성 합성 엔진 인터페이스
+
+    name과 format은 음성 파일 캐시 키에 들어가므로 엔진이나 형식이 바뀌면 값도 달라져야 합니다.
+    synthesize()는 여러 스레드에서 동시에 불릴 수 있습니다 (동시에 돌릴 수 없는 엔진은 안에서 잠금).
+    """
+
+    name: str
+    format: str = "mp3"
+    sample_rate: int = 0  # PCM 샘플링 레이트 (알 수 없으면 0)
+
+    @property
+    def mime_type(self) -> str:
+        return AUDIO_FORMATS[self.format]
+
+    @abstractmethod
+    def synthesize(self, text: str, language: str, slow: bool) -> bytes:
+        """
+        텍스트 조각 하나를 음성으로 변환
+
+        Args:
+            text: 변환할 텍스트 조각
+            language: 언어 코드
+            slow: 느린 속도 여부
+
+        Returns:
+            format 형식의 완전한 음성 바이트
+        """
+
+    def continuation(self, data: bytes) -> bytes:
+        return continuation(data, self.format)
+
+    def join(self, parts: Sequence[bytes]) -> bytes:
+        return join_audio(parts, self.format)
+
+
+class GttsEngine(SpeechEngine):
+    """Google Text-to-Speech (온라인, 요청마다 네트워크 왕복, MP3만 지원)"""
+
+    name = "gtts"
+
+    def __init__(self, audio_format: str = "mp3"):
+        """
+        초기화
+
+        Args:
+            audio_format: 출력 형식 (mp3만 가능)
+        """
+        if check_format(audio_format) != "mp3":
+            raise ValueError("gTTS는 MP3만 지원합니다. 다른 형식은 TTS_ENGINE=melo 또는 espeak를 사용하세요.")
+        from gtts import gTTS
+        self._gtts = gTTS
+
+    def synthesize(self, text: str, language: str, slow: bool) -> bytes:
+        buffer = io.BytesIO()
+        self._gtts(text=text, lang=language, slow=slow).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class PcmEngine(SpeechEngine):
+    """PCM을 만드는 로컬 엔진 (출력 형식 변환은 공통 처리)"""
+
+    def __init__(self, audio_format: str):
+        self.format = check_format(audio_format)
+
+    @abstractmethod
+    def synthesize_pcm(self, text: str, language: str, slow: bool) -> bytes:
+        """텍스트 조각 하나를 16비트 모노 PCM(sample_rate)으로 변환"""
+
+    def synthesize(self, text: str, language: str, slow: bool) -> bytes:
+        return encode_pcm(self.synthesize_pcm(text, language, slow), self.sample_rate, self.format)
+
+
+class MeloEngine(PcmEngine):
+    """
+    MeloTTS 한국어 신경망 음성 합성 (CPU, 오프라인)
+
+    모델은 생성할 때 한 번 불러오고 짧은 문장으로 미리 한 번 돌려 두어, 첫 요청부터 데운 상태로 씁니다.
+    모델은 동시에 돌릴 수 없으므로 합성은 잠금으로 직렬화합니다 (PyTorch가 내부에서 여러 코어를 사용).
+    """
+
+    # 언어 코드 -> MeloTTS 언어
+    LANGUAGES = {"ko": "KR", "en": "EN", "ja": "JP", "zh": "ZH", "es": "ES", "fr": "FR"}
+
+    def __init__(self, language: str = TTS_LANGUAGE, audio_format: str = "wav", warmup: bool = True):
+        """
+        초기화
+
+        Args:
+            language: 언어 코드 (모델은 언어마다 따로 불러옴)
+            audio_format: 출력 형식
+            warmup: 생성할 때 한 번 합성해 모델을 데울지 여부
+        """
+        super().__init__(audio_format)
+        if language not in self.LANGUAGES:
+            raise ValueError(f"MeloTTS가 지원하지 않는 언어입니다: {language}")
+        try:
+            from melo.api import TTS
+        except ImportError as e:
+            raise ImportError(
+                "MeloTTS 음성 합성에는 melo가 필요합니다: pip install git+https://github.com/myshell-ai/MeloTTS.git"
+            ) from e
+
+        self.language = language
+        self.model = TTS(language=self.LANGUAGES[language], device="cpu")
+        self.speaker_id = next(iter(self.model.hps.data.spk2id.values()))
+        self.sample_rate = self.model.hps.data.sampling_rate
+        self.name = f"melo:{self.LANGUAGES[language]}"
+        self._lock = threading.Lock()
+        if warmup:
+            self.synthesize_pcm("안녕하세요." if language == "ko" else "Hello.", language, False)
+
+    def synthesize_pcm(self, text: str, language: str, slow: bool) -> bytes:
+        if language != self.language:
+            raise ValueError(f"MeloTTS 모델 언어({self.language})와 요청 언어({language})가 다릅니다.")
+        with self._lock:
+            audio = self.model.tts_to_file(text, self.speaker_id, None, speed=0.8 if slow else 1.0, quiet=True)
+        return (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+
+class EspeakEngine(PcmEngine):
+    """
+    espeak-ng 포먼트 음성 합성 (CPU, 오프라인, 한국어 포함 100개 이상 언어)
+
+    불러올 모델이 없어 프로세스 시작 비용만 있고, 조각마다 별도 프로세스라 스레드 풀에서 그대로 동시에 돕니다.
+    음질은 신경망 엔진보다 기계적이지만 가장 가볍습니다.
+    """
+
+    def __init__(self, audio_format: str = "wav", voice: str = TTS_ESPEAK_VOICE, executable: str = "espeak-ng"):
+        """
+        초기화
+
+        Args:
+            audio_format: 출력 형식
+            voice: espeak-ng 음성 (비우면 언어 코드 사용)
+            executable: espeak-ng 실행 파일
+        """
+        super().__init__(audio_format)
+        path = shutil.which(executable)
+        if path is None:
+            raise ImportError("espeak 음성 합성에는 espeak-ng가 필요합니다: apt install espeak-ng")
+        self.executable = path
+        self.voice = voice
+        self.name = f"espeak:{voice}" if voice else "espeak"
+        self.sample_rate = read_wav(self._run("가", TTS_LANGUAGE, False))[0].framerate
+
+    def _run(self, text: str, language: str, slow: bool) -> bytes:
+        result = subprocess.run(
+            [self.executable, "--stdout", "-v", self.voice or language, "-s", "120" if slow else "175"],
+            input=text.encode('utf-8'), capture_output=True, check=True
+        )
+        return result.stdout
+
+    def synthesize_pcm(self, text: str, language: str, slow: bool) -> bytes:
+        return read_wav(self._run(text, language, slow))[1]
+
+
+ENGINES = {"gtts": GttsEngine, "melo": MeloEngine, "espeak": EspeakEngine}
+
+
+def load_speech_engine(name: str = TTS_ENGINE, audio_format: str = TTS_FORMAT) -> SpeechEngine:
+    """
+    config 설정에 맞는 음성 합성 엔진 생성 (로컬 모델은 여기서 한 번 불러와 데움)
+
+    Args:
+        name: "gtts", "melo" 또는 "espeak"
+        audio_format: 출력 형식 ("mp3", "ogg", "wav", "pcm")
+
+    Returns:
+        SpeechEngine
+    """
+    if name not in ENGINES:
+        raise ValueError(f"알 수 없는 음성 합성 엔진입니다: {name} (가능: {', '.join(ENGINES)})")
+    return ENGINES[name](audio_format=audio_format)
@@ -0,0 +1,289 @@
+"""
+음성 변환 작업 대기열 모듈
+답변 텍스트는 바로 돌려주고 음성 변환은 작업 ID가 있는 백그라운드 작업으로 처리 (스레드 풀 또는 선택적 프로세스 풀)하며,
+대기열 길이 / 작업자 사용률 / 작업 지연 시간을 지표로 제공
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import TTS_JOB_HISTORY, TTS_JOB_PROCESSES, TTS_JOB_WORKERS
+from tts import SpeechStream, TextToSpeech
+from tts_engines import ENGINES, load_speech_engine
+
+# 작업 상태
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass
+class TTSJob:
+    """음성 변환 작업 하나"""
+    job_id: str
+    text: str
+    output_path: Optional[Path] = None  # 지정하면 음성 파일도 저장
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    audio: Optional[bytes] = None  # 변환된 음성 바이트 (완료 후)
+    error: Optional[Exception] = None
+    future: Future = field(default_factory=Future, repr=False, compare=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def path(self) -> Optional[Path]:
+        """저장된 음성 파일 경로 (output_path를 지정하고 완료된 경우)"""
+        return self.output_path if self.status == DONE else None
+
+    @property
+    def latency(self) -> Optional[float]:
+        """제출부터 완료까지 걸린 시간(초)"""
+        return self.finished_at - self.submitted_at if self.finished_at is not None else None
+
+
+@dataclass
+class TTSJobStats:
+    """대기열 길이, 작업자 사용률, 작업 지연 시간"""
+    workers: int
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    latencies: List[float] = field(default_factory=list)  # 제출 -> 완료 (초)
+    waits: List[float] = field(default_factory=list)  # 제출 -> 시작 (대기열에서 기다린 시간, 초)
+    busy_seconds: float = 0.0  # 끝난 작업들이 작업자를 점유한 시간 합
+    created_at: float = field(default_factory=time.monotonic)
+    _running: Dict[str, float] = field(default_factory=dict)  # 실행 중인 작업 ID -> 시작 시각
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def record_start(self, job: TTSJob):
+        with self._lock:
+            self._running[job.job_id] = job.started_at
+            self.waits.append(job.started_at - job.submitted_at)
+
+    def record_finish(self, job: TTSJob):
+        with self._lock:
+            started = self._running.pop(job.job_id, None)
+            if started is not None:
+                self.busy_seconds += job.finished_at - started
+            self.latencies.append(job.latency)
+            if job.status == DONE:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def queue_depth(self) -> int:
+        """시작을 기다리는 작업 수"""
+        return self.submitted - self.completed - self.failed - self.running
+
+    @property
+    def utilization(self) -> float:
+        """생성 후 작업자가 일한 시간의 비율 (실행 중인 작업 포함)"""
+        now = time.monotonic()
+        with self._lock:
+            busy = self.busy_seconds + sum(now - started for started in self._running.values())
+        elapsed = now - self.created_at
+        return busy / (self.workers * elapsed) if elapsed > 0 else 0.0
+
+    def percentile(self, q: float, waits: bool = False) -> float:
+        """작업 지연 시간(waits=True면 대기 시간) 백분위수(초, 기록이 없으면 0)"""
+        values = self.waits if waits else self.latencies
+        return float(np.percentile(values, q)) if values else 0.0
+
+    def summary(self) -> str:
+        return (f"대기 {self.queue_depth} | 실행 {self.running}/{self.workers} | 사용률 {self.utilization:.0%} "
+                f"| 완료 {self.completed} / 실패 {self.failed} "
+                f"| 지연 p50 {self.percentile(50):.2f}초, p95 {self.percentile(95):.2f}초 (대기 p50 {self.percentile(50, True):.2f}초)")
+
+
+# 프로세스 풀 작업자마다 한 번 만들어 계속 쓰는 TextToSpeech (모델을 데운 상태로 유지)
+_process_tts: Optional[TextToSpeech] = None
+
+
+def _init_process(engine: str, audio_format: str, language: str, slow: bool, chunk_chars: int):
+    """프로세스 풀 작업자 초기화 (합성 엔진을 한 번 불러옴, 캐시는 부모 프로세스가 관리)"""
+    global _process_tts
+    _process_tts = TextToSpeech(language=language, slow=slow, chunk_chars=chunk_chars,
+                                engine=load_speech_engine(engine, audio_format))
+
+
+def _synthesize_in_process(text: str) -> bytes:
+    """프로세스 풀 작업자에서 텍스트를 음성 바이트로 변환"""
+    return _process_tts.engine.join(list(_process_tts.iter_audio(text)))
+
+
+class TTSJobQueue:
+    """
+    백그라운드 음성 변환 작업 대기열
+
+    submit()은 작업 ID를 바로 돌려주고, 변환은 작업자 스레드에서 진행됩니다.
+    결과는 get()으로 확인(폴링)하거나 wait()으로 기다리거나 subscribe()로 완료 콜백을 받습니다.
+    use_processes=True면 합성 자체는 프로세스 풀에서 하고 (GIL을 잡는 로컬 엔진용, 작업자마다 엔진을 한 번 불러옴),
+    캐시 조회와 파일 저장은 이 프로세스에서 합니다.
+    끝난 작업은 최근 history개만 남깁니다.
+    """
+
+    def __init__(
+        self,
+        tts: TextToSpeech,
+        max_workers: int = TTS_JOB_WORKERS,
+        use_processes: bool = TTS_JOB_PROCESSES,
+        history: int = TTS_JOB_HISTORY
+    ):
+        """
+        초기화
+
+        Args:
+            tts: 음성 변환에 쓸 TextToSpeech
+            max_workers: 동시에 실행할 작업 수
+            use_processes: True면 합성을 프로세스 풀에서 실행 (config의 합성 엔진만 가능)
+            history: 결과를 남겨 둘 끝난 작업 수
+        """
+        self.tts = tts
+        self.max_workers = max_workers
+        self.history = history
+        self.stats = TTSJobStats(workers=max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-job")
+        self._processes = None
+        if use_processes:
+            engine = next((name for name, cls in ENGINES.items() if type(tts.engine) is cls), None)
+            if engine is None:
+                raise ValueError(f"프로세스 풀에서는 기본 합성 엔진만 쓸 수 있습니다: {tts.engine.name}")
+            self._processes = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_process,
+                initargs=(engine, tts.engine.format, tts.language, tts.slow, tts.chunk_chars)
+            )
+        self._jobs: "OrderedDict[str, TTSJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, text: str, output_path: Optional[Path] = None, speech: Optional[SpeechStream] = None) -> str:
+        """
+        음성 변환 작업 제출 (기다리지 않고 작업 ID 반환)
+
+        Args:
+            text: 변환할 텍스트
+            output_path: 지정하면 음성 파일로도 저장 (작업이 끝나면 파일이 있음)
+            speech: 답변 생성과 함께 이미 변환을 시작한 SpeechStream (있으면 남은 조각만 기다림)
+
+        Returns:
+            작업 ID
+        """
+        job = TTSJob(uuid.uuid4().hex[:12], text, Path(output_path) if output_path is not None else None)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim()
+        self.stats.record_submit()
+        self._executor.submit(self._run, job, speech).add_done_callback(
+            lambda run: self._cancelled(job) if run.cancelled() else None
+        )
+        return job.job_id
+
+    def _cancelled(self, job: TTSJob):
+        """close(wait=False)로 시작 전에 취소된 작업을 실패로 완료"""
+        job.finished_at = time.monotonic()
+        job.error = CancelledError()
+        job.status = FAILED
+        self.stats.record_finish(job)
+        job.future.set_exception(job.error)
+
+    def _trim(self):
+        """끝난 작업이 history개를 넘으면 오래된 것부터 삭제"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: TTSJob, speech: Optional[SpeechStream]):
+        job.started_at = time.monotonic()
+        job.status = RUNNING
+        self.stats.record_start(job)
+        try:
+            if speech is not None:
+                job.audio = speech.audio()
+                speech.persist(job.output_path).result()
+            elif self._processes is not None:
+                job.audio = self._process_audio(job.text)
+                self.tts.persist(job.audio, None, job.output_path).result()
+            else:
+                job.audio = self.tts.synthesize_bytes(job.text)
+                if job.output_path is not None:
+                    self.tts.persist(job.audio, output_path=job.output_path).result()
+            job.status = DONE
+        except Exception as e:
+            print(f"[ERROR] 음성 변환 작업 실패 ({job.job_id}): {e}")
+            job.error = e
+            job.status = FAILED
+        finally:
+            job.finished_at = time.monotonic()
+            self.stats.record_finish(job)
+        if job.error is not None:
+            job.future.set_exception(job.error)
+        else:
+            job.future.set_result(job)
+
+    def _process_audio(self, text: str) -> bytes:
+        """캐시에 있으면 읽고, 없으면 프로세스 풀에서 변환한 뒤 캐시 저장"""
+        cache = self.tts.cache
+        key = self.tts.cache_key(text) if cache is not None else None
+        path = cache.get(key) if key is not None else None
+        if path is not None:
+            try:
+                return path.read_bytes()
+            except FileNotFoundError:
+                pass
+        audio = self._processes.submit(_synthesize_in_process, text).result()
+        if key is not None:
+            self.tts.persist(audio, text).result()
+        return audio
+
+    def get(self, job_id: str) -> TTSJob:
+        """작업 상태 조회 (기다리지 않음, 모르는 작업 ID면 KeyError)"""
+        with self._lock:
+            return self._jobs[job_id]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> TTSJob:
+        """
+        작업이 끝날 때까지 기다림
+
+        Args:
+            job_id: 작업 ID
+            timeout: 최대 대기 시간(초, 넘으면 concurrent.futures.TimeoutError)
+
+        Returns:
+            완료된 작업 (실패한 작업이면 그 예외를 다시 발생)
+        """
+        return self.get(job_id).future.result(timeout)
+
+    def subscribe(self, job_id: str, callback: Callable[[TTSJob], object]):
+        """작업이 끝나면 callback(job) 호출 (이미 끝났으면 바로 호출)"""
+        job = self.get(job_id)
+        job.future.add_done_callback(lambda _: callback(job))
+
+    def pending(self) -> List[TTSJob]:
+        """아직 끝나지 않은 작업 (제출 순)"""
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done]
+
+    def close(self, wait: bool = True):
+        """작업자 정리 (wait=True면 남은 작업이 끝날 때까지 기다림)"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=not wait)
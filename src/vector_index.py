@@ -0,0 +1,213 @@
+"""
+벡터 검색 모듈
+L2 정규화된 임베딩 행렬에서 내적(코사인 유사도)이 큰 상위 k개를 찾는 인덱스
+(전체 내적 / hnswlib HNSW 근사 검색)
+"""
+
+import threading
+from typing import List, Tuple
+
+import numpy as np
+
+from ranking import select_top_k
+
+# 전체 내적 시 한 번에 float32로 변환해 계산할 답변 수 (float16 행렬의 임시 메모리 제한)
+SCORE_BLOCK_SIZE = 65536
+
+SearchResult = Tuple[np.ndarray, np.ndarray]
+
+
+class BruteForceVectorIndex:
+    """모든 답변 임베딩과 내적하는 정확한 검색 (불변)"""
+
+    def __init__(self, embeddings: np.ndarray):
+        """
+        초기화
+
+        Args:
+            embeddings: (답변 수 x 차원) 임베딩, float16/float32, 메모리 매핑 배열도 가능
+        """
+        self.embeddings = embeddings
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def score(self, queries: np.ndarray) -> np.ndarray:
+        """
+        질문 임베딩과 모든 답변의 내적 계산
+
+        Args:
+            queries: (질문 수 x 차원) float32 배열
+
+        Returns:
+            (질문 수 x 답변 수) 유사도 배열
+        """
+        embeddings = self.embeddings
+        if embeddings.dtype == np.float32:
+            return queries @ embeddings.T
+
+        # float16 행렬곱은 느리므로 블록 단위로 float32로 변환해 계산
+        scores = np.empty((queries.shape[0], embeddings.shape[0]), dtype=np.float32)
+        for start in range(0, embeddings.shape[0], SCORE_BLOCK_SIZE):
+            block = np.asarray(embeddings[start:start + SCORE_BLOCK_SIZE], dtype=np.float32)
+            scores[:, start:start + block.shape[0]] = queries @ block.T
+        return scores
+
+    def search(self, queries: np.ndarray, top_k: int, threshold: float) -> List[SearchResult]:
+        """
+        질문마다 임계값 이상 상위 k개 답변 검색
+
+        Returns:
+            질문 순서대로 (답변 인덱스, 유사도) 배열 튜플 리스트
+        """
+        results = []
+        for row in self.score(queries):
+            top = select_top_k(row, top_k, threshold)
+            results.append((top, row[top].astype(np.float64)))
+        return results
+
+    def extend(self, embeddings: np.ndarray) -> "BruteForceVectorIndex":
+        """임베딩을 덧붙인 새 인덱스 반환 (메모리 매핑 행렬은 메모리로 복사됨)"""
+        merged = np.concatenate([self.embeddings, embeddings.astype(self.embeddings.dtype)])
+        return BruteForceVectorIndex(merged)
+
+    def select(self, indices: List[int]) -> "BruteForceVectorIndex":
+        """지정한 답변만 남긴 새 인덱스 반환"""
+        return BruteForceVectorIndex(self.embeddings[np.asarray(indices, dtype=np.intp)])
+
+    def subset(self, indices: List[int]) -> "BruteForceVectorIndex":
+        """지정한 답변만 담은 부분 인덱스 (카테고리 파티션용)"""
+        return self.select(indices)
+
+
+class _HnswGraph:
+    """스냅샷 간에 공유하는 hnswlib 그래프 (추가와 검색을 잠금으로 직렬화)"""
+
+    def __init__(self, embeddings: np.ndarray, m: int, ef_construction: int, ef_search: int):
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("HNSW 검색에는 hnswlib가 필요합니다: pip install hnswlib") from e
+
+        self.ef_search = ef_search
+        self.lock = threading.Lock()
+        self.graph = hnswlib.Index(space='ip', dim=embeddings.shape[1])
+        self.graph.init_index(max_elements=max(1, embeddings.shape[0]), M=m, ef_construction=ef_construction)
+        self.size = 0
+        self.add(embeddings)
+
+    def add(self, embeddings: np.ndarray) -> np.ndarray:
+        """임베딩을 추가하고 부여된 라벨 반환"""
+        with self.lock:
+            labels = np.arange(self.size, self.size + embeddings.shape[0], dtype=np.int64)
+            if labels.size:
+                if self.size + labels.size > self.graph.get_max_elements():
+                    self.graph.resize_index(max(self.size + labels.size, 2 * self.graph.get_max_elements()))
+                self.graph.add_items(np.asarray(embeddings, dtype=np.float32), labels)
+                self.size += labels.size
+            return labels
+
+    def query(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        with self.lock:
+            self.graph.set_ef(max(self.ef_search, k))
+            return self.graph.knn_query(queries, k=k)
+
+
+class HnswVectorIndex:
+    """
+    HNSW 근사 최근접 이웃 검색 (hnswlib, 내적 공간)
+
+    그래프는 스냅샷끼리 공유하고, 스냅샷마다 답변 위치 -> 그래프 라벨 배열만 따로 가집니다.
+    삭제된 답변은 그래프에 남아 있다가 검색 결과에서 걸러지고,
+    추가된 답변은 공유 그래프에 삽입됩니다.
+    """
+
+    def __init__(self, embeddings: np.ndarray = None, m: int = 16, ef_construction: int = 200,
+                 ef_search: int = 64, graph: _HnswGraph = None, labels: np.ndarray = None):
+        """
+        초기화
+
+        Args:
+            embeddings: (답변 수 x 차원) 임베딩 (graph가 없을 때 그래프 생성에 사용)
+            m: 노드당 연결 수
+            ef_construction: 그래프 생성 시 탐색 폭
+            ef_search: 검색 시 탐색 폭 (클수록 정확하고 느림)
+            graph: 공유할 기존 그래프 (extend/select에서 사용)
+            labels: 답변 위치별 그래프 라벨
+        """
+        if graph is None:
+            graph = _HnswGraph(embeddings, m, ef_construction, ef_search)
+            labels = np.arange(embeddings.shape[0], dtype=np.int64)
+        self.graph = graph
+        self.labels = labels
+        # 그래프 라벨 -> 이 스냅샷의 답변 위치 (-1: 이 스냅샷에 없음)
+        self.rows = np.full(graph.size, -1, dtype=np.int64)
+        self.rows[labels] = np.arange(labels.size)
+
+    def __len__(self) -> int:
+        return self.labels.size
+
+    def search(self, queries: np.ndarray, top_k: int, threshold: float) -> List[SearchResult]:
+        """
+        질문마다 임계값 이상 상위 k개 답변 검색 (근사)
+
+        Returns:
+            질문 순서대로 (답변 인덱스, 유사도) 배열 튜플 리스트
+        """
+        empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64))
+        if top_k <= 0 or self.labels.size == 0:
+            return [empty for _ in range(queries.shape[0])]
+
+        # 이 스냅샷에 없는 라벨이 섞여 나올 수 있으므로 그만큼 더 요청
+        missing = self.graph.size - self.labels.size
+        k = min(self.graph.size, top_k + missing)
+        labels, distances = self.graph.query(queries, k)
+
+        results = []
+        for label_row, distance_row in zip(labels, distances):
+            label_row = label_row[label_row < self.rows.size]
+            rows = self.rows[label_row]
+            scores = 1.0 - distance_row[:label_row.size].astype(np.float64)  # ip 공간 거리 = 1 - 내적
+            keep = (rows >= 0) & (scores >= threshold)
+            rows, scores = rows[keep], scores[keep]
+            order = np.lexsort((rows, -scores))[:top_k]
+            results.append((rows[order].astype(np.intp), scores[order]))
+        return results
+
+    def extend(self, embeddings: np.ndarray) -> "HnswVectorIndex":
+        """임베딩을 공유 그래프에 추가한 새 스냅샷 반환"""
+        labels = self.graph.add(embeddings)
+        return HnswVectorIndex(graph=self.graph, labels=np.concatenate([self.labels, labels]))
+
+    def select(self, indices: List[int]) -> "HnswVectorIndex":
+        """지정한 답변만 남긴 새 스냅샷 반환"""
+        return HnswVectorIndex(graph=self.graph, labels=self.labels[np.asarray(indices, dtype=np.intp)])
+
+    def subset(self, indices: List[int]) -> BruteForceVectorIndex:
+        """
+        지정한 답변만 담은 부분 인덱스 (카테고리 파티션용)
+
+        공유 그래프에서 걸러내면 제외된 답변만큼 더 탐색해야 하므로,
+        파티션은 그래프에 저장된 벡터를 꺼내 전체 내적 인덱스로 만듭니다.
+        """
+        labels = self.labels[np.asarray(indices, dtype=np.intp)]
+        if labels.size == 0:
+            return BruteForceVectorIndex(np.zeros((0, self.graph.graph.dim), dtype=np.float32))
+        with self.graph.lock:
+            vectors = np.asarray(self.graph.graph.get_items(labels), dtype=np.float32)
+        return BruteForceVectorIndex(vectors)
+
+
+def make_vector_index(embeddings: np.ndarray, kind: str):
+    """
+    설정에 맞는 벡터 인덱스 생성
+
+    Args:
+        embeddings: (답변 수 x 차원) 임베딩
+        kind: "brute" 또는 "hnsw"
+    """
+    if kind == "brute":
+        return BruteForceVectorIndex(embeddings)
+    if kind == "hnsw":
+        return HnswVectorIndex(embeddings)
+    raise ValueError(f"지원하지 않는 벡터 인덱스입니다: {kind}")
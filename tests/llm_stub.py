@@ -0,0 +1,314 @@
+"""
+테스트용 Claude API 스텁 서버
+로컬 포트에서 Messages API(/v1/messages)를 흉내 내며 LLM 응답 지연과 스트리밍(server-sent events) 응답을 재현합니다.
+Message Batches API(/v1/messages/batches)도 흉내 내며, 장애(429 / 529 / 5xx 응답, 응답 지연)를 주입할 수 있습니다.
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_ANSWER = "힘든 마음이 느껴져요. 천천히 한 걸음씩 나아가 보세요."
+
+ERROR_TYPES = {
+    400: "invalid_request_error", 429: "rate_limit_error", 500: "api_error", 503: "api_error", 529: "overloaded_error"
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (연결 재사용 확인용)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        stub: "StubLLMServer" = self.server.stub
+        path = self.path.split('?')[0]
+        if path.endswith('/results'):
+            data = stub.batch_results(path.split('/')[-2]).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/binary')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self._send_json(stub.batch_status(path.split('/')[-1]))
+
+    def do_POST(self):
+        stub: "StubLLMServer" = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        if self.path.split('?')[0].endswith('/batches'):
+            self._send_json(stub.create_batch(body['requests']))
+            return
+        stub.on_request_start(self.client_address, body)
+        fault = stub.next_fault()
+        if fault is not None:
+            self._fail(stub, fault)
+            return
+        try:
+            if body.get('stream'):
+                self._stream(stub, body)
+                return
+            # 일반 요청은 답변 전체가 생성될 때까지 기다린 뒤 한 번에 응답
+            time.sleep(stub.delay + stub.chunk_delay * len(stub.chunks()))
+            payload = json.dumps(stub.message(body)).encode('utf-8')
+        finally:
+            stub.on_request_end()
+
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 응답을 기다리다 취소함
+
+    def _fail(self, stub: "StubLLMServer", fault: dict):
+        """주입한 장애 응답 (hang이면 그 시간만큼 응답하지 않음)"""
+        try:
+            if fault.get('hang'):
+                time.sleep(fault['hang'])
+                return
+            status = fault.get('status', 529)
+            payload = json.dumps({"type": "error", "error": {"type": ERROR_TYPES.get(status, "api_error"),
+                                                             "message": "stub fault"}}).encode('utf-8')
+            time.sleep(fault.get('delay', 0.0))
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            if fault.get('retry_after') is not None:
+                self.send_header('retry-after', str(fault['retry_after']))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            stub.on_request_end()
+
+    def _stream(self, stub: "StubLLMServer", body: dict):
+        """server-sent events로 답변 조각을 생성되는 대로 전송 (연결 종료로 본문 끝 표시)"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def send(event: dict):
+            self.wfile.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        message = stub.message(body)
+        message.update(content=[], stop_reason=None)
+        time.sleep(stub.delay)
+        try:
+            send({"type": "message_start", "message": message})
+            send({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+            for i, chunk in enumerate(stub.chunks()):
+                if i:
+                    time.sleep(stub.chunk_delay)
+                send({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}})
+            send({"type": "content_block_stop", "index": 0})
+            send({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                  "usage": {"output_tokens": 50}})
+            send({"type": "message_stop"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 스트림을 중간에 닫음
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # 동시 연결이 많아도 대기열에서 밀리지 않도록
+
+
+class StubLLMServer:
+    """
+    Messages API 스텁 서버 (with 문으로 시작/종료)
+
+    요청 본문, 동시에 처리 중인 최대 요청 수, 클라이언트 연결 수를 기록합니다.
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        text: str = STUB_ANSWER,
+        chunk_delay: float = 0.0,
+        batch_delay: float = 0.0,
+        min_cache_tokens: int = 1024
+    ):
+        """
+        초기화
+
+        Args:
+            delay: 첫 답변 조각이 나오기까지의 시간(초) (LLM 응답 지연 흉내)
+            text: 응답할 답변 텍스트
+            chunk_delay: 답변 조각 사이의 생성 시간(초) (일반 요청은 전체 생성 시간만큼 기다린 뒤 응답)
+            batch_delay: Message Batches 배치가 처리 완료되기까지의 시간(초)
+            min_cache_tokens: 캐시할 최소 접두부 길이 (글자 수를 토큰 수로 취급)
+        """
+        self.delay = delay
+        self.text = text
+        self.chunk_delay = chunk_delay
+        self.batch_delay = batch_delay
+        self.min_cache_tokens = min_cache_tokens
+        self.batches = {}  # 배치 id -> (생성 시각, 요청 리스트)
+        self.batch_failures = 0  # 다음 결과 조회에서 실패로 돌려줄 요청 수
+        self.faults = []  # 다음 요청부터 차례로 적용할 장애 (fail_next)
+        self.fault_rate = 0.0  # 무작위 장애 비율
+        self.fault = {"status": 529}  # 무작위 장애 내용
+        self.faults_injected = 0
+        self._rng = random.Random(0)
+        self.requests = []
+        self.cache = set()  # 캐시된 프롬프트 접두부
+        self.connections = set()
+        self.active = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def chunks(self) -> list:
+        """스트리밍으로 보낼 답변 조각 (어절 단위)"""
+        words = self.text.split(' ')
+        return [word + ' ' for word in words[:-1]] + words[-1:]
+
+    def message(self, body: dict) -> dict:
+        """Messages API 응답 본문"""
+        return {
+            "id": f"msg_stub_{len(self.requests)}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": self.text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": dict(self.prompt_usage(body), output_tokens=50),
+        }
+
+    def prompt_usage(self, body: dict) -> dict:
+        """
+        프롬프트 캐시를 흉내 낸 입력 토큰 사용량 (글자 수를 토큰 수로 취급)
+
+        시스템 -> 메시지 순서로 이어 붙인 입력에서 cache_control이 붙은 블록까지를 캐시 접두부로 보고,
+        이전에 본 가장 긴 접두부는 캐시 읽기, 그 뒤로 마지막 캐시 지점까지는 캐시 쓰기로 계산합니다.
+        실제 API처럼 min_cache_tokens보다 짧은 접두부는 캐시하지 않습니다.
+        """
+        system = body.get('system', [])
+        blocks = [{"text": system}] if isinstance(system, str) else list(system)
+        for message in body['messages']:
+            content = message['content']
+            blocks += [{"text": content}] if isinstance(content, str) else content
+
+        prefix, read, last_breakpoint = "", 0, 0
+        with self._lock:
+            for block in blocks:
+                prefix += block['text']
+                if 'cache_control' in block and len(prefix) >= self.min_cache_tokens:
+                    if prefix in self.cache:
+                        read = len(prefix)
+                    self.cache.add(prefix)
+                    last_breakpoint = len(prefix)
+        write = max(last_breakpoint - read, 0)
+        return {"input_tokens": len(prefix) - read - write,
+                "cache_read_input_tokens": read, "cache_creation_input_tokens": write}
+
+    def fail_next(self, count: int = 1, status: int = 529, retry_after: float = None, hang: float = None):
+        """
+        다음 count개 요청에 장애 주입
+
+        Args:
+            count: 장애를 낼 요청 수
+            status: 오류 상태 코드 (429 요청 제한, 529 과부하, 5xx 서버 오류)
+            retry_after: retry-after 헤더 값(초)
+            hang: 설정하면 오류 대신 이 시간(초) 동안 응답하지 않음 (시간 초과 흉내)
+        """
+        with self._lock:
+            self.faults.extend([{"status": status, "retry_after": retry_after, "hang": hang}] * count)
+
+    def next_fault(self):
+        """이번 요청에 적용할 장애 (없으면 None)"""
+        with self._lock:
+            if self.faults:
+                fault = self.faults.pop(0)
+            elif self.fault_rate and self._rng.random() < self.fault_rate:
+                fault = self.fault
+            else:
+                return None
+            self.faults_injected += 1
+            return fault
+
+    def create_batch(self, requests: list) -> dict:
+        """Message Batches 배치 생성"""
+        with self._lock:
+            batch_id = f"msgbatch_stub_{len(self.batches)}"
+            self.batches[batch_id] = (time.time(), requests)
+        return self.batch_status(batch_id)
+
+    def batch_status(self, batch_id: str) -> dict:
+        """배치 처리 상태 (생성 후 batch_delay가 지나면 완료)"""
+        created, requests = self.batches[batch_id]
+        ended = time.time() - created >= self.batch_delay
+        counts = {"processing": 0 if ended else len(requests), "succeeded": len(requests) if ended else 0,
+                  "errored": 0, "canceled": 0, "expired": 0}
+        created_at = datetime.fromtimestamp(created, timezone.utc)
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": created_at.isoformat(),
+            "expires_at": (created_at + timedelta(days=1)).isoformat(),
+            "ended_at": datetime.now(timezone.utc).isoformat() if ended else None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def batch_results(self, batch_id: str) -> str:
+        """배치 결과 JSONL (실제 API처럼 요청 순서와 다르게 역순으로 반환)"""
+        lines = []
+        for request in reversed(self.batches[batch_id][1]):
+            if self.batch_failures > 0:
+                self.batch_failures -= 1
+                result = {"type": "errored",
+                          "error": {"type": "error", "error": {"type": "api_error", "message": "stub error"}}}
+            else:
+                result = {"type": "succeeded", "message": self.message(request['params'])}
+            lines.append(json.dumps({"custom_id": request['custom_id'], "result": result}))
+        return "\n".join(lines) + "\n"
+
+    def on_request_start(self, client_address, body: dict):
+        with self._lock:
+            self.requests.append(body)
+            self.connections.add(client_address)
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def on_request_end(self):
+        with self._lock:
+            self.active -= 1
+
+    def __enter__(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,144 @@
+"""
+답변 캐시 테스트
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from answer_cache import AnswerCache, MemoryCacheBackend, SqliteCacheBackend, normalize_question
+from generator import AnswerGenerator, AsyncAnswerGenerator
+from llm_stub import STUB_ANSWER, StubLLMServer
+from matcher import AnswerMatcher
+
+QUESTION = "매일 걱정이 많고 불안해요"
+REFERENCE = [({"id": "A009", "category": "불안", "title": "불안감 다루기", "content": "호흡에 집중해 보세요."}, 0.5)]
+
+
+def test_exact_match_ttl_and_lru():
+    """정규화한 질문 일치, TTL 만료, LRU 제거, 카테고리 제외 테스트"""
+    print("=== 답변 캐시 기본 테스트 ===")
+
+    assert normalize_question("  매일 걱정이  많고, 불안해요?! ") == QUESTION
+    cache = AnswerCache(MemoryCacheBackend(max_entries=2), ttl=60, excluded_categories=["위기"])
+
+    assert cache.get(QUESTION) is None
+    cache.put(QUESTION, "답변1", "불안")
+    assert cache.get("매일 걱정이 많고 불안해요...") == "답변1"
+
+    # LRU: 최근에 읽은 질문은 남고 가장 오래 쓰지 않은 질문이 제거됨
+    cache.put("질문2", "답변2")
+    assert cache.get(QUESTION) == "답변1"
+    cache.put("질문3", "답변3")
+    assert cache.get("질문2") is None and cache.get(QUESTION) == "답변1" and len(cache.backend) == 2
+
+    # 제외 카테고리는 조회/저장하지 않음
+    cache.put("위기 질문", "답변", "위기")
+    assert cache.get("위기 질문", "위기") is None and cache.get("위기 질문") is None
+
+    # TTL이 지난 답변은 만료
+    short = AnswerCache(MemoryCacheBackend(max_entries=10), ttl=0.05)
+    short.put(QUESTION, "답변")
+    time.sleep(0.1)
+    assert short.get(QUESTION) is None and len(short.backend) == 0
+
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.bypassed, stats.evictions) == (3, 3, 1, 1)
+    assert short.stats.expirations == 1
+    print(f"[OK] {stats.summary()}")
+
+
+def test_similar_questions():
+    """질문 벡터 유사도가 임계값 이상이면 비슷한 질문의 답변을 재사용하는지 테스트"""
+    print("\n=== 유사 질문 캐시 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None)
+    cache = AnswerCache(similarity_threshold=0.8, embed=matcher.question_vector)
+    cache.put(QUESTION, "불안 답변", "불안")
+    cache.put("친구를 사귀고 싶은데 방법을 모르겠어요", "친구 답변", "대인관계")
+
+    assert cache.get("요즘 걱정이 많고 불안해요") == "불안 답변"
+    assert cache.get("친구를 사귀고 싶어요 방법이 뭘까요") == "친구 답변"
+    assert cache.get("회사 상사 때문에 스트레스를 받아요") is None
+    assert (cache.stats.similar_hits, cache.stats.misses) == (2, 1)
+
+    # 벡터 공간이 다르면(재학습된 어휘 등) 비교하지 않음
+    other = AnswerCache(similarity_threshold=0.0, embed=lambda q: ("other", matcher.question_vector(q)[1]))
+    other.backend = cache.backend
+    assert other.get("요즘 걱정이 많고 불안해요") is None
+    print(f"[OK] {cache.stats.summary()}")
+
+
+def test_sqlite_backend():
+    """SQLite 저장소를 여러 캐시(워커)가 공유하고, 크기 제한과 벡터를 유지하는지 테스트"""
+    print("\n=== SQLite 답변 캐시 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "answers.sqlite3"
+        first = AnswerCache(SqliteCacheBackend(path, max_entries=2), similarity_threshold=0.8,
+                            embed=matcher.question_vector)
+        second = AnswerCache(SqliteCacheBackend(path, max_entries=2), similarity_threshold=0.8,
+                             embed=matcher.question_vector)
+
+        first.put(QUESTION, "불안 답변", "불안")
+        assert second.get(QUESTION) == "불안 답변"
+        assert second.get("요즘 걱정이 많고 불안해요") == "불안 답변"
+
+        work, study = "회사 상사 때문에 스트레스를 받아요", "시험 성적이 떨어져서 공부할 의욕이 없어요"
+        first.put(work, "직장 답변")
+        time.sleep(0.01)
+        second.get(QUESTION)  # 다른 워커가 읽어도 최근 사용으로 표시
+        first.put(study, "학업 답변")
+        assert len(first.backend) == 2 and first.get(work) is None and first.get(QUESTION) == "불안 답변"
+        assert first.stats.evictions == 1
+        first.backend.close()
+        second.backend.close()
+    print("[OK] SQLite 저장소 공유 확인")
+
+
+def test_generator_cache():
+    """캐시 적중 시 Claude API를 호출하지 않는지 테스트 (일반 / 스트리밍 / 비동기)"""
+    print("\n=== 생성기 답변 캐시 테스트 ===")
+
+    with StubLLMServer() as stub:
+        cache = AnswerCache(excluded_categories=["대인관계"])
+        generator = AnswerGenerator(api_key="test-key", base_url=stub.base_url, cache=cache)
+
+        assert generator.generate_answer(QUESTION, REFERENCE) == STUB_ANSWER
+        assert generator.generate_answer(QUESTION + "?", REFERENCE) == STUB_ANSWER
+        assert list(generator.stream_answer(QUESTION, REFERENCE)) == [STUB_ANSWER]
+        assert len(stub.requests) == 1
+
+        # 스트리밍으로 생성한 답변도 캐시에 저장
+        "".join(generator.stream_answer("처음 보는 고민이에요"))
+        assert generator.generate_simple_answer("처음 보는 고민이에요") == STUB_ANSWER
+        assert len(stub.requests) == 2
+
+        # 제외 카테고리(가장 유사한 참고 답변 기준)는 매번 생성
+        friend = [({"id": "A004", "category": "대인관계", "title": "친구", "content": "..."}, 0.5)]
+        generator.generate_answer("친구가 없어요", friend)
+        generator.generate_answer("친구가 없어요", friend)
+        assert len(stub.requests) == 4 and cache.stats.bypassed == 2
+
+        async def run():
+            async_generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url, cache=cache)
+            answers = [await async_generator.generate_answer(QUESTION, REFERENCE)]
+            answers += [text async for text in async_generator.stream_answer("처음 보는 고민이에요")]
+            await async_generator.aclose()
+            return answers
+
+        assert asyncio.run(run()) == [STUB_ANSWER, STUB_ANSWER] and len(stub.requests) == 4
+    print(f"[OK] {cache.stats.summary()}")
+
+
+if __name__ == "__main__":
+    test_exact_match_ttl_and_lru()
+    test_similar_questions()
+    test_sqlite_backend()
+    test_generator_cache()
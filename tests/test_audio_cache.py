@@ -0,0 +1,100 @@
+"""
+음성 파일 캐시 테스트 (gTTS 대신 파일을 쓰는 테스트용 TTS 사용, 네트워크 호출 없음)
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_cache import AudioCache, audio_key
+from tts import TextToSpeech
+
+
+class FakeTTS(TextToSpeech):
+    """변환 대신 텍스트 길이에 비례한 크기의 파일을 쓰는 TTS (변환 시간 흉내)"""
+
+    def __init__(self, cache: AudioCache, delay: float = 0.05, **kwargs):
+        super().__init__(cache=cache, **kwargs)
+        self.delay = delay
+        self.texts = []
+
+    def text_to_speech(self, text: str, output_path: Path) -> Path:
+        time.sleep(self.delay)
+        self.texts.append(text)
+        Path(output_path).write_bytes(text.encode('utf-8') * 100)
+        return Path(output_path)
+
+
+def test_audio_cache_hit():
+    """같은 텍스트는 한 번만 변환하고, 적중은 변환 없이 바로 반환하는지 테스트"""
+    print("=== 음성 파일 캐시 적중 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tts = FakeTTS(AudioCache(Path(tmp), max_bytes=10 ** 6))
+        start = time.perf_counter()
+        first = tts.generate_answer_audio("오늘도 수고 많으셨어요.", "answer_1")
+        miss_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        second = tts.generate_answer_audio("오늘도 수고 많으셨어요.", "answer_2")
+        hit_time = time.perf_counter() - start
+        assert first == second and first.parent == Path(tmp) and tts.texts == ["오늘도 수고 많으셨어요."]
+        assert hit_time < 0.005 < miss_time
+
+        # 언어 / 속도가 다르면 다른 파일
+        assert audio_key("안녕", "ko", False) != audio_key("안녕", "ko", True) != audio_key("안녕", "en", True)
+        slow = FakeTTS(tts.cache, slow=True)
+        assert slow.synthesize("오늘도 수고 많으셨어요.") != first and len(tts.cache) == 2
+        assert tts.cache.stats.hits == 1 and tts.cache.stats.misses == 2
+
+        # 다른 곳에서 지운 파일은 다시 변환
+        first.unlink()
+        assert tts.synthesize("오늘도 수고 많으셨어요.").exists() and len(tts.texts) == 2
+    print(f"[OK] 변환 {miss_time * 1000:.1f}ms -> 적중 {hit_time * 1_000_000:.0f}us")
+
+
+def test_audio_cache_lru():
+    """크기 예산을 넘으면 가장 오래 쓰지 않은 파일부터 지우고, 다시 시작해도 순서를 유지하는지 테스트"""
+    print("\n=== 음성 파일 캐시 LRU 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AudioCache(Path(tmp), max_bytes=2500)
+        tts = FakeTTS(cache, delay=0)
+        texts = ["가" * 4, "나" * 4, "다" * 4, "라" * 4]  # 파일 하나 1200바이트
+        paths = [tts.synthesize(text) for text in texts[:2]]
+        time.sleep(0.01)
+        tts.synthesize(texts[0])  # 가 -> 최근 사용
+        paths.append(tts.synthesize(texts[2]))  # 예산 초과 -> 나 삭제
+        assert not paths[1].exists() and paths[0].exists() and paths[2].exists()
+        assert cache.total_bytes == 2400 <= cache.max_bytes and cache.stats.evictions == 1
+
+        # 실패한 변환은 파일을 남기지 않음
+        class BrokenTTS(FakeTTS):
+            def text_to_speech(self, text, output_path):
+                Path(output_path).write_bytes(b"partial")
+                raise RuntimeError("변환 실패")
+        try:
+            BrokenTTS(cache).synthesize("실패")
+            assert False, "오류가 발생하지 않음"
+        except RuntimeError:
+            pass
+        assert sorted(p.name for p in Path(tmp).iterdir()) == sorted(p.name for p in (paths[0], paths[2]))
+
+        # 다시 시작하면 수정 시각 순서로 색인 복원 (남은 임시 파일은 삭제)
+        time.sleep(0.01)
+        tts.synthesize(texts[0])  # 가 -> 최근 사용 (다가 가장 오래 쓰지 않은 파일)
+        (Path(tmp) / "stale.tmp").write_bytes(b"x")
+        restarted = AudioCache(Path(tmp), max_bytes=2500)
+        assert len(restarted) == 2 and restarted.total_bytes == 2400 and not (Path(tmp) / "stale.tmp").exists()
+        FakeTTS(restarted, delay=0).synthesize(texts[3])  # 가장 오래 쓰지 않은 다 삭제
+        assert paths[0].exists() and not paths[2].exists()
+    print(f"[OK] {cache.stats.summary()}")
+
+
+if __name__ == "__main__":
+    test_audio_cache_hit()
+    test_audio_cache_lru()
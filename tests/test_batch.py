@@ -0,0 +1,182 @@
+"""
+배치 답변 테스트
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from answer_cache import AnswerCache
+from batch import BatchRunner, ResultWriter, read_questions
+from generator import SIMPLE_SYSTEM_PROMPT, AsyncAnswerGenerator
+from llm_stub import STUB_ANSWER, StubLLMServer
+from matcher import AnswerMatcher
+
+# 참고 답변이 있는 질문과 없는(폴백) 질문을 섞음
+QUESTIONS = [
+    "진로 선택이 막막할 때",
+    "부모님과의 갈등 해결법",
+    "공부 동기부여가 안 될 때",
+    "스트레스 관리법",
+    "짝사랑 고백의 용기",
+    "남자친구와 헤어져서 너무 힘들어요",
+    "매일 걱정이 많고 불안해요",
+    "회사 상사 때문에 스트레스를 받아요",
+    "친구를 사귀고 싶은데 방법을 모르겠어요",
+    "오늘 점심 메뉴 추천해 주세요",
+]
+
+
+def read_results(path: Path) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_read_questions():
+    """CSV / JSONL 질문 파일 읽기 테스트"""
+    print("=== 질문 파일 읽기 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "questions.csv"
+        csv_path.write_text('id,question\nu1,"친구와 다퉜어요, 어떻게 하죠"\nu2,\n,진로가 고민이에요\n',
+                            encoding='utf-8-sig')
+        questions = read_questions(csv_path)
+        assert [(q.id, q.question) for q in questions] == [("u1", "친구와 다퉜어요, 어떻게 하죠"), ("q3", "진로가 고민이에요")]
+
+        # 질문 열 이름이 다르면 --column으로 지정해야 하고, 짐작해서 첫 열(id)을 질문으로 쓰지 않음
+        other_path = Path(tmp) / "other.csv"
+        other_path.write_text('id,text\n1,불안해요\n2,잠이 안 와요\n', encoding='utf-8')
+        try:
+            read_questions(other_path)
+            assert False, "질문 열 없이 읽힘"
+        except ValueError as e:
+            assert "--column" in str(e)
+        assert [q.question for q in read_questions(other_path, column="text")] == ["불안해요", "잠이 안 와요"]
+
+        # id가 겹치면 이어서 답변할 수 없으므로 거부 (자동 id와 겹치는 경우 포함)
+        duplicate_path = Path(tmp) / "duplicate.csv"
+        duplicate_path.write_text('id,question\nq2,불안해요\n,잠이 안 와요\n', encoding='utf-8')
+        try:
+            read_questions(duplicate_path)
+            assert False, "중복 id가 허용됨"
+        except ValueError as e:
+            assert "q2" in str(e)
+
+        jsonl_path = Path(tmp) / "questions.jsonl"
+        jsonl_path.write_text('{"id": 7, "question": "불안해요"}\n\n"잠이 안 와요"\n', encoding='utf-8')
+        assert [(q.id, q.question) for q in read_questions(jsonl_path)] == [("7", "불안해요"), ("q2", "잠이 안 와요")]
+
+        # 중단되며 잘린 마지막 줄은 지우고 이어서 씀
+        output = Path(tmp) / "answers.jsonl"
+        output.write_text('{"id": "u1", "answer": "답변"}\n{"id": "u2", "ans', encoding='utf-8')
+        writer = ResultWriter(output)
+        writer.write({"id": "u2", "answer": "답변"})
+        writer.close()
+        assert writer.completed == {"u1", "u2"} and len(read_results(output)) == 2
+    print("[OK] 질문 파일 / 결과 파일 확인")
+
+
+def test_async_batch_resume():
+    """동시 요청 방식: 중단 후 다시 실행하면 남은 질문만 답변하는지 테스트"""
+    print("\n=== 배치 답변 (async) 재개 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None)
+    with tempfile.TemporaryDirectory() as tmp, StubLLMServer(delay=0.1) as stub:
+        questions_path = Path(tmp) / "questions.jsonl"
+        questions_path.write_text("".join(json.dumps(q, ensure_ascii=False) + "\n" for q in QUESTIONS + QUESTIONS[:2]),
+                                  encoding='utf-8')
+        questions = read_questions(questions_path)
+        output = Path(tmp) / "answers.jsonl"
+
+        async def run(timeout=None):
+            generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url, max_concurrency=2,
+                                             cache=AnswerCache())
+            runner = BatchRunner(matcher, generator, output, mode="async", chunk_size=4)
+            try:
+                return await asyncio.wait_for(runner.run(questions), timeout)
+            finally:
+                await generator.aclose()
+
+        # 첫 실행은 도중에 중단 (진행 중이던 요청의 답변은 저장되지 않음)
+        try:
+            asyncio.run(run(timeout=0.35))
+            assert False, "중단되지 않음"
+        except asyncio.TimeoutError:
+            pass
+        done = len(read_results(output))
+        assert 0 < done < len(questions)
+
+        report = asyncio.run(run())
+        results = read_results(output)
+        assert sorted(r['id'] for r in results) == sorted(q.id for q in questions)
+        assert all(r['answer'] == STUB_ANSWER for r in results)
+        assert report.skipped == done and report.answered == len(questions) - done and report.failed == 0
+        # 같은 질문이 두 번 나오면 두 번째는 답변 캐시에서 가져옴
+        assert report.cached + report.usage.requests == report.answered
+        assert report.cost > 0 and report.throughput > 0
+        assert next(r for r in results if r['id'] == "q1")['references'][0]['id'] == "A002"
+
+        # 모두 끝난 뒤 다시 실행하면 아무것도 요청하지 않음
+        requests = len(stub.requests)
+        report = asyncio.run(run())
+        assert report.skipped == len(questions) and len(stub.requests) == requests
+    print(f"[OK] 중단 시점 {done}/{len(questions)}개 완료 후 재개")
+
+
+def test_message_batches_resume():
+    """Message Batches 방식: 제출한 배치는 재제출하지 않고 회수하며, 실패한 요청은 다음 실행에서 재시도하는지 테스트"""
+    print("\n=== 배치 답변 (Message Batches) 재개 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None)
+    with tempfile.TemporaryDirectory() as tmp, StubLLMServer(batch_delay=0.3) as stub:
+        questions_path = Path(tmp) / "questions.jsonl"
+        questions_path.write_text("".join(json.dumps(q, ensure_ascii=False) + "\n" for q in QUESTIONS),
+                                  encoding='utf-8')
+        questions = read_questions(questions_path)
+        output = Path(tmp) / "answers.jsonl"
+
+        async def run(timeout=None):
+            generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url)
+            runner = BatchRunner(matcher, generator, output, mode="batches", chunk_size=4, poll_interval=0.05)
+            try:
+                return await asyncio.wait_for(runner.run(questions), timeout)
+            finally:
+                await generator.aclose()
+
+        # 배치 제출 후 처리 완료 전에 중단
+        try:
+            asyncio.run(run(timeout=0.15))
+            assert False, "중단되지 않음"
+        except asyncio.TimeoutError:
+            pass
+        state_path = output.with_name(output.name + ".batches.json")
+        assert len(stub.batches) == 1 and state_path.exists() and not read_results(output)
+
+        # 다시 실행하면 기존 배치를 재제출하지 않고 회수하며, 실패한 요청 하나는 새 배치로 다시 제출
+        stub.batch_failures = 1
+        report = asyncio.run(run())
+        assert len(stub.batches) == 2 and len(stub.batches["msgbatch_stub_1"][1]) == 1
+        assert (report.answered, report.failed) == (len(QUESTIONS), 1) and not state_path.exists()
+        assert sorted(r['id'] for r in read_results(output)) == sorted(q.id for q in questions)
+
+        # 모두 끝난 뒤에는 제출하지 않음
+        assert asyncio.run(run()).skipped == len(QUESTIONS) and len(stub.batches) == 2
+
+        # 참고 답변이 없는 질문은 폴백 프롬프트로 제출
+        fallback = [r for r in read_results(output) if not r['references']]
+        simple = [r for r in stub.batches["msgbatch_stub_0"][1]
+                  if r['params']['system'][0]['text'] == SIMPLE_SYSTEM_PROMPT]
+        assert 0 < len(fallback) < len(QUESTIONS) and len(simple) == len(fallback)
+        assert report.cost > 0
+    print(f"[OK] {report.summary()}")
+
+
+if __name__ == "__main__":
+    test_read_questions()
+    test_async_batch_resume()
+    test_message_batches_resume()
@@ -0,0 +1,202 @@
+"""
+코퍼스 스트리밍 테스트
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import corpus
+from config import SAMPLE_ANSWERS_PATH
+from corpus import AnswerRecord, AnswerStore, StoredAnswers, iter_answers, write_answers
+from matcher import AnswerMatcher
+
+
+def load_sample():
+    with open(SAMPLE_ANSWERS_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)['answers']
+
+
+def test_iter_answers_formats():
+    """JSON 배열(작은 청크로 분할 읽기)과 JSONL 스트리밍 파싱 테스트"""
+    print("=== 스트리밍 파싱 테스트 ===")
+
+    expected = load_sample()
+    original_chunk = corpus.READ_CHUNK_SIZE
+    corpus.READ_CHUNK_SIZE = 7  # 원소가 청크 경계에 걸리도록 아주 작게
+    try:
+        assert list(iter_answers(SAMPLE_ANSWERS_PATH)) == expected
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            (tmp / "array.json").write_text(json.dumps(expected, ensure_ascii=False), encoding='utf-8')
+            assert list(iter_answers(tmp / "array.json")) == expected
+
+            write_answers(tmp / "answers.jsonl", expected)
+            assert list(iter_answers(tmp / "answers.jsonl")) == expected
+
+            write_answers(tmp / "answers.json", iter(expected))
+            assert list(iter_answers(tmp / "answers.json")) == expected
+
+            (tmp / "empty.json").write_text('{"answers": []}', encoding='utf-8')
+            assert list(iter_answers(tmp / "empty.json")) == []
+    finally:
+        corpus.READ_CHUNK_SIZE = original_chunk
+    print("[OK] JSON/JSONL 파싱 결과 일치")
+
+
+def test_iter_answers_malformed():
+    """키 이름이 값 안에 있어도 구조로 찾고, 구분자가 잘못되거나 닫히지 않은 파일은 바로 오류를 내는지 테스트"""
+    print("\n=== 스트리밍 파싱 오류 테스트 ===")
+
+    original_chunk, original_limit = corpus.READ_CHUNK_SIZE, corpus.MAX_VALUE_SIZE
+    corpus.READ_CHUNK_SIZE, corpus.MAX_VALUE_SIZE = 5, 100
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "answers.json"
+
+            # 다른 키의 값 안에 있는 "answers" 문자열은 키로 보지 않음
+            path.write_text('{"note": "\\"answers\\": [0]", "meta": {"answers": [1]}, "answers": [{"id": 1}, {"id": 2}]}',
+                            encoding='utf-8')
+            assert list(iter_answers(path)) == [{"id": 1}, {"id": 2}]
+
+            for text in ['{"answers": [{"id": 1} {"id": 2}]}',  # 쉼표 없음
+                         '{"answers": [{"id": 1},]}',  # 끝 쉼표
+                         '{"answers": [{"id": 1}, {"id": 2}',  # 닫히지 않은 배열
+                         '{"meta": 1}',  # 키 없음
+                         '{"answers": [{"id": 1, "title": 제목}]}']:  # 문법 오류
+                path.write_text(text, encoding='utf-8')
+                try:
+                    list(iter_answers(path))
+                    assert False, f"오류가 발생하지 않음: {text}"
+                except json.JSONDecodeError as e:
+                    print(f"  {text[:30]:32s} -> {e.msg}")
+
+            # 닫히지 않은 문자열은 최대 크기까지만 읽고 중단 (나머지 파일을 버퍼에 올리지 않음)
+            path.write_text('{"answers": [{"id": "' + "가" * 10 ** 6, encoding='utf-8')
+            reads = []
+            with open(path, 'r', encoding='utf-8') as f:
+                original_read = f.read
+                f.read = lambda size: reads.append(size) or original_read(size)
+                try:
+                    list(corpus._iter_json_array(f, "answers"))
+                    assert False, "오류가 발생하지 않음"
+                except json.JSONDecodeError as e:
+                    assert "넘습니다" in e.msg
+            assert sum(reads) <= 200
+    finally:
+        corpus.READ_CHUNK_SIZE, corpus.MAX_VALUE_SIZE = original_chunk, original_limit
+    print("[OK] 손상된 파일 오류 확인")
+
+
+def test_streaming_matcher():
+    """스트리밍 모드 매처가 메모리 모드와 같은 결과를 내는지 테스트"""
+    print("\n=== 스트리밍 매처 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        jsonl_path = tmp / "answers.jsonl"
+        write_answers(jsonl_path, load_sample())
+
+        in_memory = AnswerMatcher(index_cache_dir=None)
+        streaming = AnswerMatcher(jsonl_path, index_cache_dir=tmp / "index",
+                                  streaming=True, store_dir=tmp / "store")
+        assert len(streaming.answers) == len(in_memory.answers)
+
+        for question in ["남자친구와 헤어져서 너무 힘들어요", "매일 걱정이 많고 불안해요", "친구와 다퉜어요"]:
+            expected = [(a, round(s, 9)) for a, s in in_memory.find_best_matches(question)]
+            actual = [(a, round(s, 9)) for a, s in streaming.find_best_matches(question)]
+            assert actual == expected
+
+        # 재시작 시 저장소와 인덱스를 재사용
+        reopened = AnswerMatcher(jsonl_path, index_cache_dir=tmp / "index",
+                                 streaming=True, store_dir=tmp / "store")
+        assert reopened.answers[3] == in_memory.answers[3]
+
+        # 실행 중 추가/삭제 후 저장
+        new_answer = dict(in_memory.answers[0], id="N001", title="새 답변")
+        streaming.add_answers([new_answer])
+        streaming.remove_answers([in_memory.answers[1]['id']])
+        assert streaming.answers[-1] == new_answer
+        streaming.save_answers(tmp / "saved.jsonl")
+        saved = list(iter_answers(tmp / "saved.jsonl"))
+        assert saved == list(streaming.answers)
+        assert len(saved) == len(in_memory.answers)
+    print("[OK] 스트리밍 매처 결과 일치")
+
+
+def test_int_answer_ids():
+    """정수 id가 스트리밍 모드에서도 타입을 유지해 삭제 / 조회가 메모리 모드와 같게 동작하는지 테스트"""
+    print("\n=== 정수 id 테스트 ===")
+
+    answers = [dict(answer, id=i) for i, answer in enumerate(load_sample(), 1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_answers(tmp / "answers.jsonl", answers)
+        matchers = [
+            AnswerMatcher(tmp / "answers.jsonl", index_cache_dir=None, auto_compact=False),
+            AnswerMatcher(tmp / "answers.jsonl", index_cache_dir=None, auto_compact=False,
+                          streaming=True, store_dir=tmp / "store"),
+        ]
+        for matcher in matchers:
+            assert [a['id'] for a in matcher.answers] == list(range(1, len(answers) + 1))
+            assert matcher.remove_answers([1]) == 1 and matcher.remove_answers(["2"]) == 0
+            matcher.add_answers([dict(answers[0], id=100)])
+            assert matcher.answers[-1]['id'] == 100 and matcher.remove_answers([100]) == 1
+        assert [a['id'] for a in matchers[0].answers] == [a['id'] for a in matchers[1].answers]
+
+        # 추가 후 삭제된 답변은 이전 뷰가 사라지면 overlay에서도 해제
+        store = AnswerStore.build(tmp / "views", "answers", "0" * 64, answers)
+        try:
+            view = StoredAnswers(store).extend([dict(answers[0], id=200), dict(answers[0], id=201)])
+            kept = view.select([0, len(answers) + 1])
+            assert [a['id'] for a in kept] == [1, 201] and len(kept.overlay) == 1
+            assert [a['id'] for a in kept.extend([dict(answers[0], id=202)])] == [1, 201, 202]
+            del view, kept
+        finally:
+            store.close()
+    print("[OK] 정수 id 유지")
+
+
+def test_answer_records():
+    """AnswerRecord가 dict와 같이 동작하고 저장소 레코드는 본문을 지연 로드하는지 테스트"""
+    print("\n=== 답변 레코드 테스트 ===")
+
+    expected = load_sample()
+    extra = dict(expected[0], source="manual")
+    record = AnswerRecord.from_dict(extra)
+    assert record == extra and record.to_dict() == extra
+    assert record['source'] == "manual" and record.content == extra['content']
+    assert AnswerRecord.from_dict({"id": "X"}).get('keywords', []) == []
+    assert not hasattr(record, '__dict__')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AnswerStore.build(Path(tmp), "answers", "0" * 64, expected)
+        try:
+            stored = StoredAnswers(store)
+            lazy = stored[1]
+            assert lazy.id == expected[1]['id'] and lazy.title == expected[1]['title']
+            assert lazy._loader is not None  # 본문은 아직 읽지 않음
+            assert lazy['content'] == expected[1]['content']
+            assert lazy._loader is None
+            assert list(stored) == expected
+
+            # 카테고리 문자열은 레코드 간에 공유
+            same = [a for a in stored if a['category'] == expected[0]['category']]
+            assert all(a.category is same[0].category for a in same)
+            del lazy, stored, same
+        finally:
+            store.close()
+    print("[OK] 레코드 동작 확인")
+
+
+if __name__ == "__main__":
+    test_iter_answers_formats()
+    test_iter_answers_malformed()
+    test_streaming_matcher()
+    test_int_answer_ids()
+    test_answer_records()
@@ -0,0 +1,298 @@
+"""
+답변 생성기 테스트 (로컬 스텁 서버 사용, 실제 API 호출 없음)
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import generator as generator_module
+from generator import (
+    AnswerGenerator, AsyncAnswerGenerator, build_prompt, message_params, min_cacheable_tokens, text_block
+)
+from llm_stub import STUB_ANSWER, StubLLMServer
+from matcher import AnswerMatcher
+from pipeline import AsyncCounselingPipeline, EventLoopThread
+from routing import ModelRouter, Route
+
+QUESTION = "친구와 다퉜는데 어떻게 화해해야 할까요?"
+REFERENCE = [({"id": "T001", "category": "대인관계", "title": "친구 관계 회복",
+               "content": "먼저 연락하는 용기를 내보세요."}, 0.85)]
+
+
+def user_text(body: dict) -> str:
+    """요청 본문의 사용자 메시지 텍스트 (블록을 이어 붙임)"""
+    return "".join(block['text'] for block in body['messages'][0]['content'])
+
+
+def test_sync_generator():
+    """동기 생성기가 프롬프트를 보내고 응답 텍스트를 반환하는지 테스트"""
+    print("=== 동기 생성기 테스트 ===")
+
+    with StubLLMServer() as stub:
+        generator = AnswerGenerator(api_key="test-key", base_url=stub.base_url)
+        assert generator.generate_answer(QUESTION, REFERENCE) == STUB_ANSWER
+        assert generator.generate_simple_answer(QUESTION) == STUB_ANSWER
+
+    answer_request, simple_request = stub.requests
+    assert QUESTION in user_text(answer_request)
+    assert "친구 관계 회복" in user_text(answer_request)
+    assert "참고" not in user_text(simple_request)
+    print("[OK] 동기 생성기 확인")
+
+
+async def generate_many(generator: AsyncAnswerGenerator, n: int):
+    return await asyncio.gather(*(generator.generate_answer(f"{QUESTION} {i}", REFERENCE) for i in range(n)))
+
+
+def measure_throughput(concurrency: int, n: int, delay: float):
+    """동시 요청 수 제한별 초당 처리 요청 수"""
+    async def run():
+        generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url, max_concurrency=concurrency)
+        try:
+            start = time.perf_counter()
+            answers = await generate_many(generator, n)
+            return answers, time.perf_counter() - start, generator.peak_in_flight
+        finally:
+            await generator.aclose()
+
+    with StubLLMServer(delay=delay) as stub:
+        answers, elapsed, peak = asyncio.run(run())
+    assert answers == [STUB_ANSWER] * n
+    assert peak == min(concurrency, n) and stub.peak_active <= concurrency
+    # 연결 풀을 공유하므로 연결 수가 동시 요청 수를 넘지 않음
+    assert len(stub.connections) <= concurrency
+    return n / elapsed
+
+
+def test_async_generator_concurrency():
+    """세마포어가 동시 요청 수를 제한하고, 동시 요청 수만큼 처리량이 늘어나는지 테스트"""
+    print("\n=== 비동기 생성기 동시성 테스트 ===")
+
+    n, delay = 16, 0.1
+    throughput = {c: measure_throughput(c, n, delay) for c in (1, 4, 16)}
+    for c, rps in throughput.items():
+        print(f"  동시 요청 {c:>2}: {rps:6.1f} 요청/초")
+    assert throughput[4] > 2.5 * throughput[1]
+    assert throughput[16] > 2.0 * throughput[4]
+    print("[OK] 동시 요청 수 제한 및 처리량 확인")
+
+
+def test_stream_answer():
+    """스트리밍 답변 조각이 전체 답변과 같고, 첫 조각이 전체 생성 시간보다 먼저 도착하는지 테스트"""
+    print("\n=== 스트리밍 답변 테스트 ===")
+
+    delay, chunk_delay = 0.1, 0.05
+    with StubLLMServer(delay=delay, chunk_delay=chunk_delay) as stub:
+        generator = AnswerGenerator(api_key="test-key", base_url=stub.base_url)
+        full_time = delay + chunk_delay * (len(stub.chunks()) - 1)
+
+        start = time.perf_counter()
+        deltas, arrivals = [], []
+        for delta in generator.stream_answer(QUESTION, REFERENCE):
+            deltas.append(delta)
+            arrivals.append(time.perf_counter() - start)
+        assert deltas == stub.chunks() and "".join(deltas) == STUB_ANSWER
+        assert arrivals[0] < full_time / 2 <= arrivals[-1]
+
+        # 비스트리밍 요청은 전체 생성이 끝나야 응답
+        start = time.perf_counter()
+        assert generator.generate_answer(QUESTION, REFERENCE) == STUB_ANSWER
+        blocking = time.perf_counter() - start
+        assert blocking >= full_time
+
+        # 참고 답변이 없으면 폴백 프롬프트
+        assert "".join(generator.stream_answer(QUESTION)) == STUB_ANSWER
+        assert stub.requests[0]['stream'] is True
+        assert "참고" not in user_text(stub.requests[2])
+
+        # 비동기 스트리밍 (이벤트 루프 스레드에서 동기 이터레이터로)
+        loop = EventLoopThread()
+        async_generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url)
+        pipeline = AsyncCounselingPipeline(None, async_generator)
+        assert list(loop.iterate(pipeline.stream(QUESTION, REFERENCE))) == stub.chunks()
+        assert async_generator.in_flight == 0 and async_generator.peak_in_flight == 1
+        loop.run(async_generator.aclose())
+        loop.close()
+    print(f"[OK] 첫 조각 {arrivals[0] * 1000:.0f}ms / 전체 답변 {blocking * 1000:.0f}ms")
+
+
+def test_prompt_caching():
+    """모델의 최소 캐시 길이 이상인 시스템 프롬프트에만 캐시 지점을 두고, 캐시 읽기/쓰기 토큰을 집계하는지 테스트"""
+    print("\n=== 프롬프트 캐시 테스트 ===")
+
+    # 끄면 캐시 지점을 두지 않고, 켜도 기본 시스템 프롬프트는 최소 캐시 길이(1024토큰)보다 짧아 캐시 지점을 두지 않음
+    system, user = build_prompt(QUESTION, REFERENCE)
+    guide = "\n".join(f"상담 지침 {i}: 상대방의 이야기를 끝까지 듣고 감정을 먼저 인정해 주세요." for i in range(60))
+    long_system = [text_block(f"{generator_module.SYSTEM_PROMPT}\n\n{guide}")]
+    other = [({"id": "T002", "category": "가족", "title": "부모님과의 갈등",
+               "content": "서로의 입장을 차분히 이야기해 보세요."}, 0.6)]
+    original_caching, original_prompt = generator_module.PROMPT_CACHING, generator_module.SYSTEM_PROMPT
+    try:
+        generator_module.PROMPT_CACHING = False
+        assert 'cache_control' not in message_params(long_system, user)['system'][-1]
+
+        generator_module.PROMPT_CACHING = True
+        params = message_params(system, user)
+        assert min_cacheable_tokens("claude-sonnet-4-5-20250929") == 1024
+        assert min_cacheable_tokens("claude-haiku-4-5-20251001") == 4096 and min_cacheable_tokens("claude-3-5-haiku") == 2048
+        assert not any('cache_control' in block for block in params['system'] + params['messages'][0]['content'])
+        assert 'cache_control' in message_params(long_system, user)['system'][-1]
+        assert 'cache_control' not in message_params(long_system, user, Route("fast", "claude-haiku-4-5", 800))['system'][-1]
+
+        generator_module.SYSTEM_PROMPT = long_system[0]['text']
+        with StubLLMServer() as stub:
+            # 빠른 모델(최소 4096토큰)로 가지 않도록 라우팅은 끔
+            generator = AnswerGenerator(api_key="test-key", base_url=stub.base_url, router=ModelRouter(enabled=False))
+
+            generator.generate_answer(QUESTION, REFERENCE)
+            first = generator.last_usage
+            assert first['cache_read_tokens'] == 0 and first['cache_write_tokens'] >= 1024
+
+            # 질문과 참고 답변이 달라도 시스템 프롬프트는 캐시에서 읽고, 새로 쓰는 토큰은 없음
+            "".join(generator.stream_answer("부모님과 자주 다퉈요", other))
+            second = generator.last_usage
+            assert second['cache_read_tokens'] == first['cache_write_tokens'] and second['cache_write_tokens'] == 0
+    finally:
+        generator_module.PROMPT_CACHING, generator_module.SYSTEM_PROMPT = original_caching, original_prompt
+
+    body = stub.requests[0]
+    assert body['system'][0]['cache_control'] == {"type": "ephemeral"}
+    reference_block, question_block = body['messages'][0]['content']
+    assert 'cache_control' not in reference_block and 'cache_control' not in question_block
+    assert "85%" in question_block['text'] and "85%" not in reference_block['text']
+
+    usage = generator.usage
+    assert usage.requests == 2 and usage.cache_hits == 1
+    assert usage.output_tokens == 100 and 0 < usage.cache_hit_rate < 1
+    print(f"[OK] {usage.summary()}")
+
+
+class FakeTTS:
+    """테스트용 음성 변환 (파일을 만들지 않고 경로만 반환)"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.texts = []
+
+    def generate_answer_audio(self, text, filename="answer"):
+        self.texts.append(text)
+        time.sleep(self.delay)
+        return Path(f"{filename}.mp3")
+
+
+class CountingMatcher:
+    """검색 호출 수를 세는 매처 래퍼 (검색마다 지연)"""
+
+    def __init__(self, matcher: AnswerMatcher, delay: float):
+        self.matcher = matcher
+        self.delay = delay
+        self.calls = 0
+
+    def find_best_matches(self, question, top_k=3, category=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.matcher.find_best_matches(question, top_k, category)
+
+
+def test_async_pipeline():
+    """검색 -> 생성 -> 음성 변환 단계를 이벤트 루프 스레드에서 실행하는지 테스트"""
+    print("\n=== 비동기 파이프라인 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None)
+    loop = EventLoopThread()
+    with StubLLMServer(delay=0.05) as stub:
+        generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url, max_concurrency=2)
+        tts = FakeTTS()
+        pipeline = AsyncCounselingPipeline(matcher, generator, tts)
+
+        result = loop.run(pipeline.answer("스트레스 관리법", enable_tts=True, filename="a1"))
+        assert result.matches == matcher.find_best_matches("스트레스 관리법")
+        assert result.matches and result.answer == STUB_ANSWER
+        assert result.audio_path == Path("a1.mp3") and tts.texts == [STUB_ANSWER]
+
+        # 참고 답변이 없으면 폴백 프롬프트, 여러 질문은 동시에 처리
+        results = loop.run(pipeline.answer_many(["ㅁㄴㅇㄹ", "친구 사귀기 어려울 때", "스트레스 관리법"]))
+        assert [r.question for r in results] == ["ㅁㄴㅇㄹ", "친구 사귀기 어려울 때", "스트레스 관리법"]
+        assert results[0].matches == [] and results[0].audio_path is None
+        fallback = [user_text(r) for r in stub.requests if "ㅁㄴㅇㄹ" in user_text(r)]
+        assert len(fallback) == 1 and "참고" not in fallback[0]
+        assert generator.peak_in_flight <= 2
+        loop.run(generator.aclose())
+    loop.close()
+    print("[OK] 비동기 파이프라인 확인")
+
+
+def test_request_coalescing():
+    """동시에 들어온 같은 질문은 검색 / 답변 생성 / 음성 변환을 한 번만 실행하는지 테스트"""
+    print("\n=== 요청 병합 테스트 ===")
+
+    question = "스트레스 관리법"
+    matcher = CountingMatcher(AnswerMatcher(index_cache_dir=None), delay=0.05)
+    tts = FakeTTS(delay=0.05)
+    loop = EventLoopThread()
+    with StubLLMServer(delay=0.2, chunk_delay=0.01) as stub:
+        generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url)
+        pipeline = AsyncCounselingPipeline(matcher, generator, tts)
+
+        async def clicks(n):
+            return await asyncio.gather(*(
+                pipeline.answer(question + "!" * (i % 2), enable_tts=True, filename=f"user{i}") for i in range(n)
+            ))
+
+        start = time.perf_counter()
+        results = loop.run(clicks(10))
+        elapsed = time.perf_counter() - start
+        assert len({r.answer for r in results}) == 1 and results[0].answer == STUB_ANSWER
+        assert {r.audio_path for r in results} == {results[0].audio_path}
+        assert (matcher.calls, len(stub.requests), len(tts.texts)) == (1, 1, 1)
+        assert pipeline.flights.stats.shared == 27 and len(pipeline.flights) == 0
+
+        # 끝난 작업은 다시 실행 (결과를 영구히 저장하지 않음), 다른 질문은 병합하지 않음
+        loop.run(pipeline.answer(question))
+        loop.run(pipeline.answer("친구 사귀기 어려울 때"))
+        assert (matcher.calls, len(stub.requests)) == (3, 3)
+
+        # 스트리밍: 먼저 요청한 쪽은 조각 단위로, 합류한 쪽은 완성된 답변을 한 조각으로 받음
+        matches = loop.run(pipeline.retrieve(question))
+
+        async def streams(n):
+            async def consume():
+                return [text async for text in pipeline.stream(question, matches)]
+            return await asyncio.gather(*(consume() for _ in range(n)))
+
+        streamed = loop.run(streams(5))
+        assert streamed[0] == stub.chunks() and streamed[1:] == [[STUB_ANSWER]] * 4
+        assert len(stub.requests) == 4
+
+        # 중간에 멈춘 스트림에 합류한 요청은 예외를 받고, 다음 요청은 새로 실행
+        async def abandoned():
+            leader = pipeline.stream(question, matches)
+            await leader.__anext__()
+            follower = asyncio.ensure_future(pipeline.generate(question, matches))
+            await asyncio.sleep(0)
+            await leader.aclose()
+            try:
+                await follower
+            except RuntimeError:
+                return True
+            return False
+
+        assert loop.run(abandoned())
+        assert loop.run(pipeline.generate(question, matches)) == STUB_ANSWER
+        loop.run(generator.aclose())
+    loop.close()
+    print(f"[OK] 동시 요청 10개 {elapsed * 1000:.0f}ms, {pipeline.flights.stats.summary()}")
+
+
+if __name__ == "__main__":
+    test_sync_generator()
+    test_async_generator_concurrency()
+    test_stream_answer()
+    test_prompt_caching()
+    test_async_pipeline()
+    test_request_coalescing()
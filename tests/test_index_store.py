@@ -0,0 +1,64 @@
+"""
+인덱스 캐시 테스트
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from config import SAMPLE_ANSWERS_PATH
+from matcher import AnswerMatcher
+
+
+def test_index_cache_roundtrip():
+    """저장된 인덱스로 복원한 매처가 새로 학습한 매처와 같은 결과를 내는지 테스트"""
+    print("=== 인덱스 캐시 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        fresh = AnswerMatcher(index_cache_dir=cache_dir)
+        assert list(cache_dir.glob("*.npz")), "인덱스 파일이 생성되지 않았습니다"
+
+        cached = AnswerMatcher(index_cache_dir=cache_dir)
+        assert cached.index_key == fresh.index_key
+        assert (cached.answer_vectors != fresh.answer_vectors).nnz == 0
+
+        question = "남자친구와 헤어져서 너무 힘들어요"
+        expected = [(a['id'], round(s, 6)) for a, s in fresh.find_best_matches(question)]
+        actual = [(a['id'], round(s, 6)) for a, s in cached.find_best_matches(question)]
+        assert actual == expected
+        print(f"[OK] 캐시 복원 결과 일치: {actual}")
+
+
+def test_index_cache_invalidation():
+    """코퍼스가 바뀌면 인덱스를 다시 만드는지 테스트"""
+    print("\n=== 인덱스 무효화 테스트 ===")
+
+    with open(SAMPLE_ANSWERS_PATH, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        answers_path = tmp / "answers.json"
+        answers_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+        first = AnswerMatcher(answers_path, index_cache_dir=tmp / "index")
+
+        data['answers'] = data['answers'][:-1]
+        answers_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        second = AnswerMatcher(answers_path, index_cache_dir=tmp / "index")
+
+        assert second.index_key != first.index_key
+        assert second.answer_vectors.shape[0] == len(data['answers'])
+        # 이전 버전 인덱스는 정리되어야 함
+        assert len(list((tmp / "index").glob("*.npz"))) == 2
+        print("[OK] 코퍼스 변경 시 인덱스 재생성 확인")
+
+
+if __name__ == "__main__":
+    test_index_cache_roundtrip()
+    test_index_cache_invalidation()
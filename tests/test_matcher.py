@@ -0,0 +1,295 @@
+"""
+답변 매칭 모듈 테스트
+"""
+
+import sys
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import threading
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from config import SIMILARITY_THRESHOLD
+from inverted_index import InvertedIndex
+from matcher import AnswerMatcher
+from ranking import select_top_k
+
+TEST_QUESTIONS = [
+    "남자친구와 헤어져서 너무 힘들어요",
+    "진로를 어떻게 정해야 할지 모르겠어요",
+    "매일 걱정이 많고 불안해요",
+    "친구와 다퉜어요",
+    "",
+]
+
+_matcher = None
+
+
+def get_matcher() -> AnswerMatcher:
+    """테스트 간에 공유하는 매처"""
+    global _matcher
+    if _matcher is None:
+        _matcher = AnswerMatcher(index_cache_dir=None)
+    return _matcher
+
+
+def as_ids(matches):
+    """비교용으로 (id, 반올림 점수) 리스트로 변환"""
+    return [(answer['id'], round(score, 9)) for answer, score in matches]
+
+
+def reference_matches(matcher: AnswerMatcher, question: str, top_k: int):
+    """전체 정렬 기반 기준 구현"""
+    question_vector = matcher.vectorizer.transform([question])
+    similarities = cosine_similarity(question_vector, matcher.answer_vectors)[0]
+    order = sorted(range(len(similarities)), key=lambda i: (-similarities[i], i))[:top_k]
+    return [
+        (matcher.answers[i], float(similarities[i]))
+        for i in order if similarities[i] >= SIMILARITY_THRESHOLD
+    ]
+
+
+def test_select_top_k():
+    """부분 선택 결과가 전체 정렬과 같은지 테스트"""
+    print("=== 상위 k개 선택 테스트 ===")
+
+    rng = np.random.default_rng(0)
+    scores = rng.random(1000)
+    scores[10] = scores[20] = 0.999  # 동점
+
+    top = select_top_k(scores, 5, threshold=0.0)
+    expected = sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:5]
+    assert top.tolist() == expected
+
+    assert select_top_k(scores, 5, threshold=2.0).size == 0
+    assert select_top_k(scores, 0, threshold=0.0).size == 0
+    assert len(select_top_k(scores[:3], 5, threshold=0.0)) == 3
+    print("[OK] 부분 선택 결과 일치")
+
+
+def test_find_best_matches_reference():
+    """희소 내적 + 부분 선택 결과가 코사인 유사도 + 전체 정렬과 같은지 테스트"""
+    print("\n=== 단일 검색 정확성 테스트 ===")
+
+    matcher = get_matcher()
+    for question in TEST_QUESTIONS:
+        for top_k in (1, 3, len(matcher.answers) + 5):
+            assert as_ids(matcher.find_best_matches(question, top_k)) == \
+                as_ids(reference_matches(matcher, question, top_k))
+    print("[OK] 기준 구현과 결과 일치")
+
+
+def test_find_best_matches_many():
+    """배치 검색 결과가 단일 검색 결과와 같은지 테스트"""
+    print("\n=== 배치 검색 테스트 ===")
+
+    matcher = get_matcher()
+    batch = matcher.find_best_matches_many(TEST_QUESTIONS, top_k=3)
+
+    assert len(batch) == len(TEST_QUESTIONS)
+    for question, matches in zip(TEST_QUESTIONS, batch):
+        assert as_ids(matches) == as_ids(matcher.find_best_matches(question, top_k=3))
+
+    assert matcher.find_best_matches_many([]) == []
+    print("[OK] 배치 검색 결과 일치")
+
+
+def test_inverted_index_matches_brute_force():
+    """역색인 검색 결과가 전체 채점 결과와 같은지 테스트"""
+    print("\n=== 역색인 검색 테스트 ===")
+
+    brute = get_matcher()
+    inverted = AnswerMatcher(index_cache_dir=None, retrieval_mode="inverted")
+    for question in TEST_QUESTIONS:
+        for top_k in (1, 3, 20):
+            assert as_ids(inverted.find_best_matches(question, top_k)) == \
+                as_ids(brute.find_best_matches(question, top_k))
+
+    # 임의의 희소 코퍼스에서 여러 임계값으로 비교
+    rng = np.random.default_rng(1)
+    answers = normalize(sparse.random(2000, 300, density=0.03, random_state=rng, format='csr'))
+    queries = normalize(sparse.random(30, 300, density=0.05, random_state=rng, format='csr'))
+    index = InvertedIndex(answers)
+    dense = (queries @ answers.T).toarray()
+    for threshold in (0.0, 0.05, 0.2, 0.5):
+        for i in range(queries.shape[0]):
+            indices, scores = index.search(queries[i], 10, threshold)
+            expected = select_top_k(dense[i], 10, threshold)
+            assert indices.tolist() == expected.tolist()
+            assert np.allclose(scores, dense[i][expected])
+
+    print("[OK] 역색인 결과 일치")
+
+
+NEW_ANSWER = {
+    "id": "N001",
+    "category": "반려동물",
+    "keywords": ["반려견", "강아지", "펫로스"],
+    "title": "반려견을 떠나보낸 슬픔",
+    "content": "오랜 시간 함께한 강아지를 떠나보내는 일은 가족을 잃는 것만큼 아픕니다. 충분히 슬퍼해도 괜찮아요.",
+    "key_points": ["애도", "감정 수용"]
+}
+
+
+def test_incremental_updates():
+    """재학습 없이 답변 추가/삭제 후 검색 결과가 반영되는지 테스트"""
+    print("\n=== 답변 추가/삭제 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None, auto_compact=False)
+    total = len(matcher.answers)
+    vectorizer = matcher.vectorizer
+
+    assert matcher.add_answers([NEW_ANSWER]) == 1
+    assert len(matcher.answers) == total + 1
+    assert matcher.vectorizer is vectorizer  # 재학습하지 않음
+    matches = matcher.find_best_matches("오랜 시간 함께한 강아지를 떠나보내서 슬퍼요")
+    assert matches and matches[0][0]['id'] == "N001"
+
+    try:
+        matcher.add_answers([NEW_ANSWER])
+        assert False, "중복 id가 허용되었습니다"
+    except ValueError:
+        pass
+
+    assert matcher.remove_answers(["N001", "없는id"]) == 1
+    assert len(matcher.answers) == total
+    assert all(a['id'] != "N001" for a, _ in matcher.find_best_matches("오랜 시간 함께한 강아지를 떠나보내서 슬퍼요"))
+    print("[OK] 추가/삭제 반영 확인")
+
+
+def test_compaction_matches_fresh_fit():
+    """재학습(compact) 후 결과가 처음부터 학습한 매처와 같은지 테스트"""
+    print("\n=== 인덱스 재학습 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None, auto_compact=False)
+    removed_id = matcher.answers[0]['id']
+    matcher.add_answers([NEW_ANSWER])
+    matcher.remove_answers([removed_id])
+    matcher.compact()
+    assert matcher._index.stale_updates == 0
+
+    fresh = AnswerMatcher(index_cache_dir=None)
+    fresh.prepare_vectorizer(list(matcher.answers))
+    for question in TEST_QUESTIONS + ["강아지를 떠나보내서 너무 슬퍼요"]:
+        assert as_ids(matcher.find_best_matches(question)) == as_ids(fresh.find_best_matches(question))
+    print("[OK] 재학습 결과 일치")
+
+
+def test_updates_are_atomic_for_readers():
+    """갱신과 백그라운드 재학습 중에도 검색이 항상 일관된 스냅샷을 보는지 테스트"""
+    print("\n=== 동시 갱신 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None, auto_compact=True)
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                index = matcher._index
+                assert index.answer_vectors.shape[0] == len(index.answers)
+                assert index.term_vectors.shape[1] == len(index.answers)
+                for answer, score in matcher.find_best_matches("강아지를 떠나보내서 너무 슬퍼요"):
+                    assert 0.0 <= score <= 1.0 + 1e-9
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+
+    for i in range(30):
+        answer = dict(NEW_ANSWER, id=f"N{i:03d}")
+        matcher.add_answers([answer])
+        if i % 3 == 0:
+            matcher.remove_answers([answer['id']])
+
+    thread = matcher.compact_in_background()
+    thread.join()
+    stop.set()
+    for t in threads:
+        t.join()
+
+    assert not errors, errors
+    assert len(matcher.answers) == len(get_matcher().answers) + 20
+    print("[OK] 동시 갱신 중 검색 일관성 확인")
+
+
+def test_category_partitions():
+    """카테고리 부분 인덱스 검색이 전체 검색 결과를 카테고리로 거른 것과 같은지 테스트"""
+    print("\n=== 카테고리 필터 테스트 ===")
+
+    for mode in ("brute", "inverted"):
+        matcher = AnswerMatcher(index_cache_dir=None, retrieval_mode=mode, auto_compact=False)
+        index = matcher._index
+        assert matcher.categories[:3] == ["연애", "진로", "가족"]
+
+        for question in TEST_QUESTIONS:
+            everything, scores = index.lexical.search(question, len(matcher.answers), threshold=0.0)
+            for categories in (("연애",), ("진로",), ("연애", "불안"), ("없는카테고리",)):
+                partition = index.partition(categories)
+                indices, part_scores = partition.lexical.search(question, 3, threshold=0.0)
+                expected = [
+                    (matcher.answers[i]['id'], round(float(sc), 9)) for i, sc in zip(everything, scores)
+                    if matcher.answers[i]['category'] in categories
+                ][:3]
+                assert [(partition.answers[i]['id'], round(float(sc), 9))
+                        for i, sc in zip(indices, part_scores)] == expected
+
+        # 부분 인덱스는 스냅샷마다 다시 만들어져 추가된 답변도 반영
+        matcher.add_answers([NEW_ANSWER])
+        question = "오랜 시간 함께한 강아지를 떠나보내서 슬퍼요"
+        assert [a['id'] for a, _ in matcher.find_best_matches(question, category="반려동물")] == ["N001"]
+        assert matcher.find_best_matches(question, category="연애") == []
+        assert matcher.find_best_matches_many([question], category="반려동물")[0] == \
+            matcher.find_best_matches(question, category="반려동물")
+    print("[OK] 카테고리 필터 결과 일치")
+
+
+def test_category_routing():
+    """분류기가 고른 카테고리를 먼저 검색하고, 확신이 없거나 결과가 없으면 전체 검색하는지 테스트"""
+    print("\n=== 카테고리 라우팅 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None, category_routing=True, auto_compact=False)
+    matcher.add_answers([NEW_ANSWER])
+    classifier = matcher._index.classifier
+    assert classifier.route("친구를 사귀고 싶은데 방법을 모르겠어요") == ["대인관계"]
+    assert classifier.route("ㅁㄴㅇㄹ") is None
+    probabilities = classifier.predict("부모님과 자꾸 싸우게 돼요")
+    assert probabilities[0][0] == "가족" and abs(sum(p for _, p in probabilities) - 1.0) < 1e-9
+
+    # 라우팅한 카테고리(가족)에 결과가 없으면 전체 검색 결과와 같아야 함
+    plain = AnswerMatcher(index_cache_dir=None, auto_compact=False)
+    plain.add_answers([NEW_ANSWER])
+    for question in TEST_QUESTIONS + ["강아지를 떠나보내서 너무 슬퍼요 부모님"]:
+        matches, timings = matcher.find_best_matches_with_timings(question)
+        routed = classifier.route(question)
+        if routed and matcher.find_best_matches(question, category=routed):
+            assert matches == matcher.find_best_matches(question, category=routed)
+        else:
+            assert as_ids(matches) == as_ids(plain.find_best_matches(question))
+        assert 'routing' in timings.stages
+
+    questions = TEST_QUESTIONS + ["강아지를 떠나보내서 너무 슬퍼요 부모님"]
+    assert [as_ids(m) for m in matcher.find_best_matches_many(questions)] == \
+        [as_ids(matcher.find_best_matches(q)) for q in questions]
+    print("[OK] 라우팅 및 전체 검색 대체 확인")
+
+
+if __name__ == "__main__":
+    test_select_top_k()
+    test_find_best_matches_reference()
+    test_find_best_matches_many()
+    test_inverted_index_matches_brute_force()
+    test_incremental_updates()
+    test_compaction_matches_fresh_fit()
+    test_updates_are_atomic_for_readers()
+    test_category_partitions()
+    test_category_routing()
@@ -0,0 +1,93 @@
+"""
+참고 답변 패킹 테스트
+"""
+
+import sys
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generator import build_answer_prompt, format_references
+from matcher import AnswerMatcher
+from packing import estimate_tokens, pack_references, split_sentences
+
+
+def sample_references():
+    answers = {a['id']: a for a in AnswerMatcher(index_cache_dir=None).answers}
+    return [(answers["A007"], 0.5), (answers["A001"], 0.4), (answers["A010"], 0.35)]
+
+
+def test_token_estimate_and_sentences():
+    """토큰 추정과 문장 나누기 테스트"""
+    print("=== 토큰 추정 테스트 ===")
+
+    assert estimate_tokens("안녕하세요") == 5
+    assert estimate_tokens("hello world!") == 3
+    assert estimate_tokens("스트레스 OK") == 4 + 1
+    assert split_sentences("첫 문장입니다. 두 번째인가요? 네!\n마지막") == ["첫 문장입니다.", "두 번째인가요?", "네!", "마지막"]
+    print("[OK] 토큰 추정 / 문장 나누기 확인")
+
+
+def test_budget():
+    """예산 안이면 본문을 그대로 두고, 넘으면 핵심 포인트와 질문에 가까운 문장으로 줄이는지 테스트"""
+    print("\n=== 토큰 예산 패킹 테스트 ===")
+
+    references = sample_references()
+    question = "요즘 잠이 안 오고 심장이 두근거려요"
+    full_tokens = estimate_tokens(format_references(pack_references(question, references, budget=0)))
+
+    # 예산 안이면 질문과 상관없이 같은 텍스트 (프롬프트 캐시 유지)
+    roomy = pack_references(question, references, budget=full_tokens + 50)
+    assert [" ".join(r.sentences) for r in roomy] == [a['content'] for a, _ in references]
+    assert format_references(roomy) == format_references(pack_references("다른 질문", references, full_tokens + 50))
+
+    for budget in (600, 400, 250):
+        packed = pack_references(question, references, budget=budget)
+        tokens = estimate_tokens(format_references(packed))
+        assert tokens <= budget, (budget, tokens)
+        # 모든 참고 답변의 핵심 포인트와 문장 하나 이상은 남김
+        assert len(packed) == 3 and all(r.truncated and r.sentences for r in packed)
+        assert all(f"핵심: {', '.join(a['key_points'])}" in format_references(packed) for a, _ in references)
+        print(f"[OK] 예산 {budget}: {full_tokens} -> {tokens} 토큰")
+
+    # 질문과 겹치는 문장을 우선 (불안 답변의 가운데 있는 카페인 문장)
+    packed = pack_references("커피 카페인을 줄이면 불안이 나아질까요", references, budget=250)
+    assert "카페인과 알코올을 줄이는 것도 불안 감소에 도움이 돼요." in packed[2].sentences
+    assert packed[2].sentences[0] != split_sentences(references[2][0]['content'])[0]
+
+    # 제목과 핵심 포인트만으로도 넘치면 유사도가 낮은 참고 답변부터 제외
+    assert len(pack_references(question, references, budget=60)) < 3
+
+
+def test_deduplication():
+    """본문이 거의 같은 참고 답변과 다른 답변에 반복된 문장을 제거하는지 테스트"""
+    print("\n=== 참고 답변 중복 제거 테스트 ===")
+
+    references = sample_references()
+    copy = dict(references[0][0], id="A007-copy", title="스트레스 관리 (사본)")
+    duplicated = [references[0], (copy, 0.45)] + references[1:]
+    packed = pack_references("스트레스", duplicated, budget=0)
+    assert [r.answer['id'] for r in packed] == ["A007", "A001", "A010"]
+
+    # 프롬프트의 참고 번호와 유사도 목록도 중복 제거 후 기준
+    _, user = build_answer_prompt("스트레스", duplicated)
+    assert "[참고 3] 불안감 다스리기" in user[0]['text'] and "[참고 4]" not in user[0]['text']
+    assert "참고 1 50%, 참고 2 40%, 참고 3 35%" in user[1]['text']
+
+    # 같은 문장을 공유하는 서로 다른 답변은 그 문장을 한 번만 넣음
+    shared = "힘들 때는 혼자 견디지 말고 주변 사람들에게 도움을 청하세요."
+    first = {"id": "X1", "title": "첫 번째", "category": "기타", "content": f"{shared} 산책도 도움이 됩니다.",
+             "key_points": []}
+    second = {"id": "X2", "title": "두 번째", "category": "기타",
+              "content": f"일기를 써 보세요. {shared} 충분히 자는 것도 중요해요. " * 3, "key_points": []}
+    packed = pack_references("혼자 견디기 힘들어요", [(first, 0.5), (second, 0.4)], budget=90)
+    text = format_references(packed)
+    assert text.count(shared) == 1 and estimate_tokens(text) <= 90
+    print("[OK] 중복 참고 답변 / 문장 제거 확인")
+
+
+if __name__ == "__main__":
+    test_token_estimate_and_sentences()
+    test_budget()
+    test_deduplication()
@@ -0,0 +1,235 @@
+"""
+재시도 / 서킷 브레이커 테스트
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import anthropic
+import httpx
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from answer_cache import AnswerCache
+from generator import FALLBACK_ANSWER, AnswerGenerator, AsyncAnswerGenerator, fallback_answer
+from llm_stub import STUB_ANSWER, StubLLMServer
+from resilience import CircuitBreaker, ResilientCaller, RetryPolicy, is_retryable, retry_after
+
+REFERENCE = [({"id": "A007", "category": "스트레스", "title": "스트레스 관리법", "content": "잠시 쉬어 가세요."}, 0.5)]
+
+
+def fast_caller(**policy) -> ResilientCaller:
+    """테스트용 짧은 대기 시간의 재시도 정책"""
+    options = dict(base_delay=0.01, max_delay=0.05, attempt_timeout=5.0, total_timeout=10.0)
+    options.update(policy)
+    return ResilientCaller(RetryPolicy(**options), CircuitBreaker(failure_threshold=100))
+
+
+def status_error(status: int, headers: dict = None) -> anthropic.APIStatusError:
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "http://stub/v1/messages"))
+    return anthropic.APIStatusError("stub", response=response, body=None)
+
+
+def test_backoff_and_retry_after():
+    """지터 백오프 범위, retry-after 파싱, 재시도 대상 오류 구분 테스트"""
+    print("=== 백오프 / retry-after 테스트 ===")
+
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+    delays = [policy.backoff(attempt) for attempt in range(6) for _ in range(50)]
+    assert all(0 <= d <= 1.0 for d in delays) and len(set(delays)) > 100
+    assert max(policy.backoff(0) for _ in range(50)) <= 0.1
+    assert policy.backoff(0, server_delay=2.0) >= 2.0
+
+    assert retry_after(status_error(429, {"retry-after": "3"})) == 3.0
+    assert retry_after(status_error(429, {"retry-after-ms": "250", "retry-after": "3"})) == 0.25
+    assert 0 < retry_after(status_error(529, {"retry-after": "Wed, 21 Oct 2099 07:28:00 GMT"}))
+    assert retry_after(status_error(529)) is None
+
+    assert all(is_retryable(status_error(code)) for code in (408, 429, 500, 503, 529))
+    assert not any(is_retryable(status_error(code)) for code in (400, 401, 403, 404))
+    assert is_retryable(asyncio.TimeoutError()) and is_retryable(httpx.ReadTimeout("stub"))
+    assert not is_retryable(ValueError())
+    print("[OK] 백오프 / retry-after 확인")
+
+
+def test_circuit_breaker():
+    """연속 실패 시 열리고, 시험 호출 하나만 허용한 뒤 결과에 따라 닫히는지 테스트"""
+    print("\n=== 서킷 브레이커 테스트 ===")
+
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=0.1)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # 연속 실패만 셈
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow() and breaker.trips == 1
+
+    time.sleep(0.12)
+    assert breaker.allow() and not breaker.allow()  # 시험 호출은 하나만
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.12)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow() and breaker.trips == 1
+    print("[OK] closed -> open -> half_open -> open -> closed")
+
+
+def test_circuit_breaker_interrupted_probe():
+    """시험 호출이 취소되거나 요청 오류(400)로 끝나면 서킷을 닫지 않고 다음 호출이 다시 시험하는지 테스트"""
+    print("\n=== 서킷 브레이커 시험 호출 중단 테스트 ===")
+
+    caller = ResilientCaller(RetryPolicy(base_delay=0.01, max_delay=0.05),
+                             CircuitBreaker(failure_threshold=1, recovery_timeout=0.05))
+    breaker = caller.breaker
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    async def cancelled_probe():
+        async def hang(timeout):
+            await asyncio.sleep(10)
+        task = asyncio.ensure_future(caller.acall(hang))
+        await asyncio.sleep(0.01)
+        assert not breaker.allow()  # 시험 호출 진행 중
+        task.cancel()
+        try:
+            await task
+            assert False, "취소되지 않음"
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancelled_probe())
+    assert breaker.state == "half_open"
+
+    def bad_request(timeout):
+        raise status_error(400)
+    try:
+        caller.call(bad_request)
+        assert False, "오류가 발생하지 않음"
+    except anthropic.APIStatusError:
+        pass
+    assert breaker.state == "half_open" and breaker.trips == 1  # 400은 서버가 정상이라는 근거가 아님
+
+    assert caller.call(lambda timeout: "ok") == "ok" and breaker.state == "closed"
+    print("[OK] 취소 / 400 뒤에도 시험 호출 가능")
+
+
+def test_retries():
+    """일시 오류 재시도, retry-after 준수, 시도별 제한 시간, 재시도하지 않는 오류 테스트"""
+    print("\n=== 재시도 테스트 ===")
+
+    with StubLLMServer() as stub:
+        generator = AnswerGenerator(api_key="test-key", base_url=stub.base_url, resilience=fast_caller())
+
+        stub.fail_next(2, status=529)
+        assert generator.generate_answer("스트레스 관리법", REFERENCE) == STUB_ANSWER
+        assert len(stub.requests) == 3 and generator.resilience.stats.retries == 2
+
+        stub.fail_next(1, status=429, retry_after=0.3)
+        start = time.perf_counter()
+        assert generator.generate_answer("스트레스 관리법", REFERENCE) == STUB_ANSWER
+        assert time.perf_counter() - start >= 0.3
+
+        # 응답이 없는 시도는 시도별 제한 시간 뒤 재시도
+        generator.resilience.policy.attempt_timeout = 0.2
+        stub.fail_next(1, hang=1.0)
+        start = time.perf_counter()
+        assert generator.generate_answer("스트레스 관리법", REFERENCE) == STUB_ANSWER
+        assert time.perf_counter() - start < 0.9
+
+        # 스트리밍은 연결 단계의 오류를 재시도
+        stub.fail_next(1, status=503)
+        assert list(generator.stream_answer("스트레스 관리법", REFERENCE)) == stub.chunks()
+
+        # 요청 자체의 오류는 재시도하지 않고, 폴백 답변으로 감추지도 않음
+        requests = len(stub.requests)
+        stub.fail_next(1, status=400)
+        try:
+            generator.generate_answer("스트레스 관리법", REFERENCE)
+            assert False, "오류가 발생하지 않음"
+        except anthropic.BadRequestError:
+            pass
+        assert len(stub.requests) == requests + 1 and generator.resilience.stats.fallbacks == 0
+    print(f"[OK] {generator.resilience.stats.summary()}")
+
+
+def test_deadline_and_fallback():
+    """전체 제한 시간을 넘으면 폴백 답변을 반환하고, 폴백 답변은 캐시에 저장하지 않는지 테스트"""
+    print("\n=== 전체 제한 시간 / 폴백 테스트 ===")
+
+    with StubLLMServer() as stub:
+        caller = fast_caller(max_attempts=100, base_delay=0.05, max_delay=0.1, total_timeout=0.4)
+        cache = AnswerCache()
+        generator = AnswerGenerator(api_key="test-key", base_url=stub.base_url, resilience=caller, cache=cache)
+
+        stub.fail_next(1000, status=529)
+        start = time.perf_counter()
+        assert generator.generate_answer("스트레스 관리법", REFERENCE) == fallback_answer(REFERENCE)
+        assert time.perf_counter() - start < 0.6
+        assert "".join(generator.stream_answer("처음 보는 고민")) == FALLBACK_ANSWER
+        assert caller.stats.failures == 2 and caller.stats.fallbacks == 2
+
+        # 장애가 끝나면 새로 생성 (폴백 답변은 캐시되지 않음)
+        stub.faults.clear()
+        assert generator.generate_answer("스트레스 관리법", REFERENCE) == STUB_ANSWER
+
+        # 폴백을 끄면 오류 발생 (전체 제한 시간보다 시도 수가 먼저 끝나도록 해서 마지막 오류를 고정)
+        generator.fallback = False
+        caller.policy.max_attempts = 3
+        stub.fail_next(1000, status=529)
+        try:
+            generator.generate_simple_answer("처음 보는 고민")
+            assert False, "오류가 발생하지 않음"
+        except anthropic.APIStatusError as e:
+            assert e.status_code == 529
+        stub.faults.clear()
+    print(f"[OK] {caller.stats.summary()}")
+
+
+def test_circuit_breaker_fast_fallback():
+    """장애가 이어지면 서킷이 열려 API를 호출하지 않고 바로 폴백하며, 복구 후 다시 닫히는지 테스트 (비동기)"""
+    print("\n=== 서킷 브레이커 폴백 테스트 ===")
+
+    with StubLLMServer() as stub:
+        caller = ResilientCaller(RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.02),
+                                 CircuitBreaker(failure_threshold=4, recovery_timeout=0.3))
+
+        async def run():
+            generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url, resilience=caller)
+            stub.fail_next(1000, status=529)
+            answers = [await generator.generate_answer("스트레스 관리법", REFERENCE) for _ in range(2)]
+            assert caller.breaker.state == "open" and len(stub.requests) == 4
+
+            # 열린 동안에는 요청하지 않고 바로 폴백
+            start = time.perf_counter()
+            answers += await asyncio.gather(*(generator.generate_answer("스트레스 관리법", REFERENCE) for _ in range(20)))
+            answers += [text async for text in generator.stream_answer("처음 보는 고민")]
+            short_circuit_time = time.perf_counter() - start
+            assert len(stub.requests) == 4 and caller.stats.short_circuits == 21
+
+            # 복구 시간이 지나면 시험 호출 하나로 닫힘
+            stub.faults.clear()
+            await asyncio.sleep(0.35)
+            answers.append(await generator.generate_answer("스트레스 관리법", REFERENCE))
+            await generator.aclose()
+            return answers, short_circuit_time
+
+        answers, short_circuit_time = asyncio.run(run())
+        assert answers[:22] == [fallback_answer(REFERENCE)] * 22 and answers[22] == FALLBACK_ANSWER
+        assert answers[-1] == STUB_ANSWER and caller.breaker.state == "closed"
+        assert short_circuit_time < 0.1
+    print(f"[OK] 서킷 차단 21건 {short_circuit_time * 1000:.1f}ms | {caller.stats.summary()}")
+
+
+if __name__ == "__main__":
+    test_backoff_and_retry_after()
+    test_circuit_breaker()
+    test_circuit_breaker_interrupted_probe()
+    test_retries()
+    test_deadline_and_fallback()
+    test_circuit_breaker_fast_fallback()
@@ -0,0 +1,267 @@
+"""
+검색기 / 임베딩 검색 테스트
+"""
+
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+
+from embeddings import Encoder, EmbeddingStore, embedding_key, encode_in_batches, l2_normalize
+from matcher import AnswerMatcher, answer_text
+from ranking import select_top_k
+from rerank import Reranker
+from retrievers import DenseRetriever, HybridRetriever, reciprocal_rank_fusion
+from vector_index import BruteForceVectorIndex, HnswVectorIndex
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+class CharHashEncoder(Encoder):
+    """테스트용 임베딩 모델 (문자 2-gram을 해시하여 고정 차원 벡터로 변환)"""
+
+    name = "test:char-hash-64"
+    dimension = 64
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts):
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for a, b in zip(text, text[1:]):
+                vectors[i, zlib.crc32((a + b).encode('utf-8')) % self.dimension] += 1.0
+        return l2_normalize(vectors)
+
+
+def test_brute_force_vector_index():
+    """float16/float32 전체 내적 검색이 기준 구현과 같은지 테스트"""
+    print("=== 벡터 인덱스 테스트 ===")
+
+    rng = np.random.default_rng(0)
+    embeddings = l2_normalize(rng.standard_normal((500, 32)))
+    queries = l2_normalize(rng.standard_normal((5, 32)))
+
+    for dtype in (np.float32, np.float16):
+        stored = embeddings.astype(dtype)
+        index = BruteForceVectorIndex(stored)
+        expected = queries @ stored.astype(np.float32).T
+        for (indices, scores), row in zip(index.search(queries, 10, 0.0), expected):
+            assert indices.tolist() == select_top_k(row, 10, 0.0).tolist()
+            assert np.allclose(scores, row[indices], atol=1e-5)
+
+    index = BruteForceVectorIndex(embeddings)
+    extended = index.extend(embeddings[:3]).select([0, 500])
+    assert len(extended) == 2 and np.allclose(extended.embeddings[1], embeddings[0])
+    assert len(index) == 500  # 원본은 그대로
+    print("[OK] 전체 내적 검색 결과 일치")
+
+
+def test_hnsw_vector_index():
+    """HNSW 근사 검색의 재현율과 추가/삭제 반영 테스트 (hnswlib가 있을 때만)"""
+    print("\n=== HNSW 인덱스 테스트 ===")
+    if hnswlib is None:
+        print("[SKIP] hnswlib가 설치되어 있지 않습니다")
+        return
+
+    rng = np.random.default_rng(1)
+    embeddings = l2_normalize(rng.standard_normal((2000, 32)))
+    queries = l2_normalize(rng.standard_normal((20, 32)))
+    exact = BruteForceVectorIndex(embeddings).search(queries, 10, -1.0)
+    approx = HnswVectorIndex(embeddings).search(queries, 10, -1.0)
+    hits = sum(len(set(a[0]) & set(e[0])) for a, e in zip(approx, exact))
+    assert hits / (10 * len(queries)) >= 0.9
+
+    index = HnswVectorIndex(embeddings[:100])
+    updated = index.extend(embeddings[100:101]).select(list(range(1, 101)))
+    indices, _ = updated.search(embeddings[100:101], 1, -1.0)[0]
+    assert indices.tolist() == [99]  # 새로 추가된 답변 (삭제로 한 칸 앞당겨짐)
+    print("[OK] HNSW 검색 확인")
+
+
+def test_embedding_store():
+    """임베딩이 메모리 매핑 파일로 저장/재사용되는지 테스트"""
+    print("\n=== 임베딩 저장소 테스트 ===")
+
+    encoder = CharHashEncoder()
+    texts = [f"테스트 문장 {i}" for i in range(150)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EmbeddingStore(Path(tmp), "answers")
+        key = embedding_key("corpus", encoder, "float16")
+        assert store.load(key) is None
+
+        built = store.build(key, encode_in_batches(encoder, texts, batch_size=64), 150, 64, "float16")
+        assert isinstance(built, np.memmap) and built.dtype == np.float16
+        assert encoder.calls == 3
+
+        loaded = store.load(key)
+        assert isinstance(loaded, np.memmap)
+        assert np.allclose(loaded, encoder.encode(texts), atol=1e-3)
+        del built, loaded
+    print("[OK] 임베딩 저장/재사용 확인")
+
+
+def reference_dense_matches(matcher: AnswerMatcher, question: str, top_k: int):
+    """답변 임베딩을 직접 계산하는 기준 구현"""
+    encoder = matcher.encoder
+    embeddings = encoder.encode([answer_text(a) for a in matcher.answers]).astype(matcher.embedding_dtype)
+    scores = encoder.encode([question])[0] @ embeddings.astype(np.float32).T
+    top = select_top_k(scores, top_k, matcher._index.dense.threshold)
+    return [(matcher.answers[i]['id'], round(float(scores[i]), 4)) for i in top]
+
+
+def as_ids(matches):
+    """비교용으로 (id, 반올림 점수) 리스트로 변환"""
+    return [(answer['id'], round(score, 4)) for answer, score in matches]
+
+
+def assert_same_matches(matcher: AnswerMatcher, question: str):
+    """매처 결과가 기준 구현과 같은지 확인 (점수는 float 오차 허용)"""
+    actual = as_ids(matcher.find_best_matches(question, top_k=3))
+    expected = reference_dense_matches(matcher, question, 3)
+    assert [i for i, _ in actual] == [i for i, _ in expected]
+    assert np.allclose([s for _, s in actual], [s for _, s in expected], atol=1e-3)
+
+
+def test_dense_matcher():
+    """임베딩 검색기를 쓰는 매처의 검색, 배치 검색, 추가/삭제 테스트"""
+    print("\n=== 임베딩 검색 매처 테스트 ===")
+
+    for dense_index in ("brute", "hnsw") if hnswlib is not None else ("brute",):
+        check_dense_matcher(dense_index)
+        print(f"[OK] 임베딩 검색 확인 ({dense_index})")
+
+
+def check_dense_matcher(dense_index: str):
+    questions = ["남자친구와 헤어져서 너무 힘들어요", "부모님과 자꾸 싸우게 돼요", "매일 걱정이 많고 불안해요", ""]
+    with tempfile.TemporaryDirectory() as tmp:
+        matcher = AnswerMatcher(
+            index_cache_dir=None, retriever="dense", encoder=CharHashEncoder(),
+            embedding_cache_dir=Path(tmp), dense_index=dense_index, auto_compact=False
+        )
+        for question in questions:
+            assert_same_matches(matcher, question)
+        batch = matcher.find_best_matches_many(questions, top_k=3)
+        assert [as_ids(m) for m in batch] == [as_ids(matcher.find_best_matches(q, 3)) for q in questions]
+        assert matcher.find_best_matches("") == []
+
+        # 같은 코퍼스/모델이면 임베딩을 다시 계산하지 않음
+        encoder = CharHashEncoder()
+        AnswerMatcher(index_cache_dir=None, retriever="dense", encoder=encoder,
+                      embedding_cache_dir=Path(tmp), dense_index=dense_index)
+        assert encoder.calls == 0
+
+        new_answer = {"id": "N001", "category": "반려동물", "title": "반려견을 떠나보낸 슬픔",
+                      "keywords": ["강아지"], "content": "강아지를 떠나보내서 슬퍼요"}
+        matcher.add_answers([new_answer])
+        matcher.remove_answers(["A001"])
+        assert len(matcher._index.dense.vector_index) == len(matcher.answers)
+        for question in questions + ["강아지를 떠나보내서 슬퍼요"]:
+            assert_same_matches(matcher, question)
+        assert matcher.find_best_matches("강아지를 떠나보내서 슬퍼요")[0][0]['id'] == "N001"
+        # 카테고리 부분 인덱스는 전체 결과를 카테고리로 거른 것과 같음
+        everything = matcher.find_best_matches("부모님과 자꾸 싸우게 돼요", top_k=len(matcher.answers))
+        expected = [m for m in as_ids(everything) if m[0] in {a['id'] for a in matcher.answers
+                                                                if a['category'] in ("가족", "반려동물")}]
+        actual = as_ids(matcher.find_best_matches("부모님과 자꾸 싸우게 돼요", 3, category=["가족", "반려동물"]))
+        assert [i for i, _ in actual] == [i for i, _ in expected[:3]]
+
+
+class SlowEncoder(CharHashEncoder):
+    """호출마다 지연되는 테스트용 임베딩 모델 (시간 예산 테스트용)"""
+
+    def encode(self, texts):
+        time.sleep(0.3)
+        return super().encode(texts)
+
+
+class KeywordReranker(Reranker):
+    """테스트용 재순위화 모델 (키워드가 들어 있는 답변에 높은 점수)"""
+
+    name = "test:keyword"
+
+    def __init__(self, keyword: str, delay: float = 0.0):
+        self.keyword = keyword
+        self.delay = delay
+        self.scored = 0
+
+    def score(self, question, texts):
+        time.sleep(self.delay)
+        self.scored += len(texts)
+        return np.array([0.9 if self.keyword in text else 0.1 for text in texts])
+
+
+def test_reciprocal_rank_fusion():
+    """RRF 점수와 순서 테스트"""
+    print("\n=== RRF 테스트 ===")
+
+    first = (np.array([3, 1, 2]), np.array([0.9, 0.8, 0.7]))
+    second = (np.array([1, 4]), np.array([0.6, 0.5]))
+    indices, scores = reciprocal_rank_fusion([first, second], rrf_k=60)
+    assert indices.tolist() == [1, 3, 4, 2]
+    assert np.allclose(scores, [1 / 62 + 1 / 61, 1 / 61, 1 / 62, 1 / 63])
+    assert reciprocal_rank_fusion([])[0].size == 0
+    print("[OK] RRF 결과 확인")
+
+
+def test_hybrid_matcher():
+    """하이브리드 검색의 후보 합치기, 재순위화, 단계별 시간 예산 테스트"""
+    print("\n=== 하이브리드 검색 테스트 ===")
+
+    question = "좋아하는 사람에게 고백하고 싶은데 용기가 안 나요"
+    matcher = AnswerMatcher(index_cache_dir=None, retriever="hybrid", encoder=CharHashEncoder(),
+                            embedding_cache_dir=None)
+    index = matcher._index
+
+    # 재순위화 없이: 두 검색기 후보를 RRF로 합친 순서
+    matches, timings = matcher.find_best_matches_with_timings(question, top_k=3)
+    lexical = index.lexical.search(question, 50)
+    dense = index.dense.search(question, 50)
+    expected, _ = reciprocal_rank_fusion([lexical, dense])
+    assert [a['id'] for a, _ in matches] == [index.answers[i]['id'] for i in expected[:3]]
+    assert {'tfidf', 'dense', 'fusion', 'total'} <= set(timings.stages) and not timings.over_budget
+    assert matcher.find_best_matches_many([question, ""], top_k=3)[0] == matches
+
+    # 재순위화 모델이 후보 순서를 바꿈
+    matcher.reranker = KeywordReranker("짝사랑")
+    matches, timings = matcher.find_best_matches_with_timings(question, top_k=3)
+    assert matches[0][0]['id'] == "A008" and matches[0][1] == 0.9
+    assert 'rerank' in timings.stages
+    assert matcher.reranker.scored == len(expected)  # 합친 후보만 채점
+
+    # 후보 생성 예산을 넘긴 검색기는 제외
+    slow = HybridRetriever(
+        [index.lexical, DenseRetriever(SlowEncoder(), index.dense.vector_index)], index.answers,
+        executor=matcher._executor, candidate_budget_ms=20
+    )
+    (indices, _), timings = slow.search_with_timings(question, 3)
+    assert timings.over_budget == ['dense']
+    assert indices.tolist() == lexical[0][:3].tolist()
+
+    # 재순위화 예산을 넘기면 남은 후보는 RRF 순서로 뒤에 붙음
+    reranker = KeywordReranker("없는 단어", delay=0.05)
+    limited = HybridRetriever([index.lexical, index.dense], index.answers, reranker=reranker,
+                              rerank_budget_ms=10)
+    (indices, _), timings = limited.search_with_timings(question, 10)
+    assert 'rerank' in timings.over_budget and reranker.scored == min(8, len(expected))
+    assert sorted(indices.tolist()) == sorted(expected[:10].tolist())
+    print(f"[OK] 하이브리드 검색 확인 ({timings.summary()})")
+
+
+if __name__ == "__main__":
+    test_brute_force_vector_index()
+    test_hnsw_vector_index()
+    test_embedding_store()
+    test_dense_matcher()
+    test_reciprocal_rank_fusion()
+    test_hybrid_matcher()
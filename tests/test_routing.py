@@ -0,0 +1,89 @@
+"""
+모델 라우팅 테스트 (로컬 스텁 서버 사용, 실제 API 호출 없음)
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generator import AnswerGenerator, AsyncAnswerGenerator
+from llm_stub import STUB_ANSWER, StubLLMServer
+from routing import ModelRouter
+
+
+def reference(category: str, score: float) -> list:
+    return [({"id": "T001", "category": category, "title": "테스트 답변", "content": "천천히 해 보세요."}, score)]
+
+
+def make_router(**options) -> ModelRouter:
+    """설정값과 무관한 테스트용 라우터"""
+    settings = dict(fast_model="fast-model", large_model="large-model", fast_max_tokens=600, large_max_tokens=1200,
+                    fast_threshold=0.6, sensitive_categories=["불안"], enabled=True)
+    settings.update(options)
+    return ModelRouter(**settings)
+
+
+def test_routing_policy():
+    """유사도 / 카테고리 / 민감 표현에 따른 경로 선택 테스트"""
+    print("=== 라우팅 정책 테스트 ===")
+
+    router = make_router()
+    cases = [
+        ("시험 공부가 손에 안 잡혀요", reference("학업", 0.8), "fast"),
+        ("시험 공부가 손에 안 잡혀요", reference("학업", 0.6), "fast"),
+        ("시험 공부가 손에 안 잡혀요", reference("학업", 0.4), "large"),  # 유사도 낮음
+        ("자꾸 불안해요", reference("불안", 0.9), "large"),  # 민감 카테고리
+        ("너무 힘들어서 죽고 싶어요", reference("학업", 0.9), "large"),  # 위기 표현
+        ("요즘 우울 증 같아요", reference("학업", 0.9), "large"),  # 띄어 써도 찾음
+        ("오늘 점심 메뉴 추천해 주세요", None, "large"),  # 참고 답변 없음
+    ]
+    for question, refs, expected in cases:
+        decision = router.route(question, refs)
+        assert decision.route.name == expected, (question, decision)
+        print(f"  {expected:<5} {decision.reason}")
+
+    fast = router.route("시험 공부", reference("학업", 0.9)).route
+    assert (fast.model, fast.max_tokens) == ("fast-model", 600)
+    assert make_router(enabled=False).route("시험 공부", reference("학업", 0.9)).route.model == "large-model"
+    # 점수가 유사도가 아닌 검색기(hybrid)는 빠른 모델을 쓰지 않음
+    assert make_router(fast_threshold=None).route("시험 공부", reference("학업", 1.0)).route.name == "large"
+    print("[OK] 라우팅 정책 확인")
+
+
+def test_routed_requests():
+    """생성기가 경로별 모델 / 최대 출력 토큰으로 요청하고 경로별 지연 시간을 기록하는지 테스트"""
+    print("\n=== 라우팅 요청 테스트 ===")
+
+    with StubLLMServer(delay=0.05) as stub:
+        router = make_router()
+        generator = AnswerGenerator(api_key="test-key", base_url=stub.base_url, router=router)
+        assert generator.generate_answer("시험 공부가 손에 안 잡혀요", reference("학업", 0.8)) == STUB_ANSWER
+        assert generator.generate_answer("자꾸 불안해요", reference("불안", 0.8)) == STUB_ANSWER
+        assert generator.generate_simple_answer("오늘 점심 메뉴 추천해 주세요") == STUB_ANSWER
+        assert "".join(generator.stream_answer("시험 공부가 손에 안 잡혀요", reference("학업", 0.9))) == STUB_ANSWER
+
+        async def run():
+            async_generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url, router=router)
+            answers = await asyncio.gather(
+                async_generator.generate_answer("시험 공부가 손에 안 잡혀요", reference("학업", 0.7)),
+                async_generator.generate_answer("시험 공부가 손에 안 잡혀요", reference("학업", 0.3)),
+            )
+            answers.append("".join([text async for text in async_generator.stream_answer("자꾸 불안해요")]))
+            await async_generator.aclose()
+            return answers
+
+        assert asyncio.run(run()) == [STUB_ANSWER] * 3
+
+    routes = sorted((body['model'], body['max_tokens']) for body in stub.requests)
+    assert routes == [("fast-model", 600)] * 3 + [("large-model", 1200)] * 4
+    assert router.stats.count("fast") == 3 and router.stats.count("large") == 4
+    assert router.stats.percentile("fast", 50) >= 0.05
+    print(f"[OK] {router.stats.summary()}")
+
+
+if __name__ == "__main__":
+    test_routing_policy()
+    test_routed_requests()
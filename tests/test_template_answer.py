@@ -0,0 +1,88 @@
+"""
+템플릿 답변 테스트 (로컬 스텁 서버 사용, 실제 API 호출 없음)
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from generator import AsyncAnswerGenerator
+from llm_stub import STUB_ANSWER, StubLLMServer
+from matcher import FAST_THRESHOLDS, TEMPLATE_THRESHOLDS, AnswerMatcher
+from pipeline import AsyncCounselingPipeline
+from routing import ModelRouter
+from template_answer import CLOSING, render_template_answer, template_answer
+
+ANSWER = {"id": "T001", "category": "진로", "keywords": ["진로", "취업"], "title": "진로 선택이 막막할 때",
+          "content": "완벽한 선택이란 없습니다. 지금 할 수 있는 최선의 선택을 해 보세요.",
+          "key_points": ["자기 이해", "정보 수집"]}
+
+
+def test_render_template_answer():
+    """공감 문장 / 본문 / 핵심 포인트 / 마무리 구성과 조건 테스트"""
+    print("=== 템플릿 답변 구성 테스트 ===")
+
+    answer = render_template_answer("취업 준비가 막막해요", ANSWER)
+    assert answer.startswith("취업 고민으로") and ANSWER['content'] in answer
+    assert "다음과 같아요: 자기 이해, 정보 수집." in answer
+    # 문장으로 된 핵심 포인트도 끝의 문장 부호를 떼고 그대로 나열
+    sentence = render_template_answer("진로 고민", dict(ANSWER, key_points=["작게 시작해 보세요.", "쉬어도 괜찮아요!"]))
+    assert sentence.endswith("같아요: 작게 시작해 보세요, 쉬어도 괜찮아요.\n\n" + CLOSING)
+    # 질문에 키워드가 없으면 카테고리, 핵심 포인트가 없으면 정리 문장 생략
+    bare = render_template_answer("앞으로 뭘 해야 하죠", dict(ANSWER, key_points=[]))
+    assert bare.startswith("진로 고민으로") and "핵심" not in bare
+
+    router = ModelRouter(sensitive_categories=["불안"])
+    assert template_answer("진로 고민", [(ANSWER, 0.5)], threshold=0.4, router=router) is not None
+    assert template_answer("진로 고민", [(ANSWER, 0.3)], threshold=0.4, router=router) is None
+    assert template_answer("진로 고민", [(ANSWER, 0.5)], threshold=0, router=router) is None
+    assert template_answer("진로 고민", [(ANSWER, 1.0)], threshold=None, router=router) is None
+    assert template_answer("진로 고민", [], threshold=0.4, router=router) is None
+    # 민감한 질문 / 카테고리는 항상 LLM으로
+    assert template_answer("진로 때문에 죽고 싶어요", [(ANSWER, 0.9)], threshold=0.4, router=router) is None
+    assert template_answer("진로 고민", [(dict(ANSWER, category="불안"), 0.9)], threshold=0.4, router=router) is None
+    print(f"[OK] 템플릿 답변 {len(answer)}자")
+
+
+def test_pipeline_template_fast_path():
+    """거의 같은 질문은 API 호출 없이 바로 답하고, 자세한 답변을 요청하면 그때 생성하는지 테스트"""
+    print("\n=== 템플릿 답변 파이프라인 테스트 ===")
+
+    matcher = AnswerMatcher(index_cache_dir=None)
+    # 기본값은 끔, 검색기마다 점수 척도가 달라 hybrid는 템플릿 답변을 쓰지 않음
+    assert not AsyncCounselingPipeline(matcher, None).template_threshold
+    assert TEMPLATE_THRESHOLDS["hybrid"] is None and FAST_THRESHOLDS["hybrid"] is None
+    with StubLLMServer(delay=0.2) as stub:
+        async def run():
+            generator = AsyncAnswerGenerator(api_key="test-key", base_url=stub.base_url)
+            pipeline = AsyncCounselingPipeline(matcher, generator, template_threshold=0.38)
+
+            start = time.perf_counter()
+            quick = await pipeline.answer("진로 선택이 막막할 때", allow_template=True)
+            quick_time = time.perf_counter() - start
+            assert quick.template and quick.matches[0][0]['id'] == "A002" and not stub.requests
+
+            # 자세한 답변은 요청할 때만 생성
+            detail = await pipeline.generate(quick.question, quick.matches)
+            assert detail == STUB_ANSWER and len(stub.requests) == 1
+
+            # 유사도가 낮은 질문과 allow_template이 꺼진 호출은 LLM으로 답변
+            others = await pipeline.answer_many(["오늘 점심 메뉴 추천해 주세요", "남자친구와 헤어져서 너무 힘들어요"],
+                                                allow_template=True)
+            plain = await pipeline.answer("진로 선택이 막막할 때")
+            await generator.aclose()
+            assert not any(r.template for r in others + [plain]) and plain.answer == STUB_ANSWER
+            return quick_time, pipeline.template_answers
+
+        quick_time, template_answers = asyncio.run(run())
+    assert quick_time < 0.1 and template_answers == 1
+    print(f"[OK] 템플릿 답변 {quick_time * 1000:.1f}ms (API 호출 없음)")
+
+
+if __name__ == "__main__":
+    test_render_template_answer()
+    test_pipeline_template_fast_path()
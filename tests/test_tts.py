@@ -0,0 +1,251 @@
+"""
+문장 단위 동시 음성 변환 테스트 (gTTS 대신 가짜 변환기 사용, 네트워크 호출 없음)
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_cache import AudioCache
+from tts import TextToSpeech, split_tts_chunks
+from tts_engines import GttsEngine, PcmEngine, load_speech_engine, read_wav, strip_id3
+
+ANSWER = ("많이 힘드셨죠? 그런 마음이 드는 건 자연스러운 일이에요. 먼저 하루 일과를 천천히 돌아보세요. "
+          "잠을 충분히 자고 있는지, 식사는 거르지 않는지 확인해 보는 것도 좋아요. "
+          "작은 목표를 하나 정해서 오늘 해 보세요! 그리고 믿을 만한 사람에게 지금 마음을 이야기해 보세요. "
+          "혼자 버티지 않아도 괜찮아요… 당신은 충분히 잘하고 있어요.")
+
+
+class FakeSynthesizer(TextToSpeech):
+    """글자 수에 비례해 기다린 뒤 ID3 태그 + 텍스트를 음성 대신 돌려주는 변환기"""
+
+    def __init__(self, seconds_per_char: float = 0.002, **kwargs):
+        super().__init__(**kwargs)
+        self.seconds_per_char = seconds_per_char
+        self.active = 0
+        self.peak_active = 0
+        self._count_lock = threading.Lock()
+
+    def synthesize_chunk(self, text: str) -> bytes:
+        with self._count_lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        time.sleep(len(text) * self.seconds_per_char)
+        with self._count_lock:
+            self.active -= 1
+        return b"ID3\x03\x00\x00\x00\x00\x00\x02ab" + text.encode('utf-8')
+
+
+def audio_text(audio: bytes) -> str:
+    """가짜 음성에서 텍스트 복원 (첫 ID3 태그만 남아 있어야 함)"""
+    assert audio.startswith(b"ID3") and audio.count(b"ID3") == 1
+    return strip_id3(audio).decode('utf-8')
+
+
+def test_split_tts_chunks():
+    """문장 경계 / 최대 글자 수 / 첫 문장 단독 조각 테스트"""
+    print("=== 음성 변환 조각 나누기 테스트 ===")
+
+    chunks = split_tts_chunks(ANSWER, max_chars=80)
+    assert chunks[0] == "많이 힘드셨죠?"
+    assert all(len(c) <= 80 for c in chunks) and all(c[-1] in ".?!…" for c in chunks)
+    assert "".join(chunks).replace(" ", "") == ANSWER.replace(" ", "")
+    assert split_tts_chunks("문장 부호 없는 짧은 답변") == ["문장 부호 없는 짧은 답변"]
+    assert split_tts_chunks("  \n ") == []
+    assert split_tts_chunks('그가 말했어요. "괜찮아." 정말요?') == ["그가 말했어요.", '"괜찮아." 정말요?']
+    assert strip_id3(b"ID3\x03\x00\x00\x00\x00\x00\x02abMP3") == b"MP3" and strip_id3(b"MP3") == b"MP3"
+    print(f"[OK] {len(chunks)}개 조각: {[len(c) for c in chunks]}")
+
+
+def test_parallel_synthesis():
+    """조각을 동시에 변환하고 순서대로 이어 붙이며, 첫 조각은 전체보다 먼저 나오는지 테스트"""
+    print("\n=== 문장 단위 동시 변환 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serial = FakeSynthesizer(max_workers=1, chunk_chars=80)
+        start = time.perf_counter()
+        serial_audio = b"".join(serial.iter_audio(ANSWER))
+        serial_time = time.perf_counter() - start
+
+        tts = FakeSynthesizer(max_workers=4, chunk_chars=80)
+        start = time.perf_counter()
+        parts = iter(tts.iter_audio(ANSWER))
+        first = next(parts)
+        first_time = time.perf_counter() - start
+        audio = first + b"".join(parts)
+        total_time = time.perf_counter() - start
+
+        assert audio == serial_audio and audio_text(audio).replace(" ", "") == ANSWER.replace(" ", "")
+        assert tts.peak_active > 1 and tts.chunks_synthesized == len(split_tts_chunks(ANSWER, 80))
+        assert first_time < total_time < serial_time * 0.7
+
+        path = tts.text_to_speech(ANSWER, Path(tmp) / "answer.mp3")
+        assert path.read_bytes() == audio
+        tts.close()
+        serial.close()
+    print(f"[OK] 순차 {serial_time * 1000:.0f}ms -> 동시 {total_time * 1000:.0f}ms (첫 조각 {first_time * 1000:.0f}ms)")
+
+
+def test_speech_stream():
+    """스트리밍 답변을 받는 동안 앞 문장 음성이 먼저 준비되고, 저장한 음성은 캐시에서 적중하는지 테스트"""
+    print("\n=== 스트리밍 답변 음성 변환 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tts = FakeSynthesizer(cache=AudioCache(Path(tmp), max_bytes=10 ** 6), chunk_chars=80)
+        words = [w + " " for w in ANSWER.split(" ")]
+        stream = tts.open_stream()
+        ready_at = None
+        for i, word in enumerate(words):  # LLM이 어절 단위로 10ms마다 조각을 보내는 상황
+            stream.feed(word)
+            if ready_at is None and any(True for _ in stream.ready()):
+                ready_at = i
+            time.sleep(0.01)
+        assert ready_at is not None and ready_at < len(words) // 2
+
+        path = stream.save()
+        assert audio_text(path.read_bytes()).replace(" ", "") == ANSWER.replace(" ", "")
+        synthesized = tts.chunks_synthesized
+        assert tts.generate_answer_audio(ANSWER.strip()) == path and tts.chunks_synthesized == synthesized
+        tts.close()
+    print(f"[OK] 어절 {len(words)}개 중 {ready_at + 1}번째에서 첫 음성 준비")
+
+
+def test_speech_stream_cache():
+    """같은 답변을 다시 스트리밍하면 조각을 캐시에서 읽고, 동시에 스트리밍하는 같은 조각은 한 번만 변환하는지 테스트"""
+    print("\n=== 스트리밍 음성 캐시 테스트 ===")
+
+    def stream_answer(tts):
+        stream = tts.open_stream()
+        for word in ANSWER.split(" "):
+            stream.feed(word + " ")
+        return stream
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AudioCache(Path(tmp), max_bytes=10 ** 6)
+        tts = FakeSynthesizer(cache=cache, chunk_chars=80)
+        first = stream_answer(tts).audio()
+        synthesized = tts.chunks_synthesized
+
+        # 다시 스트리밍하면 엔진을 부르지 않음
+        assert stream_answer(tts).audio() == first
+        assert tts.chunks_synthesized == synthesized and cache.stats.hits == synthesized
+
+        # 캐시에 없는 답변을 동시에 스트리밍하면 같은 조각은 한 번만 변환
+        other = "오늘은 푹 쉬세요. 내일 다시 이야기해요. 언제든 찾아와도 괜찮아요."
+        streams = []
+        for _ in range(3):
+            stream = tts.open_stream()
+            stream.feed(other + " ")
+            streams.append(stream)
+        audios = [stream.audio() for stream in streams]
+        assert audios[0] == audios[1] == audios[2] != first
+        assert tts.chunks_synthesized == synthesized + len(split_tts_chunks(other, 80))
+
+        # 먼저 제출한 쪽이 시작 전에 취소해도 기다리던 쪽은 결과를 받음
+        blocker = threading.Event()
+        slow = FakeSynthesizer(cache=AudioCache(Path(tmp) / "slow", max_bytes=10 ** 6), max_workers=1)
+        slow._executor.submit(blocker.wait)
+        leader, follower = slow.submit_cached("취소될 조각."), slow.submit_cached("취소될 조각.")
+        assert leader.cancel()
+        blocker.set()
+        assert audio_text(follower.result()) == "취소될 조각."
+        slow.close()
+        tts.close()
+    print(f"[OK] {cache.stats.summary()}")
+
+
+def test_synthesize_bytes():
+    """메모리 변환은 파일을 기다리지 않고 바이트를 돌려주고, 캐시 / 출력 파일 저장은 백그라운드에서 하는지 테스트"""
+    print("\n=== 메모리 음성 변환 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AudioCache(Path(tmp) / "cache", max_bytes=10 ** 6)
+        tts = FakeSynthesizer(cache=cache, chunk_chars=80)
+        release = threading.Event()
+        tts._sink.submit(release.wait)  # 저장 스레드를 잠시 막아 반환이 저장을 기다리지 않는지 확인
+
+        output_path = Path(tmp) / "output" / "answer.mp3"
+        audio = tts.synthesize_bytes(ANSWER, output_path)
+        assert audio_text(audio).replace(" ", "") == ANSWER.replace(" ", "")
+        assert len(cache) == 0 and not output_path.exists()
+        release.set()
+
+        # 저장이 끝나면 캐시와 출력 파일에 같은 바이트가 있고, 다시 요청하면 변환 없이 캐시에서 읽음
+        tts._sink.submit(lambda: None).result()
+        assert output_path.read_bytes() == audio and len(cache) == 1
+        synthesized = tts.chunks_synthesized
+        assert tts.synthesize_bytes(ANSWER) == audio and tts.chunks_synthesized == synthesized
+        assert tts.generate_answer_audio(ANSWER).read_bytes() == audio and cache.stats.hits == 2
+
+        # 캐시가 없어도 메모리 변환은 동작
+        plain = FakeSynthesizer(chunk_chars=80)
+        assert plain.synthesize_bytes(ANSWER) == audio
+        plain.close()
+        tts.close()
+    print(f"[OK] {len(audio)}바이트, {cache.stats.summary()}")
+
+
+class ToneEngine(PcmEngine):
+    """글자마다 10ms 길이의 무음 PCM을 만드는 로컬 엔진 (모델은 생성할 때 한 번만 불러오는 것처럼 세기)"""
+
+    name = "tone"
+    sample_rate = 16000
+    loads = 0
+
+    def __init__(self, audio_format: str = "wav"):
+        super().__init__(audio_format)
+        ToneEngine.loads += 1
+
+    def synthesize_pcm(self, text: str, language: str, slow: bool) -> bytes:
+        return b"\x00\x00" * (len(text) * self.sample_rate // 100)
+
+
+def test_local_engine_formats():
+    """로컬 엔진의 WAV / PCM 조각을 하나의 음성으로 합치고, 엔진과 형식마다 캐시 키가 다른지 테스트"""
+    print("\n=== 로컬 음성 합성 엔진 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = ToneEngine("wav")
+        tts = TextToSpeech(engine=engine, cache=AudioCache(Path(tmp), max_bytes=10 ** 7, suffix=".wav"),
+                           chunk_chars=80)
+        audio = tts.synthesize_bytes(ANSWER)
+        params, frames = read_wav(audio)
+        chars = sum(len(c) for c in split_tts_chunks(ANSWER, 80))
+        assert params.framerate == 16000 and len(frames) == chars * 160 * 2
+        assert tts.generate_answer_audio(ANSWER).suffix == ".wav" and ToneEngine.loads == 1
+
+        # 스트리밍 변환도 헤더가 하나인 WAV (조각 경계의 공백만큼만 길이가 다름)
+        stream = tts.open_stream()
+        for word in ANSWER.split(" "):
+            stream.feed(word + " ")
+        stream_params, stream_frames = read_wav(stream.audio())
+        assert stream_params.framerate == 16000 and abs(len(stream_frames) - len(frames)) <= 320 * ANSWER.count(" ")
+
+        pcm = TextToSpeech(engine=ToneEngine("pcm"), chunk_chars=80)
+        assert pcm.synthesize_bytes(ANSWER) == frames and pcm.engine.mime_type == "audio/L16"
+        assert len({tts.cache_key("안녕"), pcm.cache_key("안녕"), TextToSpeech().cache_key("안녕")}) == 3
+        pcm.close()
+        tts.close()
+
+    # 지원하지 않는 엔진 / 형식
+    for make in (lambda: GttsEngine("wav"), lambda: load_speech_engine("festival"), lambda: ToneEngine("flac")):
+        try:
+            make()
+            assert False, "오류가 발생하지 않음"
+        except ValueError:
+            pass
+    print(f"[OK] WAV {len(audio)}바이트 ({len(frames) // 2 / 16000:.2f}초)")
+
+
+if __name__ == "__main__":
+    test_split_tts_chunks()
+    test_parallel_synthesis()
+    test_speech_stream()
+    test_speech_stream_cache()
+    test_synthesize_bytes()
+    test_local_engine_formats()
@@ -0,0 +1,138 @@
+"""
+백그라운드 음성 변환 작업 대기열 테스트 (gTTS 대신 가짜 합성 엔진 사용, 네트워크 호출 없음)
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, wait
+from pathlib import Path
+
+# src 디렉토리를 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_cache import AudioCache
+from tts import TextToSpeech
+from tts_engines import SpeechEngine
+from tts_jobs import DONE, FAILED, TTSJobQueue
+
+
+class SlowEngine(SpeechEngine):
+    """조각마다 delay초 걸리는 가짜 MP3 엔진 ("실패"가 들어간 텍스트는 오류)"""
+
+    name = "slow"
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+
+    def synthesize(self, text: str, language: str, slow: bool) -> bytes:
+        time.sleep(self.delay)
+        if "실패" in text:
+            raise RuntimeError("합성 실패")
+        return text.encode('utf-8')
+
+
+def test_job_returns_immediately():
+    """작업 제출은 변환을 기다리지 않고, 결과는 폴링 / 대기 / 구독으로 받는지 테스트"""
+    print("=== 음성 변환 작업 제출 테스트 ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tts = TextToSpeech(engine=SlowEngine(0.1), cache=AudioCache(Path(tmp) / "cache", max_bytes=10 ** 6))
+        jobs = TTSJobQueue(tts, max_workers=2)
+
+        start = time.perf_counter()
+        job_id = jobs.submit("오늘도 수고 많으셨어요.", Path(tmp) / "answer.mp3")
+        submit_time = time.perf_counter() - start
+        assert submit_time < 0.02 and not jobs.get(job_id).done
+
+        notified = threading.Event()
+        jobs.subscribe(job_id, lambda job: notified.set())
+        job = jobs.wait(job_id, timeout=5)
+        assert job.status == DONE and job.audio == "오늘도 수고 많으셨어요.".encode('utf-8')
+        assert job.path.read_bytes() == job.audio and notified.wait(1)
+        assert 0.1 <= job.latency < 1 and jobs.pending() == []
+
+        # 이미 끝난 작업 구독은 바로 호출, 같은 텍스트는 캐시에서 바로 완료
+        called = []
+        jobs.subscribe(job_id, called.append)
+        assert called == [job]
+        cached = jobs.wait(jobs.submit("오늘도 수고 많으셨어요."), timeout=5)
+        assert cached.audio == job.audio and cached.latency < 0.05 and tts.cache.stats.hits == 1
+
+        jobs.close()
+        tts.close()
+    print(f"[OK] 제출 {submit_time * 1000:.2f}ms, 완료 {job.latency * 1000:.0f}ms")
+
+
+def test_job_metrics():
+    """대기열 길이 / 작업자 사용률 / 지연 시간 지표와 실패 / 취소 작업 테스트"""
+    print("\n=== 음성 변환 작업 지표 테스트 ===")
+
+    tts = TextToSpeech(engine=SlowEngine(0.1))
+    jobs = TTSJobQueue(tts, max_workers=1)
+    job_ids = [jobs.submit(f"답변 {i}번입니다.") for i in range(3)]
+    time.sleep(0.03)
+    assert jobs.stats.queue_depth == 2 and jobs.stats.running == 1 and len(jobs.pending()) == 3
+
+    failed_id = jobs.submit("실패하는 답변")
+    for job_id in job_ids:
+        jobs.wait(job_id, timeout=5)
+    try:
+        jobs.wait(failed_id, timeout=5)
+        assert False, "오류가 발생하지 않음"
+    except RuntimeError:
+        pass
+    assert jobs.get(failed_id).status == FAILED and jobs.get(failed_id).path is None
+    stats = jobs.stats
+    assert stats.completed == 3 and stats.failed == 1 and stats.queue_depth == 0 and stats.running == 0
+    assert stats.utilization > 0.8 and stats.percentile(95) > stats.percentile(50) >= 0.1
+    assert stats.percentile(50, waits=True) > 0
+    summary = stats.summary()
+
+    # 끝나지 않은 채로 닫으면 시작하지 않은 작업은 취소
+    blocked = [jobs.submit(f"닫기 전 답변 {i}") for i in range(3)]
+    jobs.close(wait=False)
+    try:
+        jobs.wait(blocked[-1], timeout=5)
+        assert False, "취소되지 않음"
+    except CancelledError:
+        pass
+    wait([jobs.get(job_id).future for job_id in blocked], timeout=5)
+    assert stats.failed >= 3 and stats.running == 0
+    tts.close()
+    print(f"[OK] {summary}")
+
+
+def test_job_history():
+    """끝난 작업은 최근 history개만 남기는지 테스트"""
+    print("\n=== 음성 변환 작업 기록 테스트 ===")
+
+    tts = TextToSpeech(engine=SlowEngine(0))
+    jobs = TTSJobQueue(tts, max_workers=1, history=2)
+    job_ids = []
+    for i in range(4):
+        job_ids.append(jobs.submit(f"답변 {i}"))
+        jobs.wait(job_ids[-1], timeout=5)
+    jobs.submit("마지막 답변")
+    try:
+        jobs.get(job_ids[0])
+        assert False, "오래된 작업이 남아 있음"
+    except KeyError:
+        pass
+    assert jobs.get(job_ids[-1]).done
+    jobs.close()
+    tts.close()
+
+    try:
+        TTSJobQueue(tts, use_processes=True)
+        assert False, "가짜 엔진으로 프로세스 풀이 만들어짐"
+    except ValueError:
+        pass
+    print("[OK] 오래된 작업 정리")
+
+
+if __name__ == "__main__":
+    test_job_returns_immediately()
+    test_job_metrics()
+    test_job_history()